@@ -0,0 +1,163 @@
+# -*- coding: utf-8 -*-
+"""
+模型管理API路由
+运行期加载、卸载、固定和预热模型
+
+接口使用 X-NLS-Token 鉴权（ADMIN_TOKEN，未设置时为 APPTOKEN），两者都未配置时返回403
+"""
+
+from fastapi import APIRouter, Request, HTTPException
+import logging
+
+from ...core.exceptions import AuthenticationException
+from ...core.executor import run_sync
+from ...core.security import is_admin_auth_configured, validate_admin_token
+from ...services.asr import lifecycle
+from ...services.asr.manager import get_model_manager
+
+# 配置日志
+logger = logging.getLogger(__name__)
+
+# 创建路由器
+router = APIRouter(
+    prefix="/stream/v1/asr/admin",
+    tags=["Admin"],
+    responses={403: {"description": "未配置 ADMIN_TOKEN 或 APPTOKEN，模型管理接口已禁用"}},
+)
+
+
+def _authenticate(request: Request, task_id: str) -> None:
+    result, content = validate_admin_token(request)
+    if not result:
+        if not is_admin_auth_configured():
+            raise HTTPException(status_code=403, detail=content)
+        raise AuthenticationException(content, task_id)
+
+
+@router.get(
+    "/models",
+    summary="模型常驻状态",
+    description="""
+返回当前 Worker 的模型常驻状态。
+
+## 返回信息
+- **models**: 可用模型列表（含是否已加载）
+- **residency**: 内存预算、已用内存、固定的模型、各模型占用及空闲时间、淘汰次数
+- **memory**: 当前内存数值（进程 RSS、已加载模型占用，GPU 模式下另含显存，单位 MB）
+- **jobs**: 加载/预热任务（最近的在前）
+""",
+)
+async def admin_models(request: Request):
+    """模型常驻状态端点"""
+    _authenticate(request, "admin_models")
+
+    model_manager = get_model_manager()
+    return {
+        "models": model_manager.list_models(),
+        "residency": model_manager.get_residency_stats(),
+        "memory": model_manager.get_memory_snapshot(),
+        "jobs": lifecycle.list_jobs(),
+    }
+
+
+@router.post(
+    "/models/{model_id}/load",
+    status_code=202,
+    summary="加载模型",
+    description="""
+在后台加载模型，立即返回任务，通过 `GET /stream/v1/asr/admin/jobs/{job_id}` 查询进度。
+同一模型已有进行中的加载任务时返回该任务。
+
+## 请求参数
+- **warmup**: 加载后是否预热（默认 true）
+
+## 任务状态
+pending → loading → warming_up → done / failed，`steps` 为各步骤耗时（秒），
+`memory` 为操作前后的内存数值及差值（MB）。
+""",
+)
+async def admin_load_model(request: Request, model_id: str, warmup: bool = True):
+    """加载模型端点"""
+    _authenticate(request, f"admin_load_{model_id}")
+    return lifecycle.submit_load(model_id, warmup)
+
+
+@router.post(
+    "/models/{model_id}/warmup",
+    status_code=202,
+    summary="预热模型",
+    description="""
+在后台预热已加载的模型（离线链路各音频时长、流式识别各步长），立即返回任务。
+预热不影响服务的就绪状态，各阶段耗时在任务的 `warmup_result` 中返回。
+""",
+)
+async def admin_warmup_model(request: Request, model_id: str):
+    """预热模型端点"""
+    _authenticate(request, f"admin_warmup_{model_id}")
+    return lifecycle.submit_warmup(model_id)
+
+
+@router.post(
+    "/models/{model_id}/unload",
+    summary="卸载模型",
+    description="""
+卸载模型并返回卸载前后的内存数值。固定的模型（含默认模型）需指定 `force=true`；
+有活跃的流式会话（WebSocket / HTTP 流式）时不能卸载默认模型。
+funasr（或 funasr-onnx）模型全部卸载后，对应的全局 VAD/标点模型一并释放。
+
+## 请求参数
+- **force**: 是否卸载固定的模型（默认 false）
+""",
+)
+async def admin_unload_model(request: Request, model_id: str, force: bool = False):
+    """卸载模型端点"""
+    _authenticate(request, f"admin_unload_{model_id}")
+    return await run_sync(lifecycle.unload_model, model_id, force)
+
+
+@router.post(
+    "/models/{model_id}/pin",
+    summary="固定模型",
+    description="固定模型，固定的模型不会因内存预算（MODEL_MEMORY_BUDGET_MB）被淘汰。",
+)
+async def admin_pin_model(request: Request, model_id: str):
+    """固定模型端点"""
+    _authenticate(request, f"admin_pin_{model_id}")
+    return lifecycle.pin_model(model_id, True)
+
+
+@router.delete(
+    "/models/{model_id}/pin",
+    summary="取消固定模型",
+    description="取消固定，超出内存预算时该模型可按最近最少使用顺序被淘汰。",
+)
+async def admin_unpin_model(request: Request, model_id: str):
+    """取消固定模型端点"""
+    _authenticate(request, f"admin_unpin_{model_id}")
+    return lifecycle.pin_model(model_id, False)
+
+
+@router.post(
+    "/aux-models/release",
+    summary="释放全局VAD/标点模型",
+    description="释放全局 VAD、离线标点和实时标点模型（含 ONNX 引擎的辅助模型），之后的请求按需重新加载。返回释放前后的内存数值。",
+)
+async def admin_release_aux_models(request: Request):
+    """释放全局VAD/标点模型端点"""
+    _authenticate(request, "admin_release_aux_models")
+    return await run_sync(lifecycle.release_aux_models)
+
+
+@router.get(
+    "/jobs/{job_id}",
+    summary="查询任务进度",
+    description="返回加载/预热任务的状态、各步骤耗时、操作前后的内存数值及失败原因。",
+)
+async def admin_job(request: Request, job_id: str):
+    """查询任务进度端点"""
+    _authenticate(request, f"admin_job_{job_id}")
+
+    job = lifecycle.get_job(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"任务不存在: {job_id}")
+    return job
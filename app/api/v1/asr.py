@@ -36,6 +36,7 @@ from ...models.asr import (
     ASRQueryParams,
 )
 from ...utils.common import generate_task_id
+from ...utils.audio_prescreen import get_prescreen_stats
 from ...utils.audio import (
     validate_sample_rate,
     download_audio_from_url,
@@ -46,6 +47,22 @@ from ...utils.audio import (
     get_audio_duration,
 )
 from ...services.asr.manager import get_model_manager
+from ...services.asr.compilation import get_compile_stats
+from ...services.asr.loading import get_load_stats
+from ...services.asr.precision import get_precision_stats
+from ...services.asr.quantization import get_quantization_stats
+from ...services.asr.snapshot import get_snapshot_stats
+from ...services.asr.warmup import get_warmup_stats, is_ready
+from ...services.http_stream_asr import (
+    STREAM_OUTPUT_FORMATS,
+    UploadStreamingResponse,
+    build_start_payload,
+    stream_transcription,
+)
+from ...services.stream_scheduler import get_stream_scheduler
+from ...services.two_pass import get_two_pass_stats
+from ...services.websocket_asr import get_aliyun_websocket_asr_service
+from ...services.websocket_session import get_session_checkpoint_store
 
 # 配置日志
 logger = logging.getLogger(__name__)
@@ -93,6 +110,7 @@ async def get_asr_params(request: Request) -> ASRQueryParams:
 
 ## 可用模型
 - **paraformer-large**（默认）：高精度中文语音识别，内置VAD+标点
+- **paraformer-large-onnx**：Paraformer Large 的 ONNX Runtime 版本，适合纯CPU节点
 - **fun-asr-nano**：轻量级多语言ASR，支持31种语言、7大中文方言
 
 ## 音频输入方式
@@ -125,10 +143,10 @@ async def get_asr_params(request: Request) -> ASRQueryParams:
                     "type": "string",
                     "maxLength": 64,
                     "default": "paraformer-large",
-                    "enum": ["paraformer-large", "fun-asr-nano"],
+                    "enum": ["paraformer-large", "paraformer-large-onnx", "fun-asr-nano"],
                     "example": "paraformer-large",
                 },
-                "description": "ASR 模型 ID。可选值：paraformer-large（默认）、fun-asr-nano（多语言+方言）",
+                "description": "ASR 模型 ID。可选值：paraformer-large（默认）、paraformer-large-onnx（ONNX Runtime）、fun-asr-nano（多语言+方言）",
             },
             {
                 "name": "sample_rate",
@@ -352,6 +370,59 @@ async def asr_transcribe(
             cleanup_temp_file(normalized_audio_path)
 
 
+@router.post(
+    "/asr/realtime",
+    summary="HTTP 分块流式实时识别",
+    description="""
+通过普通 HTTP/1.1 POST 进行实时语音识别，适用于无法使用 WebSocket 的环境。
+
+## 使用方式
+- 请求体以分块传输（`Transfer-Encoding: chunked`）持续上传音频，格式与 `/ws/v1/asr` 相同（pcm/wav/opus/ogg 等）
+- 查询参数即 StartTranscription 的 payload，如 `format`、`sample_rate`、`latency_profile`、
+  `enable_intermediate_result`、`intermediate_result_mode`、`enable_two_pass`
+- 响应在上传过程中持续返回，消息内容与 WebSocket 协议相同（SentenceBegin、TranscriptionResultChanged、SentenceEnd 等）
+- 请求体结束即视为 StopTranscription，返回 TranscriptionCompleted 后响应结束
+
+## 响应格式
+- `output=ndjson`（默认）：`application/x-ndjson`，每行一条消息
+- `output=sse`：`text/event-stream`，`event` 为消息名，`data` 为消息JSON
+""",
+    response_class=UploadStreamingResponse,
+)
+async def asr_realtime_http(request: Request):
+    """HTTP分块流式识别端点（与WebSocket实时识别共用处理路径）"""
+    task_id = generate_task_id()
+    query_params = dict(request.query_params)
+
+    result, content = validate_token(request, task_id)
+    if not result:
+        raise AuthenticationException(content, task_id)
+    result, content = validate_request_appkey(query_params.get("appkey", ""), task_id)
+    if not result:
+        raise AuthenticationException(content, task_id)
+
+    output = query_params.get("output", "").lower()
+    if not output:
+        output = "sse" if "text/event-stream" in request.headers.get("accept", "") else "ndjson"
+    if output not in STREAM_OUTPUT_FORMATS:
+        raise InvalidParameterException(
+            f"不支持的响应格式: {output}，支持: {', '.join(STREAM_OUTPUT_FORMATS)}", task_id
+        )
+
+    logger.info(f"[{task_id}] 收到HTTP流式识别请求, output={output}")
+    return UploadStreamingResponse(
+        stream_transcription(
+            get_aliyun_websocket_asr_service(),
+            request,
+            task_id,
+            build_start_payload(query_params),
+            output,
+        ),
+        media_type=STREAM_OUTPUT_FORMATS[output],
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
 @router.get(
     "/asr/health",
     response_model=ASRHealthCheckResponse,
@@ -360,12 +431,22 @@ async def asr_transcribe(
 检查语音识别服务的运行状态和资源使用情况。
 
 ## 返回信息
-- **status**: 服务状态（healthy/unhealthy/error）
+- **status**: 服务状态（healthy/warming_up/unhealthy/error），模型已加载但预热未结束时为 warming_up
 - **model_loaded**: 默认模型是否已加载
+- **ready**: 预热是否已结束（服务是否就绪）
 - **device**: 当前推理设备（cuda:0/cpu）
 - **loaded_models**: 已加载的模型列表
 - **memory_usage**: GPU 显存使用情况（仅 GPU 模式）
 - **asr_model_mode**: 当前模型加载模式（offline/realtime/all）
+- **streaming**: 流式识别调度统计（活跃会话数、在途推理数、各会话chunk延迟 p50/p99、待续传会话数）
+- **prescreen**: 离线识别能量预筛统计（已检查、跳过、裁剪次数及节省的音频时长）
+- **quantization**: 模型量化统计（各模型量化模式、量化前后内存、节省量，及合计节省）
+- **precision**: 推理精度（CPU 是否原生支持 bf16，各模型配置的精度、实际生效的精度及回退原因）
+- **warmup**: 模型预热统计（状态、音频来源、总耗时、各阶段耗时及失败原因）
+- **compile**: 模型编译统计（编译缓存目录，各模型的编译模式、已编译的 批大小x长度桶 及编译耗时、编译/eager 调用次数）
+- **loading**: 模型加载统计（同时加载的模型数上限、累计加载耗时，各模型的加载耗时及等待加载槽位的时间）
+- **snapshot**: 模型快照统计（是否启用、快照目录，各模型的加载来源（snapshot/automodel）、加载耗时及快照写出情况）
+- **residency**: 模型常驻统计（内存预算、已用内存、固定的模型，各模型占用及空闲时间，加载/重新加载/淘汰次数及最近的淘汰记录）
 """,
 )
 async def health_check(request: Request):
@@ -388,22 +469,40 @@ async def health_check(request: Request):
             device = "unknown"
 
         memory_info = model_manager.get_memory_usage()
+        ready = is_ready()
+
+        if not model_loaded:
+            status, message = "unhealthy", "ASR model not loaded"
+        elif not ready:
+            status, message = "warming_up", "ASR models are warming up"
+        else:
+            status, message = "healthy", "ASR service is running normally"
 
         return {
-            "status": "healthy" if model_loaded else "unhealthy",
+            "status": status,
             "model_loaded": model_loaded,
+            "ready": ready,
             "device": device,
             "version": settings.APP_VERSION,
-            "message": (
-                "ASR service is running normally"
-                if model_loaded
-                else "ASR model not loaded"
-            ),
+            "message": message,
             "loaded_models": memory_info["model_list"],
             "memory_usage": memory_info.get("gpu_memory"),
             "asr_model_mode": memory_info.get(
                 "asr_model_mode", settings.ASR_MODEL_MODE
             ),
+            "streaming": {
+                **get_stream_scheduler().get_stats(),
+                "resume": get_session_checkpoint_store().get_stats(),
+                "two_pass": get_two_pass_stats(),
+            },
+            "prescreen": get_prescreen_stats(),
+            "quantization": get_quantization_stats(),
+            "precision": get_precision_stats(),
+            "compile": get_compile_stats(),
+            "warmup": get_warmup_stats(),
+            "loading": get_load_stats(),
+            "snapshot": get_snapshot_stats(),
+            "residency": model_manager.get_residency_stats(),
         }
     except Exception as e:
         return {
@@ -415,6 +514,32 @@ async def health_check(request: Request):
         }
 
 
+@router.get(
+    "/asr/ready",
+    summary="ASR 服务就绪检查",
+    description="""
+就绪探针：模型预加载与预热结束后返回 200，之前返回 503。
+
+预热在模型加载后用音频跑一遍离线链路（VAD + ASR + 标点 + ITN，覆盖多个音频时长）
+和各个步长的流式识别，避免部署后首批请求的延迟尖峰。预热失败不会阻止就绪。
+
+## 返回信息
+- **ready**: 是否就绪
+- **status**: 预热状态（pending/running/done/failed/skipped）
+- **total_ms**: 预热总耗时（毫秒）
+- **stages**: 各预热阶段耗时（毫秒）
+""",
+)
+async def readiness_check(request: Request):
+    """ASR服务就绪检查端点"""
+    result, content = validate_token(request)
+    if not result:
+        raise AuthenticationException(content, "readiness_check")
+
+    warmup = get_warmup_stats()
+    return JSONResponse(status_code=200 if warmup["ready"] else 503, content=warmup)
+
+
 @router.get(
     "/asr/models",
     response_model=ASRModelsResponse,
@@ -427,6 +552,7 @@ async def health_check(request: Request):
 | 模型 ID | 名称 | 说明 | 支持实时 |
 |---------|------|------|----------|
 | paraformer-large | Paraformer Large | 高精度中文语音识别（默认） | ✅ |
+| paraformer-large-onnx | Paraformer Large (ONNX) | ONNX Runtime 推理，适合纯CPU节点 | ✅ |
 | fun-asr-nano | Fun-ASR-Nano | 轻量级多语言ASR，支持31种语言和方言 | ❌ |
 
 ## 返回信息
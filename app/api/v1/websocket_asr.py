@@ -36,6 +36,26 @@ async def aliyun_websocket_asr_endpoint(websocket: WebSocket):
             pass
 
 
+@router.websocket("/mux")
+async def aliyun_websocket_asr_mux_endpoint(websocket: WebSocket):
+    """多路复用WebSocket实时ASR端点（一个连接承载多个识别任务）"""
+    await websocket.accept()
+    service = get_aliyun_websocket_asr_service()
+    connection_id = f"aliyun_ws_mux_{int(time.time())}_{id(websocket)}"
+
+    try:
+        await service._process_multiplexed_connection(websocket, connection_id)
+    except WebSocketDisconnect:
+        logger.info(f"[{connection_id}] 客户端断开连接")
+    except Exception as e:
+        logger.error(f"[{connection_id}] 连接处理异常: {e}")
+    finally:
+        try:
+            await websocket.close()
+        except:
+            pass
+
+
 @router.get("/test", response_class=HTMLResponse)
 async def websocket_asr_test_page():
     """阿里云WebSocket ASR测试页面"""
@@ -113,6 +133,8 @@ async def websocket_asr_test_page():
                     <select id="sampleRate">
                         <option value="8000">8000</option>
                         <option value="16000" selected>16000</option>
+                        <option value="24000">24000</option>
+                        <option value="48000">48000</option>
                     </select>
                 </div>
                 <div class="form-group">
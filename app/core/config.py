@@ -25,6 +25,7 @@ class Settings:
     # 鉴权配置
     APPTOKEN: Optional[str] = None  # 从环境变量APPTOKEN读取，如果为None则鉴权可选
     APPKEY: Optional[str] = None  # 从环境变量APPKEY读取，如果为None则appkey可选
+    ADMIN_TOKEN: Optional[str] = None  # 模型管理接口的令牌，为None时使用APPTOKEN鉴权，两者都为None时管理接口返回403
 
     # 设备配置
     DEVICE: str = "auto"  # auto, cpu, cuda:0, npu:0
@@ -51,6 +52,17 @@ class Settings:
     ASR_MODELS_CONFIG: str = str(BASE_DIR / "app/services/asr/models.json")
     ASR_MODEL_MODE: str = "all"  # ASR模型加载模式: realtime, offline, all
     ASR_ENABLE_REALTIME_PUNC: bool = True  # 是否启用实时标点模型（用于中间结果展示）
+    MODEL_LOAD_CONCURRENCY: int = 2  # 同时加载的模型数上限（限制启动内存峰值），1表示串行加载
+    MODEL_SNAPSHOT_ENABLED: bool = False  # 首次加载后写出模型快照，之后从快照（mmap权重）加载
+    MODEL_SNAPSHOT_DIR: str = ""  # 模型快照目录，默认为 DATA_DIR/model_snapshots
+    MODEL_MEMORY_BUDGET_MB: int = 0  # 已加载模型的内存预算（MB），超出时按LRU卸载未固定的模型，0表示不限制
+    MODEL_PINNED_MODELS: str = ""  # 固定常驻、不会被淘汰的模型ID（逗号分隔），默认模型始终固定
+
+    # 模型预热配置（预加载后执行，结束后服务才就绪）
+    ASR_WARMUP_ENABLED: bool = True  # 是否在预加载后预热
+    ASR_WARMUP_DURATIONS: str = "2,5,10,30"  # 离线链路预热音频时长（秒），覆盖不同输入长度
+    ASR_WARMUP_STREAM_STRIDES: str = "240,480,600"  # 流式预热的chunk步长（毫秒）
+    ASR_WARMUP_AUDIO: str = ""  # 预热音频路径，默认使用模型目录的 example/asr_example.wav，缺失时使用合成音频
     AUTO_LOAD_CUSTOM_ASR_MODELS: str = (
         ""  # 启动时自动加载的自定义ASR模型列表（逗号分隔，如: fun-asr-nano）
     )
@@ -61,6 +73,13 @@ class Settings:
     PUNC_REALTIME_MODEL: str = (
         "iic/punc_ct-transformer_zh-cn-common-vad_realtime-vocab272727"
     )
+    VAD_MODEL_QUANTIZE: str = "none"  # 全局VAD模型量化模式: none, int8-dynamic（仅CPU）
+    PUNC_MODEL_QUANTIZE: str = "none"  # 全局标点模型（离线+实时）量化模式: none, int8-dynamic（仅CPU）
+    PUNC_MODEL_COMPILE: str = "none"  # 全局标点模型编译模式: none, torch-compile, torchscript
+
+    # 模型编译配置（models.json 中 "compile" 不为 none 的模型）
+    MODEL_COMPILE_CACHE_DIR: str = ""  # torch.compile 持久化缓存目录，默认为 DATA_DIR/compile_cache
+    MODEL_COMPILE_BUCKETS: str = "16,32,64,128,256,512,1024"  # 输入长度分桶（帧数/字数），超出最大桶按其整数倍补齐
 
     # 语言模型配置
     LM_MODEL: str = "iic/speech_ngram_lm_zh-cn-ai-wesp-fst"
@@ -69,10 +88,68 @@ class Settings:
     LM_BEAM_SIZE: int = 10  # 语言模型解码 beam size
     ASR_ENABLE_LM: bool = True  # 是否启用语言模型（默认启用）
 
+    # ONNX Runtime 引擎配置（models.json 中 engine 为 funasr-onnx 的模型）
+    ONNX_INTRA_OP_THREADS: int = 4  # 单个算子内部并行线程数
+    ONNX_INTER_OP_THREADS: int = 1  # 算子间并行线程数
+    ONNX_GRAPH_OPTIMIZATION_LEVEL: str = "all"  # 图优化级别: disable, basic, extended, all
+    ONNX_QUANTIZE: bool = False  # 是否使用导出的int8量化模型（model_quant.onnx）
+
+    # 离线识别能量预筛配置
+    ASR_PRESCREEN_ENABLED: bool = True  # 是否在识别前做能量预筛
+    ASR_PRESCREEN_RMS_THRESHOLD: float = 0.003  # 10ms帧RMS阈值（约-50dBFS），超过视为有效语音
+    ASR_PRESCREEN_MIN_SPEECH_MS: int = 200  # 有效语音总时长低于该值时直接返回空结果
+    ASR_PRESCREEN_TRIM_MIN_S: float = 1.0  # 首尾静音超过该时长时裁剪
+    ASR_PRESCREEN_TRIM_PADDING_MS: int = 300  # 裁剪时语音两端保留的静音（毫秒）
+
     # 流式ASR远场过滤配置
     ASR_ENABLE_NEARFIELD_FILTER: bool = True  # 是否启用远场声音过滤
     ASR_NEARFIELD_RMS_THRESHOLD: float = 0.01  # RMS能量阈值（宽松模式，适合大多数场景）
     ASR_NEARFIELD_FILTER_LOG_ENABLED: bool = True  # 是否记录过滤日志（默认启用）
+    ASR_NEARFIELD_ADAPTIVE: bool = True  # 按会话自适应阈值（RMS阈值作为初始阈值）
+    ASR_NEARFIELD_NOISE_RATIO: float = 3.0  # 阈值相对噪声底的倍数
+    ASR_NEARFIELD_SPEECH_RATIO: float = 0.25  # 阈值相对近场语音电平的比例（低于该比例视为远场）
+    ASR_NEARFIELD_MIN_RMS: float = 0.003  # 自适应阈值下限
+    ASR_NEARFIELD_MIN_ACTIVE_RATIO: float = 0.2  # chunk中超过阈值的子帧占比下限
+    ASR_NEARFIELD_PROFILES_FILE: str = ""  # 按设备/appkey的远场过滤配置（批量分析工具生成的JSON）
+
+    # 流式ASR句末后处理配置（标点恢复 + ITN 跨会话批处理）
+    ASR_SENTENCE_POSTPROCESS_BATCH_WINDOW_MS: int = 20  # 批处理收集窗口（毫秒）
+    ASR_SENTENCE_POSTPROCESS_MAX_BATCH: int = 16  # 单批次最大句子数
+
+    # 流式ASR chunk步长配置
+    ASR_STREAM_CHUNK_STRIDE_MS: int = 240  # 客户端未指定时的默认步长（240/480/600）
+    ASR_STREAM_ADAPTIVE_STRIDE: bool = True  # 是否在高负载时自动增大步长
+    ASR_STREAM_ADAPTIVE_HIGH_LOAD: float = 1.0  # 推理线程池负载达到该值时升档
+    ASR_STREAM_ADAPTIVE_LOW_LOAD: float = 0.5  # 负载回落到该值以下时逐档恢复
+
+    # 流式ASR中间结果投递配置（客户端可在StartTranscription中覆盖）
+    ASR_STREAM_INTERMEDIATE_RESULT_MODE: str = "full"  # full: 累计全文, delta: 仅新增文本
+    ASR_STREAM_PARTIAL_MIN_INTERVAL_MS: int = 0  # 中间结果最小发送间隔（毫秒）
+    ASR_STREAM_PARTIAL_MIN_CHARS: int = 1  # 触发发送的最小新增字数
+
+    # 流式ASR会话调度配置
+    ASR_STREAM_SCHEDULER_CONCURRENCY: int = 0  # 同时推理的chunk数上限，0表示与推理线程池大小一致
+    ASR_STREAM_MAX_BACKLOG_MS: int = 0  # 单会话已接收音频领先墙钟的上限（毫秒），超出则TaskFailed，0表示不限制（默认）
+    ASR_STREAM_MAX_SESSIONS: int = 0  # 单个worker最大并发识别会话数，0表示不限制
+    ASR_STREAM_IDLE_TIMEOUT_S: float = 0.0  # 连接空闲超时（秒），超时后结束当前句子并关闭，0表示不限制（默认）
+
+    # 流式ASR断线续传配置
+    ASR_STREAM_RESUME_GRACE_S: float = 30.0  # 断线会话保留时长（秒），0表示关闭续传
+    ASR_STREAM_RESUME_MAX_MEMORY_SESSIONS: int = 64  # 内存中保留的断线会话数，超出后落盘
+    ASR_STREAM_RESUME_DIR: str = ""  # 断线会话落盘目录，默认为 TEMP_DIR/ws_resume
+
+    # WebSocket多路复用配置
+    ASR_STREAM_MUX_MAX_TASKS: int = 256  # 单个多路复用连接最多同时承载的识别任务数
+    ASR_STREAM_MUX_TASK_QUEUE_SIZE: int = 256  # 每个任务待处理的音频帧上限，超出后结束该任务
+
+    # 两遍识别配置（句末使用离线模型重识别，需 ASR_MODEL_MODE=all）
+    ASR_STREAM_TWO_PASS: bool = False  # 会话默认是否启用，客户端可在StartTranscription中覆盖
+    ASR_STREAM_TWO_PASS_BATCH_WINDOW_MS: int = 50  # 跨会话批处理收集窗口（毫秒）
+    ASR_STREAM_TWO_PASS_MAX_BATCH: int = 8  # 单批次最大句子数
+    ASR_STREAM_TWO_PASS_MAX_PENDING: int = 32  # 排队中的句子数上限，超出时直接使用在线结果
+    ASR_STREAM_TWO_PASS_MAX_LOAD: float = 0.8  # 推理线程池负载达到该值时直接使用在线结果，0表示不限制
+    ASR_STREAM_TWO_PASS_TIMEOUT_MS: int = 2000  # 等待离线结果的最长时间，超时使用在线结果，0表示不限制
+    ASR_STREAM_TWO_PASS_MAX_SENTENCE_S: float = 30.0  # 缓存的单句音频上限（秒），超出后该句使用在线结果
 
     # 音频处理配置
     MAX_AUDIO_SIZE: int = 300 * 1024 * 1024  # 300MB
@@ -100,6 +177,7 @@ class Settings:
         # 鉴权配置
         self.APPTOKEN = os.getenv("APPTOKEN", self.APPTOKEN)
         self.APPKEY = os.getenv("APPKEY", self.APPKEY)
+        self.ADMIN_TOKEN = os.getenv("ADMIN_TOKEN", self.ADMIN_TOKEN)
 
         # 设备配置
         self.DEVICE = os.getenv("DEVICE", self.DEVICE)
@@ -109,9 +187,35 @@ class Settings:
         self.ASR_ENABLE_REALTIME_PUNC = (
             os.getenv("ASR_ENABLE_REALTIME_PUNC", "true").lower() == "true"
         )
+        self.MODEL_LOAD_CONCURRENCY = int(
+            os.getenv("MODEL_LOAD_CONCURRENCY", str(self.MODEL_LOAD_CONCURRENCY))
+        )
+        self.MODEL_SNAPSHOT_ENABLED = (
+            os.getenv("MODEL_SNAPSHOT_ENABLED", "false").lower() == "true"
+        )
+        self.MODEL_SNAPSHOT_DIR = os.getenv("MODEL_SNAPSHOT_DIR", self.MODEL_SNAPSHOT_DIR)
+        self.MODEL_MEMORY_BUDGET_MB = int(
+            os.getenv("MODEL_MEMORY_BUDGET_MB", str(self.MODEL_MEMORY_BUDGET_MB))
+        )
+        self.MODEL_PINNED_MODELS = os.getenv("MODEL_PINNED_MODELS", self.MODEL_PINNED_MODELS)
+
+        # 模型预热配置
+        self.ASR_WARMUP_ENABLED = os.getenv("ASR_WARMUP_ENABLED", "true").lower() == "true"
+        self.ASR_WARMUP_DURATIONS = os.getenv("ASR_WARMUP_DURATIONS", self.ASR_WARMUP_DURATIONS)
+        self.ASR_WARMUP_STREAM_STRIDES = os.getenv(
+            "ASR_WARMUP_STREAM_STRIDES", self.ASR_WARMUP_STREAM_STRIDES
+        )
+        self.ASR_WARMUP_AUDIO = os.getenv("ASR_WARMUP_AUDIO", self.ASR_WARMUP_AUDIO)
         self.AUTO_LOAD_CUSTOM_ASR_MODELS = os.getenv(
             "AUTO_LOAD_CUSTOM_ASR_MODELS", self.AUTO_LOAD_CUSTOM_ASR_MODELS
         )
+        self.VAD_MODEL_QUANTIZE = os.getenv("VAD_MODEL_QUANTIZE", self.VAD_MODEL_QUANTIZE)
+        self.PUNC_MODEL_QUANTIZE = os.getenv("PUNC_MODEL_QUANTIZE", self.PUNC_MODEL_QUANTIZE)
+        self.PUNC_MODEL_COMPILE = os.getenv("PUNC_MODEL_COMPILE", self.PUNC_MODEL_COMPILE)
+        self.MODEL_COMPILE_CACHE_DIR = os.getenv(
+            "MODEL_COMPILE_CACHE_DIR", self.MODEL_COMPILE_CACHE_DIR
+        )
+        self.MODEL_COMPILE_BUCKETS = os.getenv("MODEL_COMPILE_BUCKETS", self.MODEL_COMPILE_BUCKETS)
 
         # 语言模型配置
         self.ASR_ENABLE_LM = (
@@ -120,6 +224,35 @@ class Settings:
         self.LM_WEIGHT = float(os.getenv("LM_WEIGHT", str(self.LM_WEIGHT)))
         self.LM_BEAM_SIZE = int(os.getenv("LM_BEAM_SIZE", str(self.LM_BEAM_SIZE)))
 
+        # ONNX Runtime 引擎配置
+        self.ONNX_INTRA_OP_THREADS = int(
+            os.getenv("ONNX_INTRA_OP_THREADS", str(self.ONNX_INTRA_OP_THREADS))
+        )
+        self.ONNX_INTER_OP_THREADS = int(
+            os.getenv("ONNX_INTER_OP_THREADS", str(self.ONNX_INTER_OP_THREADS))
+        )
+        self.ONNX_GRAPH_OPTIMIZATION_LEVEL = os.getenv(
+            "ONNX_GRAPH_OPTIMIZATION_LEVEL", self.ONNX_GRAPH_OPTIMIZATION_LEVEL
+        ).lower()
+        self.ONNX_QUANTIZE = os.getenv("ONNX_QUANTIZE", "false").lower() == "true"
+
+        # 离线识别能量预筛配置
+        self.ASR_PRESCREEN_ENABLED = (
+            os.getenv("ASR_PRESCREEN_ENABLED", "true").lower() == "true"
+        )
+        self.ASR_PRESCREEN_RMS_THRESHOLD = float(
+            os.getenv("ASR_PRESCREEN_RMS_THRESHOLD", str(self.ASR_PRESCREEN_RMS_THRESHOLD))
+        )
+        self.ASR_PRESCREEN_MIN_SPEECH_MS = int(
+            os.getenv("ASR_PRESCREEN_MIN_SPEECH_MS", str(self.ASR_PRESCREEN_MIN_SPEECH_MS))
+        )
+        self.ASR_PRESCREEN_TRIM_MIN_S = float(
+            os.getenv("ASR_PRESCREEN_TRIM_MIN_S", str(self.ASR_PRESCREEN_TRIM_MIN_S))
+        )
+        self.ASR_PRESCREEN_TRIM_PADDING_MS = int(
+            os.getenv("ASR_PRESCREEN_TRIM_PADDING_MS", str(self.ASR_PRESCREEN_TRIM_PADDING_MS))
+        )
+
         # 远场过滤配置
         self.ASR_ENABLE_NEARFIELD_FILTER = (
             os.getenv("ASR_ENABLE_NEARFIELD_FILTER", "true").lower() == "true"
@@ -132,6 +265,151 @@ class Settings:
         self.ASR_NEARFIELD_FILTER_LOG_ENABLED = (
             os.getenv("ASR_NEARFIELD_FILTER_LOG_ENABLED", "true").lower() == "true"
         )
+        self.ASR_NEARFIELD_ADAPTIVE = (
+            os.getenv("ASR_NEARFIELD_ADAPTIVE", "true").lower() == "true"
+        )
+        self.ASR_NEARFIELD_NOISE_RATIO = float(
+            os.getenv("ASR_NEARFIELD_NOISE_RATIO", str(self.ASR_NEARFIELD_NOISE_RATIO))
+        )
+        self.ASR_NEARFIELD_SPEECH_RATIO = float(
+            os.getenv("ASR_NEARFIELD_SPEECH_RATIO", str(self.ASR_NEARFIELD_SPEECH_RATIO))
+        )
+        self.ASR_NEARFIELD_MIN_RMS = float(
+            os.getenv("ASR_NEARFIELD_MIN_RMS", str(self.ASR_NEARFIELD_MIN_RMS))
+        )
+        self.ASR_NEARFIELD_MIN_ACTIVE_RATIO = float(
+            os.getenv(
+                "ASR_NEARFIELD_MIN_ACTIVE_RATIO", str(self.ASR_NEARFIELD_MIN_ACTIVE_RATIO)
+            )
+        )
+        self.ASR_NEARFIELD_PROFILES_FILE = os.getenv(
+            "ASR_NEARFIELD_PROFILES_FILE", self.ASR_NEARFIELD_PROFILES_FILE
+        )
+
+        # 句末后处理配置
+        self.ASR_SENTENCE_POSTPROCESS_BATCH_WINDOW_MS = int(
+            os.getenv(
+                "ASR_SENTENCE_POSTPROCESS_BATCH_WINDOW_MS",
+                str(self.ASR_SENTENCE_POSTPROCESS_BATCH_WINDOW_MS),
+            )
+        )
+        self.ASR_SENTENCE_POSTPROCESS_MAX_BATCH = int(
+            os.getenv(
+                "ASR_SENTENCE_POSTPROCESS_MAX_BATCH",
+                str(self.ASR_SENTENCE_POSTPROCESS_MAX_BATCH),
+            )
+        )
+
+        # 流式chunk步长配置
+        self.ASR_STREAM_CHUNK_STRIDE_MS = int(
+            os.getenv(
+                "ASR_STREAM_CHUNK_STRIDE_MS", str(self.ASR_STREAM_CHUNK_STRIDE_MS)
+            )
+        )
+        self.ASR_STREAM_ADAPTIVE_STRIDE = (
+            os.getenv("ASR_STREAM_ADAPTIVE_STRIDE", "true").lower() == "true"
+        )
+        self.ASR_STREAM_ADAPTIVE_HIGH_LOAD = float(
+            os.getenv(
+                "ASR_STREAM_ADAPTIVE_HIGH_LOAD", str(self.ASR_STREAM_ADAPTIVE_HIGH_LOAD)
+            )
+        )
+        self.ASR_STREAM_ADAPTIVE_LOW_LOAD = float(
+            os.getenv(
+                "ASR_STREAM_ADAPTIVE_LOW_LOAD", str(self.ASR_STREAM_ADAPTIVE_LOW_LOAD)
+            )
+        )
+
+        # 中间结果投递配置
+        self.ASR_STREAM_INTERMEDIATE_RESULT_MODE = os.getenv(
+            "ASR_STREAM_INTERMEDIATE_RESULT_MODE",
+            self.ASR_STREAM_INTERMEDIATE_RESULT_MODE,
+        ).lower()
+        self.ASR_STREAM_PARTIAL_MIN_INTERVAL_MS = int(
+            os.getenv(
+                "ASR_STREAM_PARTIAL_MIN_INTERVAL_MS",
+                str(self.ASR_STREAM_PARTIAL_MIN_INTERVAL_MS),
+            )
+        )
+        self.ASR_STREAM_PARTIAL_MIN_CHARS = int(
+            os.getenv(
+                "ASR_STREAM_PARTIAL_MIN_CHARS", str(self.ASR_STREAM_PARTIAL_MIN_CHARS)
+            )
+        )
+
+        # 会话调度配置
+        self.ASR_STREAM_SCHEDULER_CONCURRENCY = int(
+            os.getenv(
+                "ASR_STREAM_SCHEDULER_CONCURRENCY",
+                str(self.ASR_STREAM_SCHEDULER_CONCURRENCY),
+            )
+        )
+        self.ASR_STREAM_MAX_BACKLOG_MS = int(
+            os.getenv("ASR_STREAM_MAX_BACKLOG_MS", str(self.ASR_STREAM_MAX_BACKLOG_MS))
+        )
+        self.ASR_STREAM_MAX_SESSIONS = int(
+            os.getenv("ASR_STREAM_MAX_SESSIONS", str(self.ASR_STREAM_MAX_SESSIONS))
+        )
+        self.ASR_STREAM_IDLE_TIMEOUT_S = float(
+            os.getenv("ASR_STREAM_IDLE_TIMEOUT_S", str(self.ASR_STREAM_IDLE_TIMEOUT_S))
+        )
+
+        # 断线续传配置
+        self.ASR_STREAM_RESUME_GRACE_S = float(
+            os.getenv("ASR_STREAM_RESUME_GRACE_S", str(self.ASR_STREAM_RESUME_GRACE_S))
+        )
+        self.ASR_STREAM_RESUME_MAX_MEMORY_SESSIONS = int(
+            os.getenv(
+                "ASR_STREAM_RESUME_MAX_MEMORY_SESSIONS",
+                str(self.ASR_STREAM_RESUME_MAX_MEMORY_SESSIONS),
+            )
+        )
+        self.ASR_STREAM_RESUME_DIR = os.getenv(
+            "ASR_STREAM_RESUME_DIR", self.ASR_STREAM_RESUME_DIR
+        )
+
+        # WebSocket多路复用配置
+        self.ASR_STREAM_MUX_MAX_TASKS = int(
+            os.getenv("ASR_STREAM_MUX_MAX_TASKS", str(self.ASR_STREAM_MUX_MAX_TASKS))
+        )
+        self.ASR_STREAM_MUX_TASK_QUEUE_SIZE = int(
+            os.getenv(
+                "ASR_STREAM_MUX_TASK_QUEUE_SIZE", str(self.ASR_STREAM_MUX_TASK_QUEUE_SIZE)
+            )
+        )
+
+        # 两遍识别配置
+        self.ASR_STREAM_TWO_PASS = (
+            os.getenv("ASR_STREAM_TWO_PASS", str(self.ASR_STREAM_TWO_PASS)).lower() == "true"
+        )
+        self.ASR_STREAM_TWO_PASS_BATCH_WINDOW_MS = int(
+            os.getenv(
+                "ASR_STREAM_TWO_PASS_BATCH_WINDOW_MS",
+                str(self.ASR_STREAM_TWO_PASS_BATCH_WINDOW_MS),
+            )
+        )
+        self.ASR_STREAM_TWO_PASS_MAX_BATCH = int(
+            os.getenv("ASR_STREAM_TWO_PASS_MAX_BATCH", str(self.ASR_STREAM_TWO_PASS_MAX_BATCH))
+        )
+        self.ASR_STREAM_TWO_PASS_MAX_PENDING = int(
+            os.getenv(
+                "ASR_STREAM_TWO_PASS_MAX_PENDING", str(self.ASR_STREAM_TWO_PASS_MAX_PENDING)
+            )
+        )
+        self.ASR_STREAM_TWO_PASS_MAX_LOAD = float(
+            os.getenv("ASR_STREAM_TWO_PASS_MAX_LOAD", str(self.ASR_STREAM_TWO_PASS_MAX_LOAD))
+        )
+        self.ASR_STREAM_TWO_PASS_TIMEOUT_MS = int(
+            os.getenv(
+                "ASR_STREAM_TWO_PASS_TIMEOUT_MS", str(self.ASR_STREAM_TWO_PASS_TIMEOUT_MS)
+            )
+        )
+        self.ASR_STREAM_TWO_PASS_MAX_SENTENCE_S = float(
+            os.getenv(
+                "ASR_STREAM_TWO_PASS_MAX_SENTENCE_S",
+                str(self.ASR_STREAM_TWO_PASS_MAX_SENTENCE_S),
+            )
+        )
 
         # 音频处理配置
         self.MAX_AUDIO_SIZE = int(
@@ -15,6 +15,10 @@
 3. 线程池大小根据使用场景配置：
    - CPU推理：受GIL限制，多线程并发收益有限，但可以让I/O不阻塞
    - GPU推理：CUDA操作释放GIL，可以实现真正并发
+
+4. 低优先级通道（run_sync_low_priority）使用独立的小线程池，
+   用于可延后的后台推理（如两遍识别的离线重识别），不占用主线程池的工作线程，
+   也不计入 get_executor_load() 的负载
 """
 
 import os
@@ -36,6 +40,13 @@ _MAX_WORKERS = int(os.getenv("INFERENCE_THREAD_POOL_SIZE", str(_DEFAULT_WORKERS)
 
 _executor: Optional[ThreadPoolExecutor] = None
 
+# 低优先级线程池：默认1个线程，可通过环境变量覆盖
+_LOW_PRIORITY_WORKERS = max(1, int(os.getenv("INFERENCE_LOW_PRIORITY_POOL_SIZE", "1")))
+_low_priority_executor: Optional[ThreadPoolExecutor] = None
+
+# 已提交但尚未完成的 run_sync 任务数（含排队中的任务），仅在事件循环线程中修改
+_inflight_tasks = 0
+
 
 def get_executor() -> ThreadPoolExecutor:
     """获取全局线程池执行器（懒加载）"""
@@ -49,13 +60,44 @@ def get_executor() -> ThreadPoolExecutor:
     return _executor
 
 
+def get_low_priority_executor() -> ThreadPoolExecutor:
+    """获取低优先级线程池执行器（懒加载）"""
+    global _low_priority_executor
+    if _low_priority_executor is None:
+        _low_priority_executor = ThreadPoolExecutor(
+            max_workers=_LOW_PRIORITY_WORKERS,
+            thread_name_prefix="low_priority_worker"
+        )
+        logger.info(f"低优先级线程池已创建，最大工作线程数: {_LOW_PRIORITY_WORKERS}")
+    return _low_priority_executor
+
+
+def get_max_workers() -> int:
+    """获取推理线程池的工作线程数"""
+    return _MAX_WORKERS
+
+
+def get_inflight_count() -> int:
+    """获取已提交但尚未完成的推理任务数（含排队中的任务）"""
+    return _inflight_tasks
+
+
+def get_executor_load() -> float:
+    """获取推理线程池负载：在途任务数 / 工作线程数，大于1表示任务在排队"""
+    return _inflight_tasks / max(1, _MAX_WORKERS)
+
+
 def shutdown_executor():
     """关闭线程池执行器"""
-    global _executor
+    global _executor, _low_priority_executor
     if _executor is not None:
         _executor.shutdown(wait=True)
         _executor = None
         logger.info("推理线程池已关闭")
+    if _low_priority_executor is not None:
+        _low_priority_executor.shutdown(wait=True)
+        _low_priority_executor = None
+        logger.info("低优先级线程池已关闭")
 
 
 async def run_sync(func: Callable[..., T], *args, **kwargs) -> T:
@@ -73,6 +115,7 @@ async def run_sync(func: Callable[..., T], *args, **kwargs) -> T:
     Example:
         result = await run_sync(model.generate, input=audio_array, cache=cache)
     """
+    global _inflight_tasks
     loop = asyncio.get_running_loop()
     executor = get_executor()
 
@@ -82,7 +125,23 @@ async def run_sync(func: Callable[..., T], *args, **kwargs) -> T:
     else:
         func_with_args = partial(func, *args) if args else func
 
-    return await loop.run_in_executor(executor, func_with_args)
+    _inflight_tasks += 1
+    try:
+        return await loop.run_in_executor(executor, func_with_args)
+    finally:
+        _inflight_tasks -= 1
+
+
+async def run_sync_low_priority(func: Callable[..., T], *args, **kwargs) -> T:
+    """在低优先级线程池中执行同步函数
+
+    与 run_sync 相同，但任务进入独立的低优先级线程池排队，
+    不与实时推理争抢主线程池的工作线程
+    """
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(
+        get_low_priority_executor(), partial(func, *args, **kwargs)
+    )
 
 
 async def run_sync_generator(
@@ -112,6 +112,33 @@ def validate_token(request: Request, task_id: str = "") -> tuple[bool, str]:
     return True, token
 
 
+def is_admin_auth_configured() -> bool:
+    """是否配置了模型管理接口的令牌（ADMIN_TOKEN 或 APPTOKEN）"""
+    return settings.ADMIN_TOKEN is not None or settings.APPTOKEN is not None
+
+
+def validate_admin_token(request: Request) -> tuple[bool, str]:
+    """验证模型管理接口的X-NLS-Token头部
+
+    未配置ADMIN_TOKEN时按APPTOKEN验证；两者都未配置时拒绝访问，管理接口不随可选鉴权开放
+    """
+    if not is_admin_auth_configured():
+        return False, "模型管理接口已禁用：未配置 ADMIN_TOKEN 或 APPTOKEN"
+
+    if settings.ADMIN_TOKEN is None:
+        return validate_token(request)
+
+    token = request.headers.get("X-NLS-Token")
+    if not token:
+        return False, "缺少X-NLS-Token头部"
+
+    if not validate_token_value(token, settings.ADMIN_TOKEN):
+        masked_token = mask_sensitive_data(token)
+        return False, f"Gateway:ACCESS_DENIED:The admin token '{masked_token}' is invalid!"
+
+    return True, token
+
+
 
 
 def validate_request_appkey(appkey: str, task_id: str = "") -> tuple[bool, str]:
@@ -81,19 +81,35 @@ async def lifespan(app: FastAPI):
             preload_result = preload_models()
 
             # 记录加载结果
-            loaded_count = sum(1 for r in preload_result.values() if r.get("loaded"))
-            total_count = len(preload_result)
+            model_results = [r for k, r in preload_result.items() if k != "timing"]
+            loaded_count = sum(1 for r in model_results if r.get("loaded"))
+            total_count = len(model_results)
             logger.info(f"Worker [{worker_id}] 模型加载完成: {loaded_count}/{total_count}")
 
         except Exception as e:
             logger.error(f"Worker [{worker_id}] 模型预加载失败: {e}")
             logger.warning(f"Worker [{worker_id}] 模型将在首次使用时加载")
 
+    # 未在本进程预加载时（模型按需加载）没有预热阶段，直接标记就绪
+    from .services.asr.warmup import mark_warmup_skipped
+
+    mark_warmup_skipped()
+
     logger.info(f"Worker [{worker_id}] 已就绪")
 
     yield
 
-    # 关闭时
+    # 关闭时：先结束后台批次任务，再关闭推理线程池
+    from .services.sentence_postprocessor import shutdown_sentence_postprocessor
+    from .services.stream_scheduler import shutdown_stream_scheduler
+    from .services.two_pass import shutdown_two_pass_recognizer
+    from .services.websocket_session import shutdown_session_checkpoint_store
+
+    await shutdown_stream_scheduler()
+    await shutdown_two_pass_recognizer()
+    await shutdown_session_checkpoint_store()
+    await shutdown_sentence_postprocessor()
+
     logger.info(f"Worker [{worker_id}] 正在关闭推理线程池...")
     shutdown_executor()
     logger.info(f"Worker [{worker_id}] 已关闭")
@@ -145,6 +161,7 @@ def create_app() -> FastAPI:
                 "asr": "/stream/v1/asr",
                 "asr_models": "/stream/v1/asr/models",
                 "asr_health": "/stream/v1/asr/health",
+                "asr_ready": "/stream/v1/asr/ready",
                 "ws_asr": "/ws/v1/asr",
                 # OpenAI 兼容 API
                 "openai_models": "/v1/models",
@@ -144,6 +144,7 @@ class ASRHealthCheckResponse(HealthCheckResponse):
             "example": {
                 "status": "healthy",
                 "model_loaded": True,
+                "ready": True,
                 "device": "cuda:0",
                 "version": "1.0.0",
                 "message": "ASR service is running normally",
@@ -158,10 +159,29 @@ class ASRHealthCheckResponse(HealthCheckResponse):
     }
 
     model_loaded: bool = Field(..., description="模型是否已加载")
+    ready: Optional[bool] = Field(default=None, description="预热是否已结束（服务是否就绪）")
     device: str = Field(..., description="推理设备")
     loaded_models: Optional[List[str]] = Field(default=[], description="已加载的模型列表")
     memory_usage: Optional[dict] = Field(default=None, description="内存使用情况")
     asr_model_mode: Optional[str] = Field(default=None, description="当前ASR模型加载模式")
+    streaming: Optional[dict] = Field(
+        default=None, description="流式识别调度统计（活跃会话、在途推理、各会话chunk延迟）"
+    )
+    prescreen: Optional[dict] = Field(
+        default=None, description="离线识别能量预筛统计（跳过/裁剪次数与节省的音频时长）"
+    )
+    quantization: Optional[dict] = Field(
+        default=None, description="模型量化统计（各模型量化前后内存与节省量）"
+    )
+    precision: Optional[dict] = Field(
+        default=None, description="推理精度（CPU bf16 支持情况与各模型实际生效的精度）"
+    )
+    compile: Optional[dict] = Field(
+        default=None, description="模型编译统计（编译模式、已编译的长度桶及耗时）"
+    )
+    warmup: Optional[dict] = Field(
+        default=None, description="模型预热统计（状态、各阶段耗时）"
+    )
 
 
 # ============= 模型相关 =============
@@ -178,6 +198,9 @@ class ASRModelInfo(BaseModel):
     default: bool = Field(default=False, description="是否为默认模型")
     loaded: bool = Field(default=False, description="是否已加载")
     supports_realtime: bool = Field(default=False, description="是否支持实时识别")
+    quantize: str = Field(default="none", description="量化模式（none/int8-dynamic）")
+    precision: str = Field(default="fp32", description="推理精度配置（fp32/bf16）")
+    compile: str = Field(default="none", description="编译模式（none/torch-compile/torchscript）")
     offline_model: Optional[dict] = Field(default=None, description="离线模型信息")
     realtime_model: Optional[dict] = Field(default=None, description="实时模型信息")
     asr_model_mode: str = Field(..., description="当前ASR模型加载模式")
@@ -29,8 +29,11 @@ class AliyunASRWSHeader(BaseModel):
 class AliyunStartTranscriptionPayload(BaseModel):
     """StartTranscription 消息负载"""
 
-    format: str = Field(default="pcm", description="音频格式: pcm, wav, opus, speex, amr, mp3, aac")
-    sample_rate: int = Field(default=16000, description="音频采样率: 8000/16000")
+    format: str = Field(default="pcm", description="音频格式: pcm, wav, opus, ogg, webm, amr, mp3, aac")
+    sample_rate: int = Field(
+        default=16000,
+        description="音频采样率: 8000/16000/22050/24000/44100/48000（非16000时服务端流式重采样到16000）",
+    )
     enable_intermediate_result: bool = Field(default=True, description="是否返回中间识别结果")
     enable_punctuation_prediction: bool = Field(default=True, description="是否在后处理中添加标点")
     enable_inverse_text_normalization: bool = Field(default=True, description="是否将中文数字转为阿拉伯数字")
@@ -41,11 +44,35 @@ class AliyunStartTranscriptionPayload(BaseModel):
     disfluency: bool = Field(default=False, description="过滤语气词")
     speech_noise_threshold: Optional[float] = Field(None, ge=-1.0, le=1.0, description="噪音参数阈值")
     enable_semantic_sentence_detection: bool = Field(default=False, description="是否开启语义断句")
+    latency_profile: Optional[str] = Field(
+        None, description="延迟档位: low(240ms)/balanced(480ms)/accurate(600ms)"
+    )
+    chunk_stride_ms: Optional[int] = Field(
+        None, description="chunk步长(ms): 240/480/600，优先于latency_profile"
+    )
+    encoder_chunk_look_back: int = Field(default=4, ge=1, le=10, description="编码器回看chunk数")
+    decoder_chunk_look_back: int = Field(default=1, ge=0, le=10, description="解码器回看chunk数")
+    enable_adaptive_stride: bool = Field(default=True, description="是否允许服务端在高负载时增大步长")
+    intermediate_result_mode: Optional[str] = Field(
+        None, description="中间结果模式: full(累计全文)/delta(仅新增文本，附带offset)"
+    )
+    intermediate_result_min_interval_ms: Optional[int] = Field(
+        None, ge=0, le=10000, description="中间结果最小发送间隔(ms)"
+    )
+    intermediate_result_min_chars: Optional[int] = Field(
+        None, ge=1, le=100, description="触发中间结果发送的最小新增字数"
+    )
+    enable_two_pass: Optional[bool] = Field(
+        None, description="是否在句末使用离线模型重识别（两遍识别），默认由服务端配置决定"
+    )
+    resume_token: Optional[str] = Field(
+        None, description="断线续传令牌（上次TranscriptionStarted返回），携带时忽略其他参数"
+    )
 
     @field_validator("format")
     @classmethod
     def validate_format(cls, v):
-        supported_formats = ["pcm", "wav", "opus", "speex", "amr", "mp3", "aac"]
+        supported_formats = ["pcm", "wav", "opus", "ogg", "webm", "amr", "mp3", "aac"]
         if v.lower() not in supported_formats:
             raise ValueError(f"不支持的音频格式: {v}")
         return v.lower()
@@ -53,7 +80,7 @@ class AliyunStartTranscriptionPayload(BaseModel):
     @field_validator("sample_rate")
     @classmethod
     def validate_sample_rate(cls, v):
-        supported_rates = [8000, 16000]
+        supported_rates = [8000, 16000, 22050, 24000, 44100, 48000]
         if v not in supported_rates:
             raise ValueError(f"不支持的采样率: {v}")
         return v
@@ -75,6 +102,7 @@ class AliyunTranscriptionResultPayload(BaseModel):
     time: Optional[int] = Field(None, description="已处理的音频时长(ms)")
     begin_time: Optional[int] = Field(None, description="句子开始时间(ms)")
     result: Optional[str] = Field(None, description="识别结果文本")
+    offset: Optional[int] = Field(None, description="delta模式下result在当前句子累计文本中的起始位置")
     confidence: Optional[float] = Field(None, description="置信度[0.0,1.0]")
     words: Optional[List[AliyunWordInfo]] = Field(None, description="词信息列表")
     status: Optional[int] = Field(None, description="状态码")
@@ -129,6 +157,8 @@ class AliyunASRStatus:
     TASK_FAILED = 40000000
     INVALID_PARAMETER = 40000001
     MESSAGE_INVALID = 40000002
+    IDLE_TIMEOUT = 40000004
+    TOO_MANY_REQUESTS = 40000005
     AUTHENTICATION_FAILED = 40100005
     QUOTA_EXCEEDED = 40300016
     INTERNAL_ERROR = 50000000
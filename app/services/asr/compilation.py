@@ -0,0 +1,316 @@
+# -*- coding: utf-8 -*-
+"""
+模型编译执行（torch.compile / TorchScript）
+
+对 ASR 模型和标点模型的编码器（计算量的主要部分）做编译，减少 Python 调度开销并融合算子：
+
+1. torch-compile：torch.compile 按长度分桶编译，每个桶的时间维标记为 [上一桶+1, 本桶] 的动态维度，
+   同一桶内的不同长度复用一个编译图；Inductor 的 FX 图缓存与内核缓存写入 MODEL_COMPILE_CACHE_DIR，
+   重启后命中缓存，不再重复付出编译耗时
+2. torchscript：每个 (批大小, 长度桶) 首次出现时 torch.jit.trace 一次，并用同桶内另一长度与 eager 结果
+   比对，把长度固化为常量的 trace 不会被使用；适用于 torch.compile 不可用或收益不明显的环境。
+   trace 只需一次前向、与原模块共享权重，因此在进程内按需生成，不落盘
+
+长度桶由 MODEL_COMPILE_BUCKETS 配置（VAD 分段的帧数、标点子句的字数），超出最大桶的按其整数倍划分。
+输入不补零到桶长度：编码器按 ilens 的最大值构造掩码，补零会使掩码与输入长度不一致。
+带额外参数的调用（如实时标点的 vad_indexes）按原方式执行；在线模型的 forward_chunk 在 torch-compile
+模式下也会编译（chunk 长度由步长决定，本身只有有限的几种形状），torchscript 模式下保持 eager。
+
+models.json 中按模型配置 "compile": "torch-compile" | "torchscript"，标点模型使用 PUNC_MODEL_COMPILE。
+每个长度桶首次执行时编译，耗时记录在统计中（健康检查的 compile 字段）。
+"""
+
+import logging
+import os
+import threading
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+import torch
+
+from ...core.config import settings
+
+logger = logging.getLogger(__name__)
+
+COMPILE_NONE = "none"
+COMPILE_TORCH = "torch-compile"
+COMPILE_TORCHSCRIPT = "torchscript"
+COMPILE_MODES = (COMPILE_NONE, COMPILE_TORCH, COMPILE_TORCHSCRIPT)
+
+# trace 结果与 eager 比对的容差
+_TRACE_CHECK_ATOL = 1e-3
+
+_inductor_configured = False
+_inductor_lock = threading.Lock()
+
+
+def normalize_compile_mode(mode: Optional[str]) -> str:
+    """规范化编译模式，未配置时为 none"""
+    mode = (mode or COMPILE_NONE).strip().lower()
+    if mode not in COMPILE_MODES:
+        raise ValueError(f"不支持的编译模式: {mode}，支持: {', '.join(COMPILE_MODES)}")
+    return mode
+
+
+def get_compile_buckets() -> List[int]:
+    """解析长度分桶配置（升序）"""
+    buckets = sorted(
+        {int(b) for b in settings.MODEL_COMPILE_BUCKETS.split(",") if b.strip()}
+    )
+    return [b for b in buckets if b > 0] or [1024]
+
+
+def bucket_range(length: int, buckets: List[int]) -> Tuple[int, int]:
+    """输入长度所属的桶区间 (下界, 上界)，超出最大桶时按最大桶的整数倍划分"""
+    lower = 1
+    for bucket in buckets:
+        if length <= bucket:
+            return lower, bucket
+        lower = bucket + 1
+    largest = buckets[-1]
+    upper = -(-length // largest) * largest
+    return upper - largest + 1, upper
+
+
+def get_compile_cache_dir() -> str:
+    """编译缓存目录，默认为 DATA_DIR/compile_cache"""
+    return settings.MODEL_COMPILE_CACHE_DIR or os.path.join(settings.DATA_DIR, "compile_cache")
+
+
+def _configure_inductor_cache() -> None:
+    """启用 Inductor 的持久化 FX 图缓存，缓存目录需在首次编译前设置"""
+    global _inductor_configured
+
+    with _inductor_lock:
+        if _inductor_configured:
+            return
+        cache_dir = os.path.abspath(get_compile_cache_dir())
+        os.makedirs(cache_dir, exist_ok=True)
+        os.environ.setdefault("TORCHINDUCTOR_CACHE_DIR", cache_dir)
+        os.environ.setdefault("TORCHINDUCTOR_FX_GRAPH_CACHE", "1")
+        try:
+            import torch._dynamo
+            import torch._inductor.config as inductor_config
+
+            inductor_config.fx_graph_cache = True
+            # 每个长度桶 × 批大小各占一个编译条目，放宽重编译上限，超出后 dynamo 自动回退到 eager
+            torch._dynamo.config.cache_size_limit = max(
+                torch._dynamo.config.cache_size_limit, len(get_compile_buckets()) * 8
+            )
+        except (ImportError, AttributeError) as e:
+            logger.warning(f"Inductor 缓存配置失败，编译结果不会持久化: {e}")
+        _inductor_configured = True
+        logger.info(f"torch.compile 缓存目录: {os.environ['TORCHINDUCTOR_CACHE_DIR']}")
+
+
+def _mark_length_dynamic(xs_pad: torch.Tensor, lower: int, upper: int) -> None:
+    """将时间维标记为桶区间内的动态维度（dynamo 对 0/1 做特化，下界至少为2）"""
+    try:
+        torch._dynamo.mark_dynamic(xs_pad, 1, min=max(lower, 2), max=upper)
+    except TypeError:
+        # 旧版本不支持 min/max，整个时间维动态
+        torch._dynamo.mark_dynamic(xs_pad, 1)
+
+
+def _first_output(outputs):
+    return outputs[0] if isinstance(outputs, tuple) else outputs
+
+
+class _TraceAdapter(torch.nn.Module):
+    """只返回张量输出的适配器（jit.trace 不支持 None 输出）"""
+
+    def __init__(self, inner: torch.nn.Module):
+        super().__init__()
+        self.inner = inner
+        self.num_outputs = 1
+
+    def forward(self, xs_pad: torch.Tensor, ilens: torch.Tensor):
+        outputs = self.inner(xs_pad, ilens)
+        if not isinstance(outputs, tuple):
+            return outputs
+        self.num_outputs = len(outputs)
+        return outputs[0], outputs[1]
+
+
+class _CompileStats:
+    """各模型的编译状态"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._models: Dict[str, dict] = {}
+
+    def register(self, name: str, mode: str) -> None:
+        with self._lock:
+            self._models[name] = {
+                "mode": mode,
+                "compiled": {},
+                "compiled_calls": 0,
+                "eager_calls": 0,
+            }
+
+    def record_compile(self, name: str, key: str, seconds: float) -> None:
+        with self._lock:
+            if name in self._models:
+                self._models[name]["compiled"][key] = round(seconds, 2)
+
+    def record_call(self, name: str, compiled: bool) -> None:
+        with self._lock:
+            if name in self._models:
+                self._models[name]["compiled_calls" if compiled else "eager_calls"] += 1
+
+    def discard(self, name: str) -> None:
+        with self._lock:
+            self._models.pop(name, None)
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            models = {
+                name: {**report, "compiled": dict(report["compiled"])}
+                for name, report in self._models.items()
+            }
+        return {"cache_dir": get_compile_cache_dir(), "models": models}
+
+
+_stats = _CompileStats()
+
+
+class CompiledModule(torch.nn.Module):
+    """按长度分桶执行编译版本的模块包装器，未覆盖的属性和方法透传给原模块"""
+
+    def __init__(self, inner: torch.nn.Module, mode: str, name: str):
+        super().__init__()
+        self.inner = inner
+        self.mode = mode
+        self.name = name
+        self.buckets = get_compile_buckets()
+        self._lock = threading.Lock()
+        self._traced: Dict[tuple, Any] = {}
+        self._seen: set = set()
+        # 编译结果放在普通字典中，避免注册为子模块而在 state_dict 中重复出现权重
+        self._compiled: Dict[str, Any] = {}
+        if mode == COMPILE_TORCH:
+            _configure_inductor_cache()
+            self._compiled["forward"] = torch.compile(inner)
+            if hasattr(inner, "forward_chunk"):
+                self._compiled["forward_chunk"] = torch.compile(inner.forward_chunk, dynamic=False)
+
+    def __getattr__(self, item):
+        try:
+            return super().__getattr__(item)
+        except AttributeError:
+            return getattr(self._modules["inner"], item)
+
+    def _trace(self, key: tuple, lower: int, xs_pad: torch.Tensor, ilens: torch.Tensor):
+        """trace 一个长度桶，并在同桶内另一长度上与 eager 比对，返回 (traced, 输出个数)，失败返回None"""
+        start = time.perf_counter()
+        adapter = _TraceAdapter(self.inner)
+        length = xs_pad.size(1)
+        try:
+            with torch.no_grad():
+                traced = torch.jit.trace(adapter, (xs_pad, ilens), check_trace=False)
+                if length - 1 >= max(lower, 1):
+                    check_xs = xs_pad[:, : length - 1]
+                    check_ilens = torch.clamp(ilens, max=length - 1)
+                else:
+                    check_xs = torch.nn.functional.pad(xs_pad, (0, 0, 0, 1))
+                    check_ilens = torch.where(ilens == length, ilens + 1, ilens)
+                expected = _first_output(self.inner(check_xs, check_ilens))
+                actual = _first_output(traced(check_xs, check_ilens))
+                if expected.shape != actual.shape or not torch.allclose(
+                    expected.float(), actual.float(), atol=_TRACE_CHECK_ATOL
+                ):
+                    raise RuntimeError("trace 结果与 eager 不一致（长度被固化为常量）")
+        except Exception as e:
+            logger.warning(f"模型 {self.name} 长度桶 {key[1]} trace 失败，使用eager执行: {e}")
+            return None
+        _stats.record_compile(self.name, f"b{key[0]}x{key[1]}", time.perf_counter() - start)
+        return traced, adapter.num_outputs
+
+    def _run_compiled(self, key: tuple, lower: int, xs_pad: torch.Tensor, ilens: torch.Tensor):
+        if self.mode == COMPILE_TORCHSCRIPT:
+            with self._lock:
+                if key not in self._traced:
+                    self._traced[key] = self._trace(key, lower, xs_pad, ilens)
+                entry = self._traced[key]
+            if entry is None:
+                return None
+            traced, num_outputs = entry
+            outputs = traced(xs_pad, ilens)
+            if num_outputs == 1:
+                return outputs
+            return tuple(outputs) + (None,) * (num_outputs - 2)
+
+        _mark_length_dynamic(xs_pad, lower, key[1])
+        first = key not in self._seen
+        start = time.perf_counter()
+        outputs = self._compiled["forward"](xs_pad, ilens)
+        if first:
+            self._seen.add(key)
+            _stats.record_compile(self.name, f"b{key[0]}x{key[1]}", time.perf_counter() - start)
+        return outputs
+
+    def forward(self, xs_pad, ilens, *args, **kwargs):
+        extra = args or any(v is not None for v in kwargs.values())
+        if extra or not isinstance(xs_pad, torch.Tensor) or xs_pad.dim() != 3:
+            _stats.record_call(self.name, False)
+            return self.inner(xs_pad, ilens, *args, **kwargs)
+
+        lower, upper = bucket_range(xs_pad.size(1), self.buckets)
+        outputs = self._run_compiled((xs_pad.size(0), upper), lower, xs_pad, ilens)
+        if outputs is None:
+            _stats.record_call(self.name, False)
+            return self.inner(xs_pad, ilens)
+        _stats.record_call(self.name, True)
+        return outputs
+
+    def forward_chunk(self, *args, **kwargs):
+        if "forward_chunk" in self._compiled:
+            return self._compiled["forward_chunk"](*args, **kwargs)
+        return self.inner.forward_chunk(*args, **kwargs)
+
+
+def apply_compile(
+    auto_model: Any, mode: Optional[str], name: str, submodule: str = "encoder"
+) -> Optional[str]:
+    """将 AutoModel 内部模型的子模块（默认编码器）替换为编译包装器，返回生效的编译模式
+
+    Args:
+        auto_model: FunASR AutoModel 实例
+        mode: 编译模式（none / torch-compile / torchscript）
+        name: 模型名称（用于日志和统计）
+        submodule: 要编译的子模块名
+    """
+    mode = normalize_compile_mode(mode)
+    if mode == COMPILE_NONE or auto_model is None:
+        return None
+
+    model = auto_model.model
+    inner = getattr(model, submodule, None)
+    if not isinstance(inner, torch.nn.Module):
+        logger.warning(f"模型 {name} 没有可编译的子模块 {submodule}，跳过编译")
+        return None
+    if isinstance(inner, CompiledModule):
+        return inner.mode
+    if mode == COMPILE_TORCH and not hasattr(torch, "compile"):
+        logger.warning(f"当前 PyTorch 版本不支持 torch.compile，模型 {name} 改用 torchscript")
+        mode = COMPILE_TORCHSCRIPT
+
+    _stats.register(name, mode)
+    try:
+        setattr(model, submodule, CompiledModule(inner, mode, name))
+    except Exception as e:
+        _stats.discard(name)
+        logger.error(f"模型 {name} 编译失败，使用eager执行: {e}")
+        return None
+    logger.info(f"模型 {name} 已启用 {mode} 编译（{submodule}，长度桶 {get_compile_buckets()}）")
+    return mode
+
+
+def forget_compile(name: str) -> None:
+    """模型卸载后移除其编译统计"""
+    _stats.discard(name)
+
+
+def get_compile_stats() -> dict:
+    """编译统计：各模型的编译模式、已编译的长度桶及编译耗时、编译/eager 调用次数"""
+    return _stats.snapshot()
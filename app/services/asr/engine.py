@@ -1,22 +1,46 @@
 # -*- coding: utf-8 -*-
 """
 ASR引擎模块 - 支持多种ASR引擎
+
+funasr 在首次加载模型时才导入（导入本身需数秒），仅使用 resolve_model_path 等工具函数的
+脚本与未加载模型的进程无需承担这部分开销。
 """
 
 import torch
 import logging
 import threading
-from typing import Optional, Dict, List, Any, cast
+from concurrent.futures import ThreadPoolExecutor
+from typing import TYPE_CHECKING, Optional, Dict, List, Any, cast
 from abc import ABC, abstractmethod
 from enum import Enum
 from dataclasses import dataclass
 
-from funasr import AutoModel
+import numpy as np
 
 from ...core.config import settings
 from ...core.exceptions import DefaultServerErrorException
 from ...utils.audio import get_audio_duration
+from ...utils.audio_prescreen import cleanup_prescreen, prescreen_audio_file
 from ...utils.text_processing import apply_itn_to_text
+from .compilation import apply_compile, forget_compile
+from .loading import forget_load, get_load_concurrency, load_slot
+from .precision import apply_precision
+from .quantization import apply_quantization, forget_quantization
+from .snapshot import forget_snapshot, load_auto_model
+from .streaming import StreamingSession
+
+if TYPE_CHECKING:
+    from funasr import AutoModel
+
+
+def detect_device(device: str = "auto") -> str:
+    """解析设备配置，auto 时优先使用GPU"""
+    if device == "auto":
+        if torch.cuda.is_available():
+            return "cuda:0"
+        else:
+            return "cpu"
+    return device
 
 
 class TempAutoModelWrapper:
@@ -34,14 +58,20 @@ class TempAutoModelWrapper:
 
     def inference(self, *args: Any, **kwargs: Any) -> Any:
         """调用AutoModel.inference"""
+        from funasr import AutoModel
+
         return AutoModel.inference(cast(Any, self), *args, **kwargs)
 
     def inference_with_vad(self, *args: Any, **kwargs: Any) -> Any:
         """调用AutoModel.inference_with_vad"""
+        from funasr import AutoModel
+
         return AutoModel.inference_with_vad(cast(Any, self), *args, **kwargs)
 
     def generate(self, *args: Any, **kwargs: Any) -> Any:
         """调用AutoModel.generate"""
+        from funasr import AutoModel
+
         return AutoModel.generate(cast(Any, self), *args, **kwargs)
 
 
@@ -161,14 +191,61 @@ class BaseASREngine(ABC):
         Returns:
             ASRFullResult: 包含完整文本、分段结果和时长的结果
         """
-        from ...utils.audio_splitter import AudioSplitter
-
         logger.info(f"[transcribe_long_audio] 方法被调用，音频: {audio_path}")
 
+        # 能量预筛：静音/空音频直接返回空结果，首尾长静音裁剪后再识别
+        prescreen = prescreen_audio_file(audio_path) if settings.ASR_PRESCREEN_ENABLED else None
+        if prescreen is not None and prescreen.skip:
+            return ASRFullResult(text="", segments=[], duration=prescreen.duration)
+
+        try:
+            if prescreen is not None and prescreen.trimmed_path:
+                result = self._transcribe_audio_file(
+                    prescreen.trimmed_path,
+                    prescreen.trimmed_duration,
+                    hotwords,
+                    enable_punctuation,
+                    enable_itn,
+                    sample_rate,
+                    max_segment_sec,
+                )
+                # 时间戳还原到原始音频时间轴
+                for segment in result.segments:
+                    segment.start_time += prescreen.offset_sec
+                    segment.end_time += prescreen.offset_sec
+                result.duration = prescreen.duration
+                return result
+
+            return self._transcribe_audio_file(
+                audio_path,
+                prescreen.duration if prescreen is not None else None,
+                hotwords,
+                enable_punctuation,
+                enable_itn,
+                sample_rate,
+                max_segment_sec,
+            )
+        finally:
+            cleanup_prescreen(prescreen)
+
+    def _transcribe_audio_file(
+        self,
+        audio_path: str,
+        duration: Optional[float],
+        hotwords: str,
+        enable_punctuation: bool,
+        enable_itn: bool,
+        sample_rate: int,
+        max_segment_sec: float,
+    ) -> ASRFullResult:
+        """转录音频文件，超过单次时长限制时按 VAD 分段（duration 为None时读取文件获取）"""
+        from ...utils.audio_splitter import AudioSplitter
+
         try:
             # 获取音频时长
-            logger.info("[transcribe_long_audio] 正在获取音频时长...")
-            duration = get_audio_duration(audio_path)
+            if duration is None:
+                logger.info("[transcribe_long_audio] 正在获取音频时长...")
+                duration = get_audio_duration(audio_path)
             logger.info(f"[transcribe_long_audio] 音频时长: {duration:.2f}秒")
 
             # 检查是否需要分段
@@ -201,7 +278,9 @@ class BaseASREngine(ABC):
 
             # 长音频，需要分段
             splitter = AudioSplitter(
-                max_segment_sec=max_segment_sec, device=self.device
+                max_segment_sec=max_segment_sec,
+                device=self.device,
+                vad_model=self.get_vad_model(),
             )
             segments = splitter.split_audio_file(audio_path)
 
@@ -289,12 +368,21 @@ class BaseASREngine(ABC):
 
     def _detect_device(self, device: str = "auto") -> str:
         """检测可用设备"""
-        if device == "auto":
-            if torch.cuda.is_available():
-                return "cuda:0"
-            else:
-                return "cpu"
-        return device
+        return detect_device(device)
+
+    def get_vad_model(self):
+        """引擎使用的VAD模型（AutoModel兼容接口），默认为全局PyTorch实例"""
+        return get_global_vad_model(self.device)
+
+    def get_punc_model(self, realtime: bool = False):
+        """引擎使用的标点模型（AutoModel兼容接口），默认为全局PyTorch实例
+
+        Args:
+            realtime: 是否为流式中间结果使用的实时标点模型
+        """
+        if realtime:
+            return get_global_punc_realtime_model(self.device)
+        return get_global_punc_model(self.device)
 
 
 class RealTimeASREngine(BaseASREngine):
@@ -305,6 +393,11 @@ class RealTimeASREngine(BaseASREngine):
         """支持实时识别"""
         return True
 
+    @abstractmethod
+    def create_streaming_session(self, **kwargs) -> StreamingSession:
+        """创建流式识别会话"""
+        pass
+
     @abstractmethod
     def transcribe_websocket(
         self,
@@ -332,11 +425,14 @@ class FunASREngine(RealTimeASREngine):
         punc_realtime_model: Optional[str] = None,
         enable_lm: bool = True,
         extra_model_kwargs: Optional[Dict[str, Any]] = None,
+        quantize: Optional[str] = None,
+        precision: Optional[str] = None,
+        compile_mode: Optional[str] = None,
     ):
-        self.offline_model: Optional[AutoModel] = None
-        self.realtime_model: Optional[AutoModel] = None
-        self.punc_model_instance: Optional[AutoModel] = None
-        self.punc_realtime_model_instance: Optional[AutoModel] = None
+        self.offline_model: Optional["AutoModel"] = None
+        self.realtime_model: Optional["AutoModel"] = None
+        self.punc_model_instance: Optional["AutoModel"] = None
+        self.punc_realtime_model_instance: Optional["AutoModel"] = None
         self._device: str = self._detect_device(device)
 
         # 模型路径配置
@@ -359,6 +455,17 @@ class FunASREngine(RealTimeASREngine):
         # 额外的模型加载参数（如 trust_remote_code）
         self.extra_model_kwargs = extra_model_kwargs or {}
 
+        # 量化模式（none / int8-dynamic），离线和实时模型均生效
+        self.quantize = quantize
+        self.quantization: Dict[str, Any] = {}
+
+        # 推理精度（fp32 / bf16），effective_precision 记录各模型实际生效的精度
+        self.precision = precision
+        self.effective_precision: Dict[str, str] = {}
+
+        # 编译模式（none / torch-compile / torchscript），离线和实时模型均生效
+        self.compile_mode = compile_mode
+
         self._load_models_based_on_mode()
 
     def _load_models_based_on_mode(self) -> None:
@@ -366,7 +473,14 @@ class FunASREngine(RealTimeASREngine):
         mode = settings.ASR_MODEL_MODE.lower()
 
         if mode == "all":
-            # 加载所有可用模型
+            # 加载所有可用模型，允许并发加载时离线和实时模型同时加载
+            if (
+                self.offline_model_path
+                and self.realtime_model_path
+                and get_load_concurrency() > 1
+            ):
+                self._load_offline_and_realtime_models()
+                return
             if self.offline_model_path:
                 self._load_offline_model()
             if self.realtime_model_path:
@@ -386,6 +500,18 @@ class FunASREngine(RealTimeASREngine):
         else:
             raise DefaultServerErrorException(f"不支持的ASR_MODEL_MODE: {mode}")
 
+    def _load_offline_and_realtime_models(self) -> None:
+        """并发加载离线和实时模型（两者互不依赖），受 MODEL_LOAD_CONCURRENCY 限制"""
+        with ThreadPoolExecutor(max_workers=2, thread_name_prefix="model-load") as executor:
+            futures = [
+                executor.submit(self._load_offline_model),
+                executor.submit(self._load_realtime_model),
+            ]
+            errors = [future.exception() for future in futures]
+        for error in errors:
+            if error is not None:
+                raise error
+
     def _load_offline_model(self) -> None:
         """加载离线FunASR模型（支持LM语言模型）"""
         import sys
@@ -425,7 +551,21 @@ class FunASREngine(RealTimeASREngine):
                 model_kwargs["lm_model"] = resolved_lm_path
                 model_kwargs["beam_size"] = self.lm_beam_size
 
-            self.offline_model = AutoModel(**model_kwargs)
+            with load_slot(self.offline_model_path):
+                self.offline_model = load_auto_model(model_kwargs, self.offline_model_path)
+                report = apply_quantization(
+                    self.offline_model, self.quantize, self._device, self.offline_model_path
+                )
+                if report:
+                    self.quantization["offline"] = report
+                self.effective_precision["offline"] = apply_precision(
+                    self.offline_model,
+                    self.precision,
+                    self._device,
+                    self.offline_model_path,
+                    quantize=self.quantize,
+                )
+                apply_compile(self.offline_model, self.compile_mode, self.offline_model_path)
 
             extra_info = ""
             if self.extra_model_kwargs.get("trust_remote_code"):
@@ -451,7 +591,21 @@ class FunASREngine(RealTimeASREngine):
                 **settings.FUNASR_AUTOMODEL_KWARGS,
             }
 
-            self.realtime_model = AutoModel(**model_kwargs)
+            with load_slot(self.realtime_model_path):
+                self.realtime_model = load_auto_model(model_kwargs, self.realtime_model_path)
+                report = apply_quantization(
+                    self.realtime_model, self.quantize, self._device, self.realtime_model_path
+                )
+                if report:
+                    self.quantization["realtime"] = report
+                self.effective_precision["realtime"] = apply_precision(
+                    self.realtime_model,
+                    self.precision,
+                    self._device,
+                    self.realtime_model_path,
+                    quantize=self.quantize,
+                )
+                apply_compile(self.realtime_model, self.compile_mode, self.realtime_model_path)
             logger.info("实时FunASR模型加载成功（PUNC将按需使用全局实例）")
 
         except Exception as e:
@@ -730,6 +884,32 @@ class FunASREngine(RealTimeASREngine):
         except Exception as e:
             raise DefaultServerErrorException(f"语音识别失败: {str(e)}")
 
+    def create_streaming_session(
+        self,
+        chunk_stride_ms: int = 240,
+        encoder_chunk_look_back: int = 4,
+        decoder_chunk_look_back: int = 1,
+        punc_model: Any = None,
+    ) -> StreamingSession:
+        """创建绑定实时模型的流式识别会话
+
+        Args:
+            chunk_stride_ms: chunk步长（240/480/600）
+            punc_model: 实时标点模型，为None时中间结果不添加句内标点
+        """
+        if not self.realtime_model:
+            raise DefaultServerErrorException(
+                "实时模型未加载，无法进行流式识别。"
+                "请将 ASR_MODEL_MODE 设置为 realtime 或 all"
+            )
+        return StreamingSession(
+            self.realtime_model,
+            chunk_stride_ms=chunk_stride_ms,
+            encoder_chunk_look_back=encoder_chunk_look_back,
+            decoder_chunk_look_back=decoder_chunk_look_back,
+            punc_model=punc_model,
+        )
+
     def transcribe_websocket(
         self,
         audio_chunk: bytes,
@@ -737,17 +917,34 @@ class FunASREngine(RealTimeASREngine):
         is_final: bool = False,
         **kwargs: Any,
     ) -> str:
-        """WebSocket流式语音识别（未实现）"""
-        # 忽略未使用的参数（功能尚未实现）
-        _ = (audio_chunk, cache, is_final, kwargs)
-        if not self.realtime_model:
-            raise DefaultServerErrorException(
-                "实时模型未加载，无法进行WebSocket流式识别。"
-                "请将 ASR_MODEL_MODE 设置为 realtime 或 all"
-            )
+        """流式语音识别：送入一段16kHz 16bit PCM，返回本次新识别出的文本
+
+        Args:
+            audio_chunk: 16kHz 单声道 16bit PCM（也接受 float32 numpy 数组）
+            cache: 调用方持有的状态字典，同一路音频的多次调用需传入同一个字典；
+                   为None时本次调用视为一段完整音频
+            is_final: 是否为最后一段音频，为True时刷新剩余内容并结束会话
+            **kwargs: 首次调用时传给 create_streaming_session 的参数
+        """
+        if cache is None:
+            cache = {}
+            is_final = True
+
+        session = cache.get("streaming_session")
+        if session is None:
+            session = self.create_streaming_session(**kwargs)
+            cache["streaming_session"] = session
+
+        if isinstance(audio_chunk, (bytes, bytearray, memoryview)):
+            audio = np.frombuffer(audio_chunk, dtype=np.int16).astype(np.float32) / 32768.0
+        else:
+            audio = np.asarray(audio_chunk, dtype=np.float32)
 
-        logger.warning("WebSocket流式识别功能尚未实现")
-        return ""
+        texts = [result.text for result in session.feed(audio)]
+        if is_final:
+            texts.append(session.flush(drain=True).text)
+            cache.pop("streaming_session", None)
+        return "".join(texts)
 
     def is_model_loaded(self) -> bool:
         """检查模型是否已加载"""
@@ -786,11 +983,12 @@ def get_global_vad_model(device: str):
                 resolved_vad_path = resolve_model_path(settings.VAD_MODEL)
                 logger.info(f"正在加载全局VAD模型: {resolved_vad_path}")
 
-                _global_vad_model = AutoModel(
-                    model=resolved_vad_path,
-                    device=device,
-                    **settings.FUNASR_AUTOMODEL_KWARGS,
-                )
+                with load_slot(settings.VAD_MODEL):
+                    _global_vad_model = load_auto_model(
+                        {"model": resolved_vad_path, "device": device, **settings.FUNASR_AUTOMODEL_KWARGS},
+                        settings.VAD_MODEL,
+                    )
+                    apply_quantization(_global_vad_model, settings.VAD_MODEL_QUANTIZE, device, settings.VAD_MODEL)
                 logger.info("全局VAD模型加载成功")
             except Exception as e:
                 logger.error(f"全局VAD模型加载失败: {str(e)}")
@@ -808,6 +1006,9 @@ def clear_global_vad_model():
         if _global_vad_model is not None:
             del _global_vad_model
             _global_vad_model = None
+            forget_quantization(settings.VAD_MODEL)
+            forget_load(settings.VAD_MODEL)
+            forget_snapshot(settings.VAD_MODEL)
             if torch.cuda.is_available():
                 torch.cuda.empty_cache()
             logger.info("全局VAD模型缓存已清理")
@@ -824,11 +1025,13 @@ def get_global_punc_model(device: str):
                 resolved_punc_path = resolve_model_path(settings.PUNC_MODEL)
                 logger.info(f"正在加载全局标点符号模型（离线）: {resolved_punc_path}")
 
-                _global_punc_model = AutoModel(
-                    model=resolved_punc_path,
-                    device=device,
-                    **settings.FUNASR_AUTOMODEL_KWARGS,
-                )
+                with load_slot(settings.PUNC_MODEL):
+                    _global_punc_model = load_auto_model(
+                        {"model": resolved_punc_path, "device": device, **settings.FUNASR_AUTOMODEL_KWARGS},
+                        settings.PUNC_MODEL,
+                    )
+                    apply_quantization(_global_punc_model, settings.PUNC_MODEL_QUANTIZE, device, settings.PUNC_MODEL)
+                    apply_compile(_global_punc_model, settings.PUNC_MODEL_COMPILE, settings.PUNC_MODEL)
                 logger.info("全局标点符号模型（离线）加载成功")
             except Exception as e:
                 logger.error(f"全局标点符号模型（离线）加载失败: {str(e)}")
@@ -846,6 +1049,10 @@ def clear_global_punc_model():
         if _global_punc_model is not None:
             del _global_punc_model
             _global_punc_model = None
+            forget_quantization(settings.PUNC_MODEL)
+            forget_compile(settings.PUNC_MODEL)
+            forget_load(settings.PUNC_MODEL)
+            forget_snapshot(settings.PUNC_MODEL)
             if torch.cuda.is_available():
                 torch.cuda.empty_cache()
             logger.info("全局标点符号模型（离线）缓存已清理")
@@ -862,11 +1069,15 @@ def get_global_punc_realtime_model(device: str):
                 resolved_punc_realtime_path = resolve_model_path(settings.PUNC_REALTIME_MODEL)
                 logger.info(f"正在加载全局标点符号模型（实时）: {resolved_punc_realtime_path}")
 
-                _global_punc_realtime_model = AutoModel(
-                    model=resolved_punc_realtime_path,
-                    device=device,
-                    **settings.FUNASR_AUTOMODEL_KWARGS,
-                )
+                with load_slot(settings.PUNC_REALTIME_MODEL):
+                    _global_punc_realtime_model = load_auto_model(
+                        {"model": resolved_punc_realtime_path, "device": device, **settings.FUNASR_AUTOMODEL_KWARGS},
+                        settings.PUNC_REALTIME_MODEL,
+                    )
+                    apply_quantization(_global_punc_realtime_model, settings.PUNC_MODEL_QUANTIZE, device, settings.PUNC_REALTIME_MODEL)
+                    apply_compile(
+                        _global_punc_realtime_model, settings.PUNC_MODEL_COMPILE, settings.PUNC_REALTIME_MODEL
+                    )
                 logger.info("全局标点符号模型（实时）加载成功")
             except Exception as e:
                 logger.error(f"全局标点符号模型（实时）加载失败: {str(e)}")
@@ -884,6 +1095,10 @@ def clear_global_punc_realtime_model():
         if _global_punc_realtime_model is not None:
             del _global_punc_realtime_model
             _global_punc_realtime_model = None
+            forget_quantization(settings.PUNC_REALTIME_MODEL)
+            forget_compile(settings.PUNC_REALTIME_MODEL)
+            forget_load(settings.PUNC_REALTIME_MODEL)
+            forget_snapshot(settings.PUNC_REALTIME_MODEL)
             if torch.cuda.is_available():
                 torch.cuda.empty_cache()
             logger.info("全局标点符号模型（实时）缓存已清理")
@@ -0,0 +1,258 @@
+# -*- coding: utf-8 -*-
+"""
+模型运行期生命周期管理
+
+供管理接口在不重启 Worker 的情况下调整已加载的模型（如批处理时段临时加载 fun-asr-nano，结束后卸载）：
+
+1. 加载/预热：后台线程执行，立即返回任务，通过任务ID查询进度（pending → loading → warming_up → done/failed）；
+   同一模型已有进行中的同类任务时返回该任务
+2. 卸载：卸载引擎（固定的模型需显式 force），funasr / funasr-onnx 引擎全部卸载后对应的全局VAD/标点模型随之释放；
+   流式识别（WebSocket / HTTP 流式）使用默认模型，有活跃的流式会话时拒绝卸载默认模型，
+   避免这些会话继续引用已卸载引擎的权重
+3. 释放全局VAD/标点模型（含ONNX辅助模型）：之后的请求按需重新加载
+4. 固定/取消固定：固定的模型不会因内存预算被淘汰
+
+每个操作都返回操作前后的内存数值（进程 RSS、已加载模型占用，GPU 模式下另含显存）及其差值。
+所有操作只作用于处理该请求的 Worker 进程。
+"""
+
+import logging
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional
+
+from ...core.exceptions import InvalidParameterException
+from .manager import get_model_manager
+
+logger = logging.getLogger(__name__)
+
+JOB_PENDING = "pending"
+JOB_LOADING = "loading"
+JOB_WARMING_UP = "warming_up"
+JOB_DONE = "done"
+JOB_FAILED = "failed"
+
+ACTION_LOAD = "load"
+ACTION_WARMUP = "warmup"
+
+# 保留的已结束任务数
+_JOB_HISTORY = 50
+
+
+def _memory_delta(before: Dict[str, Any], after: Dict[str, Any]) -> Dict[str, float]:
+    return {
+        key: round(after[key] - value, 1)
+        for key, value in before.items()
+        if isinstance(value, (int, float)) and isinstance(after.get(key), (int, float))
+    }
+
+
+def _memory_report(before: Dict[str, Any], after: Dict[str, Any]) -> Dict[str, Any]:
+    return {"before": before, "after": after, "delta": _memory_delta(before, after)}
+
+
+class _LifecycleJobs:
+    """加载/预热任务及其进度"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._jobs: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+
+    def submit(self, action: str, model_id: str, warmup: bool) -> Dict[str, Any]:
+        with self._lock:
+            for job in self._jobs.values():
+                if (
+                    job["action"] == action
+                    and job["model_id"] == model_id
+                    and job["status"] not in (JOB_DONE, JOB_FAILED)
+                ):
+                    return self._public(job)
+
+            job = {
+                "job_id": uuid.uuid4().hex[:12],
+                "action": action,
+                "model_id": model_id,
+                "warmup": warmup,
+                "status": JOB_PENDING,
+                "created_at": time.strftime("%Y-%m-%d %H:%M:%S"),
+                "elapsed_seconds": 0.0,
+                "steps": {},
+                "memory": None,
+                "warmup_result": None,
+                "error": None,
+                "_start": time.monotonic(),
+            }
+            self._jobs[job["job_id"]] = job
+            self._prune()
+
+        threading.Thread(
+            target=self._run,
+            args=(job["job_id"],),
+            name=f"model_{action}_{model_id}",
+            daemon=True,
+        ).start()
+        return self.get(job["job_id"])
+
+    def _prune(self) -> None:
+        finished = [
+            job_id
+            for job_id, job in self._jobs.items()
+            if job["status"] in (JOB_DONE, JOB_FAILED)
+        ]
+        for job_id in finished[: max(len(finished) - _JOB_HISTORY, 0)]:
+            del self._jobs[job_id]
+
+    def _update(self, job_id: str, **fields) -> None:
+        with self._lock:
+            self._jobs[job_id].update(fields)
+
+    def _run_step(self, job_id: str, step: str, status: str, func):
+        self._update(job_id, status=status)
+        start = time.perf_counter()
+        try:
+            return func()
+        finally:
+            with self._lock:
+                self._jobs[job_id]["steps"][step] = round(time.perf_counter() - start, 3)
+
+    def _run(self, job_id: str) -> None:
+        from .warmup import warmup_model
+
+        with self._lock:
+            job = self._jobs[job_id]
+            action, model_id, warmup = job["action"], job["model_id"], job["warmup"]
+
+        manager = get_model_manager()
+        before = manager.get_memory_snapshot()
+        self._update(job_id, memory={"before": before})
+        try:
+            if action == ACTION_WARMUP:
+                engine = manager.get_loaded_engines().get(model_id)
+                if engine is None:
+                    raise InvalidParameterException(f"模型 {model_id} 未加载")
+            else:
+                engine = self._run_step(
+                    job_id, "load", JOB_LOADING, lambda: manager.get_asr_engine(model_id)
+                )
+            if warmup:
+                result = self._run_step(
+                    job_id, "warmup", JOB_WARMING_UP, lambda: warmup_model(model_id, engine)
+                )
+                self._update(job_id, warmup_result=result)
+            status, error = JOB_DONE, None
+        except Exception as e:
+            status = JOB_FAILED
+            error = getattr(e, "message", None) or str(e)
+            logger.error(f"模型 {model_id} {action} 任务失败: {error}")
+
+        self._update(
+            job_id,
+            status=status,
+            error=error,
+            memory=_memory_report(before, manager.get_memory_snapshot()),
+        )
+        logger.info(f"模型 {model_id} {action} 任务结束: {status}")
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            job = self._jobs.get(job_id)
+            return self._public(job) if job else None
+
+    def list_jobs(self) -> List[Dict[str, Any]]:
+        with self._lock:
+            return [self._public(job) for job in reversed(self._jobs.values())]
+
+    @staticmethod
+    def _public(job: Dict[str, Any]) -> Dict[str, Any]:
+        report = {k: v for k, v in job.items() if not k.startswith("_")}
+        report["steps"] = dict(job["steps"])
+        if job["status"] not in (JOB_DONE, JOB_FAILED):
+            report["elapsed_seconds"] = round(time.monotonic() - job["_start"], 1)
+        return report
+
+
+_jobs = _LifecycleJobs()
+
+
+def submit_load(model_id: str, warmup: bool = True) -> Dict[str, Any]:
+    """后台加载模型（可选加载后预热），返回任务"""
+    get_model_manager().get_model_config(model_id)
+    return _jobs.submit(ACTION_LOAD, model_id, warmup)
+
+
+def submit_warmup(model_id: str) -> Dict[str, Any]:
+    """后台预热已加载的模型，返回任务"""
+    manager = get_model_manager()
+    manager.get_model_config(model_id)
+    if model_id not in manager.get_loaded_engines():
+        raise InvalidParameterException(f"模型 {model_id} 未加载，请先加载")
+    return _jobs.submit(ACTION_WARMUP, model_id, True)
+
+
+def get_job(job_id: str) -> Optional[Dict[str, Any]]:
+    return _jobs.get(job_id)
+
+
+def list_jobs() -> List[Dict[str, Any]]:
+    """全部任务（最近的在前）"""
+    return _jobs.list_jobs()
+
+
+def unload_model(model_id: str, force: bool = False) -> Dict[str, Any]:
+    """卸载模型，固定的模型需 force=True，有活跃的流式会话时不能卸载默认模型"""
+    from ..stream_scheduler import get_stream_scheduler
+
+    manager = get_model_manager()
+    manager.get_model_config(model_id)
+    if manager.is_pinned(model_id) and not force:
+        raise InvalidParameterException(f"模型 {model_id} 已固定，卸载需指定 force=true")
+    active_sessions = get_stream_scheduler().session_count
+    if model_id == manager.get_model_config().model_id and active_sessions:
+        raise InvalidParameterException(
+            f"模型 {model_id} 是流式识别使用的默认模型，当前有 {active_sessions} 个活跃的流式会话，"
+            f"请在会话结束后再卸载"
+        )
+
+    before = manager.get_memory_snapshot()
+    unloaded = manager.unload_model(model_id)
+    if unloaded:
+        logger.info(f"模型 {model_id} 已通过管理接口卸载")
+    return {
+        "model_id": model_id,
+        "unloaded": unloaded,
+        "memory": _memory_report(before, manager.get_memory_snapshot()),
+    }
+
+
+def release_aux_models() -> Dict[str, Any]:
+    """释放全局VAD/标点模型（之后按需重新加载）"""
+    from .engine import (
+        clear_global_punc_model,
+        clear_global_punc_realtime_model,
+        clear_global_vad_model,
+    )
+    from .onnx_engine import clear_onnx_aux_models
+
+    manager = get_model_manager()
+    before = manager.get_memory_snapshot()
+    clear_global_vad_model()
+    clear_global_punc_model()
+    clear_global_punc_realtime_model()
+    clear_onnx_aux_models()
+    logger.info("全局VAD/标点模型已通过管理接口释放")
+    return {"memory": _memory_report(before, manager.get_memory_snapshot())}
+
+
+def pin_model(model_id: str, pinned: bool = True) -> Dict[str, Any]:
+    """固定/取消固定模型"""
+    manager = get_model_manager()
+    manager.pin_model(model_id, pinned)
+    logger.info(f"模型 {model_id} 已{'固定' if pinned else '取消固定'}")
+    return {
+        "model_id": model_id,
+        "pinned": pinned,
+        "loaded": model_id in manager.get_loaded_engines(),
+        "memory": manager.get_memory_snapshot(),
+    }
@@ -0,0 +1,116 @@
+# -*- coding: utf-8 -*-
+"""
+模型加载并发控制
+
+启动预加载会并行加载相互独立的模型（默认/自定义ASR引擎、VAD、离线/实时标点，
+以及 all 模式下同一引擎的离线和实时模型）。每个模型同时占用反序列化缓冲和最终权重，
+并发越高内存峰值越高，因此所有模型构建都需先获取加载槽位：
+
+1. MODEL_LOAD_CONCURRENCY 限制同时进行的模型加载数（默认 2，1 表示完全串行）
+2. 槽位只包裹单个模型的构建，持有槽位时不会等待其他加载，不会因嵌套产生死锁
+3. 各模型的加载耗时与排队等待时间在健康检查的 loading 字段展示
+"""
+
+import logging
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Optional
+
+from ...core.config import settings
+
+logger = logging.getLogger(__name__)
+
+_slots: Optional[threading.BoundedSemaphore] = None
+_slots_lock = threading.Lock()
+
+
+def get_load_concurrency() -> int:
+    """同时加载的模型数上限（至少为1）"""
+    return max(1, settings.MODEL_LOAD_CONCURRENCY)
+
+
+def _get_slots() -> threading.BoundedSemaphore:
+    global _slots
+
+    with _slots_lock:
+        if _slots is None:
+            _slots = threading.BoundedSemaphore(get_load_concurrency())
+    return _slots
+
+
+class _LoadStats:
+    """各模型最近一次的加载耗时与等待槽位的时间"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._models: Dict[str, dict] = {}
+        self._total_seconds = 0.0
+
+    def record(self, name: str, seconds: float, waited: float) -> None:
+        with self._lock:
+            self._total_seconds += seconds
+            self._models[name] = {
+                "seconds": round(seconds, 3),
+                "waited_seconds": round(waited, 3),
+            }
+
+    def discard(self, name: str) -> None:
+        with self._lock:
+            self._models.pop(name, None)
+
+    def get(self, name: str) -> Optional[dict]:
+        with self._lock:
+            report = self._models.get(name)
+            return dict(report) if report else None
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            models = {name: dict(report) for name, report in self._models.items()}
+            total_seconds = self._total_seconds
+        return {
+            "concurrency": get_load_concurrency(),
+            "total_seconds": round(total_seconds, 3),
+            "models": models,
+        }
+
+
+_stats = _LoadStats()
+
+
+@contextmanager
+def load_slot(name: str):
+    """获取加载槽位后构建模型，记录加载耗时
+
+    Args:
+        name: 模型名称（用于日志和统计）
+    """
+    slots = _get_slots()
+    wait_start = time.perf_counter()
+    slots.acquire()
+    start = time.perf_counter()
+    waited = start - wait_start
+    if waited >= 0.1:
+        logger.info(f"模型 {name} 等待加载槽位 {waited:.1f}s")
+    try:
+        yield
+    finally:
+        slots.release()
+    seconds = time.perf_counter() - start
+    _stats.record(name, seconds, waited)
+    logger.info(f"模型 {name} 加载耗时 {seconds:.1f}s")
+
+
+def forget_load(name: str) -> None:
+    """模型卸载后移除其加载记录"""
+    _stats.discard(name)
+
+
+def get_load_record(name: str) -> Optional[dict]:
+    """指定模型最近一次的加载记录，未加载时返回None"""
+    return _stats.get(name)
+
+
+def get_load_stats() -> dict:
+    """模型加载统计：并发上限、累计加载耗时与各模型的加载耗时、等待时间（秒）"""
+    return _stats.snapshot()
@@ -6,13 +6,32 @@ ASR模型管理器
 """
 
 import json
+import logging
+import threading
+import time
 import torch
+from collections import OrderedDict
 from typing import Dict, Any, Optional, List
 from pathlib import Path
 
 from ...core.config import settings
 from ...core.exceptions import DefaultServerErrorException, InvalidParameterException
-from .engine import BaseASREngine, FunASREngine
+from .engine import BaseASREngine, FunASREngine, resolve_model_path
+from .compilation import COMPILE_NONE, forget_compile, normalize_compile_mode
+from .loading import forget_load
+from .snapshot import forget_snapshot
+from .precision import PRECISION_FP32, forget_precision, normalize_precision
+from .quantization import forget_quantization, normalize_quantize_mode
+from .residency import (
+    ResidencyStats,
+    auto_model_bytes,
+    engine_param_bytes,
+    estimate_model_bytes,
+    process_rss_bytes,
+    to_mb,
+)
+
+logger = logging.getLogger(__name__)
 
 
 class ModelConfig:
@@ -35,6 +54,15 @@ class ModelConfig:
         # 额外参数（如 trust_remote_code 等）
         self.extra_kwargs = config.get("extra_kwargs", {})
 
+        # 量化模式（none / int8-dynamic）
+        self.quantize = normalize_quantize_mode(config.get("quantize"))
+
+        # 推理精度（fp32 / bf16，仅 funasr 引擎）
+        self.precision = normalize_precision(config.get("precision"))
+
+        # 编译模式（none / torch-compile / torchscript，仅 funasr 引擎）
+        self.compile = normalize_compile_mode(config.get("compile"))
+
     @property
     def has_offline_model(self) -> bool:
         """是否有离线模型"""
@@ -61,7 +89,23 @@ class ModelManager:
         self._models_config: Dict[str, ModelConfig] = {}
         self._loaded_engines: Dict[str, BaseASREngine] = {}
         self._default_model_id: Optional[str] = None
+        # 按模型ID的加载锁：同一模型并发请求时只加载一次，不同模型可并发加载
+        self._load_locks: Dict[str, threading.Lock] = {}
+        self._load_locks_lock = threading.Lock()
+        # 常驻状态：按最近使用顺序排列（末尾为最近使用），记录各引擎的内存占用
+        self._residency: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._residency_lock = threading.RLock()
+        # 各模型最近一次实测的占用（字节），卸载后保留用于重新加载前的容量预估
+        self._footprints: Dict[str, int] = {}
+        self._pinned: set = set()
+        self._loads_in_flight = 0
+        self._residency_stats = ResidencyStats()
         self._load_models_config()
+        if self._default_model_id:
+            self._pinned.add(self._default_model_id)
+        for model_id in settings.MODEL_PINNED_MODELS.split(","):
+            if model_id.strip():
+                self._pinned.add(model_id.strip())
 
     def _load_models_config(self) -> None:
         """加载模型配置文件"""
@@ -134,6 +178,9 @@ class ModelManager:
                     "default": config.is_default,
                     "loaded": loaded,
                     "supports_realtime": config.supports_realtime,
+                    "quantize": config.quantize,
+                    "precision": config.precision,
+                    "compile": config.compile,
                     "offline_model": (
                         {
                             "path": config.offline_model_path,
@@ -165,18 +212,224 @@ class ModelManager:
             raise InvalidParameterException("未指定模型且没有默认模型")
 
         # 如果已经加载，直接返回
-        if model_id in self._loaded_engines:
-            return self._loaded_engines[model_id]
+        engine = self._get_resident_engine(model_id)
+        if engine is not None:
+            return engine
 
-        # 加载新模型
         config = self.get_model_config(model_id)
-        engine = self._create_engine(config)
+        with self._load_locks_lock:
+            load_lock = self._load_locks.setdefault(model_id, threading.Lock())
+
+        with load_lock:
+            # 等待锁期间其他线程可能已完成加载
+            engine = self._get_resident_engine(model_id)
+            if engine is None:
+                # 超出内存预算时先淘汰最近最少使用的引擎，再加载新模型
+                self._ensure_capacity(model_id, self._estimate_footprint(model_id, config))
+                engine = self._load_engine(model_id, config)
+                # 预估偏小时（如首次加载）按实测占用再检查一次
+                self._ensure_capacity(model_id, 0)
 
-        # 缓存引擎
-        self._loaded_engines[model_id] = engine
+        return engine
 
+    def _get_resident_engine(self, model_id: str) -> Optional[BaseASREngine]:
+        """返回已加载的引擎并更新其最近使用时间"""
+        with self._residency_lock:
+            engine = self._loaded_engines.get(model_id)
+            if engine is not None and model_id in self._residency:
+                self._residency.move_to_end(model_id)
+                self._residency[model_id]["last_used"] = time.monotonic()
+            return engine
+
+    def _load_engine(self, model_id: str, config: ModelConfig) -> BaseASREngine:
+        """创建引擎并记录其内存占用"""
+        with self._residency_lock:
+            self._loads_in_flight += 1
+            concurrent = self._loads_in_flight > 1
+        rss_before = process_rss_bytes()
+        try:
+            engine = self._create_engine(config)
+        finally:
+            with self._residency_lock:
+                self._loads_in_flight -= 1
+                concurrent = concurrent or self._loads_in_flight > 0
+
+        param_bytes = engine_param_bytes(engine)
+        # 并发加载时 RSS 增量包含其他模型，只使用参数字节数
+        rss_delta = None if concurrent else max(process_rss_bytes() - rss_before, 0)
+        footprint = max(param_bytes, rss_delta or 0)
+
+        with self._residency_lock:
+            reload = model_id in self._footprints
+            self._footprints[model_id] = footprint
+            self._loaded_engines[model_id] = engine
+            self._residency[model_id] = {
+                "footprint": footprint,
+                "param_bytes": param_bytes,
+                "rss_delta": rss_delta,
+                "loaded_at": time.monotonic(),
+                "last_used": time.monotonic(),
+            }
+        self._residency_stats.record_load(reload)
+        logger.info(
+            f"模型 {model_id} 已{'重新' if reload else ''}加载，占用约 {to_mb(footprint)}MB"
+            f"（参数 {to_mb(param_bytes)}MB"
+            + (f"，RSS增量 {to_mb(rss_delta)}MB）" if rss_delta is not None else "）")
+        )
         return engine
 
+    def _aux_model_bytes(self) -> int:
+        """已加载的全局VAD/标点模型的参数字节数（含ONNX引擎共享的辅助模型）"""
+        from . import engine as engine_module
+        from .onnx_engine import get_onnx_aux_model_bytes
+
+        return get_onnx_aux_model_bytes() + sum(
+            auto_model_bytes(model)
+            for model in (
+                engine_module._global_vad_model,
+                engine_module._global_punc_model,
+                engine_module._global_punc_realtime_model,
+            )
+            if model is not None
+        )
+
+    def _used_bytes(self) -> int:
+        with self._residency_lock:
+            engines = sum(info["footprint"] for info in self._residency.values())
+        return engines + self._aux_model_bytes()
+
+    def _estimate_footprint(self, model_id: str, config: ModelConfig) -> int:
+        """新模型的预估占用：上次加载的实测值，首次加载按权重文件大小估算"""
+        if settings.MODEL_MEMORY_BUDGET_MB <= 0:
+            return 0
+        return self._footprints.get(model_id) or estimate_model_bytes(
+            resolve_model_path(path)
+            for path in (config.offline_model_path, config.realtime_model_path)
+            if path
+        )
+
+    def _ensure_capacity(self, model_id: str, needed: int) -> None:
+        """按 LRU 顺序淘汰 model_id 以外未固定的引擎，直到已用内存加上 needed 不超出预算"""
+        budget = settings.MODEL_MEMORY_BUDGET_MB * 1024**2
+        if budget <= 0:
+            return
+
+        with self._residency_lock:
+            while self._used_bytes() + needed > budget:
+                candidates = [
+                    loaded_id
+                    for loaded_id in self._residency
+                    if loaded_id != model_id and loaded_id not in self._pinned
+                ]
+                if not candidates:
+                    logger.warning(
+                        f"模型 {model_id} 加载后将超出内存预算 {settings.MODEL_MEMORY_BUDGET_MB}MB"
+                        f"（已用 {to_mb(self._used_bytes())}MB，需要 {to_mb(needed)}MB），"
+                        f"已无可淘汰的模型"
+                    )
+                    return
+                self._evict(candidates[0], f"为加载 {model_id} 腾出内存")
+
+    def _evict(self, model_id: str, reason: str) -> None:
+        footprint = self._residency.get(model_id, {}).get("footprint", 0)
+        idle = time.monotonic() - self._residency.get(model_id, {}).get("last_used", time.monotonic())
+        self._remove_engine(model_id)
+        self._residency_stats.record_eviction(model_id, footprint, reason)
+        logger.info(
+            f"已淘汰模型 {model_id}（约 {to_mb(footprint)}MB，空闲 {idle:.0f}s）: {reason}"
+        )
+
+    def _remove_engine(self, model_id: str) -> bool:
+        """移除引擎及其统计记录，同类引擎全部移除后释放对应的全局VAD/标点模型"""
+        with self._residency_lock:
+            if model_id not in self._loaded_engines:
+                return False
+            del self._loaded_engines[model_id]
+            self._residency.pop(model_id, None)
+            # 量化/精度/编译/加载/快照记录按模型路径登记，多个模型ID可共用同一路径
+            # （如 paraformer-large 与 paraformer-large-onnx），仍有已加载引擎使用的路径保留记录
+            in_use = {
+                path
+                for loaded_id in self._loaded_engines
+                for path in self._model_paths(loaded_id)
+            }
+            for path in self._model_paths(model_id) - in_use:
+                forget_quantization(path)
+                forget_precision(path)
+                forget_compile(path)
+                forget_load(path)
+                forget_snapshot(path)
+            self._release_unused_aux_models()
+        # 强制垃圾回收
+        if torch.cuda.is_available():
+            torch.cuda.empty_cache()
+        return True
+
+    def _model_paths(self, model_id: str) -> set:
+        """模型配置中的离线/实时模型路径"""
+        config = self._models_config.get(model_id)
+        if not config:
+            return set()
+        return {
+            path
+            for path in (config.offline_model_path, config.realtime_model_path)
+            if path
+        }
+
+    def _release_unused_aux_models(self) -> None:
+        """没有已加载的 funasr / funasr-onnx 引擎时释放对应的全局VAD/标点模型（再次使用时按需加载）"""
+        from .engine import (
+            clear_global_punc_model,
+            clear_global_punc_realtime_model,
+            clear_global_vad_model,
+        )
+        from .onnx_engine import FunASROnnxEngine, clear_onnx_aux_models
+
+        engines = list(self._loaded_engines.values())
+        if not any(isinstance(engine, FunASREngine) for engine in engines):
+            clear_global_vad_model()
+            clear_global_punc_model()
+            clear_global_punc_realtime_model()
+        if not any(isinstance(engine, FunASROnnxEngine) for engine in engines):
+            clear_onnx_aux_models()
+
+    def pin_model(self, model_id: str, pinned: bool = True) -> None:
+        """固定/取消固定模型，固定的模型不会因内存预算被淘汰"""
+        self.get_model_config(model_id)
+        with self._residency_lock:
+            if pinned:
+                self._pinned.add(model_id)
+            else:
+                self._pinned.discard(model_id)
+
+    def get_residency_stats(self) -> Dict[str, Any]:
+        """常驻状态：内存预算、已用内存、各引擎占用与空闲时间、固定的模型及淘汰/重新加载计数"""
+        now = time.monotonic()
+        with self._residency_lock:
+            models = {
+                model_id: {
+                    "footprint_mb": to_mb(info["footprint"]),
+                    "param_mb": to_mb(info["param_bytes"]),
+                    "rss_delta_mb": (
+                        to_mb(info["rss_delta"]) if info["rss_delta"] is not None else None
+                    ),
+                    "pinned": model_id in self._pinned,
+                    "idle_seconds": round(now - info["last_used"], 1),
+                }
+                for model_id, info in reversed(self._residency.items())
+            }
+            pinned = sorted(self._pinned)
+            engine_bytes = sum(info["footprint"] for info in self._residency.values())
+        aux_bytes = self._aux_model_bytes()
+        return {
+            "budget_mb": settings.MODEL_MEMORY_BUDGET_MB,
+            "used_mb": to_mb(engine_bytes + aux_bytes),
+            "aux_models_mb": to_mb(aux_bytes),
+            "pinned": pinned,
+            "models": models,
+            **self._residency_stats.snapshot(),
+        }
+
     def _create_engine(self, config: ModelConfig) -> BaseASREngine:
         """根据配置创建ASR引擎"""
         if config.engine.lower() == "funasr":
@@ -190,19 +443,37 @@ class ModelManager:
                 punc_model_revision=settings.PUNC_MODEL_REVISION,
                 punc_realtime_model=settings.PUNC_REALTIME_MODEL,
                 extra_model_kwargs=config.extra_kwargs,
+                quantize=config.quantize,
+                precision=config.precision,
+                compile_mode=config.compile,
+            )
+        elif config.engine.lower() == "funasr-onnx":
+            from .onnx_engine import FunASROnnxEngine
+
+            if config.precision != PRECISION_FP32:
+                logger.warning(f"模型 {config.model_id} 的 precision 配置仅对 funasr 引擎生效，已忽略")
+            if config.compile != COMPILE_NONE:
+                logger.warning(f"模型 {config.model_id} 的 compile 配置仅对 funasr 引擎生效，已忽略")
+            return FunASROnnxEngine(
+                offline_model_path=config.offline_model_path,
+                realtime_model_path=config.realtime_model_path,
+                device=settings.DEVICE,
+                vad_model=settings.VAD_MODEL,
+                punc_model=settings.PUNC_MODEL,
+                punc_realtime_model=settings.PUNC_REALTIME_MODEL,
+                quantize=config.quantize,
             )
         else:
             raise InvalidParameterException(f"不支持的引擎类型: {config.engine}")
 
     def unload_model(self, model_id: str) -> bool:
         """卸载指定模型"""
-        if model_id in self._loaded_engines:
-            del self._loaded_engines[model_id]
-            # 强制垃圾回收
-            if torch.cuda.is_available():
-                torch.cuda.empty_cache()
-            return True
-        return False
+        return self._remove_engine(model_id)
+
+    def get_loaded_engines(self) -> Dict[str, BaseASREngine]:
+        """已加载的引擎 {模型ID: 引擎}"""
+        with self._residency_lock:
+            return dict(self._loaded_engines)
 
     def get_memory_usage(self) -> Dict[str, Any]:
         """获取内存使用情况"""
@@ -210,6 +481,10 @@ class ModelManager:
             "model_list": list(self._loaded_engines.keys()),
             "loaded_count": len(self._loaded_engines),
             "asr_model_mode": settings.ASR_MODEL_MODE,
+            "process_memory": {
+                "rss": f"{process_rss_bytes() / 1024**3:.2f}GB",
+                "models": f"{self._used_bytes() / 1024**3:.2f}GB",
+            },
         }
 
         if torch.cuda.is_available():
@@ -221,11 +496,26 @@ class ModelManager:
 
         return memory_info
 
+    def get_memory_snapshot(self) -> Dict[str, Any]:
+        """当前内存数值（MB）：进程 RSS、已加载模型的占用，GPU 模式下另含显存"""
+        snapshot = {
+            "rss_mb": to_mb(process_rss_bytes()),
+            "models_mb": to_mb(self._used_bytes()),
+            "loaded_models": list(self.get_loaded_engines()),
+        }
+        if torch.cuda.is_available():
+            snapshot["gpu_allocated_mb"] = to_mb(torch.cuda.memory_allocated())
+            snapshot["gpu_reserved_mb"] = to_mb(torch.cuda.memory_reserved())
+        return snapshot
+
+    def is_pinned(self, model_id: str) -> bool:
+        with self._residency_lock:
+            return model_id in self._pinned
+
     def clear_cache(self) -> None:
         """清空模型缓存"""
-        self._loaded_engines.clear()
-        if torch.cuda.is_available():
-            torch.cuda.empty_cache()
+        for model_id in list(self._loaded_engines):
+            self._remove_engine(model_id)
 
     def validate_model_mode_compatibility(self, model_id: str) -> Dict[str, Any]:
         """验证模型与当前ASR_MODEL_MODE的兼容性"""
@@ -0,0 +1,594 @@
+# -*- coding: utf-8 -*-
+"""
+ONNX Runtime 推理引擎（engine: funasr-onnx）
+
+使用 funasr_onnx 在 ONNX Runtime 上运行 Paraformer（离线/在线）、FSMN-VAD 和 CT-Transformer 标点模型，
+适用于仅有CPU的节点：推理更快、内存占用明显小于 PyTorch AutoModel。
+
+1. 模型目录与 funasr 引擎相同（ModelScope 缓存），需先用 scripts/export_onnx.py 导出 model.onnx
+2. 各模型包装为与 AutoModel 兼容的 generate() 接口，流式会话、两遍识别、句末标点、
+   长音频分段等上层逻辑无需区分引擎
+3. ORT 会话参数（线程数、图优化级别、是否使用量化模型）由 ONNX_* 配置项控制；
+   模型配置 "quantize": "int8-dynamic" 时该模型使用导出的 model_quant.onnx
+
+依赖 funasr_onnx 与 onnxruntime（可选依赖，仅使用本引擎时需要安装）。
+"""
+
+import copy
+import logging
+import os
+import re
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+import soundfile as sf
+
+from ...core.config import settings
+from ...core.exceptions import DefaultServerErrorException
+from ...utils.text_processing import apply_itn_to_text
+from .engine import (
+    ASRRawResult,
+    ASRSegmentResult,
+    RealTimeASREngine,
+    resolve_model_path,
+)
+from .loading import get_load_concurrency, load_slot
+from .quantization import QUANTIZE_INT8_DYNAMIC, normalize_quantize_mode
+from .streaming import MODEL_SAMPLE_RATE, StreamingSession
+
+logger = logging.getLogger(__name__)
+
+# 在线模型前端（WavFrontendOnline）跨chunk保留的状态，按会话保存在流式缓存中
+_FRONTEND_STATE = ("input_cache", "reserve_waveforms", "lfr_splice_cache")
+
+# 中文字符之间的空格（funasr_onnx 带时间戳的输出按字以空格分隔）
+_CJK_SPACE_PATTERN = re.compile(r"(?<=[\u3400-\u9fff]) +(?=[\u3400-\u9fff])")
+
+
+def _import_funasr_onnx():
+    """延迟导入 funasr_onnx，未安装时给出明确提示"""
+    try:
+        import funasr_onnx
+    except ImportError as e:
+        raise DefaultServerErrorException(
+            "funasr-onnx 引擎需要安装 funasr_onnx 和 onnxruntime: "
+            "pip install funasr_onnx onnxruntime"
+        ) from e
+    return funasr_onnx
+
+
+def _device_id(device: str) -> str:
+    """设备字符串转换为 funasr_onnx 的 device_id（-1 表示CPU）"""
+    if device.startswith("cuda"):
+        return device.split(":", 1)[1] if ":" in device else "0"
+    return "-1"
+
+
+def _session_options():
+    """按配置构建 ORT SessionOptions"""
+    import onnxruntime as ort
+
+    levels = {
+        "disable": ort.GraphOptimizationLevel.ORT_DISABLE_ALL,
+        "basic": ort.GraphOptimizationLevel.ORT_ENABLE_BASIC,
+        "extended": ort.GraphOptimizationLevel.ORT_ENABLE_EXTENDED,
+        "all": ort.GraphOptimizationLevel.ORT_ENABLE_ALL,
+    }
+    level = settings.ONNX_GRAPH_OPTIMIZATION_LEVEL
+    if level not in levels:
+        logger.warning(f"不支持的ONNX_GRAPH_OPTIMIZATION_LEVEL: {level}，使用 all")
+        level = "all"
+
+    options = ort.SessionOptions()
+    options.intra_op_num_threads = settings.ONNX_INTRA_OP_THREADS
+    options.inter_op_num_threads = settings.ONNX_INTER_OP_THREADS
+    options.graph_optimization_level = levels[level]
+    # 算子间线程数大于1时才需要并行执行模式
+    if settings.ONNX_INTER_OP_THREADS > 1:
+        options.execution_mode = ort.ExecutionMode.ORT_PARALLEL
+    options.log_severity_level = 4
+    options.enable_cpu_mem_arena = False
+    return options
+
+
+def _apply_session_options(model) -> None:
+    """按配置重建模型中的ORT会话
+
+    funasr_onnx 只开放 intra_op_num_threads，图优化级别固定为 ORT_ENABLE_ALL、串行执行，
+    配置与其默认值不同时使用自定义 SessionOptions 重新创建会话
+    """
+    if settings.ONNX_GRAPH_OPTIMIZATION_LEVEL == "all" and settings.ONNX_INTER_OP_THREADS <= 1:
+        return
+
+    import onnxruntime as ort
+    from funasr_onnx.utils.utils import OrtInferSession
+
+    for wrapper in vars(model).values():
+        if isinstance(wrapper, OrtInferSession):
+            session = wrapper.session
+            wrapper.session = ort.InferenceSession(
+                session._model_path,
+                sess_options=_session_options(),
+                providers=session.get_providers(),
+            )
+
+
+def _use_quantized_onnx(quantize: Optional[str]) -> bool:
+    """是否加载int8量化模型（model_quant.onnx）：ONNX_QUANTIZE 全局开启或模型配置了 int8-dynamic"""
+    return settings.ONNX_QUANTIZE or normalize_quantize_mode(quantize) == QUANTIZE_INT8_DYNAMIC
+
+
+def _load_onnx_model(
+    model_class, model_id: str, device: str, quantize: Optional[str] = None, **kwargs
+):
+    """从 ModelScope 缓存目录加载 ONNX 模型"""
+    model_dir = resolve_model_path(model_id)
+    with load_slot(model_id):
+        model = model_class(
+            model_dir,
+            device_id=_device_id(device),
+            quantize=_use_quantized_onnx(quantize),
+            intra_op_num_threads=settings.ONNX_INTRA_OP_THREADS,
+            **kwargs,
+        )
+        _apply_session_options(model)
+    return model
+
+
+def _load_audio(audio) -> np.ndarray:
+    """音频文件路径或数组转换为16kHz单声道float32数组"""
+    if not isinstance(audio, str):
+        return np.asarray(audio, dtype=np.float32)
+
+    data, sample_rate = sf.read(audio, dtype="float32", always_2d=True)
+    data = data[:, 0] if data.shape[1] == 1 else data.mean(axis=1)
+    if sample_rate != MODEL_SAMPLE_RATE:
+        from math import gcd
+
+        from scipy.signal import resample_poly
+
+        factor = gcd(sample_rate, MODEL_SAMPLE_RATE)
+        data = resample_poly(
+            data, MODEL_SAMPLE_RATE // factor, sample_rate // factor
+        ).astype(np.float32)
+    return data
+
+
+def _preds_text(preds) -> str:
+    """funasr_onnx 识别结果的 preds 字段转换为文本"""
+    if isinstance(preds, (list, tuple)):
+        preds = preds[0] if preds else ""
+    return _CJK_SPACE_PATTERN.sub("", str(preds or "")).strip()
+
+
+class OnnxOfflineModel:
+    """离线 Paraformer 的 AutoModel 兼容包装"""
+
+    def __init__(self, model):
+        self.model = model
+
+    def generate(self, input, cache=None, batch_size: int = 1, **kwargs) -> List[dict]:
+        """识别一段或一组音频，返回 [{"text": ...}]（热词等参数忽略）"""
+        inputs = input if isinstance(input, list) else [input]
+        waveforms = [_load_audio(item) for item in inputs]
+        if not any(len(waveform) for waveform in waveforms):
+            return [{"text": ""} for _ in waveforms]
+
+        model = self.model
+        if batch_size > 1:
+            model = copy.copy(self.model)
+            model.batch_size = batch_size
+        results = model(waveforms)
+        return [{"text": _preds_text(result.get("preds"))} for result in results]
+
+
+class OnnxVadModel:
+    """FSMN-VAD 的 AutoModel 兼容包装，返回 [{"value": [[start_ms, end_ms], ...]}]"""
+
+    def __init__(self, model):
+        self.model = model
+
+    def generate(self, input, cache=None, **kwargs) -> List[dict]:
+        audio = _load_audio(input)
+        if len(audio) == 0:
+            return [{"value": []}]
+        segments = self.model(audio)
+        return [{"value": [list(seg) for seg in segments[0]] if segments else []}]
+
+
+class OnnxPuncModel:
+    """离线 CT-Transformer 标点模型的 AutoModel 兼容包装"""
+
+    def __init__(self, model):
+        self.model = model
+
+    def generate(self, input, cache=None, **kwargs) -> List[dict]:
+        texts = input if isinstance(input, list) else [input]
+        return [{"text": self.model(text)[0] if text else text} for text in texts]
+
+
+class OnnxRealtimePuncModel:
+    """实时 CT-Transformer 标点模型的 AutoModel 兼容包装
+
+    模型缓存（上一句未结束的词）保存在调用方传入的 cache 中，可随流式会话序列化
+    """
+
+    def __init__(self, model):
+        self.model = model
+
+    def generate(self, input, cache: Optional[Dict] = None, **kwargs) -> List[dict]:
+        if not input:
+            return [{"text": ""}]
+        if cache is None:
+            cache = {}
+        param_dict = {"cache": cache.get("words", [])}
+        text = self.model(input, param_dict=param_dict)[0]
+        cache["words"] = param_dict["cache"]
+        return [{"text": text}]
+
+
+class OnnxOnlineModel:
+    """在线 Paraformer 的 AutoModel 兼容包装
+
+    funasr_onnx 的在线模型把特征前端的跨chunk状态保存在模型实例上，无法在会话间共享。
+    这里每次调用使用模型的浅拷贝（共享ORT会话）和独立的前端，前端状态与模型缓存一起
+    保存在调用方传入的 cache 中，因此 StreamingSession 的缓存重置、切换步长和会话续传
+    的语义与 PyTorch 引擎一致
+    """
+
+    def __init__(self, model):
+        self.model = model
+
+    def generate(
+        self,
+        input,
+        cache: Dict,
+        is_final: bool = False,
+        chunk_size: Optional[List[int]] = None,
+        **kwargs,
+    ) -> List[dict]:
+        """推理一个chunk（encoder/decoder_chunk_look_back 由导出的模型固定，此处忽略）"""
+        audio = np.asarray(input, dtype=np.float32)
+        model_cache = cache.setdefault("model", {})
+        if len(audio) == 0 and not model_cache:
+            return [{"text": ""}]
+
+        model = copy.copy(self.model)
+        if chunk_size is not None:
+            model.chunk_size = list(chunk_size)
+        frontend = copy.copy(self.model.frontend)
+        state = cache.get("frontend", {})
+        frontend.input_cache = state.get("input_cache")
+        frontend.reserve_waveforms = state.get("reserve_waveforms")
+        # lfr_splice_cache 在前端内按元素原地更新，使用副本
+        frontend.lfr_splice_cache = list(state.get("lfr_splice_cache", []))
+        model.frontend = frontend
+
+        results = model(audio, param_dict={"cache": model_cache, "is_final": is_final})
+        cache["frontend"] = {name: getattr(frontend, name) for name in _FRONTEND_STATE}
+
+        text = "".join(_preds_text(result.get("preds")) for result in results)
+        return [{"text": text}]
+
+
+# 全局ONNX辅助模型缓存（VAD/标点），按 (类型, 模型ID) 在引擎间共享
+_onnx_aux_models: Dict[tuple, Any] = {}
+# 各辅助模型的占用（按加载的模型文件大小估算），计入 MODEL_MEMORY_BUDGET_MB
+_onnx_aux_model_bytes: Dict[tuple, int] = {}
+_onnx_aux_models_lock = threading.Lock()
+# 按 (类型, 模型ID) 的加载锁，不同辅助模型可并发加载
+_onnx_aux_load_locks: Dict[tuple, threading.Lock] = {}
+
+
+def _onnx_model_file_bytes(model_id: str, quantize: Optional[str]) -> int:
+    """加载的 ONNX 模型文件大小（model.onnx / model_quant.onnx），不存在时返回0"""
+    name = "model_quant.onnx" if _use_quantized_onnx(quantize) else "model.onnx"
+    try:
+        return os.path.getsize(os.path.join(resolve_model_path(model_id), name))
+    except OSError:
+        return 0
+
+
+def _get_onnx_aux_model(kind: str, model_id: str, device: str):
+    """获取全局ONNX辅助模型实例（vad / punc / punc_realtime）"""
+    key = (kind, model_id)
+    with _onnx_aux_models_lock:
+        load_lock = _onnx_aux_load_locks.setdefault(key, threading.Lock())
+    with load_lock:
+        if key not in _onnx_aux_models:
+            funasr_onnx = _import_funasr_onnx()
+            logger.info(f"正在加载ONNX辅助模型({kind}): {model_id}")
+            if kind == "vad":
+                model = OnnxVadModel(
+                    _load_onnx_model(
+                        funasr_onnx.Fsmn_vad, model_id, device, settings.VAD_MODEL_QUANTIZE
+                    )
+                )
+            elif kind == "punc":
+                model = OnnxPuncModel(
+                    _load_onnx_model(
+                        funasr_onnx.CT_Transformer, model_id, device, settings.PUNC_MODEL_QUANTIZE
+                    )
+                )
+            else:
+                model = OnnxRealtimePuncModel(
+                    _load_onnx_model(
+                        funasr_onnx.CT_Transformer_VadRealtime,
+                        model_id,
+                        device,
+                        settings.PUNC_MODEL_QUANTIZE,
+                    )
+                )
+            quantize = settings.VAD_MODEL_QUANTIZE if kind == "vad" else settings.PUNC_MODEL_QUANTIZE
+            with _onnx_aux_models_lock:
+                _onnx_aux_models[key] = model
+                _onnx_aux_model_bytes[key] = _onnx_model_file_bytes(model_id, quantize)
+            logger.info(f"ONNX辅助模型({kind})加载成功")
+        return _onnx_aux_models[key]
+
+
+def get_onnx_aux_model_bytes() -> int:
+    """已加载的全局ONNX辅助模型占用（字节）"""
+    with _onnx_aux_models_lock:
+        return sum(_onnx_aux_model_bytes[key] for key in _onnx_aux_models)
+
+
+def clear_onnx_aux_models() -> None:
+    """释放全局ONNX辅助模型（再次使用时按需加载）"""
+    with _onnx_aux_models_lock:
+        if _onnx_aux_models:
+            logger.info(f"释放全局ONNX辅助模型: {sorted(kind for kind, _ in _onnx_aux_models)}")
+        _onnx_aux_models.clear()
+        _onnx_aux_model_bytes.clear()
+
+
+class FunASROnnxEngine(RealTimeASREngine):
+    """基于 ONNX Runtime 的 FunASR 语音识别引擎"""
+
+    def __init__(
+        self,
+        offline_model_path: Optional[str] = None,
+        realtime_model_path: Optional[str] = None,
+        device: str = "cpu",
+        vad_model: Optional[str] = None,
+        punc_model: Optional[str] = None,
+        punc_realtime_model: Optional[str] = None,
+        quantize: Optional[str] = None,
+    ):
+        self.offline_model: Optional[OnnxOfflineModel] = None
+        self.realtime_model: Optional[OnnxOnlineModel] = None
+        self._device: str = self._detect_device(device)
+
+        self.offline_model_path = offline_model_path
+        self.realtime_model_path = realtime_model_path
+        self.vad_model = vad_model or settings.VAD_MODEL
+        self.punc_model = punc_model or settings.PUNC_MODEL
+        self.punc_realtime_model = punc_realtime_model or settings.PUNC_REALTIME_MODEL
+        self.quantize = quantize
+
+        self._load_models_based_on_mode()
+
+    def _load_models_based_on_mode(self) -> None:
+        """根据ASR_MODEL_MODE加载对应的模型"""
+        mode = settings.ASR_MODEL_MODE.lower()
+        if mode not in ("all", "offline", "realtime"):
+            raise DefaultServerErrorException(f"不支持的ASR_MODEL_MODE: {mode}")
+
+        if mode == "all" and self.offline_model_path and self.realtime_model_path:
+            if get_load_concurrency() > 1:
+                # 离线和实时模型互不依赖，并发加载
+                with ThreadPoolExecutor(max_workers=2, thread_name_prefix="model-load") as executor:
+                    futures = [
+                        executor.submit(self._load_offline_model),
+                        executor.submit(self._load_realtime_model),
+                    ]
+                    errors = [future.exception() for future in futures]
+                for error in errors:
+                    if error is not None:
+                        raise error
+                return
+
+        if mode in ("all", "offline"):
+            if self.offline_model_path:
+                self._load_offline_model()
+            elif mode == "offline":
+                logger.warning("ASR_MODEL_MODE设置为offline，但未提供离线模型路径")
+        if mode in ("all", "realtime"):
+            if self.realtime_model_path:
+                self._load_realtime_model()
+            elif mode == "realtime":
+                logger.warning("ASR_MODEL_MODE设置为realtime，但未提供实时模型路径")
+
+    def _load_offline_model(self) -> None:
+        """加载离线ONNX模型"""
+        funasr_onnx = _import_funasr_onnx()
+        try:
+            logger.info(f"正在加载离线ONNX模型: {self.offline_model_path}")
+            self.offline_model = OnnxOfflineModel(
+                _load_onnx_model(
+                    funasr_onnx.Paraformer, self.offline_model_path, self._device, self.quantize
+                )
+            )
+            logger.info("离线ONNX模型加载成功")
+        except Exception as e:
+            raise DefaultServerErrorException(f"离线ONNX模型加载失败: {str(e)}")
+
+    def _load_realtime_model(self) -> None:
+        """加载实时ONNX模型"""
+        _import_funasr_onnx()
+        from funasr_onnx.paraformer_online_bin import Paraformer as ParaformerOnline
+
+        try:
+            logger.info(f"正在加载实时ONNX模型: {self.realtime_model_path}")
+            self.realtime_model = OnnxOnlineModel(
+                _load_onnx_model(
+                    ParaformerOnline, self.realtime_model_path, self._device, self.quantize
+                )
+            )
+            logger.info("实时ONNX模型加载成功")
+        except Exception as e:
+            raise DefaultServerErrorException(f"实时ONNX模型加载失败: {str(e)}")
+
+    def get_vad_model(self):
+        """VAD模型（ONNX）"""
+        return _get_onnx_aux_model("vad", self.vad_model, self._device)
+
+    def get_punc_model(self, realtime: bool = False):
+        """标点模型（ONNX）"""
+        if realtime:
+            return _get_onnx_aux_model("punc_realtime", self.punc_realtime_model, self._device)
+        return _get_onnx_aux_model("punc", self.punc_model, self._device)
+
+    def _require_offline_model(self) -> OnnxOfflineModel:
+        if not self.offline_model:
+            raise DefaultServerErrorException(
+                "离线模型未加载，无法进行文件识别。"
+                "请将 ASR_MODEL_MODE 设置为 offline 或 all"
+            )
+        return self.offline_model
+
+    def _punctuate(self, text: str) -> str:
+        if not text:
+            return text
+        result = self.get_punc_model().generate(input=text)
+        return result[0].get("text", text) or text
+
+    def _recognize_segments(
+        self, audio: np.ndarray, enable_punctuation: bool
+    ) -> List[ASRSegmentResult]:
+        """VAD切分后逐段识别（可选逐段标点恢复）"""
+        offline_model = self._require_offline_model()
+        vad_segments = self.get_vad_model().generate(input=audio)[0]["value"]
+
+        segments: List[ASRSegmentResult] = []
+        for start_ms, end_ms in vad_segments:
+            start = int(start_ms) * MODEL_SAMPLE_RATE // 1000
+            end = int(end_ms) * MODEL_SAMPLE_RATE // 1000
+            text = offline_model.generate(input=audio[start:end])[0]["text"]
+            if not text:
+                continue
+            if enable_punctuation:
+                text = self._punctuate(text)
+            segments.append(
+                ASRSegmentResult(
+                    text=text, start_time=start_ms / 1000.0, end_time=end_ms / 1000.0
+                )
+            )
+        return segments
+
+    def transcribe_file(
+        self,
+        audio_path: str,
+        hotwords: str = "",
+        enable_punctuation: bool = False,
+        enable_itn: bool = False,
+        enable_vad: bool = False,
+        sample_rate: int = 16000,
+    ) -> str:
+        """使用ONNX模型转录音频文件（热词不支持，忽略）"""
+        _ = hotwords, sample_rate
+        offline_model = self._require_offline_model()
+
+        try:
+            audio = _load_audio(audio_path)
+            if enable_vad:
+                segments = self._recognize_segments(audio, enable_punctuation)
+                text = "".join(segment.text for segment in segments)
+            else:
+                text = offline_model.generate(input=audio)[0]["text"]
+                if enable_punctuation:
+                    text = self._punctuate(text)
+
+            if enable_itn and text:
+                text = apply_itn_to_text(text)
+            return text
+
+        except DefaultServerErrorException:
+            raise
+        except Exception as e:
+            raise DefaultServerErrorException(f"语音识别失败: {str(e)}")
+
+    def transcribe_file_with_vad(
+        self,
+        audio_path: str,
+        hotwords: str = "",
+        enable_punctuation: bool = True,
+        enable_itn: bool = True,
+        sample_rate: int = 16000,
+    ) -> ASRRawResult:
+        """使用ONNX VAD切分后识别，返回带时间戳分段的结果"""
+        _ = hotwords, sample_rate
+
+        try:
+            segments = self._recognize_segments(_load_audio(audio_path), enable_punctuation)
+            if enable_itn:
+                for segment in segments:
+                    segment.text = apply_itn_to_text(segment.text)
+            return ASRRawResult(
+                text="".join(segment.text for segment in segments), segments=segments
+            )
+
+        except DefaultServerErrorException:
+            raise
+        except Exception as e:
+            raise DefaultServerErrorException(f"语音识别失败: {str(e)}")
+
+    def create_streaming_session(
+        self,
+        chunk_stride_ms: int = 240,
+        encoder_chunk_look_back: int = 4,
+        decoder_chunk_look_back: int = 1,
+        punc_model: Any = None,
+    ) -> StreamingSession:
+        """创建绑定实时ONNX模型的流式识别会话"""
+        if not self.realtime_model:
+            raise DefaultServerErrorException(
+                "实时模型未加载，无法进行流式识别。"
+                "请将 ASR_MODEL_MODE 设置为 realtime 或 all"
+            )
+        return StreamingSession(
+            self.realtime_model,
+            chunk_stride_ms=chunk_stride_ms,
+            encoder_chunk_look_back=encoder_chunk_look_back,
+            decoder_chunk_look_back=decoder_chunk_look_back,
+            punc_model=punc_model,
+        )
+
+    def transcribe_websocket(
+        self,
+        audio_chunk: bytes,
+        cache: Optional[Dict] = None,
+        is_final: bool = False,
+        **kwargs: Any,
+    ) -> str:
+        """流式语音识别：送入一段16kHz 16bit PCM，返回本次新识别出的文本"""
+        if cache is None:
+            cache = {}
+            is_final = True
+
+        session = cache.get("streaming_session")
+        if session is None:
+            session = self.create_streaming_session(**kwargs)
+            cache["streaming_session"] = session
+
+        if isinstance(audio_chunk, (bytes, bytearray, memoryview)):
+            audio = np.frombuffer(audio_chunk, dtype=np.int16).astype(np.float32) / 32768.0
+        else:
+            audio = np.asarray(audio_chunk, dtype=np.float32)
+
+        texts = [result.text for result in session.feed(audio)]
+        if is_final:
+            texts.append(session.flush(drain=True).text)
+            cache.pop("streaming_session", None)
+        return "".join(texts)
+
+    def is_model_loaded(self) -> bool:
+        """检查模型是否已加载"""
+        return self.offline_model is not None or self.realtime_model is not None
+
+    @property
+    def device(self) -> str:
+        """获取设备信息"""
+        return self._device
@@ -0,0 +1,175 @@
+# -*- coding: utf-8 -*-
+"""
+推理精度（fp32 / bf16）
+
+在原生支持 bfloat16 的设备上以 bf16 autocast 推理：矩阵乘、卷积等算子以 bf16 计算，
+其余算子保持 fp32，模型权重不变，识别结果与 fp32 基本一致。
+
+1. models.json 中按模型配置 "precision": "bf16"（默认 fp32），仅 funasr 引擎生效
+2. CPU 需具备原生 bf16 指令（AMX-BF16 或 AVX512-BF16），否则 bf16 由软件模拟、比 fp32 更慢，
+   此时拒绝启用并回退到 fp32；CUDA 设备按 torch.cuda.is_bf16_supported() 判断
+3. 与 int8 动态量化互斥：量化层只接受 fp32 激活，同时配置时以量化为准
+4. 各模型实际生效的精度及回退原因在健康检查的 precision 字段展示
+"""
+
+import functools
+import logging
+import threading
+from typing import Any, Dict, Optional
+
+import torch
+
+from .quantization import QUANTIZE_NONE, normalize_quantize_mode
+
+logger = logging.getLogger(__name__)
+
+PRECISION_FP32 = "fp32"
+PRECISION_BF16 = "bf16"
+PRECISION_MODES = (PRECISION_FP32, PRECISION_BF16)
+
+# 原生 bf16 计算的 CPU 指令集标志（/proc/cpuinfo flags）
+_NATIVE_BF16_FLAGS = ("amx_bf16", "avx512_bf16")
+
+_cpu_bf16_support: Optional[dict] = None
+_cpu_bf16_lock = threading.Lock()
+
+
+def normalize_precision(precision: Optional[str]) -> str:
+    """规范化精度配置，未配置时为 fp32"""
+    precision = (precision or PRECISION_FP32).strip().lower()
+    if precision not in PRECISION_MODES:
+        raise ValueError(f"不支持的推理精度: {precision}，支持: {', '.join(PRECISION_MODES)}")
+    return precision
+
+
+def _read_cpu_flags() -> set:
+    try:
+        with open("/proc/cpuinfo", "r") as f:
+            for line in f:
+                if line.startswith("flags"):
+                    return set(line.split(":", 1)[1].split())
+    except OSError:
+        pass
+    return set()
+
+
+def detect_cpu_bf16_support() -> dict:
+    """检测CPU是否原生支持 bf16（结果缓存，进程内只检测一次）"""
+    global _cpu_bf16_support
+
+    with _cpu_bf16_lock:
+        if _cpu_bf16_support is None:
+            flags = _read_cpu_flags()
+            isa = [flag for flag in _NATIVE_BF16_FLAGS if flag in flags]
+            mkldnn = bool(torch.backends.mkldnn.is_available())
+            _cpu_bf16_support = {
+                "native": bool(isa) and mkldnn,
+                "isa": isa,
+                "mkldnn": mkldnn,
+            }
+            if _cpu_bf16_support["native"]:
+                logger.info(f"CPU 原生支持 bf16 推理: {', '.join(isa)}")
+            else:
+                logger.info("CPU 不支持原生 bf16 指令（AMX-BF16/AVX512-BF16），bf16 模型将回退到 fp32")
+    return dict(_cpu_bf16_support)
+
+
+def _bf16_unsupported_reason(device: str) -> Optional[str]:
+    """返回设备不能高效运行 bf16 的原因，支持时返回None"""
+    if str(device).startswith("cuda"):
+        if torch.cuda.is_available() and torch.cuda.is_bf16_supported():
+            return None
+        return "GPU 不支持 bf16"
+    support = detect_cpu_bf16_support()
+    if not support["mkldnn"]:
+        return "PyTorch 未启用 oneDNN(mkldnn)"
+    if not support["native"]:
+        return "CPU 无 AMX-BF16/AVX512-BF16 指令，bf16 将被软件模拟"
+    return None
+
+
+class _PrecisionStats:
+    """各模型实际生效的推理精度"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._models: Dict[str, dict] = {}
+
+    def record(self, name: str, report: dict) -> None:
+        with self._lock:
+            self._models[name] = report
+
+    def discard(self, name: str) -> None:
+        with self._lock:
+            self._models.pop(name, None)
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            models = {name: dict(report) for name, report in self._models.items()}
+        return {"cpu_bf16": detect_cpu_bf16_support(), "models": models}
+
+
+_stats = _PrecisionStats()
+
+
+def _autocast_inference(inference, device_type: str):
+    """在 bf16 autocast 上下文中执行模型的 inference"""
+
+    @functools.wraps(inference)
+    def wrapper(*args, **kwargs):
+        with torch.autocast(device_type=device_type, dtype=torch.bfloat16):
+            return inference(*args, **kwargs)
+
+    return wrapper
+
+
+def apply_precision(
+    auto_model: Any,
+    precision: Optional[str],
+    device: str,
+    name: str,
+    quantize: Optional[str] = None,
+) -> str:
+    """按配置设置 AutoModel 的推理精度，返回实际生效的精度
+
+    AutoModel.generate 以及共享 .model 的临时包装器最终都调用 model.inference，
+    因此在模型实例上包装 inference 即可覆盖离线、VAD 分段和流式识别。
+
+    Args:
+        auto_model: FunASR AutoModel 实例
+        precision: 配置的精度（fp32 / bf16）
+        device: 模型所在设备
+        name: 模型名称（用于日志和统计）
+        quantize: 模型的量化模式，已量化时不启用 bf16
+    """
+    requested = normalize_precision(precision)
+    report = {"requested": requested, "effective": PRECISION_FP32}
+
+    if requested == PRECISION_BF16 and auto_model is not None:
+        if normalize_quantize_mode(quantize) != QUANTIZE_NONE:
+            reason = "已启用 int8 动态量化"
+        else:
+            reason = _bf16_unsupported_reason(device)
+
+        if reason:
+            report["reason"] = reason
+            logger.warning(f"模型 {name} 配置了 bf16 推理，但{reason}，使用 fp32")
+        else:
+            model = auto_model.model
+            device_type = "cuda" if str(device).startswith("cuda") else "cpu"
+            model.inference = _autocast_inference(model.inference, device_type)
+            report["effective"] = PRECISION_BF16
+            logger.info(f"模型 {name} 已启用 bf16 autocast 推理（{device_type}）")
+
+    _stats.record(name, report)
+    return report["effective"]
+
+
+def forget_precision(name: str) -> None:
+    """模型卸载后移除其精度记录"""
+    _stats.discard(name)
+
+
+def get_precision_stats() -> dict:
+    """推理精度统计：CPU bf16 能力与各模型实际生效的精度"""
+    return _stats.snapshot()
@@ -0,0 +1,139 @@
+# -*- coding: utf-8 -*-
+"""
+CPU 动态量化
+
+对 PyTorch 模型的 Linear/LSTM 层执行 int8 动态量化（torch.quantization.quantize_dynamic）：
+权重离线量化为 int8，激活在推理时按批动态量化，无需校准数据。
+Paraformer、CT-Transformer 的计算量主要在 Linear 层，量化后内存约降为 1/4，CPU 推理更快，
+准确率损失需按模型用 scripts/benchmark/engine_compare.py 评估后再启用。
+
+1. models.json 中按模型配置 "quantize": "int8-dynamic"，VAD/标点模型使用
+   VAD_MODEL_QUANTIZE / PUNC_MODEL_QUANTIZE
+2. 仅在CPU上生效，GPU设备忽略并记录警告
+3. 每个模型量化前后的参数内存、节省量和耗时记录在统计中，在健康检查的 quantization 字段展示
+"""
+
+import logging
+import threading
+import time
+from typing import Any, Dict, Optional
+
+import torch
+
+logger = logging.getLogger(__name__)
+
+QUANTIZE_NONE = "none"
+QUANTIZE_INT8_DYNAMIC = "int8-dynamic"
+QUANTIZE_MODES = (QUANTIZE_NONE, QUANTIZE_INT8_DYNAMIC)
+
+# 动态量化的层类型
+_DYNAMIC_QUANT_LAYERS = {torch.nn.Linear, torch.nn.LSTM}
+
+
+def normalize_quantize_mode(mode: Optional[str]) -> str:
+    """规范化量化模式，未配置时为 none"""
+    mode = (mode or QUANTIZE_NONE).strip().lower()
+    if mode not in QUANTIZE_MODES:
+        raise ValueError(f"不支持的量化模式: {mode}，支持: {', '.join(QUANTIZE_MODES)}")
+    return mode
+
+
+def _state_size_bytes(value) -> int:
+    if isinstance(value, torch.Tensor):
+        return value.numel() * value.element_size()
+    if isinstance(value, (list, tuple)):
+        return sum(_state_size_bytes(item) for item in value)
+    return 0
+
+
+def module_size_mb(module: torch.nn.Module) -> float:
+    """模块参数与缓冲区占用的内存（MB），包含量化层的打包权重"""
+    return sum(_state_size_bytes(v) for v in module.state_dict().values()) / 1024**2
+
+
+def _count_quantized_layers(module: torch.nn.Module) -> int:
+    from torch.ao.nn.quantized import dynamic as nnqd
+
+    return sum(1 for layer in module.modules() if isinstance(layer, (nnqd.Linear, nnqd.LSTM)))
+
+
+class _QuantizationStats:
+    """各模型的量化结果"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._models: Dict[str, dict] = {}
+
+    def record(self, name: str, report: dict) -> None:
+        with self._lock:
+            self._models[name] = report
+
+    def discard(self, name: str) -> None:
+        with self._lock:
+            self._models.pop(name, None)
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            models = {name: dict(report) for name, report in self._models.items()}
+        return {
+            "models": models,
+            "saved_mb": round(sum((r.get("saved_mb", 0.0) for r in models.values()), 0.0), 1),
+        }
+
+
+_stats = _QuantizationStats()
+
+
+def apply_quantization(auto_model: Any, mode: Optional[str], device: str, name: str) -> Optional[dict]:
+    """按模式量化 AutoModel 的内部模型（原地替换），返回量化报告，未量化时返回None
+
+    Args:
+        auto_model: FunASR AutoModel 实例（量化其 .model）
+        mode: 量化模式（none / int8-dynamic）
+        device: 模型所在设备
+        name: 模型名称（用于日志和统计）
+    """
+    mode = normalize_quantize_mode(mode)
+    if mode == QUANTIZE_NONE or auto_model is None:
+        return None
+    if not str(device).startswith("cpu"):
+        logger.warning(f"模型 {name} 配置了 {mode} 量化，但设备为 {device}，动态量化仅支持CPU，已忽略")
+        return None
+
+    model = auto_model.model
+    start = time.perf_counter()
+    fp32_mb = module_size_mb(model)
+    try:
+        quantized = torch.quantization.quantize_dynamic(
+            model, _DYNAMIC_QUANT_LAYERS, dtype=torch.qint8, inplace=True
+        )
+    except Exception as e:
+        logger.error(f"模型 {name} 动态量化失败，使用fp32模型: {e}")
+        return None
+    auto_model.model = quantized
+
+    quantized_mb = module_size_mb(quantized)
+    report = {
+        "mode": mode,
+        "fp32_mb": round(fp32_mb, 1),
+        "quantized_mb": round(quantized_mb, 1),
+        "saved_mb": round(fp32_mb - quantized_mb, 1),
+        "quantized_layers": _count_quantized_layers(quantized),
+        "seconds": round(time.perf_counter() - start, 2),
+    }
+    _stats.record(name, report)
+    logger.info(
+        f"模型 {name} 已应用 {mode} 量化: {report['fp32_mb']}MB -> {report['quantized_mb']}MB "
+        f"(节省 {report['saved_mb']}MB, {report['quantized_layers']} 层, 耗时 {report['seconds']}s)"
+    )
+    return report
+
+
+def forget_quantization(name: str) -> None:
+    """模型卸载后移除其量化统计"""
+    _stats.discard(name)
+
+
+def get_quantization_stats() -> dict:
+    """量化统计：各模型量化前后内存与节省量"""
+    return _stats.snapshot()
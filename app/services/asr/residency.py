@@ -0,0 +1,118 @@
+# -*- coding: utf-8 -*-
+"""
+模型常驻内存管理
+
+ModelManager 按 MODEL_MEMORY_BUDGET_MB 限制已加载ASR引擎占用的内存：
+
+1. 每个引擎加载时记录占用：模型参数与缓冲区字节数，以及加载前后进程常驻内存（RSS）的增量
+   （并发加载时 RSS 增量不可靠，只使用参数字节数），以两者中的较大值作为该引擎的占用
+2. 加载新模型前，若已用内存加上新模型的预估占用超出预算，按最近最少使用（LRU）顺序卸载未固定的引擎；
+   新模型的预估占用取其上次加载时的实测值，首次加载时按模型目录中的权重文件大小估算
+3. 被卸载的模型再次被请求时透明地重新加载（同一模型的并发请求只加载一次）
+4. 默认模型与 MODEL_PINNED_MODELS 中的模型固定常驻；funasr / funasr-onnx 引擎全部卸载后，
+   对应的全局VAD/标点模型随之释放（ONNX 辅助模型按模型文件大小计入已用内存）
+
+常驻状态、占用、淘汰与重新加载次数在健康检查的 residency 字段展示。
+"""
+
+import os
+import threading
+import time
+from collections import deque
+from typing import Any, Iterable, Optional
+
+import torch
+
+# 计入预估占用的权重文件后缀
+_WEIGHT_SUFFIXES = (".pt", ".pth", ".bin", ".onnx", ".safetensors")
+
+# 保留的最近淘汰记录数
+_EVICTION_HISTORY = 20
+
+
+def process_rss_bytes() -> int:
+    """当前进程常驻内存（字节），无法读取时返回0"""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError):
+        return 0
+
+
+def auto_model_bytes(auto_model: Any) -> int:
+    """AutoModel 中模型参数与缓冲区的字节数（共享的张量只计一次）"""
+    module = getattr(auto_model, "model", None)
+    if not isinstance(module, torch.nn.Module):
+        return 0
+    seen = set()
+    total = 0
+    for tensor in list(module.parameters()) + list(module.buffers()):
+        if id(tensor) not in seen:
+            seen.add(id(tensor))
+            total += tensor.numel() * tensor.element_size()
+    return total
+
+
+def engine_param_bytes(engine: Any) -> int:
+    """引擎中离线/实时模型的参数字节数（ONNX 引擎为0，以 RSS 增量为准）"""
+    return sum(
+        auto_model_bytes(getattr(engine, attr, None))
+        for attr in ("offline_model", "realtime_model")
+    )
+
+
+def estimate_model_bytes(model_dirs: Iterable[Optional[str]]) -> int:
+    """按模型目录中权重文件的大小估算加载后的占用"""
+    total = 0
+    for model_dir in model_dirs:
+        if not model_dir or not os.path.isdir(model_dir):
+            continue
+        for entry in os.scandir(model_dir):
+            if entry.is_file() and entry.name.endswith(_WEIGHT_SUFFIXES):
+                total += entry.stat().st_size
+    return total
+
+
+def to_mb(value: int) -> float:
+    return round(value / 1024**2, 1)
+
+
+class ResidencyStats:
+    """加载、重新加载与淘汰计数"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.loads = 0
+        self.reloads = 0
+        self.evictions = 0
+        self.evicted_bytes = 0
+        self.history: deque = deque(maxlen=_EVICTION_HISTORY)
+
+    def record_load(self, reload: bool) -> None:
+        with self._lock:
+            self.loads += 1
+            if reload:
+                self.reloads += 1
+
+    def record_eviction(self, model_id: str, footprint: int, reason: str) -> None:
+        with self._lock:
+            self.evictions += 1
+            self.evicted_bytes += footprint
+            self.history.append(
+                {
+                    "model_id": model_id,
+                    "footprint_mb": to_mb(footprint),
+                    "reason": reason,
+                    "time": time.strftime("%Y-%m-%d %H:%M:%S"),
+                }
+            )
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {
+                "loads": self.loads,
+                "reloads": self.reloads,
+                "evictions": self.evictions,
+                "evicted_mb": to_mb(self.evicted_bytes),
+                "recent_evictions": list(self.history),
+            }
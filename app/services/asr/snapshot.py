@@ -0,0 +1,302 @@
+# -*- coding: utf-8 -*-
+"""
+模型快照（冷启动加速）
+
+AutoModel(model=..., device=...) 每次启动都要解析 config.yaml、重建分词器和前端、
+用 torch.load 完整读入并复制 .pt 权重。启用快照后，模型首次加载完成时写出一份可直接使用的快照：
+
+1. skeleton.pkl：pickle 的 AutoModel 对象（配置、分词器、前端、模型结构），其中所有张量
+   以引用形式记录，不写入 pickle
+2. weights.safetensors：上述张量，后续启动以 mmap 方式读取，CPU 上基本无拷贝
+3. meta.json：快照来源、版本与大小
+
+快照按模型目录文件（名称/大小/修改时间）、加载参数、设备以及 funasr/torch 版本生成键，
+任一变化都会生成新快照；读取失败时回退到 AutoModel 并重新写出。快照在量化/精度/编译之前写出，
+读取后同样再应用这些配置。skeleton.pkl 为 pickle 格式，快照目录必须只对服务自身可写。
+
+由 MODEL_SNAPSHOT_ENABLED 开启（默认关闭），目录为 MODEL_SNAPSHOT_DIR（默认 DATA_DIR/model_snapshots）。
+各模型的加载来源与耗时在健康检查的 snapshot 字段展示。
+"""
+
+import hashlib
+import json
+import logging
+import os
+import pickle
+import re
+import shutil
+import threading
+import time
+from typing import Any, Dict
+
+import torch
+
+from ...core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# 快照格式版本，格式变化时递增使旧快照失效
+_FORMAT_VERSION = 1
+
+SOURCE_AUTOMODEL = "automodel"
+SOURCE_SNAPSHOT = "snapshot"
+
+_SKELETON_FILE = "skeleton.pkl"
+_WEIGHTS_FILE = "weights.safetensors"
+_META_FILE = "meta.json"
+
+
+def get_snapshot_dir() -> str:
+    """快照目录，默认为 DATA_DIR/model_snapshots"""
+    return settings.MODEL_SNAPSHOT_DIR or os.path.join(settings.DATA_DIR, "model_snapshots")
+
+
+def _dir_fingerprint(path: str) -> list:
+    """模型目录顶层文件的 (名称, 大小, 修改时间)，用于判断模型文件是否变化"""
+    if not os.path.isdir(path):
+        return [path]
+    entries = []
+    for entry in sorted(os.scandir(path), key=lambda e: e.name):
+        if entry.is_file():
+            stat = entry.stat()
+            entries.append([entry.name, stat.st_size, stat.st_mtime_ns])
+    return entries
+
+
+def _snapshot_key(model_kwargs: Dict[str, Any]) -> str:
+    import funasr
+
+    payload = {
+        "format": _FORMAT_VERSION,
+        "funasr": getattr(funasr, "__version__", ""),
+        "torch": torch.__version__,
+        "kwargs": model_kwargs,
+        "model_files": _dir_fingerprint(str(model_kwargs.get("model", ""))),
+    }
+    if model_kwargs.get("lm_model"):
+        payload["lm_files"] = _dir_fingerprint(str(model_kwargs["lm_model"]))
+    data = json.dumps(payload, sort_keys=True, default=str)
+    return hashlib.sha256(data.encode("utf-8")).hexdigest()[:16]
+
+
+def _snapshot_slug(name: str) -> str:
+    return re.sub(r"[^0-9A-Za-z._-]+", "_", name).strip("_") or "model"
+
+
+def _snapshot_path(name: str, model_kwargs: Dict[str, Any]) -> str:
+    return os.path.join(get_snapshot_dir(), f"{_snapshot_slug(name)}-{_snapshot_key(model_kwargs)}")
+
+
+def _prune_stale_snapshots(name: str, current: str) -> None:
+    """删除同一模型的旧快照（模型文件或版本变化后不再命中）"""
+    prefix = f"{_snapshot_slug(name)}-"
+    root = get_snapshot_dir()
+    for entry in os.listdir(root):
+        path = os.path.join(root, entry)
+        key = entry[len(prefix):]
+        if (
+            entry.startswith(prefix)
+            and path != current
+            and re.fullmatch(r"[0-9a-f]{16}", key)
+            and os.path.isdir(path)
+        ):
+            shutil.rmtree(path, ignore_errors=True)
+            logger.info(f"已删除模型 {name} 的旧快照: {path}")
+
+
+class _SkeletonPickler(pickle.Pickler):
+    """pickle 对象结构，张量只记录引用，收集到 tensors 中单独保存"""
+
+    def __init__(self, file, tensors: Dict[str, torch.Tensor]):
+        super().__init__(file, protocol=pickle.HIGHEST_PROTOCOL)
+        self.tensors = tensors
+        self._names: Dict[int, str] = {}
+
+    def persistent_id(self, obj):
+        if not isinstance(obj, torch.Tensor):
+            return None
+        name = self._names.get(id(obj))
+        if name is None:
+            name = f"t{len(self._names)}"
+            self._names[id(obj)] = name
+            self.tensors[name] = obj
+        kind = "parameter" if isinstance(obj, torch.nn.Parameter) else "tensor"
+        return (kind, name, bool(obj.requires_grad))
+
+
+class _SkeletonUnpickler(pickle.Unpickler):
+    """还原对象结构，张量引用替换为 safetensors 中 mmap 读取的张量"""
+
+    def __init__(self, file, weights: Dict[str, torch.Tensor]):
+        super().__init__(file)
+        self.weights = weights
+        self._restored: Dict[str, torch.Tensor] = {}
+
+    def persistent_load(self, pid):
+        kind, name, requires_grad = pid
+        # 同一张量（如共享权重）的多处引用还原为同一对象
+        if name not in self._restored:
+            tensor = self.weights[name]
+            if kind == "parameter":
+                tensor = torch.nn.Parameter(tensor, requires_grad=requires_grad)
+            elif requires_grad:
+                tensor.requires_grad_(True)
+            self._restored[name] = tensor
+        return self._restored[name]
+
+
+def _prepare_tensors(tensors: Dict[str, torch.Tensor]) -> Dict[str, torch.Tensor]:
+    """转为 safetensors 可保存的连续CPU张量，共享存储的张量复制一份"""
+    prepared = {}
+    storages = set()
+    for name, tensor in tensors.items():
+        tensor = tensor.detach().cpu().contiguous()
+        storage = (tensor.untyped_storage().data_ptr(), tensor.untyped_storage().nbytes())
+        if storage in storages or tensor.storage_offset() or tensor.nbytes != storage[1]:
+            tensor = tensor.clone()
+        else:
+            storages.add(storage)
+        prepared[name] = tensor
+    return prepared
+
+
+def write_snapshot(auto_model: Any, path: str, name: str) -> float:
+    """写出模型快照，返回快照大小（MB）。先写入临时目录再原子重命名，多进程同时写出时保留先完成的一份"""
+    from safetensors.torch import save_file
+
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    temp_path = f"{path}.tmp-{os.getpid()}-{threading.get_ident()}"
+    os.makedirs(temp_path, exist_ok=True)
+    try:
+        tensors: Dict[str, torch.Tensor] = {}
+        with open(os.path.join(temp_path, _SKELETON_FILE), "wb") as f:
+            _SkeletonPickler(f, tensors).dump(auto_model)
+        save_file(_prepare_tensors(tensors), os.path.join(temp_path, _WEIGHTS_FILE))
+
+        size_mb = sum(
+            os.path.getsize(os.path.join(temp_path, file))
+            for file in (_SKELETON_FILE, _WEIGHTS_FILE)
+        ) / 1024**2
+        meta = {
+            "name": name,
+            "format": _FORMAT_VERSION,
+            "torch": torch.__version__,
+            "tensors": len(tensors),
+            "size_mb": round(size_mb, 1),
+            "created_at": time.strftime("%Y-%m-%d %H:%M:%S"),
+        }
+        with open(os.path.join(temp_path, _META_FILE), "w", encoding="utf-8") as f:
+            json.dump(meta, f, ensure_ascii=False, indent=2)
+
+        try:
+            os.rename(temp_path, path)
+        except OSError:
+            if not os.path.isdir(path):
+                raise
+        return size_mb
+    finally:
+        shutil.rmtree(temp_path, ignore_errors=True)
+
+
+def read_snapshot(path: str, device: str) -> Any:
+    """读取模型快照：权重以 mmap 方式加载到目标设备，再还原 AutoModel"""
+    from safetensors.torch import load_file
+
+    weights = load_file(os.path.join(path, _WEIGHTS_FILE), device=str(device))
+    with open(os.path.join(path, _SKELETON_FILE), "rb") as f:
+        return _SkeletonUnpickler(f, weights).load()
+
+
+class _SnapshotStats:
+    """各模型的加载来源（快照 / AutoModel）、耗时与快照写出情况"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._models: Dict[str, dict] = {}
+
+    def record(self, name: str, report: dict) -> None:
+        with self._lock:
+            self._models[name] = report
+
+    def discard(self, name: str) -> None:
+        with self._lock:
+            self._models.pop(name, None)
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            models = {name: dict(report) for name, report in self._models.items()}
+        return {
+            "enabled": settings.MODEL_SNAPSHOT_ENABLED,
+            "dir": get_snapshot_dir(),
+            "models": models,
+        }
+
+
+_stats = _SnapshotStats()
+
+
+def load_auto_model(model_kwargs: Dict[str, Any], name: str) -> Any:
+    """创建 AutoModel，启用快照时优先从快照读取，首次加载后写出快照
+
+    Args:
+        model_kwargs: AutoModel 的参数（model、device 等）
+        name: 模型名称（用于日志、统计和快照目录名）
+    """
+    from funasr import AutoModel
+
+    if not settings.MODEL_SNAPSHOT_ENABLED:
+        start = time.perf_counter()
+        auto_model = AutoModel(**model_kwargs)
+        _stats.record(
+            name,
+            {"source": SOURCE_AUTOMODEL, "load_seconds": round(time.perf_counter() - start, 3)},
+        )
+        return auto_model
+
+    path = _snapshot_path(name, model_kwargs)
+    report: Dict[str, Any] = {"path": path}
+
+    if os.path.isdir(path):
+        from .engine import detect_device
+
+        start = time.perf_counter()
+        try:
+            auto_model = read_snapshot(path, detect_device(model_kwargs.get("device", "cpu")))
+            report.update(source=SOURCE_SNAPSHOT, load_seconds=round(time.perf_counter() - start, 3))
+            _stats.record(name, report)
+            logger.info(f"模型 {name} 已从快照加载: {report['load_seconds']:.2f}s")
+            return auto_model
+        except Exception as e:
+            logger.warning(f"模型 {name} 快照读取失败，回退到 AutoModel 并重新生成: {e}")
+            report["error"] = str(e)
+            shutil.rmtree(path, ignore_errors=True)
+
+    start = time.perf_counter()
+    auto_model = AutoModel(**model_kwargs)
+    report.update(source=SOURCE_AUTOMODEL, load_seconds=round(time.perf_counter() - start, 3))
+
+    start = time.perf_counter()
+    try:
+        report["snapshot_mb"] = round(write_snapshot(auto_model, path, name), 1)
+        report["write_seconds"] = round(time.perf_counter() - start, 3)
+        _prune_stale_snapshots(name, path)
+        logger.info(
+            f"模型 {name} 快照已写出: {report['snapshot_mb']:.1f}MB, 耗时 {report['write_seconds']:.2f}s"
+        )
+    except Exception as e:
+        # 无法序列化的模型（如部分远程代码模型）每次都走 AutoModel
+        report["error"] = f"快照写出失败: {e}"
+        logger.warning(f"模型 {name} 快照写出失败，下次启动仍使用 AutoModel 加载: {e}")
+
+    _stats.record(name, report)
+    return auto_model
+
+
+def forget_snapshot(name: str) -> None:
+    """模型卸载后移除其加载记录（快照文件保留）"""
+    _stats.discard(name)
+
+
+def get_snapshot_stats() -> dict:
+    """模型快照统计：是否启用、快照目录与各模型的加载来源、耗时"""
+    return _stats.snapshot()
@@ -0,0 +1,215 @@
+# -*- coding: utf-8 -*-
+"""
+引擎层流式识别会话
+
+StreamingSession 封装在线 Paraformer 单路流式识别的全部模型侧状态与操作，
+与传输协议无关，WebSocket 协议处理、其他传输方式以及基准测试都可直接使用：
+
+1. 显式状态：模型缓存 cache、实时标点缓存 punc_cache、不足一个chunk的音频缓冲区 buffer
+2. feed(audio) 追加16kHz音频并推理所有完整chunk；也可用 push/pop_chunk/decode 逐chunk控制
+   （协议层需要在chunk之间做远场过滤、调度和断句）
+3. flush() 以 is_final=True 刷新模型缓存并返回剩余文本，随后重置缓存开始下一句
+4. reset() 丢弃模型缓存（及缓冲区），chunk 步长只能在缓存为空时切换
+5. 可序列化：pickle 时不包含模型引用，恢复后通过 attach() 重新绑定模型
+
+decode/feed/flush 是同步调用，异步调用方应放入线程池（或流式调度器）执行。
+"""
+
+import logging
+from typing import Dict, List, Optional
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# 在线模型输入采样率
+MODEL_SAMPLE_RATE = 16000
+
+# 流式chunk步长档位：步长(ms) -> chunk_size，单位为60ms帧 [0, 步长, 前瞻]
+STREAM_CHUNK_PROFILES = {
+    240: [0, 4, 5],
+    480: [0, 8, 4],
+    600: [0, 10, 5],
+}
+
+# 静音判定的最大振幅阈值，与 chunk 时长下限（短chunk不做判定，避免增加断句延迟）
+SILENCE_MAX_AMPLITUDE = 0.002
+SILENCE_MIN_CHUNK_MS = 400
+
+
+def is_silence_chunk(audio: np.ndarray, max_amplitude: float = SILENCE_MAX_AMPLITUDE) -> bool:
+    """最大振幅低于阈值时视为静音"""
+    if len(audio) == 0:
+        return True
+    return float(np.max(np.abs(audio))) < max_amplitude
+
+
+class StreamingResult:
+    """单次流式推理的结果"""
+
+    __slots__ = ("text", "text_raw", "is_silence", "audio_ms")
+
+    def __init__(self, text: str = "", text_raw: str = "", is_silence: bool = False, audio_ms: int = 0):
+        self.text = text  # 展示文本（启用实时标点时带句内标点）
+        self.text_raw = text_raw  # 模型原始文本（无标点），用于句末标点恢复
+        self.is_silence = is_silence
+        self.audio_ms = audio_ms
+
+    def __repr__(self) -> str:
+        return (
+            f"StreamingResult(text={self.text!r}, is_silence={self.is_silence}, "
+            f"audio_ms={self.audio_ms})"
+        )
+
+
+class StreamingSession:
+    """在线模型的单路流式识别会话"""
+
+    __slots__ = (
+        "model",
+        "punc_model",
+        "chunk_stride_ms",
+        "encoder_chunk_look_back",
+        "decoder_chunk_look_back",
+        "cache",
+        "punc_cache",
+        "buffer",
+    )
+
+    def __init__(
+        self,
+        model,
+        chunk_stride_ms: int = 240,
+        encoder_chunk_look_back: int = 4,
+        decoder_chunk_look_back: int = 1,
+        punc_model=None,
+    ):
+        if chunk_stride_ms not in STREAM_CHUNK_PROFILES:
+            raise ValueError(
+                f"不支持的chunk_stride_ms: {chunk_stride_ms}，"
+                f"支持: {', '.join(map(str, STREAM_CHUNK_PROFILES))}"
+            )
+        self.model = model
+        self.punc_model = punc_model  # 实时标点模型，为None时不添加句内标点
+        self.chunk_stride_ms = chunk_stride_ms
+        self.encoder_chunk_look_back = encoder_chunk_look_back
+        self.decoder_chunk_look_back = decoder_chunk_look_back
+        self.cache: Dict = {}
+        self.punc_cache: Dict = {}
+        self.buffer = np.zeros(0, dtype=np.float32)
+
+    def __getstate__(self) -> dict:
+        state = {name: getattr(self, name) for name in self.__slots__}
+        # 模型不随会话序列化，恢复后由 attach() 重新绑定
+        state["model"] = None
+        state["punc_model"] = None
+        return state
+
+    def __setstate__(self, state: dict) -> None:
+        for name in self.__slots__:
+            setattr(self, name, state.get(name))
+
+    def attach(self, model, punc_model=None) -> None:
+        """绑定（或重新绑定）模型"""
+        self.model = model
+        self.punc_model = punc_model
+
+    @property
+    def chunk_samples(self) -> int:
+        """一个chunk的16kHz样本数，如 240ms = 3840"""
+        return self.chunk_stride_ms * MODEL_SAMPLE_RATE // 1000
+
+    @property
+    def buffered_ms(self) -> int:
+        """缓冲区中尚未推理的音频时长"""
+        return len(self.buffer) * 1000 // MODEL_SAMPLE_RATE
+
+    def set_chunk_stride(self, chunk_stride_ms: int) -> None:
+        """切换chunk步长，模型缓存按旧chunk大小建立，切换时丢弃
+
+        句子进行中切换会丢失上下文，调用方应只在句子间隙切换
+        """
+        if chunk_stride_ms not in STREAM_CHUNK_PROFILES:
+            raise ValueError(f"不支持的chunk_stride_ms: {chunk_stride_ms}")
+        if chunk_stride_ms != self.chunk_stride_ms:
+            self.chunk_stride_ms = chunk_stride_ms
+            self.cache = {}
+
+    def push(self, audio: np.ndarray) -> None:
+        """追加16kHz float32音频到缓冲区"""
+        if len(audio):
+            self.buffer = np.concatenate([self.buffer, np.asarray(audio, dtype=np.float32)])
+
+    def pop_chunk(self) -> Optional[np.ndarray]:
+        """取出一个完整chunk，缓冲区不足时返回None"""
+        chunk_samples = self.chunk_samples
+        if len(self.buffer) < chunk_samples:
+            return None
+        chunk = self.buffer[:chunk_samples]
+        self.buffer = self.buffer[chunk_samples:]
+        return chunk
+
+    def decode(self, chunk: np.ndarray, is_final: bool = False) -> StreamingResult:
+        """推理一个chunk（is_final=True时刷新模型缓存中的剩余内容）"""
+        if self.model is None:
+            raise RuntimeError("流式会话未绑定模型")
+
+        chunk = np.asarray(chunk, dtype=np.float32)
+        audio_ms = len(chunk) * 1000 // MODEL_SAMPLE_RATE
+        is_silence = audio_ms >= SILENCE_MIN_CHUNK_MS and is_silence_chunk(chunk)
+
+        # chunk_stride = chunk_size[1]，FunASR期望: samples = chunk_stride * 960
+        result = self.model.generate(
+            input=chunk,
+            cache=self.cache,
+            is_final=is_final,
+            chunk_size=STREAM_CHUNK_PROFILES[self.chunk_stride_ms],
+            encoder_chunk_look_back=self.encoder_chunk_look_back,
+            decoder_chunk_look_back=self.decoder_chunk_look_back,
+        )
+
+        text_raw = ""
+        if result and len(result) > 0:
+            text_raw = result[0].get("text", "").strip()
+
+        text = text_raw
+        if text_raw and self.punc_model is not None:
+            try:
+                punc_result = self.punc_model.generate(input=text_raw, cache=self.punc_cache)
+                if punc_result and len(punc_result) > 0:
+                    text = punc_result[0].get("text", text_raw).strip()
+            except Exception as e:
+                logger.warning(f"实时标点恢复失败: {e}")
+
+        return StreamingResult(text, text_raw, is_silence, audio_ms)
+
+    def feed(self, audio: np.ndarray) -> List[StreamingResult]:
+        """追加音频并推理所有完整chunk"""
+        self.push(audio)
+        results = []
+        while True:
+            chunk = self.pop_chunk()
+            if chunk is None:
+                return results
+            results.append(self.decode(chunk))
+
+    def flush(self, drain: bool = False) -> StreamingResult:
+        """刷新模型缓存并结束当前句子
+
+        Args:
+            drain: 是否把缓冲区中不足一个chunk的音频一并送入（流结束时使用）；
+                   为False时缓冲区保留给下一句
+        """
+        audio = np.zeros(0, dtype=np.float32)
+        if drain:
+            audio, self.buffer = self.buffer, np.zeros(0, dtype=np.float32)
+        result = self.decode(audio, is_final=True)
+        self.reset(clear_buffer=False)
+        return result
+
+    def reset(self, clear_buffer: bool = True) -> None:
+        """丢弃模型缓存（默认同时清空缓冲区）"""
+        self.cache = {}
+        self.punc_cache = {}
+        if clear_buffer:
+            self.buffer = np.zeros(0, dtype=np.float32)
@@ -0,0 +1,334 @@
+# -*- coding: utf-8 -*-
+"""
+模型预热
+
+preload_models 只加载权重，首批真实请求仍要承担分配器扩容、FunASR 内部的懒初始化、
+LM/ITN 的 FST 加载以及编译模式下各长度桶的编译，部署后会出现一段延迟尖峰。
+预热阶段在模型加载后用音频跑一遍完整链路：
+
+1. 离线：按 ASR_WARMUP_DURATIONS 的各个时长执行 VAD + ASR + 标点 + ITN，覆盖不同的输入长度桶
+   （VAD 未检出语音时直接对整段音频做 ASR，保证 ASR 的各长度都被执行到）
+2. 标点/ITN：对固定文本执行离线标点、实时标点和 ITN
+3. 流式：按 ASR_WARMUP_STREAM_STRIDES 的各个步长创建会话并送入音频
+
+预热音频优先使用 ASR_WARMUP_AUDIO，其次是模型目录自带的 example/asr_example.wav，
+都不存在时使用合成的类语音信号。各阶段耗时记录在日志和健康检查的 warmup 字段中，
+预热结束（成功或失败）后就绪状态才变为 true。
+
+运行期间新加载的模型可通过 warmup_model 单独预热（管理接口使用），只更新该模型的阶段记录，不影响就绪状态。
+"""
+
+import logging
+import os
+import tempfile
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+import soundfile as sf
+
+from ...core.config import settings
+from ...utils.text_processing import apply_itn_to_text
+from .engine import resolve_model_path
+from .streaming import MODEL_SAMPLE_RATE
+
+logger = logging.getLogger(__name__)
+
+WARMUP_PENDING = "pending"
+WARMUP_RUNNING = "running"
+WARMUP_DONE = "done"
+WARMUP_FAILED = "failed"
+WARMUP_SKIPPED = "skipped"
+
+# 标点/ITN 预热文本
+_WARMUP_TEXT = "今天是二零二五年一月一日天气不错我们下午三点在会议室讨论第二季度的计划"
+
+# 流式预热送入的音频时长（秒）
+_STREAM_WARMUP_SECONDS = 3.0
+
+
+def _parse_numbers(value: str, cast=float) -> List:
+    return [cast(v) for v in value.split(",") if v.strip()]
+
+
+class _WarmupState:
+    """预热进度与就绪状态"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.status = WARMUP_PENDING
+        self.audio_source: Optional[str] = None
+        self.stages: Dict[str, float] = {}
+        self.total_ms: Optional[float] = None
+        self.errors: Dict[str, str] = {}
+
+    def start(self, audio_source: str) -> None:
+        with self._lock:
+            self.status = WARMUP_RUNNING
+            self.audio_source = audio_source
+            self.stages = {}
+            self.errors = {}
+            self.total_ms = None
+
+    def record_stage(self, stage: str, elapsed_ms: float) -> None:
+        with self._lock:
+            self.stages[stage] = round(elapsed_ms, 1)
+
+    def record_error(self, stage: str, error: str) -> None:
+        with self._lock:
+            self.errors[stage] = error
+
+    def discard_model(self, model_id: str) -> None:
+        """移除指定模型的阶段记录"""
+        prefix = f"{model_id}/"
+        with self._lock:
+            self.stages = {k: v for k, v in self.stages.items() if not k.startswith(prefix)}
+            self.errors = {k: v for k, v in self.errors.items() if not k.startswith(prefix)}
+
+    def finish(self, status: str, total_ms: Optional[float] = None) -> None:
+        with self._lock:
+            self.status = status
+            if total_ms is not None:
+                self.total_ms = round(total_ms, 1)
+
+    @property
+    def ready(self) -> bool:
+        return self.status in (WARMUP_DONE, WARMUP_FAILED, WARMUP_SKIPPED)
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {
+                "status": self.status,
+                "ready": self.ready,
+                "audio_source": self.audio_source,
+                "total_ms": self.total_ms,
+                "stages": dict(self.stages),
+                "errors": dict(self.errors),
+            }
+
+
+_state = _WarmupState()
+
+
+def _read_audio(path: str) -> np.ndarray:
+    """读取音频为16kHz单声道float32"""
+    audio, sample_rate = sf.read(path, dtype="float32", always_2d=True)
+    audio = audio.mean(axis=1)
+    if sample_rate != MODEL_SAMPLE_RATE:
+        from math import gcd
+
+        from scipy.signal import resample_poly
+
+        g = gcd(MODEL_SAMPLE_RATE, sample_rate)
+        audio = resample_poly(audio, MODEL_SAMPLE_RATE // g, sample_rate // g).astype(np.float32)
+    return audio
+
+
+def _synthetic_speech(seconds: float) -> np.ndarray:
+    """合成类语音信号：基频缓慢变化的谐波，按音节节奏调幅，句间留短暂停顿"""
+    rng = np.random.default_rng(0)
+    t = np.arange(int(seconds * MODEL_SAMPLE_RATE)) / MODEL_SAMPLE_RATE
+    f0 = 160 + 40 * np.sin(2 * np.pi * 0.7 * t)
+    phase = 2 * np.pi * np.cumsum(f0) / MODEL_SAMPLE_RATE
+    voiced = sum(np.sin(k * phase) / k for k in range(1, 8))
+    syllables = np.clip(np.sin(2 * np.pi * 4 * t), 0, None)
+    pauses = (np.mod(t, 4.0) < 3.4).astype(np.float32)
+    audio = 0.3 * voiced * syllables * pauses + 0.005 * rng.standard_normal(len(t))
+    return audio.astype(np.float32)
+
+
+def _load_warmup_audio(engine: Any) -> tuple:
+    """返回 (音频, 来源说明)"""
+    candidates = []
+    if settings.ASR_WARMUP_AUDIO:
+        candidates.append(settings.ASR_WARMUP_AUDIO)
+    for model_path in (
+        getattr(engine, "offline_model_path", None),
+        getattr(engine, "realtime_model_path", None),
+    ):
+        if model_path:
+            model_dir = resolve_model_path(model_path)
+            candidates.append(os.path.join(model_dir, "example", "asr_example.wav"))
+
+    for path in candidates:
+        if os.path.isfile(path):
+            try:
+                return _read_audio(path), path
+            except Exception as e:
+                logger.warning(f"预热音频读取失败 {path}: {e}")
+    seconds = max(_parse_numbers(settings.ASR_WARMUP_DURATIONS) or [5.0])
+    return _synthetic_speech(seconds), "synthetic"
+
+
+def _fit_duration(audio: np.ndarray, seconds: float) -> np.ndarray:
+    """重复或截取音频到指定时长"""
+    samples = max(int(seconds * MODEL_SAMPLE_RATE), 1)
+    repeats = -(-samples // len(audio))
+    return np.tile(audio, repeats)[:samples]
+
+
+class _Stage:
+    """计时一个预热阶段，异常只记录不中断后续阶段"""
+
+    def __init__(self, name: str):
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        elapsed_ms = (time.perf_counter() - self.start) * 1000
+        if exc is not None:
+            _state.record_error(self.name, str(exc))
+            logger.warning(f"   ⚠️  预热 {self.name} 失败 ({elapsed_ms:.0f}ms): {exc}")
+        else:
+            _state.record_stage(self.name, elapsed_ms)
+            logger.info(f"   🔥 预热 {self.name}: {elapsed_ms:.0f}ms")
+        return True
+
+
+def _warmup_offline(model_id: str, engine: Any, audio: np.ndarray, temp_dir: str) -> None:
+    for seconds in _parse_numbers(settings.ASR_WARMUP_DURATIONS):
+        wav_path = os.path.join(temp_dir, f"warmup_{seconds:g}s.wav")
+        sf.write(wav_path, _fit_duration(audio, seconds), MODEL_SAMPLE_RATE, subtype="PCM_16")
+
+        result = None
+        with _Stage(f"{model_id}/offline/{seconds:g}s"):
+            result = engine.transcribe_file_with_vad(
+                audio_path=wav_path, enable_punctuation=True, enable_itn=True
+            )
+        if result is None or not result.segments:
+            # VAD 未检出语音（如合成音频），直接对整段做 ASR 以覆盖该长度
+            with _Stage(f"{model_id}/asr/{seconds:g}s"):
+                engine.transcribe_file(audio_path=wav_path, enable_vad=False)
+
+
+def _warmup_streaming(model_id: str, engine: Any, audio: np.ndarray) -> None:
+    stream_audio = _fit_duration(audio, _STREAM_WARMUP_SECONDS)
+    punc_model = None
+    if settings.ASR_ENABLE_REALTIME_PUNC:
+        try:
+            punc_model = engine.get_punc_model(realtime=True)
+        except Exception as e:
+            logger.warning(f"实时标点模型不可用，流式预热不含标点: {e}")
+
+    for stride_ms in _parse_numbers(settings.ASR_WARMUP_STREAM_STRIDES, int):
+        with _Stage(f"{model_id}/streaming/{stride_ms}ms"):
+            session = engine.create_streaming_session(
+                chunk_stride_ms=stride_ms, punc_model=punc_model
+            )
+            session.feed(stream_audio)
+            session.flush(drain=True)
+
+
+def _warmup_text(engine: Any) -> None:
+    with _Stage("punc"):
+        engine.get_punc_model().generate(input=_WARMUP_TEXT)
+    if settings.ASR_ENABLE_REALTIME_PUNC:
+        with _Stage("punc_realtime"):
+            engine.get_punc_model(realtime=True).generate(input=_WARMUP_TEXT, cache={})
+    with _Stage("itn"):
+        apply_itn_to_text(_WARMUP_TEXT)
+
+
+def _warmup_engine(model_id: str, engine: Any, audio: np.ndarray, temp_dir: str) -> None:
+    mode = settings.ASR_MODEL_MODE.lower()
+    if mode in ("all", "offline") and getattr(engine, "offline_model", None) is not None:
+        _warmup_offline(model_id, engine, audio, temp_dir)
+    if (
+        mode in ("all", "realtime")
+        and engine.supports_realtime
+        and getattr(engine, "realtime_model", None) is not None
+    ):
+        _warmup_streaming(model_id, engine, audio)
+
+
+def run_warmup(engines: Dict[str, Any]) -> dict:
+    """预热已加载的引擎，结束后标记就绪，返回预热统计
+
+    Args:
+        engines: {模型ID: 引擎实例}
+    """
+    if not settings.ASR_WARMUP_ENABLED or not engines:
+        _state.finish(WARMUP_SKIPPED)
+        logger.info("⏭️  跳过模型预热 (ASR_WARMUP_ENABLED=False 或没有已加载的模型)")
+        return get_warmup_stats()
+
+    start = time.perf_counter()
+    first_engine = next(iter(engines.values()))
+    try:
+        audio, source = _load_warmup_audio(first_engine)
+    except Exception as e:
+        logger.error(f"❌ 预热音频准备失败，跳过预热: {e}")
+        _state.record_error("audio", str(e))
+        _state.finish(WARMUP_FAILED)
+        return get_warmup_stats()
+
+    _state.start(source)
+    logger.info("=" * 60)
+    logger.info(f"🔥 开始预热模型（音频: {source}）...")
+
+    try:
+        with tempfile.TemporaryDirectory(prefix="warmup_", dir=settings.TEMP_DIR) as temp_dir:
+            for model_id, engine in engines.items():
+                _warmup_engine(model_id, engine, audio, temp_dir)
+            _warmup_text(first_engine)
+    except Exception as e:
+        # 预热失败不阻止服务就绪，只是首批请求仍会较慢
+        _state.record_error("warmup", str(e))
+        logger.error(f"❌ 模型预热中断: {e}")
+
+    total_ms = (time.perf_counter() - start) * 1000
+    stats = get_warmup_stats()
+    _state.finish(WARMUP_FAILED if stats["errors"] else WARMUP_DONE, total_ms)
+    logger.info(f"🔥 模型预热完成，总耗时 {total_ms / 1000:.1f}s，失败阶段 {len(stats['errors'])} 个")
+    logger.info("=" * 60)
+    return get_warmup_stats()
+
+
+def warmup_model(model_id: str, engine: Any) -> dict:
+    """预热单个已加载的引擎（运行期间加载的模型），不改变就绪状态
+
+    Returns:
+        该模型的预热结果：音频来源、总耗时与各阶段耗时（毫秒）、失败原因
+    """
+    start = time.perf_counter()
+    prefix = f"{model_id}/"
+    _state.discard_model(model_id)
+    source = None
+    try:
+        audio, source = _load_warmup_audio(engine)
+        logger.info(f"🔥 开始预热模型 {model_id}（音频: {source}）...")
+        with tempfile.TemporaryDirectory(prefix="warmup_", dir=settings.TEMP_DIR) as temp_dir:
+            _warmup_engine(model_id, engine, audio, temp_dir)
+    except Exception as e:
+        _state.record_error(f"{model_id}/warmup", str(e))
+        logger.error(f"❌ 模型 {model_id} 预热中断: {e}")
+
+    total_ms = (time.perf_counter() - start) * 1000
+    stats = get_warmup_stats()
+    logger.info(f"🔥 模型 {model_id} 预热完成，耗时 {total_ms / 1000:.1f}s")
+    return {
+        "audio_source": source,
+        "total_ms": round(total_ms, 1),
+        "stages": {k: v for k, v in stats["stages"].items() if k.startswith(prefix)},
+        "errors": {k: v for k, v in stats["errors"].items() if k.startswith(prefix)},
+    }
+
+
+def mark_warmup_skipped() -> None:
+    """当前进程未执行预加载（模型按需加载）时直接标记就绪"""
+    if _state.status == WARMUP_PENDING:
+        _state.finish(WARMUP_SKIPPED)
+
+
+def is_ready() -> bool:
+    """预热是否已结束（服务是否就绪）"""
+    return _state.ready
+
+
+def get_warmup_stats() -> dict:
+    """预热统计：状态、就绪标志、音频来源、各阶段耗时（毫秒）与失败原因"""
+    return _state.snapshot()
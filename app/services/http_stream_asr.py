@@ -0,0 +1,170 @@
+# -*- coding: utf-8 -*-
+"""
+HTTP 分块流式识别
+
+部分调用方位于不允许 WebSocket 升级的代理之后。本模块让客户端通过一个普通的
+HTTP/1.1 POST 请求完成实时识别：请求体以分块传输（chunked）持续上传音频，
+响应体在上传过程中持续返回识别结果。
+
+实现方式是把HTTP请求适配为 WebSocket 协议处理器使用的连接接口（receive/send_text），
+因此与 /ws/v1/asr 走完全相同的处理路径（流式会话、chunk调度、断句、两遍识别、会话数限制等）：
+
+1. 查询参数作为 StartTranscription 的 payload（format、sample_rate、latency_profile 等）
+2. 请求体的每个数据块作为一条二进制音频消息
+3. 请求体结束时自动发送 StopTranscription
+4. 服务端消息与 WebSocket 相同（阿里云协议JSON），以 NDJSON（每行一条）或 SSE（event为消息名）返回
+"""
+
+import asyncio
+import json
+import logging
+from typing import AsyncIterator, Dict, List, Optional
+
+from starlette.requests import ClientDisconnect
+from starlette.responses import StreamingResponse
+
+from ..models.websocket_asr import AliyunASRNamespace, AliyunASRMessageName
+
+logger = logging.getLogger(__name__)
+
+# 响应格式
+STREAM_OUTPUT_FORMATS = {
+    "ndjson": "application/x-ndjson",
+    "sse": "text/event-stream",
+}
+
+# 不作为 StartTranscription 参数的查询参数
+_RESERVED_QUERY_PARAMS = ("output", "appkey", "task_id")
+
+# 结果队列结束标记
+_END = None
+
+
+def _coerce_query_value(value: str):
+    """查询参数均为字符串，转换布尔值与整数后交给协议层校验"""
+    lowered = value.strip().lower()
+    if lowered in ("true", "false"):
+        return lowered == "true"
+    if lowered.lstrip("-").isdigit():
+        return int(lowered)
+    return value
+
+
+def build_start_payload(query_params: Dict[str, str]) -> dict:
+    """由查询参数构建 StartTranscription 的 payload"""
+    return {
+        key: _coerce_query_value(value)
+        for key, value in query_params.items()
+        if key not in _RESERVED_QUERY_PARAMS
+    }
+
+
+class HTTPStreamTransport:
+    """把分块上传的HTTP请求适配为WebSocket协议处理器使用的连接接口"""
+
+    def __init__(self, request, task_id: str, start_payload: dict):
+        self.headers = request.headers
+        self.task_id = task_id
+        self._body = request.stream().__aiter__()
+        self._pending: List[dict] = [
+            self._control_message(AliyunASRMessageName.START_TRANSCRIPTION, start_payload)
+        ]
+        self._body_finished = False
+        self.outbox: asyncio.Queue = asyncio.Queue()
+
+    def _control_message(self, name: str, payload: Optional[dict] = None) -> dict:
+        message = {
+            "header": {
+                "namespace": AliyunASRNamespace.SPEECH_TRANSCRIBER,
+                "name": name,
+                "task_id": self.task_id,
+            }
+        }
+        if payload is not None:
+            message["payload"] = payload
+        return {"type": "websocket.receive", "text": json.dumps(message, ensure_ascii=False)}
+
+    async def receive(self) -> dict:
+        if self._pending:
+            return self._pending.pop(0)
+        if self._body_finished:
+            return {"type": "websocket.disconnect"}
+
+        while True:
+            try:
+                chunk = await self._body.__anext__()
+            except StopAsyncIteration:
+                # 上传结束：结束识别，等待剩余结果
+                self._body_finished = True
+                return self._control_message(AliyunASRMessageName.STOP_TRANSCRIPTION)
+            except ClientDisconnect:
+                self._body_finished = True
+                return {"type": "websocket.disconnect"}
+            if chunk:
+                return {"type": "websocket.receive", "bytes": chunk}
+
+    async def send_text(self, text: str) -> None:
+        if (
+            AliyunASRMessageName.TASK_FAILED in text
+            and _message_name(text) == AliyunASRMessageName.TASK_FAILED
+        ):
+            # HTTP请求无法像WebSocket那样在失败后继续交互，停止读取请求体并结束响应
+            self._body_finished = True
+        await self.outbox.put(text)
+
+
+def _message_name(text: str) -> str:
+    try:
+        return json.loads(text)["header"]["name"]
+    except Exception:
+        return "message"
+
+
+def _format_event(text: str, output: str) -> str:
+    if output == "sse":
+        return f"event: {_message_name(text)}\ndata: {text}\n\n"
+    return text + "\n"
+
+
+async def stream_transcription(
+    service, request, task_id: str, start_payload: dict, output: str = "ndjson"
+) -> AsyncIterator[str]:
+    """运行协议处理器并逐条产出格式化后的服务端消息"""
+    transport = HTTPStreamTransport(request, task_id, start_payload)
+
+    async def run_session():
+        try:
+            await service._process_websocket_connection(transport, task_id)
+        finally:
+            await transport.outbox.put(_END)
+
+    session_task = asyncio.ensure_future(run_session())
+    try:
+        while True:
+            text = await transport.outbox.get()
+            if text is _END:
+                break
+            yield _format_event(text, output)
+    finally:
+        if not session_task.done():
+            # 客户端不再读取响应（连接断开），结束识别会话
+            logger.warning(f"[{task_id}] HTTP流式识别响应中断，结束会话")
+            session_task.cancel()
+            try:
+                await session_task
+            except BaseException:
+                pass
+
+
+class UploadStreamingResponse(StreamingResponse):
+    """请求体上传过程中同时返回响应的流式响应
+
+    StreamingResponse 在 ASGI spec < 2.4 时会并发调用 receive() 监听断开，
+    会与仍在读取的请求体争抢消息。这里只发送响应，断开由请求体读取（ClientDisconnect）
+    和响应发送失败感知
+    """
+
+    async def __call__(self, scope, receive, send) -> None:
+        await self.stream_response(send)
+        if self.background is not None:
+            await self.background()
@@ -0,0 +1,242 @@
+# -*- coding: utf-8 -*-
+"""
+句末后处理模块
+
+流式识别中每个句子结束时需要执行最终标点恢复（CT-Transformer离线标点模型）和ITN，
+这两步都是CPU密集的同步调用。本模块将同一时间窗口内所有会话结束的句子收集起来，
+合并为一次线程池任务批量处理：
+
+1. 事件循环中只做排队和结果分发，wetext FST 和标点模型推理都在线程池中执行
+2. 同一批次中使用同一标点模型的句子合并为一次 punc_model.generate 调用，节省的是线程池
+   调度与调用开销：CT-Transformer 在这次调用内仍逐条推理，并不是批量推理
+3. 每个句子对应一个 Future，调用方 await 自己的结果后再发送 SentenceEnd，
+   因此同一会话内的 SentenceEnd 顺序与句子结束顺序一致
+4. 批次任务保存在任务集合中（事件循环只持有任务的弱引用），应用关闭时取消并等待结束
+5. 标点模型获取函数随每个句子提交（由调用方从当前引擎获取），后处理器不绑定某个引擎
+"""
+
+import asyncio
+import logging
+from typing import Any, Callable, Dict, List, Optional, Set
+
+from ..core.config import settings
+from ..core.executor import run_sync
+from ..utils.text_processing import apply_itn_to_text
+
+logger = logging.getLogger(__name__)
+
+
+class _SentenceRequest:
+    """待处理的句子"""
+
+    __slots__ = (
+        "text",
+        "enable_punctuation",
+        "enable_itn",
+        "punc_model_loader",
+        "task_id",
+        "future",
+    )
+
+    def __init__(
+        self,
+        text: str,
+        enable_punctuation: bool,
+        enable_itn: bool,
+        punc_model_loader: Optional[Callable[[], Any]],
+        task_id: str,
+        future: asyncio.Future,
+    ):
+        self.text = text
+        self.enable_punctuation = enable_punctuation
+        self.enable_itn = enable_itn
+        self.punc_model_loader = punc_model_loader
+        self.task_id = task_id
+        self.future = future
+
+
+class SentencePostProcessor:
+    """跨会话批量执行句末标点恢复与ITN"""
+
+    def __init__(
+        self,
+        device: str,
+        batch_window_ms: int = 20,
+        max_batch_size: int = 16,
+    ):
+        self.device = device
+        self.batch_window = max(0, batch_window_ms) / 1000.0
+        self.max_batch_size = max(1, max_batch_size)
+        self._pending: List[_SentenceRequest] = []
+        self._flush_handle: Optional[asyncio.TimerHandle] = None
+        self._tasks: Set[asyncio.Task] = set()
+
+    async def process(
+        self,
+        text: str,
+        enable_punctuation: bool = True,
+        enable_itn: bool = True,
+        task_id: str = "",
+        punc_model_loader: Optional[Callable[[], Any]] = None,
+    ) -> str:
+        """提交一个句子，返回标点恢复和ITN后的文本
+
+        Args:
+            punc_model_loader: 标点模型获取函数（如引擎的 get_punc_model），
+                为None时使用全局PyTorch标点模型
+        """
+        if not text or not (enable_punctuation or enable_itn):
+            return text
+
+        loop = asyncio.get_running_loop()
+        request = _SentenceRequest(
+            text,
+            enable_punctuation,
+            enable_itn,
+            punc_model_loader,
+            task_id,
+            loop.create_future(),
+        )
+        self._pending.append(request)
+
+        if len(self._pending) >= self.max_batch_size:
+            self._flush()
+        elif self._flush_handle is None:
+            self._flush_handle = loop.call_later(self.batch_window, self._flush)
+
+        return await request.future
+
+    def _flush(self) -> None:
+        """将当前排队的句子作为一个批次提交"""
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+
+        if not self._pending:
+            return
+
+        batch = self._pending
+        self._pending = []
+        task = asyncio.ensure_future(self._run_batch(batch))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def shutdown(self) -> None:
+        """取消排队中的句子和进行中的批次（应用关闭时调用）"""
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        for request in self._pending:
+            request.future.cancel()
+        self._pending = []
+
+        tasks = list(self._tasks)
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    async def _run_batch(self, batch: List[_SentenceRequest]) -> None:
+        """在线程池中处理一个批次并分发结果"""
+        try:
+            results = await run_sync(self._process_batch, batch)
+        except asyncio.CancelledError:
+            for request in batch:
+                request.future.cancel()
+            raise
+        except Exception as e:
+            logger.warning(f"句末后处理批次失败({len(batch)}句)，返回原文本: {e}")
+            results = [request.text for request in batch]
+
+        for request, result in zip(batch, results):
+            if not request.future.done():
+                request.future.set_result(result)
+
+    def _process_batch(self, batch: List[_SentenceRequest]) -> List[str]:
+        """批量标点恢复 + ITN（在线程池中执行）"""
+        results = [request.text for request in batch]
+
+        # 按标点模型获取函数分组，各组使用提交时所属引擎的标点模型
+        punc_groups: Dict[Any, List[int]] = {}
+        for i, request in enumerate(batch):
+            if request.enable_punctuation:
+                punc_groups.setdefault(request.punc_model_loader, []).append(i)
+        for loader, indices in punc_groups.items():
+            punctuated = self._punctuate([results[i] for i in indices], loader)
+            for i, text in zip(indices, punctuated):
+                results[i] = text
+        punc_count = sum(len(indices) for indices in punc_groups.values())
+
+        for i, request in enumerate(batch):
+            if request.enable_itn and results[i]:
+                results[i] = apply_itn_to_text(results[i])
+
+        logger.debug(
+            f"句末后处理完成: {len(batch)}句, 其中标点恢复{punc_count}句"
+        )
+        return results
+
+    def _punctuate(
+        self, texts: List[str], punc_model_loader: Optional[Callable[[], Any]]
+    ) -> List[str]:
+        """使用离线标点模型对一组文本添加完整标点"""
+        from .asr.engine import get_global_punc_model
+
+        try:
+            if punc_model_loader is not None:
+                punc_model = punc_model_loader()
+            else:
+                punc_model = get_global_punc_model(self.device)
+        except Exception as e:
+            logger.warning(f"标点模型加载失败，返回原文本: {e}")
+            return texts
+
+        if punc_model is None:
+            logger.info("标点模型未加载，返回原文本")
+            return texts
+
+        try:
+            # CT-Transformer 按条推理，列表输入在一次 generate 调用内依次处理
+            result = punc_model.generate(input=texts, cache={})
+            if result and len(result) == len(texts):
+                return [
+                    r.get("text", text).strip() or text
+                    for r, text in zip(result, texts)
+                ]
+            logger.warning(
+                f"批量标点恢复结果数量不匹配({len(result or [])}/{len(texts)})，逐条重试"
+            )
+        except Exception as e:
+            logger.warning(f"批量标点恢复失败，逐条重试: {e}")
+
+        punctuated = []
+        for text in texts:
+            try:
+                result = punc_model.generate(input=text, cache={})
+                if result and len(result) > 0:
+                    text = result[0].get("text", text).strip() or text
+            except Exception as e:
+                logger.warning(f"标点恢复失败: {e}")
+            punctuated.append(text)
+        return punctuated
+
+
+# 全局后处理器实例
+_sentence_postprocessor: Optional[SentencePostProcessor] = None
+
+
+def get_sentence_postprocessor(device: str) -> SentencePostProcessor:
+    """获取全局句末后处理器实例"""
+    global _sentence_postprocessor
+    if _sentence_postprocessor is None:
+        _sentence_postprocessor = SentencePostProcessor(
+            device=device,
+            batch_window_ms=settings.ASR_SENTENCE_POSTPROCESS_BATCH_WINDOW_MS,
+            max_batch_size=settings.ASR_SENTENCE_POSTPROCESS_MAX_BATCH,
+        )
+    return _sentence_postprocessor
+
+
+async def shutdown_sentence_postprocessor() -> None:
+    """关闭全局句末后处理器，取消未完成的批次"""
+    if _sentence_postprocessor is not None:
+        await _sentence_postprocessor.shutdown()
@@ -0,0 +1,299 @@
+# -*- coding: utf-8 -*-
+"""
+流式识别chunk调度模块
+
+所有WebSocket会话的chunk推理原本直接提交到同一个FIFO线程池队列，先提交先执行。
+当推理槽位饱和时，快于实时上传的客户端（例如一次性推送60秒积压音频）会与实时会话
+平等竞争，实时会话的中间结果延迟随之上升。本模块在线程池之前增加一层按会话的调度：
+
+1. 每个会话一个待处理队列，同一会话同时最多只有一个chunk在推理
+2. 推理槽位空闲时，选择“领先实时量”最小的会话派发：
+   领先量 = 已推理音频时长 - 会话开始以来的墙钟时长
+   实时会话的领先量约为0，快于实时上传的会话领先量持续增大而被延后，
+   相同领先量时按上次派发顺序轮转
+3. 记录每个会话的chunk延迟（排队 + 推理），供健康检查展示
+4. 会话注册表同时用于并发会话数限制和会话状态内存统计（模型缓存 + 音频缓冲区）
+5. 记录每个会话已接收的音频时长，积压量 = 已接收音频时长 - 会话开始以来的墙钟时长，
+   客户端在socket中堆积的音频也随读取计入，供会话按 ASR_STREAM_MAX_BACKLOG_MS 限制
+6. 推理任务保存在集合中，关闭时取消并等待结束
+"""
+
+import asyncio
+import itertools
+import logging
+import time
+from collections import deque
+from typing import Any, Callable, Deque, Dict, List, Optional, Set
+
+import numpy as np
+
+from ..core.config import settings
+from ..core.executor import run_sync, get_max_workers
+
+logger = logging.getLogger(__name__)
+
+
+def estimate_state_bytes(obj: Any, _depth: int = 0) -> int:
+    """估算会话状态的数据内存（numpy数组与torch张量的元素字节数）
+
+    流式模型缓存是嵌套的dict/list，叶子为张量、数组或标量，这里递归累加张量与数组的大小，
+    不导入torch，按 element_size/nelement 识别张量
+    """
+    if _depth > 8 or obj is None:
+        return 0
+    if isinstance(obj, np.ndarray):
+        return int(obj.nbytes)
+    if hasattr(obj, "element_size") and hasattr(obj, "nelement"):
+        try:
+            return int(obj.element_size() * obj.nelement())
+        except Exception:
+            return 0
+    if isinstance(obj, dict):
+        return sum(estimate_state_bytes(v, _depth + 1) for v in obj.values())
+    if isinstance(obj, (list, tuple)):
+        return sum(estimate_state_bytes(v, _depth + 1) for v in obj)
+    return 0
+
+
+class _ChunkJob:
+    """待执行的chunk推理"""
+
+    __slots__ = ("func", "args", "kwargs", "audio_ms", "future", "submitted_at")
+
+    def __init__(self, func, args, kwargs, audio_ms: int, future: asyncio.Future):
+        self.func = func
+        self.args = args
+        self.kwargs = kwargs
+        self.audio_ms = audio_ms
+        self.future = future
+        self.submitted_at = time.monotonic()
+
+
+class StreamSession:
+    """调度器中的单个会话"""
+
+    __slots__ = (
+        "task_id",
+        "started_at",
+        "served_audio_ms",
+        "received_audio_ms",
+        "chunks",
+        "pending",
+        "in_flight",
+        "last_dispatch",
+        "latencies",
+        "state_bytes",
+        "idle_waiters",
+    )
+
+    def __init__(self, task_id: str, latency_window: int = 512):
+        self.task_id = task_id
+        self.started_at = time.monotonic()
+        self.served_audio_ms = 0
+        self.received_audio_ms = 0.0  # 已接收的16kHz音频时长，由会话在收到音频后累加
+        self.chunks = 0
+        self.pending: Deque[_ChunkJob] = deque()
+        self.in_flight = False
+        self.last_dispatch = 0
+        self.latencies: Deque[float] = deque(maxlen=latency_window)
+        self.state_bytes = 0  # 模型缓存 + 音频缓冲区，由会话在处理音频后更新
+        self.idle_waiters: List[asyncio.Future] = []  # 等待在途推理完成的调用方
+
+    def lead_ms(self, now: float) -> float:
+        """已推理音频领先墙钟的时长（毫秒），越大越应让出槽位"""
+        return self.served_audio_ms - (now - self.started_at) * 1000
+
+    def backlog_ms(self, now: float) -> float:
+        """已接收音频领先墙钟的时长（毫秒），即客户端快于实时发送的积压量"""
+        return self.received_audio_ms - (now - self.started_at) * 1000
+
+    def latency_stats(self) -> dict:
+        """最近chunk延迟统计（毫秒）"""
+        if not self.latencies:
+            return {"p50_ms": None, "p99_ms": None, "max_ms": None}
+        ordered = sorted(self.latencies)
+        return {
+            "p50_ms": round(ordered[len(ordered) // 2], 1),
+            "p99_ms": round(ordered[min(len(ordered) - 1, int(len(ordered) * 0.99))], 1),
+            "max_ms": round(ordered[-1], 1),
+        }
+
+
+class StreamChunkScheduler:
+    """按会话公平调度流式chunk推理"""
+
+    def __init__(self, max_concurrent: int, max_sessions: int = 0):
+        self.max_concurrent = max(1, max_concurrent)
+        self.max_sessions = max(0, max_sessions)
+        self._sessions: Dict[int, StreamSession] = {}
+        self._in_flight = 0
+        self._dispatch_seq = itertools.count(1)
+        self._tasks: Set[asyncio.Task] = set()
+        self._closed = False
+
+    @property
+    def session_count(self) -> int:
+        """当前注册的会话数"""
+        return len(self._sessions)
+
+    def is_full(self) -> bool:
+        """是否已达到并发会话上限"""
+        return 0 < self.max_sessions <= len(self._sessions)
+
+    def open_session(self, task_id: str) -> Optional[StreamSession]:
+        """注册会话（StartTranscription时调用），已达到并发会话上限时返回None
+
+        检查上限与登记之间没有await，并发的StartTranscription不会超出上限
+        """
+        if self.is_full():
+            return None
+        session = StreamSession(task_id)
+        self._sessions[id(session)] = session
+        return session
+
+    def close_session(self, session: StreamSession) -> None:
+        """注销会话并取消其排队中的chunk"""
+        self._sessions.pop(id(session), None)
+        while session.pending:
+            job = session.pending.popleft()
+            if not job.future.done():
+                job.future.cancel()
+
+    async def wait_idle(self, session: StreamSession) -> None:
+        """等待会话在途的chunk推理完成
+
+        线程池中的推理无法中断，保存会话快照前调用，避免快照与推理线程并发修改模型缓存
+        """
+        while session.in_flight:
+            waiter = asyncio.get_running_loop().create_future()
+            session.idle_waiters.append(waiter)
+            await waiter
+
+    async def run(
+        self, session: StreamSession, audio_ms: int, func: Callable, *args, **kwargs
+    ):
+        """提交一个chunk推理并等待结果
+
+        Args:
+            session: open_session 返回的会话
+            audio_ms: chunk音频时长，用于计算会话领先实时的程度
+        """
+        loop = asyncio.get_running_loop()
+        job = _ChunkJob(func, args, kwargs, audio_ms, loop.create_future())
+        session.pending.append(job)
+        self._dispatch()
+        return await job.future
+
+    def _dispatch(self) -> None:
+        while not self._closed and self._in_flight < self.max_concurrent:
+            session = self._pick_session()
+            if session is None:
+                return
+            job = session.pending.popleft()
+            if job.future.done():
+                # 等待方已取消（连接断开）
+                continue
+            session.in_flight = True
+            session.last_dispatch = next(self._dispatch_seq)
+            self._in_flight += 1
+            task = asyncio.ensure_future(self._execute(session, job))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    def _pick_session(self) -> Optional[StreamSession]:
+        now = time.monotonic()
+        best = None
+        best_key = None
+        for session in self._sessions.values():
+            if session.in_flight or not session.pending:
+                continue
+            key = (session.lead_ms(now), session.last_dispatch)
+            if best_key is None or key < best_key:
+                best, best_key = session, key
+        return best
+
+    async def _execute(self, session: StreamSession, job: _ChunkJob) -> None:
+        try:
+            result = await run_sync(job.func, *job.args, **job.kwargs)
+        except asyncio.CancelledError:
+            if not job.future.done():
+                job.future.cancel()
+            raise
+        except Exception as e:
+            if not job.future.done():
+                job.future.set_exception(e)
+        else:
+            if not job.future.done():
+                job.future.set_result(result)
+        finally:
+            session.in_flight = False
+            for waiter in session.idle_waiters:
+                if not waiter.done():
+                    waiter.set_result(None)
+            session.idle_waiters.clear()
+            session.served_audio_ms += job.audio_ms
+            session.chunks += 1
+            session.latencies.append((time.monotonic() - job.submitted_at) * 1000)
+            self._in_flight -= 1
+            self._dispatch()
+
+    async def shutdown(self) -> None:
+        """停止派发，取消排队中的chunk与进行中的推理任务并等待其结束"""
+        self._closed = True
+        for session in list(self._sessions.values()):
+            self.close_session(session)
+        tasks = list(self._tasks)
+        for task in tasks:
+            task.cancel()
+        if tasks:
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+    def get_stats(self) -> dict:
+        """调度器与各会话的运行统计"""
+        now = time.monotonic()
+        sessions: List[dict] = []
+        for session in self._sessions.values():
+            sessions.append(
+                {
+                    "task_id": session.task_id,
+                    "chunks": session.chunks,
+                    "queued": len(session.pending),
+                    "lead_ms": int(session.lead_ms(now)),
+                    "backlog_ms": int(session.backlog_ms(now)),
+                    "state_bytes": session.state_bytes,
+                    "latency": session.latency_stats(),
+                }
+            )
+        return {
+            "max_concurrent": self.max_concurrent,
+            "in_flight": self._in_flight,
+            "active_sessions": len(sessions),
+            "max_sessions": self.max_sessions,
+            "state_bytes_total": sum(s["state_bytes"] for s in sessions),
+            "sessions": sessions,
+        }
+
+
+# 全局调度器实例
+_stream_scheduler: Optional[StreamChunkScheduler] = None
+
+
+def get_stream_scheduler() -> StreamChunkScheduler:
+    """获取全局流式chunk调度器实例"""
+    global _stream_scheduler
+    if _stream_scheduler is None:
+        max_concurrent = settings.ASR_STREAM_SCHEDULER_CONCURRENCY or get_max_workers()
+        _stream_scheduler = StreamChunkScheduler(
+            max_concurrent, settings.ASR_STREAM_MAX_SESSIONS
+        )
+        logger.info(
+            f"流式chunk调度器已创建，最大并发推理数: {max_concurrent}，"
+            f"最大会话数: {settings.ASR_STREAM_MAX_SESSIONS or '不限制'}"
+        )
+    return _stream_scheduler
+
+
+async def shutdown_stream_scheduler() -> None:
+    """关闭全局调度器，取消未完成的chunk推理任务"""
+    if _stream_scheduler is not None:
+        await _stream_scheduler.shutdown()
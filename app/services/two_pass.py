@@ -0,0 +1,285 @@
+# -*- coding: utf-8 -*-
+"""
+两遍识别模块（流式在线结果 + 句末离线重识别）
+
+流式识别的中间结果来自在线 Paraformer，延迟低但准确率不如离线模型。
+ASR_MODEL_MODE=all 时离线模型已经加载，两遍识别模式下每个句子结束时，
+将会话缓存的整句音频交给离线模型重新识别，用离线结果替换 SentenceEnd 中的文本：
+
+1. 同一时间窗口内所有会话结束的句子合并为一次离线模型 generate 调用（batch_size=句子数）
+2. 离线推理在低优先级线程池中执行，不占用实时chunk推理的工作线程
+3. 主线程池负载超过 ASR_STREAM_TWO_PASS_MAX_LOAD、排队句子过多或等待超时时，
+   直接使用在线识别文本，保证 SentenceEnd 不因重识别而无限延后
+4. 会话结束（连接断开、任务取消）时，尚未开始推理的句子随等待方一同取消，不再执行
+5. 批次任务保存在集合中，应用关闭时取消排队中的句子和进行中的批次
+6. 离线模型随每个句子提交（由调用方从模型管理器获取），识别实例不持有模型，
+   模型卸载后不会因全局实例而继续占用内存
+"""
+
+import asyncio
+import logging
+from typing import Dict, List, Optional, Set
+
+import numpy as np
+
+from ..core.config import settings
+from ..core.executor import get_executor_load, run_sync_low_priority
+
+logger = logging.getLogger(__name__)
+
+
+class _RecognitionRequest:
+    """待重识别的句子"""
+
+    __slots__ = ("model", "batch_supported", "audio", "online_text", "task_id", "future")
+
+    def __init__(
+        self,
+        model,
+        batch_supported: bool,
+        audio: np.ndarray,
+        online_text: str,
+        task_id: str,
+        future: asyncio.Future,
+    ):
+        self.model = model
+        self.batch_supported = batch_supported
+        self.audio = audio
+        self.online_text = online_text
+        self.task_id = task_id
+        self.future = future
+
+
+class TwoPassRecognizer:
+    """跨会话批量执行句末离线重识别"""
+
+    def __init__(
+        self,
+        batch_window_ms: int = 50,
+        max_batch_size: int = 8,
+        max_pending: int = 32,
+        max_load: float = 0.8,
+        timeout_ms: int = 2000,
+    ):
+        self.batch_window = max(0, batch_window_ms) / 1000.0
+        self.max_batch_size = max(1, max_batch_size)
+        self.max_pending = max(1, max_pending)
+        self.max_load = max_load
+        self.timeout = timeout_ms / 1000.0 if timeout_ms > 0 else None
+        self._pending: List[_RecognitionRequest] = []
+        self._flush_handle: Optional[asyncio.TimerHandle] = None
+        self._outstanding = 0  # 已提交、尚未完成的句子数（含排队中的批次）
+        self._tasks: Set[asyncio.Task] = set()
+        self._stats = {
+            "submitted": 0,
+            "corrected": 0,
+            "fallback_load": 0,
+            "fallback_timeout": 0,
+            "fallback_error": 0,
+            "cancelled": 0,
+            "batches": 0,
+            "batched_sentences": 0,
+        }
+
+    async def recognize(
+        self, asr_engine, audio: np.ndarray, online_text: str, task_id: str = ""
+    ) -> str:
+        """提交一个句子的16kHz音频，使用 asr_engine 的离线模型重识别
+
+        返回离线识别文本（离线模型未加载或降级时返回在线文本）
+        """
+        if not online_text or audio is None or len(audio) == 0:
+            return online_text
+
+        model = getattr(asr_engine, "offline_model", None)
+        if model is None:
+            return online_text
+        extra_model_kwargs = getattr(asr_engine, "extra_model_kwargs", None) or {}
+        # 远程代码模型（如 Fun-ASR-Nano）只支持 batch_size=1
+        batch_supported = not extra_model_kwargs.get("trust_remote_code", False)
+
+        if self._overloaded():
+            self._stats["fallback_load"] += 1
+            logger.debug(f"[{task_id}] 推理负载过高，跳过离线重识别")
+            return online_text
+
+        loop = asyncio.get_running_loop()
+        request = _RecognitionRequest(
+            model, batch_supported, audio, online_text, task_id, loop.create_future()
+        )
+        self._pending.append(request)
+        self._outstanding += 1
+        self._stats["submitted"] += 1
+
+        if len(self._pending) >= self.max_batch_size:
+            self._flush()
+        elif self._flush_handle is None:
+            self._flush_handle = loop.call_later(self.batch_window, self._flush)
+
+        try:
+            text = await asyncio.wait_for(request.future, timeout=self.timeout)
+        except asyncio.TimeoutError:
+            # 等待超时：取消该句（未开始推理时不再执行），使用在线文本
+            self._stats["fallback_timeout"] += 1
+            logger.debug(f"[{task_id}] 离线重识别超时，使用在线识别结果")
+            return online_text
+        except asyncio.CancelledError:
+            self._stats["cancelled"] += 1
+            raise
+
+        if not text:
+            return online_text
+        if text != online_text:
+            self._stats["corrected"] += 1
+        return text
+
+    def _overloaded(self) -> bool:
+        if self._outstanding >= self.max_pending:
+            return True
+        return self.max_load > 0 and get_executor_load() >= self.max_load
+
+    def _flush(self) -> None:
+        """将当前排队的句子作为一个批次提交"""
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+
+        if not self._pending:
+            return
+
+        batch = self._pending
+        self._pending = []
+        task = asyncio.ensure_future(self._run_batch(batch))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def shutdown(self) -> None:
+        """取消排队中的句子和进行中的批次（应用关闭时调用）"""
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        for request in self._pending:
+            request.future.cancel()
+        self._outstanding -= len(self._pending)
+        self._pending = []
+
+        tasks = list(self._tasks)
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    async def _run_batch(self, batch: List[_RecognitionRequest]) -> None:
+        """在低优先级线程池中处理一个批次并分发结果"""
+        try:
+            live = [request for request in batch if not request.future.done()]
+            if not live:
+                return
+            self._stats["batches"] += 1
+            self._stats["batched_sentences"] += len(live)
+
+            try:
+                results = await run_sync_low_priority(self._recognize_batch, live)
+            except asyncio.CancelledError:
+                for request in live:
+                    request.future.cancel()
+                raise
+            except Exception as e:
+                logger.warning(f"离线重识别批次失败({len(live)}句)，使用在线识别结果: {e}")
+                self._stats["fallback_error"] += len(live)
+                results = [request.online_text for request in live]
+
+            for request, result in zip(live, results):
+                if not request.future.done():
+                    request.future.set_result(result)
+        finally:
+            self._outstanding -= len(batch)
+
+    def _recognize_batch(self, batch: List[_RecognitionRequest]) -> List[str]:
+        """批量离线识别（在低优先级线程池中执行），按离线模型分组调用 generate"""
+        # 排队期间已取消的句子不再推理
+        indices = [i for i, request in enumerate(batch) if not request.future.done()]
+        results = [request.online_text for request in batch]
+        if not indices:
+            return results
+
+        groups: Dict[int, List[int]] = {}
+        for i in indices:
+            groups.setdefault(id(batch[i].model), []).append(i)
+
+        for group in groups.values():
+            first = batch[group[0]]
+            texts = self._generate(
+                first.model, [batch[i].audio for i in group], first.batch_supported
+            )
+            for i, text in zip(group, texts):
+                results[i] = text or batch[i].online_text
+
+        logger.debug(f"离线重识别完成: {len(indices)}句")
+        return results
+
+    @staticmethod
+    def _generate(model, audios: List[np.ndarray], batch_supported: bool) -> List[str]:
+        """一组音频的离线识别，批量调用失败时逐条重试"""
+        if len(audios) > 1 and batch_supported:
+            try:
+                result = model.generate(input=audios, cache={}, batch_size=len(audios))
+                if result and len(result) == len(audios):
+                    return [r.get("text", "").strip() for r in result]
+                logger.warning(
+                    f"离线重识别结果数量不匹配({len(result or [])}/{len(audios)})，逐条重试"
+                )
+            except Exception as e:
+                logger.warning(f"批量离线重识别失败，逐条重试: {e}")
+
+        texts = []
+        for audio in audios:
+            try:
+                result = model.generate(input=audio, cache={})
+                texts.append(result[0].get("text", "").strip() if result else "")
+            except Exception as e:
+                logger.warning(f"离线重识别失败: {e}")
+                texts.append("")
+        return texts
+
+    def get_stats(self) -> dict:
+        """两遍识别运行统计"""
+        batches = self._stats["batches"]
+        return {
+            **self._stats,
+            "outstanding": self._outstanding,
+            "avg_batch_size": (
+                round(self._stats["batched_sentences"] / batches, 2) if batches else None
+            ),
+        }
+
+
+# 全局两遍识别实例
+_two_pass_recognizer: Optional[TwoPassRecognizer] = None
+
+
+def get_two_pass_recognizer() -> TwoPassRecognizer:
+    """获取全局两遍识别实例"""
+    global _two_pass_recognizer
+    if _two_pass_recognizer is None:
+        _two_pass_recognizer = TwoPassRecognizer(
+            batch_window_ms=settings.ASR_STREAM_TWO_PASS_BATCH_WINDOW_MS,
+            max_batch_size=settings.ASR_STREAM_TWO_PASS_MAX_BATCH,
+            max_pending=settings.ASR_STREAM_TWO_PASS_MAX_PENDING,
+            max_load=settings.ASR_STREAM_TWO_PASS_MAX_LOAD,
+            timeout_ms=settings.ASR_STREAM_TWO_PASS_TIMEOUT_MS,
+        )
+        logger.info("两遍识别已启用：句末使用离线模型重识别")
+    return _two_pass_recognizer
+
+
+def get_two_pass_stats() -> Optional[dict]:
+    """两遍识别统计，未启用时返回None"""
+    if _two_pass_recognizer is None:
+        return None
+    return _two_pass_recognizer.get_stats()
+
+
+async def shutdown_two_pass_recognizer() -> None:
+    """关闭全局两遍识别实例，取消未完成的批次"""
+    if _two_pass_recognizer is not None:
+        await _two_pass_recognizer.shutdown()
@@ -20,125 +20,213 @@ WebSocket ASR 服务 - 阿里云实时语音识别协议实现
 5. 缓存刷新: 句子结束时强制flush模型缓存，确保获取完整内容
 6. TranscriptionResultChanged结果: 返回当前句子从开始到现在的累计完整文本（去重拼接后的结果）
 
+【音频输入】
+1. 每个会话持有一个增量解码器：pcm 直接转换；wav 增量解析文件头；
+   opus/ogg/webm/mp3/aac/amr 通过常驻 ffmpeg 进程解码为16kHz PCM（管道读写在线程池中执行）
+2. 非16kHz输入经流式多相重采样器转换为16kHz后再切分chunk
+3. StopTranscription 或空闲超时时刷新解码器取回最后写入的音频，连同缓冲区中不足一个chunk的音频
+   一并识别后再发送SentenceEnd
+
+【引擎层流式会话】
+模型侧状态（模型缓存、实时标点缓存、不足一个chunk的音频缓冲区）及 decode/flush/reset 由
+引擎创建的 StreamingSession（asr.streaming）实现；本模块只负责协议、断句、调度与结果投递
+
+【chunk步长】
+1. 客户端可在StartTranscription中通过 latency_profile（low/balanced/accurate）
+   或 chunk_stride_ms（240/480/600）协商步长，并可指定 encoder/decoder look-back
+2. 推理线程池负载过高时，服务端在句子间隙自动将会话升到更大的步长以减少前向次数，
+   负载回落后逐档恢复到协商值；句子进行中不切换，避免模型缓存与chunk大小不一致
+3. 实际生效的初始步长在TranscriptionStarted中返回
+
+【中间结果投递】
+1. intermediate_result_mode=full（默认）：每次发送当前句子的累计文本
+2. intermediate_result_mode=delta：只发送新追加的文本，payload.offset 为其在累计文本中的起始位置
+3. 可通过最小发送间隔与最小变化字数对中间结果节流，被节流的内容并入下一次发送
+4. 成功类消息使用预生成的头部JSON模板编码，message_id 由进程前缀 + 计数生成
+
+【会话调度】
+1. chunk推理经全局 StreamChunkScheduler 按会话公平派发，实时会话优先于快于实时上传的会话
+2. 配置 ASR_STREAM_MAX_BACKLOG_MS（默认0，不启用）后，单会话已接收音频领先墙钟（会话开始以来）
+   超过该值时返回TaskFailed并结束识别
+3. 并发会话数达到 ASR_STREAM_MAX_SESSIONS 时，StartTranscription 直接以 TOO_MANY_REQUESTS 拒绝
+4. 配置 ASR_STREAM_IDLE_TIMEOUT_S（默认0，不启用）后，超时未收到任何消息时结束当前句子并以 IDLE_TIMEOUT 关闭连接
+5. 每个会话的模型缓存与音频缓冲区大小计入调度器统计，在健康检查中展示
+
+【断线续传】
+1. 会话状态集中在 WebSocketSessionState 中；TranscriptionStarted 返回 resume_token
+2. 连接异常断开（未发送StopTranscription）时，会话状态连同流式模型缓存保留
+   ASR_STREAM_RESUME_GRACE_S 秒（内存，超出上限后落盘）
+3. 客户端重连后在 StartTranscription 的 payload 中携带 resume_token 即可继续当前句子，
+   TranscriptionStarted 返回已接收的音频时长 received_audio_ms，客户端从该位置继续发送
+
+【多路复用】
+1. /ws/v1/asr/mux 端点允许一个连接同时承载多个识别任务，文本消息按 header.task_id 区分任务
+2. TranscriptionStarted 返回任务的 channel，音频帧以2字节大端 channel 为前缀
+3. 各任务独立排队处理，单个任务失败不影响同连接的其他任务，详见 websocket_mux 模块
+
+【两遍识别】
+1. enable_two_pass（默认 ASR_STREAM_TWO_PASS）开启时，会话缓存当前句子的16kHz音频，
+   句子结束时交由离线模型重识别，SentenceEnd 使用离线结果（中间结果仍来自在线模型）
+2. 离线重识别跨会话批处理，在低优先级线程池中执行；负载过高、排队过多或超时时直接使用在线结果
+3. 需要 ASR_MODEL_MODE=all（离线模型已加载），否则自动关闭
+
+【远场过滤】
+1. 每个会话持有自适应远场过滤器，跟踪噪声底与近场语音电平的指数统计，按10ms子帧能量判定，
+   判定为远场的chunk不送入模型（ASR_NEARFIELD_ADAPTIVE=false 时使用固定RMS阈值）
+2. 配置 ASR_NEARFIELD_PROFILES_FILE 后，按 appkey（或 payload.nearfield_profile）选择批量校准得到的
+   设备配置初始化过滤器
+3. 句子进行中阈值降低，远场chunk按空结果计数以触发句子结束
+
 【标点恢复机制】
 1. 流式识别中间结果：
    - ASR_ENABLE_REALTIME_PUNC=True时，使用实时标点模型添加句内标点（逗号等）
    - ASR_ENABLE_REALTIME_PUNC=False时（默认），中间结果不添加标点
 2. 句子结束时：始终使用离线标点模型对无标点文本添加完整标点（包括句末标点）
+   - 标点恢复与ITN在线程池中执行，并与同一时间窗口内其他会话结束的句子合并批处理
 3. 双轨处理：同时维护带标点版本（展示用）和无标点版本（最终标点恢复用）
 """
 
+import asyncio
 import json
 import logging
+import math
+import time
 import numpy as np
-import soundfile as sf
-import io
-from typing import Optional, Dict
-from enum import IntEnum
+from typing import Optional
 
 from fastapi import WebSocketDisconnect
 
 from ..core.config import settings
-from ..core.executor import run_sync
+from ..core.executor import run_sync, get_executor_load
 from ..core.security import validate_token_websocket
-from ..utils.text_processing import apply_itn_to_text
-from ..utils.audio_filter import is_nearfield_voice
+from ..utils.audio_filter import AdaptiveNearfieldFilter, is_nearfield_voice
+from ..utils.stream_resampler import StreamingResampler
+from ..utils.stream_decoder import STREAMING_AUDIO_FORMATS
 from ..models.websocket_asr import (
-    AliyunASRWSHeader,
     AliyunASRNamespace,
     AliyunASRMessageName,
     AliyunASRStatus,
 )
+from .sentence_postprocessor import get_sentence_postprocessor
+from .stream_scheduler import estimate_state_bytes, get_stream_scheduler
+from .two_pass import get_two_pass_recognizer
+from .websocket_messages import (
+    INTERMEDIATE_RESULT_MODES,
+    encode_success_message,
+    next_message_id,
+)
+from .websocket_mux import MultiplexedConnection
+from .asr.streaming import (
+    MODEL_SAMPLE_RATE,
+    STREAM_CHUNK_PROFILES,
+    StreamingResult,
+    StreamingSession,
+)
+from .websocket_session import (
+    ConnectionState,
+    WebSocketSessionState,
+    get_session_checkpoint_store,
+)
 
 logger = logging.getLogger(__name__)
 
+# StartTranscription 支持的输入采样率
+SUPPORTED_SAMPLE_RATES = (8000, 16000, 22050, 24000, 44100, 48000)
 
-class ConnectionState(IntEnum):
-    """连接状态"""
-
-    READY = 1
-    STARTED = 2
-    COMPLETED = 3
+# StartTranscription latency_profile 对应的步长
+STREAM_LATENCY_PROFILES = {
+    "low": 240,
+    "balanced": 480,
+    "accurate": 600,
+}
 
 
 class AliyunWebSocketASRService:
     """阿里云WebSocket实时ASR服务"""
 
-    def __init__(self):
-        self.asr_engine = None
-
-    def cleanup(self):
-        """清理资源"""
-        try:
-            if self.asr_engine:
-                logger.info("WebSocket ASR引擎资源已清理")
-        except Exception as e:
-            logger.warning(f"清理WebSocket ASR资源异常: {e}")
-
     def _ensure_asr_engine(self):
-        """确保ASR引擎已加载"""
-        if self.asr_engine is None:
-            self._initialize_engine()
-        return self.asr_engine
+        """获取ASR引擎（确保已加载）
 
-    def _initialize_engine(self):
-        """初始化ASR引擎"""
+        每次通过模型管理器获取默认模型的引擎而不缓存在服务实例中，
+        模型卸载或被淘汰后不会继续引用旧引擎的权重
+        """
         try:
             from .asr.manager import get_model_manager
 
-            model_manager = get_model_manager()
-            self.asr_engine = model_manager.get_asr_engine()
-
-            if not self.asr_engine.supports_realtime:
-                raise Exception("当前ASR引擎不支持实时识别")
-
-            logger.info("WebSocket ASR引擎加载完成")
+            asr_engine = get_model_manager().get_asr_engine()
         except Exception as e:
             logger.error(f"WebSocket ASR引擎加载失败: {e}")
             raise e
 
+        if not asr_engine.supports_realtime:
+            raise Exception("当前ASR引擎不支持实时识别")
+        return asr_engine
+
+    async def _authenticate(self, websocket, task_id: str) -> bool:
+        """校验连接头中的X-NLS-Token，失败时发送TaskFailed并返回False"""
+        if not hasattr(websocket, "headers"):
+            return True
+
+        x_nls_token = websocket.headers.get("X-NLS-Token")
+        if settings.APPTOKEN and not x_nls_token:
+            await self._send_task_failed(
+                websocket, task_id, "X-NLS-Token not found in ws header"
+            )
+            return False
+
+        if x_nls_token:
+            result, message = validate_token_websocket(x_nls_token, task_id)
+            if not result:
+                await self._send_task_failed(websocket, task_id, message)
+                return False
+        return True
+
+    async def _process_multiplexed_connection(self, websocket, connection_id: str):
+        """处理多路复用WebSocket连接（一个连接承载多个识别任务）"""
+        if not await self._authenticate(websocket, connection_id):
+            return
+        await MultiplexedConnection(self, websocket, connection_id).run()
+
     async def _process_websocket_connection(self, websocket, task_id: str):
         """处理WebSocket连接"""
-        state = ConnectionState.READY
-        session_id = f"session_{task_id}"
-        transcription_params = None
-        audio_cache = {}
-        punc_cache = {}
-        sentence_index = 0
-        audio_time = 0
-        sentence_active = False
-        sentence_start_time = 0
-        last_sentence_text = ""
-        sentence_texts = []
-        sentence_texts_raw = []
-        empty_result_count = 0
-        audio_buffer = np.array([], dtype=np.float32)  # 音频缓冲区，用于累积到完整chunk
+        session = WebSocketSessionState(task_id)
+        checkpointed = False
 
         logger.info(f"[{task_id}] WebSocket ASR连接开始")
 
         try:
-            if hasattr(websocket, "headers"):
-                x_nls_token = websocket.headers.get("X-NLS-Token")
-                if settings.APPTOKEN and not x_nls_token:
+            if not await self._authenticate(websocket, task_id):
+                return
+
+            idle_timeout = settings.ASR_STREAM_IDLE_TIMEOUT_S or None
+            while True:
+                try:
+                    message = await asyncio.wait_for(
+                        websocket.receive(), timeout=idle_timeout
+                    )
+                except asyncio.TimeoutError:
+                    logger.warning(
+                        f"[{session.task_id}] 连接空闲超过{settings.ASR_STREAM_IDLE_TIMEOUT_S}s，回收会话"
+                    )
+                    if session.state == ConnectionState.STARTED:
+                        await self._finish_active_sentence(websocket, session)
                     await self._send_task_failed(
-                        websocket, task_id, "X-NLS-Token not found in ws header"
+                        websocket,
+                        session.task_id,
+                        f"Idle timeout: no data received in "
+                        f"{settings.ASR_STREAM_IDLE_TIMEOUT_S}s",
+                        status=AliyunASRStatus.IDLE_TIMEOUT,
                     )
-                    return
+                    break
 
-                if x_nls_token:
-                    result, message = validate_token_websocket(x_nls_token, task_id)
-                    if not result:
-                        await self._send_task_failed(websocket, task_id, message)
-                        return
-
-            while True:
-                message = await websocket.receive()
+                if message.get("type") == "websocket.disconnect":
+                    raise WebSocketDisconnect()
 
                 if "text" in message:
                     try:
                         data = json.loads(message["text"])
                         logger.debug(
-                            f"[{task_id}] 收到消息: {data.get('header', {}).get('name', '')}"
+                            f"[{session.task_id}] 收到消息: {data.get('header', {}).get('name', '')}"
                         )
 
                         header = data.get("header", {})
@@ -148,378 +236,89 @@ class AliyunWebSocketASRService:
 
                         if namespace != AliyunASRNamespace.SPEECH_TRANSCRIBER:
                             await self._send_task_failed(
-                                websocket, task_id, "Invalid namespace"
+                                websocket, session.task_id, "Invalid namespace"
                             )
                             continue
 
                         if message_name == AliyunASRMessageName.START_TRANSCRIPTION:
-                            if state == ConnectionState.READY:
-                                transcription_params = self._parse_start_transcription(
-                                    data, task_id
-                                )
-                                if transcription_params:
-                                    task_id = message_task_id or task_id
-                                    await self._send_transcription_started(
-                                        websocket, task_id, session_id
-                                    )
-                                    state = ConnectionState.STARTED
-                                    sentence_index = 0
-                                    audio_time = 0
-                                    sentence_active = False
-                                    sentence_start_time = 0
-                                    last_sentence_text = ""
-                                    sentence_texts = []
-                                    sentence_texts_raw = []
-                                    empty_result_count = 0
-                                else:
-                                    await self._send_task_failed(
-                                        websocket,
-                                        task_id,
-                                        "Invalid StartTranscription parameters",
-                                    )
+                            if session.state == ConnectionState.READY:
+                                if not await self._start_session(
+                                    websocket, session, data, message_task_id
+                                ):
+                                    break
                             else:
                                 await self._send_task_failed(
-                                    websocket, task_id, "Connection already started"
+                                    websocket, session.task_id, "Connection already started"
                                 )
 
                         elif message_name == AliyunASRMessageName.STOP_TRANSCRIPTION:
-                            if state == ConnectionState.STARTED:
-                                if message_task_id != task_id:
+                            if session.state == ConnectionState.STARTED:
+                                if message_task_id != session.task_id:
                                     await self._send_task_failed(
-                                        websocket, task_id, "Task ID not match"
+                                        websocket, session.task_id, "Task ID not match"
                                     )
                                     continue
 
                                 # 如果有未完成的句子，直接结束
-                                if sentence_active and sentence_texts_raw:
-                                    sentence_index += 1
-                                    full_sentence_text = "".join(sentence_texts_raw)
-
-                                    if transcription_params.get(
-                                        "enable_punctuation_prediction", True
-                                    ):
-                                        full_sentence_text = await self._apply_final_punctuation_to_sentence(
-                                            full_sentence_text, task_id
-                                        )
-
-                                    await self._send_sentence_end(
-                                        websocket,
-                                        task_id,
-                                        sentence_index,
-                                        audio_time,
-                                        full_sentence_text,
-                                        sentence_start_time,
-                                        enable_itn=transcription_params.get(
-                                            "enable_inverse_text_normalization", True
-                                        ),
-                                    )
+                                await self._finish_active_sentence(websocket, session)
 
                                 await self._send_transcription_completed(
-                                    websocket, task_id
+                                    websocket, session.task_id
                                 )
-                                state = ConnectionState.COMPLETED
-                                logger.info(f"[{task_id}] 识别完成")
+                                session.state = ConnectionState.COMPLETED
+                                logger.info(f"[{session.task_id}] 识别完成")
                                 break
                             else:
                                 await self._send_task_failed(
-                                    websocket, task_id, "Connection not started"
+                                    websocket, session.task_id, "Connection not started"
                                 )
                         else:
                             await self._send_task_failed(
                                 websocket,
-                                task_id,
+                                session.task_id,
                                 f"Invalid message name: {message_name}",
                             )
 
                     except json.JSONDecodeError as e:
-                        logger.error(f"[{task_id}] JSON解析错误: {e}")
+                        logger.error(f"[{session.task_id}] JSON解析错误: {e}")
                         await self._send_task_failed(
-                            websocket, task_id, f"Message Not Json: {message}"
+                            websocket, session.task_id, f"Message Not Json: {message}"
                         )
                     except WebSocketDisconnect:
                         # 客户端断开，向外层抛出
-                        logger.debug(f"[{task_id}] 处理消息时检测到客户端断开")
+                        logger.debug(f"[{session.task_id}] 处理消息时检测到客户端断开")
                         raise
                     except Exception as e:
-                        logger.error(f"[{task_id}] 处理消息异常: {e}")
-                        await self._send_task_failed(websocket, task_id, str(e))
+                        logger.error(f"[{session.task_id}] 处理消息异常: {e}")
+                        await self._send_task_failed(websocket, session.task_id, str(e))
                         break
 
                 elif "bytes" in message:
-                    if state == ConnectionState.STARTED:
-                        audio_bytes = message["bytes"]
-
-                        if not transcription_params:
-                            await self._send_task_failed(
-                                websocket, task_id, "StartTranscription not received"
-                            )
-                            continue
-
+                    if session.state == ConnectionState.STARTED:
                         try:
-                            # 将接收到的音频添加到缓冲区
-                            audio_format = transcription_params.get("format", "pcm")
-                            sample_rate = transcription_params.get("sample_rate", 16000)
-                            incoming_audio = self._convert_audio_bytes_to_array(
-                                audio_bytes, audio_format, sample_rate, task_id
-                            )
-                            audio_buffer = np.concatenate([audio_buffer, incoming_audio])
-
-                            logger.debug(
-                                f"[{task_id}] 收到音频 {len(incoming_audio)} samples, "
-                                f"缓冲区共 {len(audio_buffer)} samples"
-                            )
-
-                            # 定义标准chunk大小（支持多种，对应不同的chunk_stride）
-                            # 3840 samples = 240ms @ 16kHz (chunk_stride=4, 低延迟)
-                            # 9600 samples = 600ms @ 16kHz (chunk_stride=10, 高准确率)
-                            standard_chunk_sizes = [3840, 9600]
-
-                            # 根据当前缓冲区大小选择最合适的chunk_size
-                            # 策略：选择能完整处理的最大chunk，减少缓冲区残留
-                            selected_chunk_size = None
-                            for chunk_size in sorted(standard_chunk_sizes, reverse=True):
-                                if len(audio_buffer) >= chunk_size:
-                                    selected_chunk_size = chunk_size
-                                    break
-
-                            # 如果缓冲区不足最小chunk，跳过本次处理
-                            if selected_chunk_size is None:
-                                logger.debug(
-                                    f"[{task_id}] 缓冲区不足，等待更多数据 "
-                                    f"(当前{len(audio_buffer)}, 需要至少{min(standard_chunk_sizes)})"
-                                )
-                                continue
-
-                            # 处理缓冲区中所有完整的chunk
-                            while len(audio_buffer) >= selected_chunk_size:
-                                chunk_start_time = audio_time
-
-                                # 提取标准大小的chunk
-                                audio_chunk = audio_buffer[:selected_chunk_size]
-                                audio_buffer = audio_buffer[selected_chunk_size:]
-
-                                # ========== 远场声音过滤 ==========
-                                # 动态阈值：句子活跃时降低阈值，避免句子中间音量波动导致丢帧
-                                effective_rms_threshold = settings.ASR_NEARFIELD_RMS_THRESHOLD
-                                if sentence_active:
-                                    # 句子进行中，降低阈值容忍音量波动
-                                    effective_rms_threshold = settings.ASR_NEARFIELD_RMS_THRESHOLD * 0.6
-
-                                is_nearfield, filter_metrics = is_nearfield_voice(
-                                    audio_chunk,
-                                    sample_rate=sample_rate,
-                                    rms_threshold=effective_rms_threshold,
-                                    enable_filter=settings.ASR_ENABLE_NEARFIELD_FILTER,
-                                )
-
-                                # 判断是否需要送入ASR处理
-                                if not is_nearfield:
-                                    # 远场声音：跳过ASR，但如果当前有活跃句子，需要继续计数以触发句子结束
-                                    if settings.ASR_NEARFIELD_FILTER_LOG_ENABLED:
-                                        logger.debug(
-                                            f"[{task_id}] 远场声音已过滤 - "
-                                            f"RMS: {filter_metrics['rms_energy']:.6f} (阈值: {effective_rms_threshold:.6f})"
-                                        )
-
-                                    # 更新音频时间
-                                    chunk_duration_ms = int(len(audio_chunk) / sample_rate * 1000)
-                                    audio_time += chunk_duration_ms
-
-                                    # 如果当前有活跃句子，将远场音频视为空结果进行计数
-                                    if sentence_active:
-                                        result_text = ""
-                                        result_text_raw = ""
-                                        is_sentence_end = False
-                                        is_silence_frame = False
-                                        # 不跳过，继续后续的句子结束判断
-                                    else:
-                                        # 没有活跃句子，直接跳过
-                                        continue
-
-                                else:
-                                    # 近场声音，正常送入ASR处理
-                                    if settings.ASR_NEARFIELD_FILTER_LOG_ENABLED and filter_metrics.get('enabled', True):
-                                        logger.debug(
-                                            f"[{task_id}] 近场声音检测通过 - "
-                                            f"RMS: {filter_metrics['rms_energy']:.6f} (阈值: {effective_rms_threshold:.6f})"
-                                        )
-
-                                    # 将float32数组转换为PCM bytes (int16)
-                                    audio_chunk_int16 = (audio_chunk * 32768.0).astype(np.int16)
-                                    audio_bytes_chunk = audio_chunk_int16.tobytes()
-
-                                    (
-                                        result_text,
-                                        result_text_raw,
-                                        is_sentence_end,
-                                        is_silence_frame,
-                                        audio_cache,
-                                        audio_time,
-                                    ) = await self._process_audio_chunk(
-                                        audio_bytes_chunk,
-                                        audio_cache,
-                                        punc_cache,
-                                        transcription_params,
-                                        audio_time,
-                                        task_id,
-                                        is_final=False,
-                                    )
-                                # ========== 远场过滤结束 ==========
-
-                                max_empty_count = max(
-                                    3,
-                                    (
-                                        transcription_params.get(
-                                            "max_sentence_silence", 800
-                                        )
-                                        * 2
-                                    )
-                                    // 600,
-                                )
-
-                                if not result_text:
-                                    empty_result_count += 1
-                                    if (
-                                        sentence_active
-                                        and empty_result_count >= max_empty_count
-                                    ):
-                                        is_sentence_end = True
-                                        logger.debug(
-                                            f"[{task_id}] 连续空结果，判断句子结束"
-                                        )
-                                else:
-                                    empty_result_count = 0
-
-                                # 检测到静音帧且当前有正在识别的句子，触发SentenceEnd
-                                if (
-                                    is_silence_frame
-                                    and sentence_active
-                                    and sentence_texts_raw
-                                ):
-                                    is_sentence_end = True
-                                    logger.debug(f"[{task_id}] 检测到静音帧，判断句子结束")
-
-                                if is_sentence_end and sentence_active:
-                                    (
-                                        _,
-                                        flush_result_text_raw,
-                                        _,
-                                        _,
-                                        audio_cache,
-                                        audio_time,
-                                    ) = await self._process_audio_chunk(
-                                        b"",
-                                        audio_cache,
-                                        punc_cache,
-                                        transcription_params,
-                                        audio_time,
-                                        task_id,
-                                        is_final=True,
-                                    )
-
-                                    if flush_result_text_raw:
-                                        if (
-                                            not sentence_texts_raw
-                                            or flush_result_text_raw
-                                            != sentence_texts_raw[-1]
-                                        ):
-                                            sentence_texts_raw.append(flush_result_text_raw)
-
-                                    sentence_index += 1
-                                    sentence_duration = audio_time - sentence_start_time
-                                    full_sentence_text = "".join(sentence_texts_raw)
-
-                                    if transcription_params.get(
-                                        "enable_punctuation_prediction", True
-                                    ):
-                                        full_sentence_text = (
-                                            await self._apply_final_punctuation_to_sentence(
-                                                full_sentence_text, task_id
-                                            )
-                                        )
-
-                                    logger.debug(
-                                        f"[{task_id}] 句子结束 #{sentence_index}: '{full_sentence_text}' "
-                                        f"({sentence_duration}ms)"
-                                    )
-                                    await self._send_sentence_end(
-                                        websocket,
-                                        task_id,
-                                        sentence_index,
-                                        audio_time,
-                                        full_sentence_text,
-                                        sentence_start_time,
-                                        enable_itn=transcription_params.get(
-                                            "enable_inverse_text_normalization", True
-                                        ),
-                                    )
-                                    sentence_active = False
-                                    sentence_start_time = 0
-                                    last_sentence_text = ""
-                                    sentence_texts = []
-                                    sentence_texts_raw = []
-                                    empty_result_count = 0
-                                    audio_cache = {}
-                                    punc_cache = {}
-                                elif result_text:
-                                    if result_text != last_sentence_text:
-                                        last_sentence_text = result_text
-                                        if (
-                                            not sentence_texts
-                                            or result_text != sentence_texts[-1]
-                                        ):
-                                            sentence_texts.append(result_text)
-                                        if (
-                                            not sentence_texts_raw
-                                            or result_text_raw != sentence_texts_raw[-1]
-                                        ):
-                                            sentence_texts_raw.append(result_text_raw)
-
-                                        if not sentence_active:
-                                            sentence_active = True
-                                            sentence_start_time = chunk_start_time
-                                            sentence_texts = [result_text]
-                                            sentence_texts_raw = [result_text_raw]
-                                            empty_result_count = 0
-                                            logger.debug(
-                                                f"[{task_id}] 句子开始 #{sentence_index + 1}"
-                                            )
-                                            await self._send_sentence_begin(
-                                                websocket,
-                                                task_id,
-                                                sentence_index + 1,
-                                                sentence_start_time,
-                                            )
-
-                                        if transcription_params.get(
-                                            "enable_intermediate_result", True
-                                        ):
-                                            # 发送当前句子的累计完整文本（去重拼接）
-                                            accumulated_text = "".join(sentence_texts)
-                                            await self._send_transcription_result_changed(
-                                                websocket,
-                                                task_id,
-                                                sentence_index + 1,
-                                                audio_time,
-                                                accumulated_text,
-                                            )
-
+                            if not await self._handle_audio(
+                                websocket, session, message["bytes"]
+                            ):
+                                break
                         except WebSocketDisconnect:
                             # 客户端断开，向外层抛出
-                            logger.debug(f"[{task_id}] 音频处理时检测到客户端断开")
+                            logger.debug(f"[{session.task_id}] 音频处理时检测到客户端断开")
                             raise
                         except Exception as e:
-                            logger.error(f"[{task_id}] 音频处理异常: {e}")
+                            logger.error(f"[{session.task_id}] 音频处理异常: {e}")
                             await self._send_task_failed(
-                                websocket, task_id, f"Audio processing failed: {str(e)}"
+                                websocket,
+                                session.task_id,
+                                f"Audio processing failed: {str(e)}",
                             )
                     else:
                         await self._send_task_failed(
-                            websocket, task_id, "Connection not started"
+                            websocket, session.task_id, "Connection not started"
                         )
 
         except WebSocketDisconnect:
-            logger.warning(f"[{task_id}] 客户端主动断开WebSocket连接")
+            logger.warning(f"[{session.task_id}] 客户端主动断开WebSocket连接")
+            checkpointed = await self._checkpoint_session(session)
         except Exception as e:
             # 检查是否是WebSocket连接相关的异常
             error_msg = str(e)
@@ -528,22 +327,477 @@ class AliyunWebSocketASRService:
                 or "WebSocket is not connected" in error_msg
                 or "Need to call \"accept\" first" in error_msg
             ):
-                logger.warning(f"[{task_id}] WebSocket连接已断开: {e}")
+                logger.warning(f"[{session.task_id}] WebSocket连接已断开: {e}")
+                checkpointed = await self._checkpoint_session(session)
             else:
-                logger.error(f"[{task_id}] WebSocket ASR连接处理异常: {e}")
+                logger.error(f"[{session.task_id}] WebSocket ASR连接处理异常: {e}")
                 try:
-                    await self._send_task_failed(websocket, task_id, str(e))
+                    await self._send_task_failed(websocket, session.task_id, str(e))
                 except:
                     pass
+        finally:
+            if session.stream_session is not None:
+                get_stream_scheduler().close_session(session.stream_session)
+                session.stream_session = None
+            if not checkpointed:
+                session.release()
+
+    async def _start_session(
+        self,
+        websocket,
+        session: WebSocketSessionState,
+        data: dict,
+        message_task_id: str,
+        extra_payload: Optional[dict] = None,
+    ) -> bool:
+        """处理StartTranscription：新建识别或按resume_token续传
+
+        先在调度器中预留会话名额（检查与登记一步完成，并发的StartTranscription不会超出
+        ASR_STREAM_MAX_SESSIONS），启动失败时释放
+
+        Args:
+            extra_payload: 附加到TranscriptionStarted payload中的字段（如多路复用的channel）
+
+        Returns:
+            并发会话数已达上限时返回False，否则返回True（参数错误等失败已发送TaskFailed）
+        """
+        scheduler = get_stream_scheduler()
+        stream_session = scheduler.open_session(message_task_id or session.task_id)
+        if stream_session is None:
+            await self._send_task_failed(
+                websocket,
+                message_task_id or session.task_id,
+                f"Too many sessions: limit {settings.ASR_STREAM_MAX_SESSIONS} reached",
+                status=AliyunASRStatus.TOO_MANY_REQUESTS,
+            )
+            return False
+
+        try:
+            await self._start_reserved_session(
+                websocket, session, data, message_task_id, stream_session, extra_payload
+            )
+        finally:
+            if session.state != ConnectionState.STARTED:
+                scheduler.close_session(stream_session)
+                session.stream_session = None
+        return True
+
+    async def _start_reserved_session(
+        self,
+        websocket,
+        session: WebSocketSessionState,
+        data: dict,
+        message_task_id: str,
+        stream_session,
+        extra_payload: Optional[dict],
+    ) -> None:
+        """在已预留的调度器会话上新建识别或续传"""
+        payload = data.get("payload", {}) or {}
+        resume_token = payload.get("resume_token")
+
+        if resume_token:
+            restored = await get_session_checkpoint_store().take(str(resume_token))
+            if restored is None:
+                await self._send_task_failed(
+                    websocket,
+                    session.task_id,
+                    "Invalid or expired resume_token",
+                    status=AliyunASRStatus.INVALID_PARAMETER,
+                )
+                return
+            session.load(restored)
+            session.task_id = message_task_id or session.task_id
+            session.ensure_decoder()
+            session.stream.attach(
+                self._ensure_asr_engine().realtime_model,
+                self._realtime_punc_model(session.params),
+            )
+            logger.info(
+                f"[{session.task_id}] 会话续传: 句子#{session.sentence_index + 1}, "
+                f"已处理{session.audio_time}ms, 已接收{session.received_audio_ms}ms"
+            )
+        else:
+            params = self._parse_start_transcription(data, session.task_id)
+            if not params:
+                await self._send_task_failed(
+                    websocket, session.task_id, "Invalid StartTranscription parameters"
+                )
+                return
+            session.start(
+                params, message_task_id or session.task_id, self._create_stream(params)
+            )
+
+        if not session.sentence_active:
+            session.stream.set_chunk_stride(
+                self._select_chunk_stride(session.params, session.chunk_stride_ms)
+            )
+        checkpoint_store = get_session_checkpoint_store()
+        session.resume_token = (
+            checkpoint_store.new_token() if checkpoint_store.enabled else None
+        )
+        session.stream_session = stream_session
+        await self._send_transcription_started(
+            websocket, session, resumed=bool(resume_token), extra_payload=extra_payload
+        )
+        session.state = ConnectionState.STARTED
+
+    def _create_stream(self, params: dict) -> StreamingSession:
+        """按会话参数创建引擎层流式识别会话"""
+        return self._ensure_asr_engine().create_streaming_session(
+            chunk_stride_ms=params["chunk_stride_ms"],
+            encoder_chunk_look_back=params["encoder_chunk_look_back"],
+            decoder_chunk_look_back=params["decoder_chunk_look_back"],
+            punc_model=self._realtime_punc_model(params),
+        )
+
+    def _realtime_punc_model(self, params: dict):
+        """中间结果使用的实时标点模型，未启用或加载失败时返回None"""
+        if not (
+            settings.ASR_ENABLE_REALTIME_PUNC
+            and params.get("enable_punctuation_prediction", True)
+        ):
+            return None
+        try:
+            return self._ensure_asr_engine().get_punc_model(realtime=True)
+        except Exception as e:
+            logger.warning(f"实时标点模型加载失败，中间结果不添加标点: {e}")
+            return None
+
+    async def _checkpoint_session(self, session: WebSocketSessionState) -> bool:
+        """连接异常断开时保存会话，供客户端在宽限期内续传
+
+        先等待在途的chunk推理完成再注销调度器会话并保存，续传的会话不会与旧的推理线程
+        同时使用同一份模型缓存
+        """
+        if session.state != ConnectionState.STARTED or not session.resume_token:
+            return False
+        if session.stream_session is not None:
+            scheduler = get_stream_scheduler()
+            await scheduler.wait_idle(session.stream_session)
+            scheduler.close_session(session.stream_session)
+        return await get_session_checkpoint_store().put(session)
+
+    async def _finish_active_sentence(self, websocket, session: WebSocketSessionState):
+        """输入结束（StopTranscription或空闲超时时调用）：识别剩余音频并结束当前句子
+
+        ffmpeg 解码器只返回调用前已解码完成的音频，最后写入的数据需刷新解码器才能取回；
+        之后缓冲区中不足一个chunk的音频随模型缓存一并刷新，最后发送SentenceEnd
+        """
+        stream = session.stream
+        if session.decoder is not None:
+            tail = await self._decode_audio(session, None)
+            if len(tail):
+                stream.push(tail)
+                await self._process_buffered_chunks(websocket, session)
+
+        if not session.sentence_active and len(stream.buffer) == 0:
+            return
+
+        chunk_start_time = session.audio_time
+        if session.params.get("enable_two_pass") and len(stream.buffer):
+            session.buffer_sentence_audio(
+                stream.buffer,
+                int(settings.ASR_STREAM_TWO_PASS_MAX_SENTENCE_S * MODEL_SAMPLE_RATE),
+            )
+        result = await self._process_audio_chunk(session, None, is_final=True, drain=True)
+        session.audio_time += result.audio_ms
+
+        if result.text_raw:
+            if not session.sentence_active:
+                session.sentence_active = True
+                session.sentence_start_time = chunk_start_time
+                session.sentence_texts = [result.text]
+                session.sentence_texts_raw = [result.text_raw]
+                await self._send_sentence_begin(
+                    websocket,
+                    session.task_id,
+                    session.sentence_index + 1,
+                    session.sentence_start_time,
+                )
+            elif (
+                not session.sentence_texts_raw
+                or result.text_raw != session.sentence_texts_raw[-1]
+            ):
+                session.sentence_texts_raw.append(result.text_raw)
+
+        if session.sentence_active and session.sentence_texts_raw:
+            await self._end_sentence(websocket, session)
+        else:
+            session.reset_sentence()
+
+    async def _end_sentence(self, websocket, session: WebSocketSessionState):
+        """完成当前句子的最终文本，发送SentenceEnd并重置句子状态"""
+        session.sentence_index += 1
+        sentence_duration = session.audio_time - session.sentence_start_time
+        full_sentence_text = await self._complete_sentence_text(session)
+
+        logger.debug(
+            f"[{session.task_id}] 句子结束 #{session.sentence_index}: '{full_sentence_text}' "
+            f"({sentence_duration}ms)"
+        )
+        await self._send_sentence_end(
+            websocket,
+            session.task_id,
+            session.sentence_index,
+            session.audio_time,
+            full_sentence_text,
+            session.sentence_start_time,
+        )
+        session.reset_sentence()
+
+    async def _decode_audio(
+        self, session: WebSocketSessionState, audio_bytes: Optional[bytes]
+    ) -> np.ndarray:
+        """增量解码并重采样到16kHz，audio_bytes 为None时取回解码器中剩余的音频
+
+        ffmpeg 解码器读写子进程管道，在线程池中调用，避免阻塞事件循环
+        """
+        decoder = session.decoder
+        if audio_bytes is None:
+            func, args = decoder.flush, ()
+        else:
+            func, args = decoder.decode, (audio_bytes,)
+        if decoder.blocking:
+            audio = await run_sync(func, *args)
+        else:
+            audio = func(*args)
+
+        if (
+            session.resampler is None
+            and decoder.sample_rate
+            and decoder.sample_rate != MODEL_SAMPLE_RATE
+        ):
+            # WAV 的实际采样率在头部解析后才能确定
+            session.resampler = StreamingResampler(decoder.sample_rate, MODEL_SAMPLE_RATE)
+        if session.resampler is not None:
+            audio = session.resampler.process(audio)
+        return audio
+
+    async def _handle_audio(
+        self, websocket, session: WebSocketSessionState, audio_bytes: bytes
+    ) -> bool:
+        """处理一条音频消息，返回False表示需要结束连接"""
+        task_id = session.task_id
+
+        # 增量解码并重采样到16kHz后添加到缓冲区
+        incoming_audio = await self._decode_audio(session, audio_bytes)
+        stream = session.stream
+        stream.push(incoming_audio)
+
+        # 积压量按已接收音频与墙钟比较：客户端快于实时发送时，积压堆在socket中而非缓冲区
+        stream_session = session.stream_session
+        stream_session.received_audio_ms += len(incoming_audio) * 1000 / MODEL_SAMPLE_RATE
+        backlog_ms = int(stream_session.backlog_ms(time.monotonic()))
+        if (
+            settings.ASR_STREAM_MAX_BACKLOG_MS > 0
+            and backlog_ms > settings.ASR_STREAM_MAX_BACKLOG_MS
+        ):
+            await self._send_task_failed(
+                websocket,
+                task_id,
+                f"Audio backlog exceeds limit: {backlog_ms}ms > "
+                f"{settings.ASR_STREAM_MAX_BACKLOG_MS}ms",
+            )
+            return False
+
+        logger.debug(
+            f"[{task_id}] 收到音频 {len(incoming_audio)} samples, "
+            f"缓冲区共 {len(stream.buffer)} samples"
+        )
+
+        await self._process_buffered_chunks(websocket, session)
+        return True
+
+    async def _process_buffered_chunks(self, websocket, session: WebSocketSessionState):
+        """推理缓冲区中所有完整的chunk，按结果发送句子事件"""
+        task_id = session.task_id
+        params = session.params
+        stream = session.stream
+
+        max_sentence_silence = params.get("max_sentence_silence", 800)
+        two_pass_max_samples = int(settings.ASR_STREAM_TWO_PASS_MAX_SENTENCE_S * MODEL_SAMPLE_RATE)
+
+        # 处理缓冲区中所有完整的chunk
+        while True:
+            # 句子间隙根据推理负载调整步长（句子进行中保持不变）
+            if not session.sentence_active:
+                new_stride_ms = self._select_chunk_stride(params, session.chunk_stride_ms)
+                if new_stride_ms != session.chunk_stride_ms:
+                    logger.info(
+                        f"[{task_id}] chunk步长调整: "
+                        f"{session.chunk_stride_ms}ms -> {new_stride_ms}ms "
+                        f"(推理负载 {get_executor_load():.2f})"
+                    )
+                    # 静音期间的模型缓存按旧chunk大小建立，切换时丢弃
+                    stream.set_chunk_stride(new_stride_ms)
+
+            # 提取标准大小的chunk
+            audio_chunk = stream.pop_chunk()
+            if audio_chunk is None:
+                logger.debug(
+                    f"[{task_id}] 缓冲区不足，等待更多数据 "
+                    f"(当前{len(stream.buffer)}, 需要{stream.chunk_samples})"
+                )
+                break
+
+            # 连续空结果达到约 2 倍 max_sentence_silence 时判断句子结束（按当前步长换算为chunk数）
+            max_empty_count = max(
+                3, math.ceil(max_sentence_silence * 2 / session.chunk_stride_ms)
+            )
+            chunk_start_time = session.audio_time
+            if params.get("enable_two_pass"):
+                session.buffer_sentence_audio(audio_chunk, two_pass_max_samples)
+
+            # ========== 远场声音过滤 ==========
+            is_nearfield, filter_metrics = self._filter_nearfield(session, audio_chunk)
+            effective_rms_threshold = filter_metrics.get('thresholds', {}).get('rms', 0.0)
+
+            # 判断是否需要送入ASR处理
+            if not is_nearfield:
+                # 远场声音：跳过ASR，但如果当前有活跃句子，需要继续计数以触发句子结束
+                if settings.ASR_NEARFIELD_FILTER_LOG_ENABLED:
+                    logger.debug(
+                        f"[{task_id}] 远场声音已过滤 - "
+                        f"RMS: {filter_metrics.get('rms_energy', 0.0):.6f} (阈值: {effective_rms_threshold:.6f}"
+                        f", 噪声底: {filter_metrics.get('noise_floor', '-')})"
+                    )
+
+                # 更新音频时间
+                session.audio_time += int(len(audio_chunk) / MODEL_SAMPLE_RATE * 1000)
+
+                # 如果当前有活跃句子，将远场音频视为空结果进行计数
+                if session.sentence_active:
+                    result_text = ""
+                    result_text_raw = ""
+                    is_sentence_end = False
+                    is_silence_frame = False
+                    # 不跳过，继续后续的句子结束判断
+                else:
+                    # 没有活跃句子，直接跳过
+                    continue
+
+            else:
+                # 近场声音，正常送入ASR处理
+                if settings.ASR_NEARFIELD_FILTER_LOG_ENABLED and filter_metrics.get('enabled', True):
+                    logger.debug(
+                        f"[{task_id}] 近场声音检测通过 - "
+                        f"RMS: {filter_metrics['rms_energy']:.6f} (阈值: {effective_rms_threshold:.6f})"
+                    )
+
+                result = await self._process_audio_chunk(session, audio_chunk)
+                session.audio_time += result.audio_ms
+                result_text = result.text
+                result_text_raw = result.text_raw
+                is_sentence_end = False
+                is_silence_frame = result.is_silence
+            # ========== 远场过滤结束 ==========
+
+            if not result_text:
+                session.empty_result_count += 1
+                if (
+                    session.sentence_active
+                    and session.empty_result_count >= max_empty_count
+                ):
+                    is_sentence_end = True
+                    logger.debug(f"[{task_id}] 连续空结果，判断句子结束")
+            else:
+                session.empty_result_count = 0
+
+            # 检测到静音帧且当前有正在识别的句子，触发SentenceEnd
+            if (
+                is_silence_frame
+                and session.sentence_active
+                and session.sentence_texts_raw
+            ):
+                is_sentence_end = True
+                logger.debug(f"[{task_id}] 检测到静音帧，判断句子结束")
+
+            if is_sentence_end and session.sentence_active:
+                flush_result_text_raw = (
+                    await self._process_audio_chunk(session, None, is_final=True)
+                ).text_raw
+
+                if flush_result_text_raw:
+                    if (
+                        not session.sentence_texts_raw
+                        or flush_result_text_raw != session.sentence_texts_raw[-1]
+                    ):
+                        session.sentence_texts_raw.append(flush_result_text_raw)
+
+                await self._end_sentence(websocket, session)
+            elif result_text:
+                if result_text != session.last_sentence_text:
+                    session.last_sentence_text = result_text
+                    if (
+                        not session.sentence_texts
+                        or result_text != session.sentence_texts[-1]
+                    ):
+                        session.sentence_texts.append(result_text)
+                    if (
+                        not session.sentence_texts_raw
+                        or result_text_raw != session.sentence_texts_raw[-1]
+                    ):
+                        session.sentence_texts_raw.append(result_text_raw)
+
+                    if not session.sentence_active:
+                        session.sentence_active = True
+                        session.sentence_start_time = chunk_start_time
+                        session.sentence_texts = [result_text]
+                        session.sentence_texts_raw = [result_text_raw]
+                        session.empty_result_count = 0
+                        session.partial_emitter.reset()
+                        logger.debug(f"[{task_id}] 句子开始 #{session.sentence_index + 1}")
+                        await self._send_sentence_begin(
+                            websocket,
+                            task_id,
+                            session.sentence_index + 1,
+                            session.sentence_start_time,
+                        )
+
+                    if params.get("enable_intermediate_result", True):
+                        # 当前句子的累计文本（去重拼接），按会话的投递模式和节流策略发送
+                        partial_payload = session.partial_emitter.next_payload(
+                            session.sentence_index + 1,
+                            session.audio_time,
+                            "".join(session.sentence_texts),
+                        )
+                        if partial_payload is not None:
+                            await self._send_transcription_result_changed(
+                                websocket, task_id, partial_payload
+                            )
+
+        # 更新会话状态内存统计（模型缓存 + 音频缓冲区 + 两遍识别的句子音频）
+        session.stream_session.state_bytes = (
+            estimate_state_bytes(stream.cache)
+            + estimate_state_bytes(stream.punc_cache)
+            + estimate_state_bytes(session.sentence_audio)
+            + stream.buffer.nbytes
+        )
 
     def _parse_start_transcription(self, data: dict, task_id: str) -> Optional[dict]:
         """解析StartTranscription消息参数"""
         try:
             payload = data.get("payload", {})
 
+            sample_rate = self._parse_sample_rate(payload.get("sample_rate", 16000))
+            if sample_rate not in SUPPORTED_SAMPLE_RATES:
+                logger.error(
+                    f"[{task_id}] 不支持的采样率: {sample_rate}，"
+                    f"支持: {', '.join(map(str, SUPPORTED_SAMPLE_RATES))}"
+                )
+                return None
+
+            audio_format = str(payload.get("format", "pcm")).lower()
+            if audio_format not in STREAMING_AUDIO_FORMATS:
+                logger.error(
+                    f"[{task_id}] 不支持的音频格式: {audio_format}，"
+                    f"支持: {', '.join(STREAMING_AUDIO_FORMATS)}"
+                )
+                return None
+
             params = {
-                "format": payload.get("format", "pcm"),
-                "sample_rate": payload.get("sample_rate", 16000),
+                "format": audio_format,
+                "sample_rate": sample_rate,
                 "enable_intermediate_result": payload.get(
                     "enable_intermediate_result", True
                 ),
@@ -556,6 +810,14 @@ class AliyunWebSocketASRService:
                 "max_sentence_silence": payload.get("max_sentence_silence", 800),
                 "enable_words": payload.get("enable_words", False),
             }
+            params.update(self._parse_stream_params(payload))
+            params.update(self._parse_intermediate_result_params(payload))
+            params["enable_two_pass"] = self._parse_two_pass(payload, task_id)
+            # 远场过滤设备配置：默认按 appkey 选择
+            params["nearfield_profile"] = (
+                payload.get("nearfield_profile") or data.get("header", {}).get("appkey")
+            )
+            params["nearfield_channel"] = payload.get("nearfield_channel")
 
             logger.info(f"[{task_id}] StartTranscription参数解析成功: {params}")
             return params
@@ -564,216 +826,240 @@ class AliyunWebSocketASRService:
             logger.error(f"[{task_id}] 解析StartTranscription失败: {e}")
             return None
 
-    def _is_silence_frame(
-        self, audio_array: np.ndarray, threshold: float = 0.001
-    ) -> bool:
-        """检测音频帧是否为静音（优化版）
+    def _parse_two_pass(self, payload: dict, task_id: str) -> bool:
+        """解析是否启用两遍识别，离线模型未加载时关闭"""
+        enabled = payload.get("enable_two_pass")
+        if enabled is None:
+            enabled = settings.ASR_STREAM_TWO_PASS
+        if not enabled:
+            return False
+        if getattr(self._ensure_asr_engine(), "offline_model", None) is None:
+            logger.warning(f"[{task_id}] 离线模型未加载（ASR_MODEL_MODE=all时可用），关闭两遍识别")
+            return False
+        return True
+
+    @staticmethod
+    def _parse_sample_rate(sample_rate_value) -> int:
+        """解析采样率参数（兼容列表、字符串形式）"""
+        if isinstance(sample_rate_value, (list, tuple)):
+            sample_rate_value = sample_rate_value[0] if sample_rate_value else 16000
+        if isinstance(sample_rate_value, str):
+            sample_rate_value = sample_rate_value.strip()
+            if not sample_rate_value.isdigit():
+                raise ValueError(f"无效的采样率参数: {sample_rate_value}")
+        try:
+            return int(sample_rate_value)
+        except (TypeError, ValueError):
+            raise ValueError(f"无效的采样率类型: {sample_rate_value}")
 
-        Args:
-            audio_array: 音频数据数组（float32，范围-1.0到1.0）
-            threshold: 静音阈值，低于此值视为静音
+    @staticmethod
+    def _parse_stream_params(payload: dict) -> dict:
+        """解析chunk步长与look-back参数
 
-        Returns:
-            True表示静音帧，False表示有效语音
+        chunk_stride_ms 优先于 latency_profile，均未指定时使用服务端默认步长
         """
-        if len(audio_array) == 0:
-            return True
-
-        # 使用更快的最大振幅检测，避免计算RMS
-        max_amplitude = np.max(np.abs(audio_array))
-
-        # 如果最大振幅都很低，直接判定为静音，无需进一步计算
-        return max_amplitude < threshold * 2
-
-    async def _process_audio_chunk(
-        self,
-        audio_bytes: bytes,
-        cache: Dict,
-        punc_cache: Dict,
-        params: dict,
-        current_audio_time: int,
-        task_id: str,
-        is_final: bool = False,
-    ) -> tuple[str, str, bool, bool, Dict, int]:
-        """处理音频块，返回带标点文本、无标点文本、是否句子结束、是否静音帧、缓存、音频时长"""
-        try:
-            asr_engine = self._ensure_asr_engine()
-
-            audio_format = params.get("format", "pcm").lower()
-            sample_rate_value = params.get("sample_rate", 16000)
-            if isinstance(sample_rate_value, (list, tuple)):
-                sample_rate_value = sample_rate_value[0] if sample_rate_value else 16000
-            if isinstance(sample_rate_value, str):
-                sample_rate_value = sample_rate_value.strip()
-                if sample_rate_value.isdigit():
-                    sample_rate_value = int(sample_rate_value)
-                else:
-                    raise Exception(f"无效的采样率参数: {sample_rate_value}")
-            try:
-                sample_rate = int(sample_rate_value)
-            except (TypeError, ValueError):
-                raise Exception(f"无效的采样率类型: {sample_rate_value}")
-
-            if audio_format == "pcm":
-                audio_array = (
-                    np.frombuffer(audio_bytes, dtype=np.int16).astype(np.float32)
-                    / 32768.0
+        stride_ms = payload.get("chunk_stride_ms")
+        profile = payload.get("latency_profile")
+        if stride_ms is None and profile is not None:
+            stride_ms = STREAM_LATENCY_PROFILES.get(str(profile).lower())
+            if stride_ms is None:
+                raise ValueError(
+                    f"不支持的latency_profile: {profile}，"
+                    f"支持: {', '.join(STREAM_LATENCY_PROFILES)}"
                 )
-            elif audio_format == "wav":
-                audio_io = io.BytesIO(audio_bytes)
-                audio_array, sr = sf.read(audio_io)
-                if sr != sample_rate:
-                    logger.warning(f"WAV采样率 {sr} 与配置 {sample_rate} 不一致")
-            else:
-                raise Exception(f"暂不支持的音频格式: {audio_format}")
-
-            audio_array = np.asarray(audio_array, dtype=np.float32)
-
-            chunk_duration_ms = int(len(audio_array) / sample_rate * 1000)
-            new_audio_time = current_audio_time + chunk_duration_ms
-
-            # 计算音频能量用于调试
-            max_amplitude = np.max(np.abs(audio_array)) if len(audio_array) > 0 else 0
-            mean_amplitude = np.mean(np.abs(audio_array)) if len(audio_array) > 0 else 0
-            logger.debug(
-                f"[{task_id}] 音频块信息: samples={len(audio_array)}, "
-                f"duration={chunk_duration_ms}ms, max={max_amplitude:.4f}, mean={mean_amplitude:.6f}"
+        if stride_ms is None:
+            stride_ms = settings.ASR_STREAM_CHUNK_STRIDE_MS
+            if stride_ms not in STREAM_CHUNK_PROFILES:
+                logger.warning(f"ASR_STREAM_CHUNK_STRIDE_MS={stride_ms} 无效，使用240ms")
+                stride_ms = 240
+
+        stride_ms = int(stride_ms)
+        if stride_ms not in STREAM_CHUNK_PROFILES:
+            raise ValueError(
+                f"不支持的chunk_stride_ms: {stride_ms}，"
+                f"支持: {', '.join(map(str, STREAM_CHUNK_PROFILES))}"
             )
 
-            # 只在音频块足够大（>=400ms）时才检测静音帧，避免对小块音频进行检测增加延迟
-            # 静音帧检测主要用于主动结束句子，不需要对每个小块都检测
-            is_silence = False
-            if chunk_duration_ms >= 400:
-                is_silence = self._is_silence_frame(audio_array)
-                logger.debug(f"[{task_id}] 静音帧检测: is_silence={is_silence}")
-
-            # 根据实际音频样本数自适应调整chunk_size
-            # chunk_stride = chunk_size[1], FunASR期望: samples ≈ chunk_stride * 960
-            # 支持的标准chunk_stride: 4 (3840 samples, 240ms), 10 (9600 samples, 600ms)
-            num_samples = len(audio_array)
-
-            # 计算最接近的chunk_stride
-            if num_samples == 3840:
-                chunk_stride = 4
-            elif num_samples == 9600:
-                chunk_stride = 10
-            else:
-                # 自动选择最接近的标准stride
-                chunk_stride = round(num_samples / 960)
-                chunk_stride = max(4, min(chunk_stride, 10))  # 限制在4-10之间
+        encoder_chunk_look_back = int(payload.get("encoder_chunk_look_back", 4))
+        decoder_chunk_look_back = int(payload.get("decoder_chunk_look_back", 1))
+        if not 1 <= encoder_chunk_look_back <= 10:
+            raise ValueError(f"encoder_chunk_look_back 超出范围[1, 10]: {encoder_chunk_look_back}")
+        if not 0 <= decoder_chunk_look_back <= 10:
+            raise ValueError(f"decoder_chunk_look_back 超出范围[0, 10]: {decoder_chunk_look_back}")
+
+        return {
+            "chunk_stride_ms": stride_ms,
+            "encoder_chunk_look_back": encoder_chunk_look_back,
+            "decoder_chunk_look_back": decoder_chunk_look_back,
+            "enable_adaptive_stride": bool(payload.get("enable_adaptive_stride", True)),
+        }
 
-            chunk_size = [0, chunk_stride, 5]
-            encoder_chunk_look_back = 4
-            decoder_chunk_look_back = 1
+    @staticmethod
+    def _parse_intermediate_result_params(payload: dict) -> dict:
+        """解析中间结果投递模式与节流参数，未指定时使用服务端默认值"""
+        mode = str(
+            payload.get(
+                "intermediate_result_mode", settings.ASR_STREAM_INTERMEDIATE_RESULT_MODE
+            )
+        ).lower()
+        if mode not in INTERMEDIATE_RESULT_MODES:
+            raise ValueError(
+                f"不支持的intermediate_result_mode: {mode}，"
+                f"支持: {', '.join(INTERMEDIATE_RESULT_MODES)}"
+            )
 
-            logger.debug(
-                f"[{task_id}] 使用chunk_size={chunk_size} (samples={num_samples}, "
-                f"stride={chunk_stride}, expected={chunk_stride * 960})"
+        min_interval_ms = int(
+            payload.get(
+                "intermediate_result_min_interval_ms",
+                settings.ASR_STREAM_PARTIAL_MIN_INTERVAL_MS,
+            )
+        )
+        min_chars = int(
+            payload.get(
+                "intermediate_result_min_chars", settings.ASR_STREAM_PARTIAL_MIN_CHARS
             )
+        )
+        if not 0 <= min_interval_ms <= 10000:
+            raise ValueError(
+                f"intermediate_result_min_interval_ms 超出范围[0, 10000]: {min_interval_ms}"
+            )
+        if not 1 <= min_chars <= 100:
+            raise ValueError(f"intermediate_result_min_chars 超出范围[1, 100]: {min_chars}")
 
-            # 使用线程池执行模型推理，避免阻塞事件循环
-            result = await run_sync(
-                asr_engine.realtime_model.generate,
-                input=audio_array,
-                cache=cache,
-                is_final=is_final,
-                chunk_size=chunk_size,
-                encoder_chunk_look_back=encoder_chunk_look_back,
-                decoder_chunk_look_back=decoder_chunk_look_back,
+        return {
+            "intermediate_result_mode": mode,
+            "intermediate_result_min_interval_ms": min_interval_ms,
+            "intermediate_result_min_chars": min_chars,
+        }
+
+    @staticmethod
+    def _filter_nearfield(session: WebSocketSessionState, audio_chunk: np.ndarray):
+        """远场声音过滤：自适应过滤器优先，未启用时使用固定RMS阈值"""
+        if session.nearfield_filter is not None:
+            return session.nearfield_filter.process(
+                audio_chunk,
+                sample_rate=MODEL_SAMPLE_RATE,
+                sentence_active=session.sentence_active,
             )
 
-            logger.debug(f"[{task_id}] ASR模型返回结果: {result}")
+        # 固定阈值：句子活跃时降低阈值，避免句子中间音量波动导致丢帧
+        rms_threshold = settings.ASR_NEARFIELD_RMS_THRESHOLD
+        if session.sentence_active:
+            rms_threshold *= AdaptiveNearfieldFilter.ACTIVE_THRESHOLD_FACTOR
+        return is_nearfield_voice(
+            audio_chunk,
+            sample_rate=MODEL_SAMPLE_RATE,
+            rms_threshold=rms_threshold,
+            enable_filter=settings.ASR_ENABLE_NEARFIELD_FILTER,
+        )
+
+    @staticmethod
+    def _select_chunk_stride(params: dict, current_stride_ms: int) -> int:
+        """根据推理线程池负载选择会话的chunk步长
+
+        负载高于上限时升一档（更少的前向次数），低于下限时降一档，
+        但不会低于客户端协商的步长
+        """
+        requested = params["chunk_stride_ms"]
+        if not (settings.ASR_STREAM_ADAPTIVE_STRIDE and params.get("enable_adaptive_stride", True)):
+            return requested
+
+        strides = sorted(STREAM_CHUNK_PROFILES)
+        if current_stride_ms not in strides:
+            return requested
+        index = strides.index(current_stride_ms)
+
+        load = get_executor_load()
+        if load >= settings.ASR_STREAM_ADAPTIVE_HIGH_LOAD and index < len(strides) - 1:
+            return strides[index + 1]
+        if load <= settings.ASR_STREAM_ADAPTIVE_LOW_LOAD and current_stride_ms > requested:
+            return max(requested, strides[index - 1])
+        return max(requested, current_stride_ms)
 
-            result_text_raw = ""
-            result_text_with_punc = ""
-            is_sentence_end = False
+    async def _process_audio_chunk(
+        self,
+        session: WebSocketSessionState,
+        audio_array: Optional[np.ndarray],
+        is_final: bool = False,
+        drain: bool = False,
+    ) -> StreamingResult:
+        """经会话调度器在线程池中推理一个chunk
 
-            if result and len(result) > 0:
-                result_text_raw = result[0].get("text", "").strip()
-                result_text_with_punc = result_text_raw
+        Args:
+            audio_array: 16kHz float32音频（已完成格式解码与重采样），is_final=True时忽略
+            is_final: 为True时刷新模型缓存，返回句子剩余文本
+            drain: is_final时是否同时送入缓冲区中不足一个chunk的音频（输入结束时使用）
+        """
+        task_id = session.task_id
+        stream = session.stream
+        try:
+            if is_final:
+                audio_ms = stream.buffered_ms if drain else 0
+                func, args = stream.flush, (drain,)
+            else:
+                func, args = stream.decode, (audio_array,)
+                audio_ms = len(audio_array) * 1000 // MODEL_SAMPLE_RATE
+                logger.debug(
+                    f"[{task_id}] 音频块信息: samples={len(audio_array)}, "
+                    f"chunk_size={STREAM_CHUNK_PROFILES[stream.chunk_stride_ms]}"
+                )
 
-                # 如果启用实时标点且用户要求标点，则应用实时标点恢复（仅用于中间结果展示）
-                if (
-                    result_text_raw
-                    and settings.ASR_ENABLE_REALTIME_PUNC
-                    and params.get("enable_punctuation_prediction", True)
-                ):
-                    try:
-                        from .asr.engine import get_global_punc_realtime_model
+            # 模型推理与实时标点都在线程池中执行，避免阻塞事件循环
+            if session.stream_session is not None:
+                result = await get_stream_scheduler().run(
+                    session.stream_session, audio_ms, func, *args
+                )
+            else:
+                result = await run_sync(func, *args)
 
-                        # 使用全局实时PUNC模型
-                        punc_realtime_model = get_global_punc_realtime_model(
-                            asr_engine.device
-                        )
-                        if punc_realtime_model:
-                            # 使用线程池执行标点模型推理
-                            punc_result = await run_sync(
-                                punc_realtime_model.generate,
-                                input=result_text_raw,
-                                cache=punc_cache,
-                            )
-                            if punc_result and len(punc_result) > 0:
-                                result_text_with_punc = (
-                                    punc_result[0].get("text", result_text_raw).strip()
-                                )
-                    except Exception as e:
-                        logger.warning(f"[{task_id}] 实时标点恢复失败: {e}")
-
-                # 注释掉句末标点符号触发句子结束的逻辑，避免与静音帧检测冲突
-                # if result_text_with_punc and self._is_sentence_boundary(
-                #     result_text_with_punc
-                # ):
-                #     is_sentence_end = True
-
-            if result_text_with_punc:
-                logger.debug(f"[{task_id}] 识别: '{result_text_with_punc}'")
-
-            return (
-                result_text_with_punc,
-                result_text_raw,
-                is_sentence_end,
-                is_silence,
-                cache,
-                new_audio_time,
-            )
+            if result.text:
+                logger.debug(f"[{task_id}] 识别: '{result.text}'")
+            return result
 
         except Exception as e:
             logger.exception(f"[{task_id}] 音频块处理失败: {e}")
             raise e
 
-    async def _apply_final_punctuation_to_sentence(
-        self, text: str, task_id: str
+    async def _complete_sentence_text(self, session: WebSocketSessionState) -> str:
+        """生成SentenceEnd的最终文本：两遍识别（可选）后执行标点恢复与ITN"""
+        text = "".join(session.sentence_texts_raw)
+        if session.params.get("enable_two_pass") and session.sentence_audio:
+            online_text = text
+            text = await get_two_pass_recognizer().recognize(
+                self._ensure_asr_engine(),
+                np.concatenate(session.sentence_audio),
+                online_text,
+                session.task_id,
+            )
+            if text != online_text:
+                logger.debug(
+                    f"[{session.task_id}] 离线重识别修正: '{online_text}' -> '{text}'"
+                )
+        return await self._finalize_sentence_text(text, session.params, session.task_id)
+
+    async def _finalize_sentence_text(
+        self, text: str, params: dict, task_id: str
     ) -> str:
-        """对完整句子应用最终标点恢复（使用离线标点模型添加完整标点包括句末标点）"""
+        """句子结束时的最终后处理：离线标点恢复（含句末标点）+ ITN
+
+        交由全局句末后处理器在线程池中与其他会话的句子合并批处理
+        """
         if not text:
             return text
 
-        try:
-            from .asr.engine import get_global_punc_model
+        asr_engine = self._ensure_asr_engine()
+        postprocessor = get_sentence_postprocessor(asr_engine.device)
 
-            asr_engine = self._ensure_asr_engine()
-
-            # 使用全局PUNC模型
-            punc_model = get_global_punc_model(asr_engine.device)
-
-            if punc_model is None:
-                logger.info(f"[{task_id}] 标点模型未加载，返回原文本")
-                return text
-
-            logger.debug(f"[{task_id}] 应用标点恢复: '{text}'")
-            # 使用线程池执行标点模型推理
-            result = await run_sync(punc_model.generate, input=text)
-
-            if result and len(result) > 0:
-                punctuated_text = result[0].get("text", text).strip()
-                logger.debug(f"[{task_id}] 标点恢复结果: '{punctuated_text}'")
-                return punctuated_text
-            else:
-                return text
-
-        except Exception as e:
-            logger.warning(f"[{task_id}] 标点恢复失败: {e}")
-            return text
+        logger.debug(f"[{task_id}] 句末后处理: '{text}'")
+        result = await postprocessor.process(
+            text,
+            enable_punctuation=params.get("enable_punctuation_prediction", True),
+            enable_itn=params.get("enable_inverse_text_normalization", True),
+            task_id=task_id,
+            punc_model_loader=asr_engine.get_punc_model,
+        )
+        logger.debug(f"[{task_id}] 句末后处理结果: '{result}'")
+        return result
 
     def _is_sentence_boundary(self, text: str) -> bool:
         """判断是否为句子边界（包含句末标点）"""
@@ -782,106 +1068,78 @@ class AliyunWebSocketASRService:
         sentence_endings = ["。", "！", "？", ".", "!", "?", "…"]
         return any(text.endswith(ending) for ending in sentence_endings)
 
-    def _convert_audio_bytes_to_array(
-        self, audio_bytes: bytes, audio_format: str, sample_rate: int, task_id: str
-    ) -> np.ndarray:
-        """将音频字节转换为numpy数组
-
-        Args:
-            audio_bytes: 音频字节数据
-            audio_format: 音频格式（pcm或wav）
-            sample_rate: 采样率
-            task_id: 任务ID
-
-        Returns:
-            float32的numpy数组，范围-1.0到1.0
-        """
-        if audio_format == "pcm":
-            audio_array = (
-                np.frombuffer(audio_bytes, dtype=np.int16).astype(np.float32)
-                / 32768.0
-            )
-        elif audio_format == "wav":
-            audio_io = io.BytesIO(audio_bytes)
-            audio_array, sr = sf.read(audio_io)
-            if sr != sample_rate:
-                logger.warning(f"[{task_id}] WAV采样率 {sr} 与配置 {sample_rate} 不一致")
-        else:
-            raise Exception(f"暂不支持的音频格式: {audio_format}")
-
-        return np.asarray(audio_array, dtype=np.float32)
-
-    async def _send_transcription_started(
-        self, websocket, task_id: str, session_id: str
+    async def _send_message(
+        self, websocket, task_id: str, name: str, payload: Optional[dict] = None
     ):
-        """发送TranscriptionStarted响应"""
-        response = {
-            "header": {
-                "message_id": AliyunASRWSHeader.generate_message_id(),
-                "task_id": task_id,
-                "namespace": AliyunASRNamespace.SPEECH_TRANSCRIBER,
-                "name": AliyunASRMessageName.TRANSCRIPTION_STARTED,
-                "status": AliyunASRStatus.SUCCESS,
-                "status_message": "GATEWAY|SUCCESS|Success.",
-            },
-            "payload": {
-                "session_id": session_id,
-            },
-        }
+        """使用预生成头部模板编码并发送成功类消息"""
         try:
-            await websocket.send_text(json.dumps(response, ensure_ascii=False))
+            await websocket.send_text(encode_success_message(name, task_id, payload))
         except Exception as e:
-            logger.debug(f"[{task_id}] 发送TranscriptionStarted失败，客户端可能已断开: {e}")
+            logger.debug(f"[{task_id}] 发送{name}失败，客户端可能已断开: {e}")
             raise WebSocketDisconnect()
 
+    async def _send_transcription_started(
+        self,
+        websocket,
+        session: WebSocketSessionState,
+        resumed: bool = False,
+        extra_payload: Optional[dict] = None,
+    ):
+        """发送TranscriptionStarted响应（附带实际生效的chunk参数与续传信息）"""
+        params = session.params
+        payload = {
+            "session_id": session.session_id,
+            "chunk_stride_ms": session.chunk_stride_ms,
+            "encoder_chunk_look_back": params["encoder_chunk_look_back"],
+            "decoder_chunk_look_back": params["decoder_chunk_look_back"],
+            "enable_adaptive_stride": bool(
+                settings.ASR_STREAM_ADAPTIVE_STRIDE and params["enable_adaptive_stride"]
+            ),
+            "intermediate_result_mode": params["intermediate_result_mode"],
+            "enable_two_pass": params.get("enable_two_pass", False),
+        }
+        if session.resume_token:
+            payload["resume_token"] = session.resume_token
+        if resumed:
+            # 客户端从 received_audio_ms 之后继续发送音频即可
+            payload.update(
+                {
+                    "resumed": True,
+                    "sentence_index": session.sentence_index,
+                    "time": session.audio_time,
+                    "received_audio_ms": session.received_audio_ms,
+                }
+            )
+        if extra_payload:
+            payload.update(extra_payload)
+        await self._send_message(
+            websocket,
+            session.task_id,
+            AliyunASRMessageName.TRANSCRIPTION_STARTED,
+            payload,
+        )
+
     async def _send_sentence_begin(
         self, websocket, task_id: str, index: int, time: int
     ):
         """发送SentenceBegin响应"""
-        response = {
-            "header": {
-                "message_id": AliyunASRWSHeader.generate_message_id(),
-                "task_id": task_id,
-                "namespace": AliyunASRNamespace.SPEECH_TRANSCRIBER,
-                "name": AliyunASRMessageName.SENTENCE_BEGIN,
-                "status": AliyunASRStatus.SUCCESS,
-                "status_message": "GATEWAY|SUCCESS|Success.",
-            },
-            "payload": {
-                "index": index,
-                "time": time,
-            },
-        }
-        try:
-            await websocket.send_text(json.dumps(response, ensure_ascii=False))
-        except Exception as e:
-            logger.debug(f"[{task_id}] 发送SentenceBegin失败，客户端可能已断开: {e}")
-            raise WebSocketDisconnect()
+        await self._send_message(
+            websocket,
+            task_id,
+            AliyunASRMessageName.SENTENCE_BEGIN,
+            {"index": index, "time": time},
+        )
 
     async def _send_transcription_result_changed(
-        self, websocket, task_id: str, index: int, time: int, result: str
+        self, websocket, task_id: str, payload: dict
     ):
-        """发送TranscriptionResultChanged响应（中间结果）"""
-        response = {
-            "header": {
-                "message_id": AliyunASRWSHeader.generate_message_id(),
-                "task_id": task_id,
-                "namespace": AliyunASRNamespace.SPEECH_TRANSCRIBER,
-                "name": AliyunASRMessageName.TRANSCRIPTION_RESULT_CHANGED,
-                "status": AliyunASRStatus.SUCCESS,
-                "status_message": "GATEWAY|SUCCESS|Success.",
-            },
-            "payload": {
-                "index": index,
-                "time": time,
-                "result": result,
-            },
-        }
-        try:
-            await websocket.send_text(json.dumps(response, ensure_ascii=False))
-        except Exception as e:
-            logger.debug(f"[{task_id}] 发送TranscriptionResultChanged失败，客户端可能已断开: {e}")
-            raise WebSocketDisconnect()
+        """发送TranscriptionResultChanged响应（中间结果，payload由IntermediateResultEmitter生成）"""
+        await self._send_message(
+            websocket,
+            task_id,
+            AliyunASRMessageName.TRANSCRIPTION_RESULT_CHANGED,
+            payload,
+        )
 
     async def _send_sentence_end(
         self,
@@ -891,62 +1149,40 @@ class AliyunWebSocketASRService:
         time: int,
         result: str,
         begin_time: int = 0,
-        enable_itn: bool = False,
     ):
-        """发送SentenceEnd响应"""
-        if enable_itn and result:
-            logger.debug(f"[{task_id}] 应用ITN: {result}")
-            result = apply_itn_to_text(result)
-            logger.debug(f"[{task_id}] ITN结果: {result}")
-
-        response = {
-            "header": {
-                "message_id": AliyunASRWSHeader.generate_message_id(),
-                "task_id": task_id,
-                "namespace": AliyunASRNamespace.SPEECH_TRANSCRIBER,
-                "name": AliyunASRMessageName.SENTENCE_END,
-                "status": AliyunASRStatus.SUCCESS,
-                "status_message": "GATEWAY|SUCCESS|Success.",
-            },
-            "payload": {
+        """发送SentenceEnd响应（result 应已完成标点恢复与ITN）"""
+        await self._send_message(
+            websocket,
+            task_id,
+            AliyunASRMessageName.SENTENCE_END,
+            {
                 "index": index,
                 "time": time,
                 "result": result,
                 "begin_time": begin_time,
             },
-        }
-        try:
-            await websocket.send_text(json.dumps(response, ensure_ascii=False))
-        except Exception as e:
-            logger.debug(f"[{task_id}] 发送SentenceEnd失败，客户端可能已断开: {e}")
-            raise WebSocketDisconnect()
+        )
 
     async def _send_transcription_completed(self, websocket, task_id: str):
         """发送TranscriptionCompleted响应"""
-        response = {
-            "header": {
-                "message_id": AliyunASRWSHeader.generate_message_id(),
-                "task_id": task_id,
-                "namespace": AliyunASRNamespace.SPEECH_TRANSCRIBER,
-                "name": AliyunASRMessageName.TRANSCRIPTION_COMPLETED,
-                "status": AliyunASRStatus.SUCCESS,
-                "status_message": "GATEWAY|SUCCESS|Success.",
-            },
-        }
-        try:
-            await websocket.send_text(json.dumps(response, ensure_ascii=False))
-        except Exception as e:
-            logger.debug(f"[{task_id}] 发送TranscriptionCompleted失败，客户端可能已断开: {e}")
-            raise WebSocketDisconnect()
+        await self._send_message(
+            websocket, task_id, AliyunASRMessageName.TRANSCRIPTION_COMPLETED
+        )
 
-    async def _send_task_failed(self, websocket, task_id: str, reason: str):
+    async def _send_task_failed(
+        self,
+        websocket,
+        task_id: str,
+        reason: str,
+        status: int = AliyunASRStatus.TASK_FAILED,
+    ):
         """发送TaskFailed响应"""
         response = {
             "header": {
                 "namespace": AliyunASRNamespace.SPEECH_TRANSCRIBER,
                 "name": AliyunASRMessageName.TASK_FAILED,
-                "status": AliyunASRStatus.TASK_FAILED,
-                "message_id": AliyunASRWSHeader.generate_message_id(),
+                "status": status,
+                "message_id": next_message_id(),
                 "task_id": task_id,
                 "status_text": reason,
             }
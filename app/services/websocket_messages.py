@@ -0,0 +1,133 @@
+# -*- coding: utf-8 -*-
+"""
+WebSocket ASR 消息编码与中间结果发送策略
+
+1. 成功类消息（TranscriptionStarted / SentenceBegin / TranscriptionResultChanged 等）
+   的头部除 message_id 和 task_id 外完全固定，按消息名预先生成JSON片段，
+   发送时只拼接 message_id、task_id 和 payload
+2. message_id 使用“进程随机前缀 + 递增计数”生成，无需每条消息调用 uuid4
+3. IntermediateResultEmitter 实现 TranscriptionResultChanged 的 full/delta 两种模式
+   以及最小发送间隔、最小变化字数节流
+"""
+
+import itertools
+import json
+import time
+import uuid
+from typing import Callable, Dict, Optional
+
+from ..models.websocket_asr import AliyunASRNamespace, AliyunASRStatus
+
+# 中间结果模式
+INTERMEDIATE_RESULT_MODES = ("full", "delta")
+
+# message_id：16位进程随机前缀 + 16位十六进制计数，共32位
+_MESSAGE_ID_PREFIX = uuid.uuid4().hex[:16]
+_message_counter = itertools.count(1)
+
+# 消息名 -> 头部固定部分（namespace/name/status/status_message）的JSON片段
+_HEADER_TEMPLATES: Dict[str, str] = {}
+
+
+def next_message_id() -> str:
+    """生成32位消息ID（进程内唯一）"""
+    return f"{_MESSAGE_ID_PREFIX}{next(_message_counter) & 0xFFFFFFFFFFFFFFFF:016x}"
+
+
+def _header_template(name: str) -> str:
+    template = _HEADER_TEMPLATES.get(name)
+    if template is None:
+        template = json.dumps(
+            {
+                "namespace": AliyunASRNamespace.SPEECH_TRANSCRIBER,
+                "name": name,
+                "status": AliyunASRStatus.SUCCESS,
+                "status_message": "GATEWAY|SUCCESS|Success.",
+            },
+            ensure_ascii=False,
+        )[1:-1]
+        _HEADER_TEMPLATES[name] = template
+    return template
+
+
+def encode_success_message(
+    name: str, task_id: str, payload: Optional[dict] = None
+) -> str:
+    """编码成功类消息，字段与逐条构建dict后 json.dumps 的结果一致"""
+    text = (
+        f'{{"header":{{"message_id":"{next_message_id()}",'
+        f'"task_id":{json.dumps(task_id, ensure_ascii=False)},'
+        f"{_header_template(name)}}}"
+    )
+    if payload is not None:
+        text += f',"payload":{json.dumps(payload, ensure_ascii=False)}'
+    return text + "}"
+
+
+class IntermediateResultEmitter:
+    """单个会话的中间结果发送策略
+
+    当前句子的累计文本只会在末尾追加（见去重拼接逻辑），因此 delta 模式只需发送
+    上次已发送长度之后的部分，并以 offset 标明其在累计文本中的起始位置。
+    被节流的变化不会丢失：下一次发送的增量会包含它们，句子结束时 SentenceEnd 给出完整文本。
+    """
+
+    __slots__ = (
+        "mode",
+        "min_interval",
+        "min_chars",
+        "_clock",
+        "_sent_length",
+        "_last_sent_at",
+    )
+
+    def __init__(
+        self,
+        mode: str = "full",
+        min_interval_ms: int = 0,
+        min_chars: int = 1,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        if mode not in INTERMEDIATE_RESULT_MODES:
+            raise ValueError(f"不支持的中间结果模式: {mode}")
+        self.mode = mode
+        self.min_interval = max(0, min_interval_ms) / 1000.0
+        self.min_chars = max(1, min_chars)
+        self._clock = clock
+        self.reset()
+
+    def reset(self) -> None:
+        """新句子开始时重置发送进度"""
+        self._sent_length = 0
+        self._last_sent_at: Optional[float] = None
+
+    def next_payload(self, index: int, time_ms: int, accumulated: str) -> Optional[dict]:
+        """根据当前累计文本生成待发送的payload，不满足节流条件时返回None"""
+        if len(accumulated) < self._sent_length:
+            # 防御：累计文本变短时从头发送
+            self._sent_length = 0
+
+        changed = len(accumulated) - self._sent_length
+        if changed < self.min_chars:
+            return None
+
+        now = self._clock()
+        if (
+            self._last_sent_at is not None
+            and now - self._last_sent_at < self.min_interval
+        ):
+            return None
+
+        if self.mode == "delta":
+            payload = {
+                "index": index,
+                "time": time_ms,
+                "result": accumulated[self._sent_length:],
+                "offset": self._sent_length,
+            }
+        else:
+            payload = {"index": index, "time": time_ms, "result": accumulated}
+
+        self._sent_length = len(accumulated)
+        self._last_sent_at = now
+        return payload
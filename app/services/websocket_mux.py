@@ -0,0 +1,335 @@
+# -*- coding: utf-8 -*-
+"""
+WebSocket ASR 多路复用连接
+
+媒体网关等客户端同时有成百上千路通话，每路单独建立 WebSocket（及TLS握手）开销很大。
+多路复用模式下一个连接可同时承载多个识别任务：
+
+1. 文本消息沿用阿里云协议，按 header.task_id 区分任务；StartTranscription 的 task_id
+   必须是连接内未使用的ID，TranscriptionStarted 的 payload 中返回分配的 channel（0-65535）
+2. 二进制消息以2字节大端 channel 作为前缀，其后为该任务的音频数据
+3. 每个任务拥有独立的会话状态（WebSocketSessionState）和一个工作协程，按顺序处理本任务的
+   音频与StopTranscription；各任务的结果交错写回同一连接，发送经连接级锁串行化
+4. 单个任务失败（参数错误、积压超限、队列溢出）只结束该任务，不影响同连接的其他任务；
+   连接异常断开时，所有未完成的任务按断线续传规则分别保存
+5. 空闲超时按连接计算：连接上任一任务有数据即视为活跃
+"""
+
+import asyncio
+import json
+import logging
+import struct
+from typing import Dict, Optional, Set
+
+from fastapi import WebSocketDisconnect
+
+from ..core.config import settings
+from ..models.websocket_asr import (
+    AliyunASRNamespace,
+    AliyunASRMessageName,
+    AliyunASRStatus,
+)
+from .stream_scheduler import get_stream_scheduler
+from .websocket_session import ConnectionState, WebSocketSessionState
+
+logger = logging.getLogger(__name__)
+
+# 二进制帧前缀：2字节大端 channel
+_CHANNEL_PREFIX = struct.Struct(">H")
+_MAX_CHANNEL = 0xFFFF
+
+# 任务队列中的StopTranscription标记
+_STOP = object()
+
+
+class _SerializedSender:
+    """串行化同一连接上多个任务的发送"""
+
+    def __init__(self, websocket):
+        self._websocket = websocket
+        self._lock = asyncio.Lock()
+        self.headers = getattr(websocket, "headers", {})
+
+    async def send_text(self, text: str):
+        async with self._lock:
+            await self._websocket.send_text(text)
+
+
+class _MuxTask:
+    """多路复用连接中的单个识别任务"""
+
+    __slots__ = ("session", "channel", "queue", "worker", "closing", "busy", "stopping")
+
+    def __init__(self, session: WebSocketSessionState, channel: int, queue_size: int):
+        self.session = session
+        self.channel = channel
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=queue_size)
+        self.worker: Optional[asyncio.Task] = None
+        self.closing = False  # 正在结束（队列溢出），不再接收新的数据
+        self.busy = False  # 工作协程正在处理一帧（可能有在途的chunk推理）
+        self.stopping = False  # 已请求停止，处理完当前帧后退出
+
+
+class MultiplexedConnection:
+    """单个多路复用WebSocket连接"""
+
+    def __init__(self, service, websocket, connection_id: str):
+        self.service = service
+        self.websocket = websocket
+        self.connection_id = connection_id
+        self.sender = _SerializedSender(websocket)
+        self.tasks: Dict[str, _MuxTask] = {}
+        self.channels: Dict[int, _MuxTask] = {}
+        self._next_channel = 0
+        self._background: Set[asyncio.Task] = set()  # 结束溢出任务的后台协程
+
+    async def run(self) -> None:
+        """连接主循环：接收消息并分发到各任务"""
+        cid = self.connection_id
+        logger.info(f"[{cid}] 多路复用WebSocket连接开始")
+        disconnected = False
+        try:
+            idle_timeout = settings.ASR_STREAM_IDLE_TIMEOUT_S or None
+            while True:
+                try:
+                    message = await asyncio.wait_for(
+                        self.websocket.receive(), timeout=idle_timeout
+                    )
+                except asyncio.TimeoutError:
+                    logger.warning(f"[{cid}] 多路复用连接空闲超时，结束所有任务")
+                    await self._fail_all_tasks(
+                        f"Idle timeout: no data received in "
+                        f"{settings.ASR_STREAM_IDLE_TIMEOUT_S}s",
+                        AliyunASRStatus.IDLE_TIMEOUT,
+                    )
+                    break
+
+                if message.get("type") == "websocket.disconnect":
+                    raise WebSocketDisconnect()
+
+                if "text" in message:
+                    await self._handle_text(message["text"])
+                elif "bytes" in message:
+                    await self._handle_bytes(message["bytes"])
+
+        except WebSocketDisconnect:
+            logger.warning(f"[{cid}] 多路复用连接断开，活跃任务数: {len(self.tasks)}")
+            disconnected = True
+        except Exception as e:
+            logger.error(f"[{cid}] 多路复用连接处理异常: {e}")
+            disconnected = True
+        finally:
+            await self._close_all_tasks(checkpoint=disconnected)
+
+    async def _handle_text(self, text: str) -> None:
+        try:
+            data = json.loads(text)
+        except json.JSONDecodeError:
+            await self.service._send_task_failed(
+                self.sender, "", f"Message Not Json: {text[:200]}"
+            )
+            return
+
+        header = data.get("header", {})
+        message_name = header.get("name", "")
+        task_id = header.get("task_id", "")
+
+        if header.get("namespace", "") != AliyunASRNamespace.SPEECH_TRANSCRIBER:
+            await self.service._send_task_failed(self.sender, task_id, "Invalid namespace")
+            return
+        if not task_id:
+            await self.service._send_task_failed(
+                self.sender, "", "task_id is required in multiplexed mode"
+            )
+            return
+
+        if message_name == AliyunASRMessageName.START_TRANSCRIPTION:
+            await self._start_task(task_id, data)
+        elif message_name == AliyunASRMessageName.STOP_TRANSCRIPTION:
+            task = self.tasks.get(task_id)
+            if task is None:
+                await self.service._send_task_failed(
+                    self.sender, task_id, "Task not started"
+                )
+                return
+            self._enqueue(task, _STOP)
+        else:
+            await self.service._send_task_failed(
+                self.sender, task_id, f"Invalid message name: {message_name}"
+            )
+
+    async def _handle_bytes(self, data: bytes) -> None:
+        if len(data) < _CHANNEL_PREFIX.size:
+            await self.service._send_task_failed(
+                self.sender, "", "Binary frame too short for channel prefix"
+            )
+            return
+        (channel,) = _CHANNEL_PREFIX.unpack_from(data)
+        task = self.channels.get(channel)
+        if task is None:
+            await self.service._send_task_failed(
+                self.sender, "", f"Unknown channel: {channel}"
+            )
+            return
+        self._enqueue(task, data[_CHANNEL_PREFIX.size:])
+
+    def _enqueue(self, task: _MuxTask, item) -> None:
+        if task.closing:
+            return
+        try:
+            task.queue.put_nowait(item)
+        except asyncio.QueueFull:
+            # 任务处理跟不上推送速度，只结束该任务，不阻塞整个连接的接收
+            logger.warning(f"[{task.session.task_id}] 任务队列已满，结束该任务")
+            task.closing = True
+            background = asyncio.ensure_future(
+                self._abort_task(
+                    task, f"Task queue full: more than {task.queue.maxsize} pending frames"
+                )
+            )
+            self._background.add(background)
+            background.add_done_callback(self._background.discard)
+
+    async def _abort_task(self, task: _MuxTask, reason: str) -> None:
+        """等待工作协程退出后释放任务，再发送TaskFailed"""
+        await self._stop_worker(task)
+        await self._release_task(task)
+        await self.service._send_task_failed(self.sender, task.session.task_id, reason)
+
+    async def _start_task(self, task_id: str, data: dict) -> None:
+        if task_id in self.tasks:
+            await self.service._send_task_failed(
+                self.sender, task_id, "Task already started"
+            )
+            return
+        if len(self.tasks) >= settings.ASR_STREAM_MUX_MAX_TASKS:
+            await self.service._send_task_failed(
+                self.sender,
+                task_id,
+                f"Too many tasks on connection: limit {settings.ASR_STREAM_MUX_MAX_TASKS}",
+                status=AliyunASRStatus.TOO_MANY_REQUESTS,
+            )
+            return
+        channel = self._allocate_channel()
+        if channel is None:
+            await self.service._send_task_failed(
+                self.sender, task_id, "No free channel on connection"
+            )
+            return
+
+        session = WebSocketSessionState(task_id)
+        await self.service._start_session(
+            self.sender, session, data, task_id, extra_payload={"channel": channel}
+        )
+        if session.state != ConnectionState.STARTED:
+            return
+
+        task = _MuxTask(session, channel, settings.ASR_STREAM_MUX_TASK_QUEUE_SIZE)
+        self.tasks[task_id] = task
+        self.channels[channel] = task
+        task.worker = asyncio.ensure_future(self._run_task(task))
+
+    def _allocate_channel(self) -> Optional[int]:
+        for _ in range(_MAX_CHANNEL + 1):
+            channel = self._next_channel
+            self._next_channel = (self._next_channel + 1) & _MAX_CHANNEL
+            if channel not in self.channels:
+                return channel
+        return None
+
+    async def _run_task(self, task: _MuxTask) -> None:
+        """任务工作协程：按顺序处理本任务的音频帧与StopTranscription
+
+        正常结束（完成、积压超限）时自行释放任务；被停止时由停止方负责释放
+        """
+        session = task.session
+        try:
+            while not task.stopping:
+                item = await task.queue.get()
+                task.busy = True
+                try:
+                    if not await self._process_item(task, item):
+                        break
+                finally:
+                    task.busy = False
+        except WebSocketDisconnect:
+            # 连接已断开，由连接主循环统一保存或释放
+            logger.debug(f"[{session.task_id}] 发送结果时检测到客户端断开")
+            return
+        if not task.stopping:
+            await self._release_task(task)
+
+    async def _process_item(self, task: _MuxTask, item) -> bool:
+        """处理一帧音频或StopTranscription，返回是否继续处理后续数据"""
+        session = task.session
+        if item is _STOP:
+            await self.service._finish_active_sentence(self.sender, session)
+            await self.service._send_transcription_completed(self.sender, session.task_id)
+            session.state = ConnectionState.COMPLETED
+            logger.info(f"[{session.task_id}] 识别完成（多路复用）")
+            return False
+        try:
+            return await self.service._handle_audio(self.sender, session, item)
+        except WebSocketDisconnect:
+            raise
+        except Exception as e:
+            logger.error(f"[{session.task_id}] 音频处理异常: {e}")
+            await self.service._send_task_failed(
+                self.sender, session.task_id, f"Audio processing failed: {str(e)}"
+            )
+            return True
+
+    async def _release_task(self, task: _MuxTask, checkpoint: bool = False) -> None:
+        """移出任务表并保存或释放会话，已释放的任务直接返回"""
+        session = task.session
+        if self.tasks.get(session.task_id) is not task:
+            return
+        del self.tasks[session.task_id]
+        if self.channels.get(task.channel) is task:
+            del self.channels[task.channel]
+
+        checkpointed = checkpoint and await self.service._checkpoint_session(session)
+        if session.stream_session is not None:
+            get_stream_scheduler().close_session(session.stream_session)
+            session.stream_session = None
+        if not checkpointed:
+            session.release()
+
+    async def _fail_all_tasks(self, reason: str, status: int) -> None:
+        for task in list(self.tasks.values()):
+            if task.closing:
+                continue
+            await self._stop_worker(task)
+            await self.service._finish_active_sentence(self.sender, task.session)
+            await self.service._send_task_failed(
+                self.sender, task.session.task_id, reason, status=status
+            )
+            task.session.state = ConnectionState.COMPLETED
+            await self._release_task(task)
+
+    @staticmethod
+    async def _stop_worker(task: _MuxTask) -> None:
+        """停止任务工作协程：等待新数据时直接取消；正在处理一帧时等其处理完再退出
+
+        chunk 已从缓冲区取出、推理在线程池中无法中断，中途取消会丢失该chunk的音频，
+        且推理线程仍在修改模型缓存，之后的保存/续传会与其并发
+        """
+        if task.worker is None or task.worker.done():
+            return
+        task.stopping = True
+        if not task.busy:
+            task.worker.cancel()
+        try:
+            await task.worker
+        except BaseException:
+            pass
+
+    async def _close_all_tasks(self, checkpoint: bool) -> None:
+        """连接结束：等待溢出任务结束，停止所有任务工作协程，断线时保存未完成的任务"""
+        if self._background:
+            await asyncio.gather(*self._background, return_exceptions=True)
+        tasks = list(self.tasks.values())
+        for task in tasks:
+            await self._stop_worker(task)
+            await self._release_task(task, checkpoint=checkpoint)
+        logger.info(f"[{self.connection_id}] 多路复用连接结束，共关闭任务 {len(tasks)} 个")
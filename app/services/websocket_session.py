@@ -0,0 +1,358 @@
+# -*- coding: utf-8 -*-
+"""
+WebSocket ASR 会话状态与断线续传
+
+1. WebSocketSessionState 以 __slots__ 保存一个识别会话的全部状态：协议状态、句子进度、
+   引擎层流式会话（StreamingSession：模型缓存与音频缓冲区）、解码器与重采样器、
+   自适应远场过滤器的噪声底与语音电平等
+2. 连接异常断开时，会话状态按 resume_token 保存一段宽限期（ASR_STREAM_RESUME_GRACE_S）：
+   内存中保留的会话数超过上限后，新的快照序列化到磁盘（ASR_STREAM_RESUME_DIR）
+3. 客户端重连后在 StartTranscription 中携带 resume_token，即可从断开处继续识别，
+   已处理的音频不会重新推理，未结束的句子继续累积
+4. 快照的序列化与磁盘读写在线程池中执行；过期快照由后台协程定时清理，不在保存/取出时扫描
+
+说明：pcm/wav 解码器与重采样器的状态可以完整保存；opus/ogg/webm/mp3/aac/amr 由 ffmpeg
+进程解码，进程无法保存，续传后会新建解码器，客户端需从新的容器/帧边界开始发送。
+"""
+
+import asyncio
+import logging
+import os
+import pickle
+import re
+import secrets
+import time
+from enum import IntEnum
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from ..core.config import settings
+from ..core.executor import run_sync
+from ..utils.audio_filter import AdaptiveNearfieldFilter, create_nearfield_filter
+from ..utils.stream_decoder import StreamDecoder, create_stream_decoder
+from .asr.streaming import MODEL_SAMPLE_RATE, StreamingSession
+from .websocket_messages import IntermediateResultEmitter
+
+logger = logging.getLogger(__name__)
+
+# resume_token 只允许URL安全字符，避免拼接磁盘路径时出现目录穿越
+_TOKEN_PATTERN = re.compile(r"^[A-Za-z0-9_-]{16,128}$")
+
+# 过期快照清理间隔上限（秒），宽限期更短时按宽限期清理
+_SWEEP_INTERVAL_S = 30.0
+
+
+class ConnectionState(IntEnum):
+    """连接状态"""
+
+    READY = 1
+    STARTED = 2
+    COMPLETED = 3
+
+
+class WebSocketSessionState:
+    """单个WebSocket识别会话的状态"""
+
+    __slots__ = (
+        "task_id",
+        "session_id",
+        "state",
+        "params",
+        "stream",
+        "sentence_index",
+        "audio_time",
+        "sentence_active",
+        "sentence_start_time",
+        "last_sentence_text",
+        "sentence_texts",
+        "sentence_texts_raw",
+        "empty_result_count",
+        "decoder",
+        "resampler",
+        "partial_emitter",
+        "stream_session",
+        "resume_token",
+        "sentence_audio",
+        "nearfield_filter",
+    )
+
+    def __init__(self, task_id: str):
+        self.task_id = task_id
+        self.session_id = f"session_{task_id}"
+        self.state = ConnectionState.READY
+        self.params: Optional[dict] = None
+        self.stream: Optional[StreamingSession] = None  # 引擎层流式会话（模型缓存 + 16kHz音频缓冲区）
+        self.sentence_index = 0
+        self.audio_time = 0
+        self.sentence_active = False
+        self.sentence_start_time = 0
+        self.last_sentence_text = ""
+        self.sentence_texts: List[str] = []
+        self.sentence_texts_raw: List[str] = []
+        self.empty_result_count = 0
+        self.decoder: Optional[StreamDecoder] = None  # 增量音频解码器（pcm/wav/压缩格式）
+        self.resampler = None  # 非16kHz输入的流式重采样器
+        self.partial_emitter: Optional[IntermediateResultEmitter] = None  # 中间结果发送策略
+        self.stream_session = None  # chunk调度器中的会话（不随快照保存）
+        self.resume_token: Optional[str] = None
+        # 两遍识别：当前句子的16kHz音频chunk（句子开始前保留一个chunk作为前导），超长时为None
+        self.sentence_audio: Optional[List[np.ndarray]] = []
+        # 自适应远场过滤器（噪声底与语音电平随会话保存），未启用自适应过滤时为None
+        self.nearfield_filter: Optional[AdaptiveNearfieldFilter] = None
+
+    def start(self, params: dict, task_id: str, stream: StreamingSession) -> None:
+        """以StartTranscription参数开始新的识别"""
+        self.task_id = task_id
+        self.params = params
+        self.stream = stream
+        self.decoder = create_stream_decoder(
+            params["format"], params["sample_rate"], target_sample_rate=MODEL_SAMPLE_RATE
+        )
+        self.resampler = None
+        self.partial_emitter = IntermediateResultEmitter(
+            params["intermediate_result_mode"],
+            params["intermediate_result_min_interval_ms"],
+            params["intermediate_result_min_chars"],
+        )
+        self.nearfield_filter = create_nearfield_filter(
+            params.get("nearfield_profile"), params.get("nearfield_channel")
+        )
+        self.sentence_index = 0
+        self.audio_time = 0
+        self.reset_sentence()
+
+    def reset_sentence(self) -> None:
+        """句子结束后重置句子级状态与模型缓存"""
+        self.sentence_active = False
+        self.sentence_start_time = 0
+        self.last_sentence_text = ""
+        self.sentence_texts = []
+        self.sentence_texts_raw = []
+        self.empty_result_count = 0
+        self.sentence_audio = []
+        if self.stream is not None:
+            # 丢弃模型缓存，保留不足一个chunk的音频给下一句
+            self.stream.reset(clear_buffer=False)
+
+    def buffer_sentence_audio(self, chunk: np.ndarray, max_samples: int) -> None:
+        """缓存当前句子的音频，供句末离线重识别使用"""
+        if not self.sentence_active:
+            # 句子在识别出首个文本后才开始，保留上一个chunk作为前导
+            self.sentence_audio = (self.sentence_audio or [])[-1:] + [chunk]
+            return
+        if self.sentence_audio is None:
+            return
+        self.sentence_audio.append(chunk)
+        if sum(len(c) for c in self.sentence_audio) > max_samples:
+            # 句子过长，放弃该句的离线重识别
+            self.sentence_audio = None
+
+    @property
+    def chunk_stride_ms(self) -> int:
+        """当前生效的chunk步长"""
+        if self.stream is None:
+            return settings.ASR_STREAM_CHUNK_STRIDE_MS
+        return self.stream.chunk_stride_ms
+
+    @property
+    def received_audio_ms(self) -> int:
+        """已接收的16kHz音频时长（已推理 + 缓冲区中未推理）"""
+        if self.stream is None:
+            return self.audio_time
+        return self.audio_time + self.stream.buffered_ms
+
+    def load(self, other: "WebSocketSessionState") -> None:
+        """从续传快照恢复全部状态"""
+        for name in self.__slots__:
+            setattr(self, name, getattr(other, name))
+
+    def detach(self) -> None:
+        """断开连接时保存快照前调用：释放不可保存的资源"""
+        self.stream_session = None
+        if self.decoder is not None and not self.decoder.resumable:
+            self.decoder.close()
+            self.decoder = None
+
+    def ensure_decoder(self) -> None:
+        """续传后补建不可保存的解码器"""
+        if self.decoder is None and self.params:
+            self.decoder = create_stream_decoder(
+                self.params["format"],
+                self.params["sample_rate"],
+                target_sample_rate=MODEL_SAMPLE_RATE,
+            )
+
+    def release(self) -> None:
+        """连接结束（未保存快照）时释放资源"""
+        if self.decoder is not None:
+            self.decoder.close()
+            self.decoder = None
+
+
+class SessionCheckpointStore:
+    """断线会话快照存储：内存优先，超出上限后落盘"""
+
+    def __init__(self, grace_s: float, max_memory_sessions: int, spill_dir: str):
+        self.grace_s = grace_s
+        self.max_memory_sessions = max(0, max_memory_sessions)
+        self.spill_dir = spill_dir
+        # token -> (过期时间, 会话状态)
+        self._memory: Dict[str, Tuple[float, WebSocketSessionState]] = {}
+        self._sweeper: Optional[asyncio.Task] = None
+
+    @property
+    def enabled(self) -> bool:
+        return self.grace_s > 0
+
+    @staticmethod
+    def new_token() -> str:
+        return secrets.token_urlsafe(24)
+
+    async def put(self, session: WebSocketSessionState) -> bool:
+        """保存断线会话，返回是否保存成功"""
+        token = session.resume_token
+        if not self.enabled or not token:
+            return False
+
+        self._ensure_sweeper()
+        session.detach()
+
+        if len(self._memory) < self.max_memory_sessions:
+            self._memory[token] = (time.monotonic() + self.grace_s, session)
+            logger.info(f"[{session.task_id}] 会话已保存至内存，{self.grace_s:.0f}s内可续传")
+            return True
+
+        try:
+            await run_sync(self._spill, token, session)
+            logger.info(f"[{session.task_id}] 会话已保存至磁盘，{self.grace_s:.0f}s内可续传")
+            return True
+        except Exception as e:
+            logger.warning(f"[{session.task_id}] 会话快照落盘失败: {e}")
+            return False
+
+    async def take(self, token: str) -> Optional[WebSocketSessionState]:
+        """取出续传会话（一次性），不存在或已过期时返回None"""
+        if not self.enabled or not token or not _TOKEN_PATTERN.match(token):
+            return None
+
+        entry = self._memory.pop(token, None)
+        if entry is not None:
+            expires_at, session = entry
+            if expires_at < time.monotonic():
+                session.release()
+                return None
+            return session
+
+        try:
+            return await run_sync(self._load_spilled, token)
+        except Exception as e:
+            logger.warning(f"读取会话快照失败: {e}")
+            return None
+
+    def _spill_path(self, token: str) -> str:
+        return os.path.join(self.spill_dir, f"{token}.pkl")
+
+    def _spill(self, token: str, session: WebSocketSessionState) -> None:
+        """序列化会话并写入磁盘（线程池中执行）"""
+        os.makedirs(self.spill_dir, exist_ok=True)
+        path = self._spill_path(token)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "wb") as f:
+            pickle.dump(session, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, path)
+
+    def _load_spilled(self, token: str) -> Optional[WebSocketSessionState]:
+        """读取并删除落盘的快照（线程池中执行）
+
+        按文件修改时间判断过期（同一目录下其他worker保存的快照也可续传）
+        """
+        path = self._spill_path(token)
+        try:
+            if time.time() - os.path.getmtime(path) > self.grace_s:
+                os.remove(path)
+                return None
+            with open(path, "rb") as f:
+                session = pickle.load(f)
+            os.remove(path)
+            return session
+        except FileNotFoundError:
+            return None
+
+    def _ensure_sweeper(self) -> None:
+        """首次保存快照时启动定时清理协程"""
+        if self._sweeper is None or self._sweeper.done():
+            self._sweeper = asyncio.ensure_future(self._sweep_loop())
+
+    async def _sweep_loop(self) -> None:
+        interval = min(self.grace_s, _SWEEP_INTERVAL_S)
+        while True:
+            await asyncio.sleep(interval)
+            self._sweep_memory(time.monotonic())
+            try:
+                await run_sync(self._sweep_disk)
+            except Exception as e:
+                logger.warning(f"清理过期会话快照失败: {e}")
+
+    def _sweep_memory(self, now: float) -> None:
+        """清理过期的内存快照"""
+        for token in [t for t, (expires_at, _) in self._memory.items() if expires_at < now]:
+            _, session = self._memory.pop(token)
+            session.release()
+
+    def _sweep_disk(self) -> None:
+        """清理过期的磁盘快照（线程池中执行）"""
+        if not os.path.isdir(self.spill_dir):
+            return
+        wall_now = time.time()
+        for name in os.listdir(self.spill_dir):
+            path = os.path.join(self.spill_dir, name)
+            try:
+                if name.endswith(".pkl") and wall_now - os.path.getmtime(path) > self.grace_s:
+                    os.remove(path)
+            except OSError:
+                pass
+
+    async def shutdown(self) -> None:
+        """停止定时清理并释放内存中的快照"""
+        if self._sweeper is not None:
+            self._sweeper.cancel()
+            await asyncio.gather(self._sweeper, return_exceptions=True)
+            self._sweeper = None
+        for _, session in self._memory.values():
+            session.release()
+        self._memory.clear()
+
+    def get_stats(self) -> dict:
+        """续传快照统计"""
+        spilled = 0
+        if os.path.isdir(self.spill_dir):
+            spilled = sum(1 for name in os.listdir(self.spill_dir) if name.endswith(".pkl"))
+        return {
+            "grace_s": self.grace_s,
+            "in_memory": len(self._memory),
+            "on_disk": spilled,
+        }
+
+
+# 全局快照存储实例
+_checkpoint_store: Optional[SessionCheckpointStore] = None
+
+
+def get_session_checkpoint_store() -> SessionCheckpointStore:
+    """获取全局断线会话快照存储"""
+    global _checkpoint_store
+    if _checkpoint_store is None:
+        _checkpoint_store = SessionCheckpointStore(
+            grace_s=settings.ASR_STREAM_RESUME_GRACE_S,
+            max_memory_sessions=settings.ASR_STREAM_RESUME_MAX_MEMORY_SESSIONS,
+            spill_dir=settings.ASR_STREAM_RESUME_DIR
+            or os.path.join(settings.TEMP_DIR, "ws_resume"),
+        )
+    return _checkpoint_store
+
+
+async def shutdown_session_checkpoint_store() -> None:
+    """关闭全局快照存储，停止定时清理"""
+    if _checkpoint_store is not None:
+        await _checkpoint_store.shutdown()
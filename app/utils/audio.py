@@ -2,15 +2,15 @@
 """
 统一音频处理工具
 ASR音频处理功能
+
+读写与时长查询优先使用 soundfile（libsndfile 支持 wav/flac/ogg/mp3，时长只读文件头），
+重采样使用 scipy；librosa（连带 numba）仅在 soundfile 无法解码的格式（如 m4a/aac）时按需导入，
+requests 在下载音频时才导入，不使用这些路径的进程（如只做实时识别的 Worker）无需加载它们。
 """
 
 import os
 import tempfile
-import requests
-import librosa
 import soundfile as sf
-import torchaudio
-import torch
 import numpy as np
 import subprocess
 import logging
@@ -67,6 +67,8 @@ def download_audio_from_url(url: str, max_size: int = None) -> bytes:
 
     max_file_size = max_size or settings.MAX_AUDIO_SIZE
 
+    import requests
+
     try:
         response = requests.get(url, timeout=30, stream=True)
         response.raise_for_status()
@@ -131,6 +133,34 @@ def cleanup_temp_file(file_path: str) -> None:
         pass
 
 
+def _resample(audio: np.ndarray, original_sr: int, target_sr: int) -> np.ndarray:
+    """多相滤波重采样（单声道float32）"""
+    from math import gcd
+
+    from scipy.signal import resample_poly
+
+    factor = gcd(original_sr, target_sr)
+    return resample_poly(audio, target_sr // factor, original_sr // factor).astype(np.float32)
+
+
+def _read_audio(audio_path: str, target_sr: Optional[int]) -> Tuple[np.ndarray, int]:
+    """读取音频为单声道float32，target_sr 为 None 时保持原采样率
+
+    soundfile 无法解码的格式（如 m4a/aac/webm）回退到 librosa（audioread/ffmpeg）。
+    """
+    try:
+        audio, sr = sf.read(audio_path, dtype="float32", always_2d=True)
+    except RuntimeError:
+        import librosa
+
+        return librosa.load(audio_path, sr=target_sr)
+
+    audio = audio[:, 0] if audio.shape[1] == 1 else audio.mean(axis=1)
+    if target_sr and sr != target_sr:
+        audio, sr = _resample(audio, sr, target_sr), target_sr
+    return audio, sr
+
+
 def load_audio_file(audio_path: str, target_sr: int = 16000) -> Tuple[np.ndarray, int]:
     """加载音频文件并转换为指定采样率
 
@@ -145,9 +175,7 @@ def load_audio_file(audio_path: str, target_sr: int = 16000) -> Tuple[np.ndarray
         AudioProcessingException: 加载失败
     """
     try:
-        # 使用librosa加载音频
-        audio_data, sr = librosa.load(audio_path, sr=target_sr)
-        return audio_data, sr
+        return _read_audio(audio_path, target_sr)
     except Exception as e:
         raise DefaultServerErrorException(f"加载音频文件失败: {str(e)}")
 
@@ -165,10 +193,12 @@ def get_audio_duration(audio_path: str) -> float:
         AudioProcessingException: 获取时长失败
     """
     try:
-        # Load audio and get duration
-        y, sr = librosa.load(audio_path, sr=None)
-        duration = librosa.get_duration(y=y, sr=sr)
-        return duration
+        # soundfile 只读文件头即可得到时长，无法解码的格式才完整加载
+        try:
+            return sf.info(audio_path).duration
+        except RuntimeError:
+            y, sr = _read_audio(audio_path, None)
+            return len(y) / sr
     except Exception as e:
         raise DefaultServerErrorException(f"获取音频时长失败: {str(e)}")
 
@@ -192,7 +222,7 @@ def resample_audio_array(
         return audio_array
 
     try:
-        # 确保是1D数组用于librosa重采样
+        # 确保是1D数组用于重采样
         if audio_array.ndim > 1:
             # 如果是多声道，取第一个声道
             if audio_array.shape[0] > audio_array.shape[1]:
@@ -206,8 +236,7 @@ def resample_audio_array(
         else:
             audio_1d = audio_array
 
-        # 使用librosa进行重采样
-        resampled = librosa.resample(audio_1d, orig_sr=original_sr, target_sr=target_sr)
+        resampled = _resample(np.asarray(audio_1d, dtype=np.float32), original_sr, target_sr)
 
         logger.info(f"音频重采样: {original_sr}Hz -> {target_sr}Hz")
         return resampled
@@ -300,9 +329,8 @@ def save_audio_array(
 
         # 根据格式选择保存方法
         if format.lower() == "wav":
-            # 使用torchaudio保存WAV格式
-            audio_tensor = torch.from_numpy(audio_array)
-            torchaudio.save(output_path, audio_tensor, sample_rate)
+            # 32位浮点WAV，(samples, channels)
+            sf.write(output_path, audio_array.T, sample_rate, format="WAV", subtype="FLOAT")
         else:
             # 使用soundfile保存其他格式
             # 确保音频数据是单声道
@@ -337,8 +365,7 @@ def convert_audio_to_wav(
         output_path = input_path.rsplit(".", 1)[0] + ".wav"
 
     try:
-        # 使用librosa加载并重采样
-        audio_data, sr = librosa.load(input_path, sr=target_sr)
+        audio_data, sr = _read_audio(input_path, target_sr)
         sf.write(output_path, audio_data, target_sr, format="WAV")
         return output_path
 
@@ -386,10 +413,12 @@ def normalize_audio_for_asr(audio_path: str, target_sr: int = 16000) -> str:
 
         # 如果已经是WAV格式且采样率正确，直接返回
         if file_ext == ".wav":
-            # 检查采样率
-            audio_data, sr = librosa.load(audio_path, sr=None)
-            if sr == target_sr:
-                return audio_path
+            # 检查采样率（只读文件头），无法识别的文件交给格式转换处理
+            try:
+                if sf.info(audio_path).samplerate == target_sr:
+                    return audio_path
+            except RuntimeError:
+                pass
 
         # 转换为标准WAV格式
         normalized_path = convert_audio_to_wav(audio_path, target_sr=target_sr)
@@ -445,7 +474,7 @@ def detect_audio_format_from_bytes(data: bytes) -> str:
         # WebM/MKV
         return ".webm"
 
-    # 默认为 wav，librosa 会自动处理
+    # 默认为 wav，解码时会按实际内容处理
     return ".wav"
 
 
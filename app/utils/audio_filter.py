@@ -1,11 +1,21 @@
 # -*- coding: utf-8 -*-
 """
 音频过滤工具 - 用于流式ASR的近场/远场声音检测
+
+- is_nearfield_voice: 固定RMS阈值判定
+- AdaptiveNearfieldFilter: 按会话跟踪噪声底与语音电平的自适应判定
+- NearfieldProfileStore: 批量分析工具（scripts/analyze_audio_rms.py --batch）生成的
+  按设备/声道的过滤配置，按 appkey 选择，用于初始化自适应过滤器
 """
 
+import json
+import os
+import threading
 import numpy as np
 import logging
-from typing import Tuple, Dict
+from typing import Tuple, Dict, Optional
+
+from ..core.config import settings
 
 logger = logging.getLogger(__name__)
 
@@ -62,3 +72,280 @@ def is_nearfield_voice(
     }
 
     return is_nearfield, metrics
+
+
+class AdaptiveNearfieldFilter:
+    """单会话自适应近场过滤器
+
+    固定 RMS 阈值难以兼顾不同耳机/麦克风的增益差异。本过滤器为每个会话跟踪两个指数统计量：
+
+    1. 噪声底 noise_floor：每个chunk取子帧能量的低分位数作为噪声估计，
+       下降快（环境变安静时立即跟随）、上升慢（近场chunk中更慢，说话不会把噪声底抬高）
+    2. 近场语音电平 speech_level：判定为近场的chunk中，有效子帧能量的指数平均（上升慢、下降快），
+       判定为远场的chunk中向噪声底衰减，单次大音量瞬态不会长期抬高阈值
+
+    判定阈值 = max(噪声底 × noise_ratio, min(语音电平 × speech_ratio, 初始阈值 × SPEECH_THRESHOLD_CAP),
+    min_rms)，语音电平项不超过初始阈值的 SPEECH_THRESHOLD_CAP 倍；句子进行中乘以
+    ACTIVE_THRESHOLD_FACTOR 容忍音量波动。chunk 按10ms子帧一次性向量化计算能量，
+    超过阈值的子帧占比达到 min_active_ratio 时判定为近场声音。
+
+    统计量随会话保存（可序列化），断线续传后继续使用。
+    """
+
+    __slots__ = (
+        "noise_ratio",
+        "speech_ratio",
+        "min_rms",
+        "min_active_ratio",
+        "noise_floor",
+        "speech_level",
+        "speech_threshold_cap",
+        "chunks",
+        "filtered",
+    )
+
+    # 子帧时长（ms）
+    SUBFRAME_MS = 10
+    # 噪声估计使用的子帧能量分位数
+    NOISE_PERCENTILE = 10
+    # 噪声底指数平均系数：下降快、上升慢；近场chunk中上升更慢，避免持续说话抬高噪声底
+    NOISE_ALPHA_DOWN = 0.5
+    NOISE_ALPHA_UP = 0.05
+    NOISE_ALPHA_UP_SPEECH = 0.005
+    # 语音电平指数平均系数：上升慢、下降快；远场chunk中向噪声底衰减的系数
+    SPEECH_ALPHA_UP = 0.05
+    SPEECH_ALPHA_DOWN = 0.2
+    SPEECH_DECAY = 0.05
+    # 语音电平项阈值上限（初始阈值的倍数）
+    SPEECH_THRESHOLD_CAP = 2.0
+    # 句子进行中的阈值系数
+    ACTIVE_THRESHOLD_FACTOR = 0.6
+
+    def __init__(
+        self,
+        initial_threshold: float = 0.01,
+        noise_ratio: float = 3.0,
+        speech_ratio: float = 0.25,
+        min_rms: float = 0.003,
+        min_active_ratio: float = 0.2,
+        noise_floor: Optional[float] = None,
+        speech_level: float = 0.0,
+    ):
+        self.noise_ratio = max(1.0, noise_ratio)
+        self.speech_ratio = max(0.0, speech_ratio)
+        self.min_rms = max(0.0, min_rms)
+        self.min_active_ratio = min(max(min_active_ratio, 0.0), 1.0)
+        # 初始噪声底使首个chunk的阈值等于固定阈值，随后按实际噪声自适应；
+        # 有设备配置时直接使用校准得到的噪声底与语音电平
+        if noise_floor is None:
+            noise_floor = initial_threshold / self.noise_ratio
+        self.noise_floor = max(0.0, noise_floor)
+        self.speech_level = max(0.0, speech_level)
+        self.speech_threshold_cap = max(initial_threshold, self.min_rms) * self.SPEECH_THRESHOLD_CAP
+        self.chunks = 0
+        self.filtered = 0
+
+    def __getstate__(self) -> dict:
+        return {name: getattr(self, name) for name in self.__slots__}
+
+    def __setstate__(self, state: dict) -> None:
+        for name in self.__slots__:
+            setattr(self, name, state.get(name))
+        if self.speech_threshold_cap is None:
+            # 旧版本保存的快照没有上限，按全局固定阈值补齐
+            self.speech_threshold_cap = (
+                settings.ASR_NEARFIELD_RMS_THRESHOLD * self.SPEECH_THRESHOLD_CAP
+            )
+
+    def threshold(self, sentence_active: bool = False) -> float:
+        """当前判定阈值"""
+        threshold = max(
+            self.noise_floor * self.noise_ratio,
+            min(self.speech_level * self.speech_ratio, self.speech_threshold_cap),
+            self.min_rms,
+        )
+        if sentence_active:
+            threshold *= self.ACTIVE_THRESHOLD_FACTOR
+        return threshold
+
+    @classmethod
+    def subframe_energies(cls, audio_array: np.ndarray, sample_rate: int = 16000) -> np.ndarray:
+        """一次性计算所有子帧的RMS能量（不足一个子帧的尾部不参与计算）"""
+        frame = max(1, sample_rate * cls.SUBFRAME_MS // 1000)
+        count = len(audio_array) // frame
+        if count == 0:
+            return np.array([calculate_rms_energy(audio_array)], dtype=np.float32)
+        frames = np.asarray(audio_array[: count * frame], dtype=np.float32).reshape(count, frame)
+        return np.sqrt(np.einsum("ij,ij->i", frames, frames) / frame)
+
+    def process(
+        self,
+        audio_array: np.ndarray,
+        sample_rate: int = 16000,
+        sentence_active: bool = False,
+    ) -> Tuple[bool, Dict]:
+        """判断一个chunk是否为近场声音，并更新噪声底与语音电平
+
+        Returns:
+            (is_nearfield, metrics): 是否近场声音 + 检测指标详情
+        """
+        if len(audio_array) == 0:
+            return False, {'error': 'empty_array'}
+
+        energies = self.subframe_energies(audio_array, sample_rate)
+        threshold = self.threshold(sentence_active)
+        active = energies >= threshold
+        active_ratio = float(np.count_nonzero(active)) / len(energies)
+        is_nearfield = active_ratio >= self.min_active_ratio and bool(active.any())
+
+        # 噪声底：低分位数估计，下降快、上升慢
+        noise_estimate = float(np.percentile(energies, self.NOISE_PERCENTILE))
+        if noise_estimate < self.noise_floor:
+            alpha = self.NOISE_ALPHA_DOWN
+        elif is_nearfield:
+            alpha = self.NOISE_ALPHA_UP_SPEECH
+        else:
+            alpha = self.NOISE_ALPHA_UP
+        self.noise_floor += alpha * (noise_estimate - self.noise_floor)
+
+        # 语音电平：由近场chunk中的有效子帧更新（上升慢、下降快），远场chunk中向噪声底衰减
+        if is_nearfield:
+            speech_estimate = float(np.mean(energies[active]))
+            if self.speech_level == 0.0:
+                alpha = 1.0
+            elif speech_estimate > self.speech_level:
+                alpha = self.SPEECH_ALPHA_UP
+            else:
+                alpha = self.SPEECH_ALPHA_DOWN
+            self.speech_level += alpha * (speech_estimate - self.speech_level)
+        elif self.speech_level > self.noise_floor:
+            self.speech_level += self.SPEECH_DECAY * (self.noise_floor - self.speech_level)
+
+        self.chunks += 1
+        if not is_nearfield:
+            self.filtered += 1
+
+        metrics = {
+            'rms_energy': round(calculate_rms_energy(audio_array), 6),
+            'is_nearfield': is_nearfield,
+            'active_ratio': round(active_ratio, 3),
+            'noise_floor': round(self.noise_floor, 6),
+            'speech_level': round(self.speech_level, 6),
+            'thresholds': {
+                'rms': round(threshold, 6),
+            }
+        }
+        return is_nearfield, metrics
+
+    def get_stats(self) -> Dict:
+        """过滤统计"""
+        return {
+            'chunks': self.chunks,
+            'filtered': self.filtered,
+            'noise_floor': round(self.noise_floor, 6),
+            'speech_level': round(self.speech_level, 6),
+        }
+
+
+# 过滤配置中可覆盖的过滤器参数
+_PROFILE_FILTER_KEYS = (
+    "initial_threshold",
+    "noise_ratio",
+    "speech_ratio",
+    "min_rms",
+    "min_active_ratio",
+    "noise_floor",
+    "speech_level",
+)
+
+
+class NearfieldProfileStore:
+    """按设备/声道的远场过滤配置，文件修改后自动重新加载
+
+    文件格式（由批量分析工具生成）::
+
+        {"version": 1, "profiles": {"<appkey或设备名>": {"mix": {...}, "ch0": {...}}}}
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._profiles: Dict[str, Dict[str, dict]] = {}
+        self._mtime: Optional[float] = None
+        self._lock = threading.Lock()
+
+    def _reload_if_changed(self) -> None:
+        try:
+            mtime = os.path.getmtime(self.path)
+        except OSError:
+            if self._mtime is not None:
+                logger.warning(f"远场过滤配置文件不可访问: {self.path}")
+            return
+        if mtime == self._mtime:
+            return
+
+        with self._lock:
+            if mtime == self._mtime:
+                return
+            try:
+                with open(self.path, "r", encoding="utf-8") as f:
+                    document = json.load(f)
+                profiles = document.get("profiles", {})
+                if not isinstance(profiles, dict):
+                    raise ValueError("profiles 必须是对象")
+                self._profiles = profiles
+                logger.info(f"远场过滤配置已加载: {self.path}，共 {len(profiles)} 个设备")
+            except Exception as e:
+                logger.warning(f"远场过滤配置加载失败，沿用已加载的配置: {e}")
+            self._mtime = mtime
+
+    def get(self, name: Optional[str], channel: Optional[str] = None) -> Optional[dict]:
+        """查找配置：未找到 name 时使用 default，未找到声道时使用 mix"""
+        self._reload_if_changed()
+        channels = self._profiles.get(name) if name else None
+        if channels is None:
+            channels = self._profiles.get("default")
+        if not channels:
+            return None
+        profile = channels.get(channel or "mix") or channels.get("mix")
+        if not profile:
+            return None
+        return {key: float(profile[key]) for key in _PROFILE_FILTER_KEYS if key in profile}
+
+    def names(self):
+        self._reload_if_changed()
+        return list(self._profiles)
+
+
+# 全局过滤配置实例
+_nearfield_profile_store: Optional[NearfieldProfileStore] = None
+
+
+def get_nearfield_profile_store() -> Optional[NearfieldProfileStore]:
+    """获取全局远场过滤配置，未配置 ASR_NEARFIELD_PROFILES_FILE 时返回None"""
+    global _nearfield_profile_store
+    if _nearfield_profile_store is None and settings.ASR_NEARFIELD_PROFILES_FILE:
+        _nearfield_profile_store = NearfieldProfileStore(settings.ASR_NEARFIELD_PROFILES_FILE)
+    return _nearfield_profile_store
+
+
+def create_nearfield_filter(
+    profile_name: Optional[str] = None, channel: Optional[str] = None
+) -> Optional[AdaptiveNearfieldFilter]:
+    """按全局配置与设备配置创建会话的自适应过滤器，未启用时返回None"""
+    if not (settings.ASR_ENABLE_NEARFIELD_FILTER and settings.ASR_NEARFIELD_ADAPTIVE):
+        return None
+
+    options = {
+        "initial_threshold": settings.ASR_NEARFIELD_RMS_THRESHOLD,
+        "noise_ratio": settings.ASR_NEARFIELD_NOISE_RATIO,
+        "speech_ratio": settings.ASR_NEARFIELD_SPEECH_RATIO,
+        "min_rms": settings.ASR_NEARFIELD_MIN_RMS,
+        "min_active_ratio": settings.ASR_NEARFIELD_MIN_ACTIVE_RATIO,
+    }
+    store = get_nearfield_profile_store()
+    if store is not None:
+        profile = store.get(profile_name, channel)
+        if profile:
+            options.update(profile)
+            logger.debug(f"使用远场过滤配置: {profile_name or 'default'}/{channel or 'mix'}")
+    return AdaptiveNearfieldFilter(**options)
@@ -0,0 +1,181 @@
+# -*- coding: utf-8 -*-
+"""
+离线识别能量预筛
+
+在音频解码（标准化为WAV）之后、进入 VAD/ASR/标点模型之前，对整段音频做一次向量化的
+分帧能量统计：
+
+1. 有效语音（帧RMS超过阈值）总时长不足 ASR_PRESCREEN_MIN_SPEECH_MS 时直接返回空结果，
+   不调用 VAD/ASR/标点模型（空语音信箱、无声录音等）
+2. 首尾静音超过 ASR_PRESCREEN_TRIM_MIN_S 时裁掉（两端各保留 ASR_PRESCREEN_TRIM_PADDING_MS），
+   裁剪后的音频写入临时文件，识别结果的时间戳按偏移量还原到原始时间轴
+3. 跳过与裁剪次数、节省的音频时长计入统计，在健康检查中展示
+"""
+
+import logging
+import os
+import tempfile
+import threading
+from dataclasses import dataclass
+from typing import Optional
+
+import numpy as np
+import soundfile as sf
+
+from ..core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# 分帧时长（ms）
+PRESCREEN_FRAME_MS = 10
+
+# 按块读取的时长（秒），避免长音频一次性载入内存
+_READ_BLOCK_S = 60
+
+
+@dataclass
+class PrescreenResult:
+    """能量预筛结果"""
+
+    duration: float  # 原始音频时长（秒）
+    speech_sec: float  # 有效语音总时长（秒）
+    skip: bool = False  # 是否跳过识别（直接返回空结果）
+    trimmed_path: Optional[str] = None  # 裁剪后的临时文件，未裁剪时为None
+    offset_sec: float = 0.0  # 裁剪后音频在原始时间轴上的起点（秒）
+    trimmed_duration: Optional[float] = None  # 裁剪后音频时长（秒）
+
+
+class _PrescreenStats:
+    """预筛统计（线程池中并发更新）"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._stats = {
+            "checked": 0,
+            "skipped": 0,
+            "trimmed": 0,
+            "errors": 0,
+            "skipped_audio_s": 0.0,
+            "trimmed_audio_s": 0.0,
+        }
+
+    def record(self, key: str, audio_s: float = 0.0) -> None:
+        with self._lock:
+            self._stats[key] += 1
+            if key in ("skipped", "trimmed"):
+                self._stats[f"{key}_audio_s"] += audio_s
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            stats = dict(self._stats)
+        stats["skipped_audio_s"] = round(stats["skipped_audio_s"], 1)
+        stats["trimmed_audio_s"] = round(stats["trimmed_audio_s"], 1)
+        return stats
+
+
+_stats = _PrescreenStats()
+
+
+def frame_rms(audio: np.ndarray, frame_samples: int) -> np.ndarray:
+    """一次性计算所有完整帧的RMS能量"""
+    count = len(audio) // frame_samples
+    if count == 0:
+        return np.zeros(0, dtype=np.float32)
+    frames = audio[: count * frame_samples].reshape(count, frame_samples)
+    return np.sqrt(np.einsum("ij,ij->i", frames, frames) / frame_samples)
+
+
+def _read_frame_energies(audio_path: str):
+    """按块读取音频并计算分帧RMS，返回 (帧能量, 采样率, 总样本数)"""
+    info = sf.info(audio_path)
+    sample_rate = info.samplerate
+    frame_samples = max(1, sample_rate * PRESCREEN_FRAME_MS // 1000)
+    # 块大小取帧长的整数倍，保证分帧不跨块
+    block_samples = (sample_rate * _READ_BLOCK_S // frame_samples) * frame_samples
+
+    energies = []
+    total_samples = 0
+    for block in sf.blocks(audio_path, blocksize=block_samples, dtype="float32", always_2d=True):
+        mono = block[:, 0] if block.shape[1] == 1 else block.mean(axis=1)
+        energies.append(frame_rms(mono, frame_samples))
+        total_samples += len(block)
+
+    energies = np.concatenate(energies) if energies else np.zeros(0, dtype=np.float32)
+    return energies, sample_rate, total_samples
+
+
+def _write_trimmed(audio_path: str, start: int, stop: int) -> str:
+    """将 [start, stop) 样本写入临时WAV文件"""
+    audio, sample_rate = sf.read(audio_path, start=start, stop=stop, dtype="float32")
+    with tempfile.NamedTemporaryFile(
+        delete=False, suffix=".wav", prefix="prescreen_", dir=settings.TEMP_DIR
+    ) as temp_file:
+        trimmed_path = temp_file.name
+    sf.write(trimmed_path, audio, sample_rate, subtype="PCM_16")
+    return trimmed_path
+
+
+def prescreen_audio_file(audio_path: str) -> Optional[PrescreenResult]:
+    """对标准化后的音频做能量预筛，读取失败时返回None（按原流程识别）"""
+    try:
+        energies, sample_rate, total_samples = _read_frame_energies(audio_path)
+    except Exception as e:
+        logger.warning(f"能量预筛读取音频失败，跳过预筛: {e}")
+        _stats.record("errors")
+        return None
+
+    _stats.record("checked")
+    duration = total_samples / sample_rate if sample_rate else 0.0
+    frame_sec = PRESCREEN_FRAME_MS / 1000
+    active = np.flatnonzero(energies >= settings.ASR_PRESCREEN_RMS_THRESHOLD)
+    speech_sec = len(active) * frame_sec
+    result = PrescreenResult(duration=duration, speech_sec=speech_sec)
+
+    if speech_sec * 1000 < settings.ASR_PRESCREEN_MIN_SPEECH_MS:
+        result.skip = True
+        _stats.record("skipped", duration)
+        logger.info(f"能量预筛: 有效语音 {speech_sec:.2f}s，跳过识别 (音频 {duration:.1f}s)")
+        return result
+
+    padding_sec = settings.ASR_PRESCREEN_TRIM_PADDING_MS / 1000
+    start_sec = max(0.0, active[0] * frame_sec - padding_sec)
+    end_sec = min(duration, (active[-1] + 1) * frame_sec + padding_sec)
+    trim_min_s = settings.ASR_PRESCREEN_TRIM_MIN_S
+    if start_sec < trim_min_s:
+        start_sec = 0.0
+    if duration - end_sec < trim_min_s:
+        end_sec = duration
+    if start_sec == 0.0 and end_sec == duration:
+        return result
+
+    start = int(start_sec * sample_rate)
+    stop = min(total_samples, int(round(end_sec * sample_rate)))
+    try:
+        result.trimmed_path = _write_trimmed(audio_path, start, stop)
+    except Exception as e:
+        logger.warning(f"能量预筛写入裁剪音频失败，使用原始音频: {e}")
+        _stats.record("errors")
+        return result
+
+    result.offset_sec = start / sample_rate
+    result.trimmed_duration = (stop - start) / sample_rate
+    _stats.record("trimmed", duration - result.trimmed_duration)
+    logger.info(
+        f"能量预筛: 裁剪首尾静音 {duration:.1f}s -> {result.trimmed_duration:.1f}s "
+        f"(起点 {result.offset_sec:.2f}s)"
+    )
+    return result
+
+
+def cleanup_prescreen(result: Optional[PrescreenResult]) -> None:
+    """删除裁剪产生的临时文件"""
+    if result is not None and result.trimmed_path:
+        try:
+            os.remove(result.trimmed_path)
+        except OSError:
+            pass
+
+
+def get_prescreen_stats() -> dict:
+    """能量预筛统计"""
+    return {"enabled": settings.ASR_PRESCREEN_ENABLED, **_stats.snapshot()}
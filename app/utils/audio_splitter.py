@@ -6,7 +6,6 @@
 
 import logging
 import numpy as np
-import librosa
 import soundfile as sf
 import tempfile
 import os
@@ -15,6 +14,7 @@ from dataclasses import dataclass
 
 from ..core.config import settings
 from ..core.exceptions import DefaultServerErrorException
+from .audio import load_audio_file
 
 logger = logging.getLogger(__name__)
 
@@ -65,6 +65,7 @@ class AudioSplitter:
         max_segment_sec: float = DEFAULT_MAX_SEGMENT_SEC,
         min_segment_sec: float = DEFAULT_MIN_SEGMENT_SEC,
         device: str = "auto",
+        vad_model=None,
     ):
         """初始化音频分割器
 
@@ -72,12 +73,14 @@ class AudioSplitter:
             max_segment_sec: 每段最大时长（秒）
             min_segment_sec: 每段最小时长（秒）
             device: 计算设备
+            vad_model: VAD模型（AutoModel兼容接口），为None时使用全局VAD模型
         """
         self.max_segment_sec = max_segment_sec
         self.min_segment_sec = min_segment_sec
         self.max_segment_ms = int(max_segment_sec * 1000)
         self.min_segment_ms = int(min_segment_sec * 1000)
         self.device = device
+        self.vad_model = vad_model
 
     def get_vad_segments(
         self, audio_path: str
@@ -94,7 +97,7 @@ class AudioSplitter:
             from ..services.asr.engine import get_global_vad_model
 
             logger.info("开始 VAD 语音段检测...")
-            vad_model = get_global_vad_model(self.device)
+            vad_model = self.vad_model or get_global_vad_model(self.device)
             if vad_model is None:
                 raise DefaultServerErrorException("VAD 模型未加载")
 
@@ -251,7 +254,7 @@ class AudioSplitter:
         """
         try:
             # 加载音频
-            audio_data, sr = librosa.load(audio_path, sr=self.DEFAULT_SAMPLE_RATE)
+            audio_data, sr = load_audio_file(audio_path, target_sr=self.DEFAULT_SAMPLE_RATE)
             total_duration_ms = int(len(audio_data) / sr * 1000)
 
             logger.info(f"音频总时长: {total_duration_ms / 1000:.2f}秒")
@@ -2,13 +2,25 @@
 """
 模型预加载工具
 在应用启动时预加载所有需要的模型,避免首次请求时的延迟
+
+各模型按依赖关系并行加载：默认/自定义ASR模型、VAD、离线/实时标点互不依赖，
+仅当默认引擎提供自己的辅助模型实现（如 funasr-onnx 加载ONNX版VAD/标点）时，
+辅助模型需等待默认引擎加载完成。同时加载的模型数受 MODEL_LOAD_CONCURRENCY 限制。
 """
 
 import logging
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Callable, Dict, Tuple
 
 logger = logging.getLogger(__name__)
 
 
+def _format_seconds(status: dict) -> str:
+    seconds = status.get("seconds")
+    return f" ({seconds:.1f}s)" if seconds is not None else ""
+
+
 def print_model_statistics(result: dict, use_logger: bool = True):
     """
     打印模型加载统计信息
@@ -31,7 +43,9 @@ def print_model_statistics(result: dict, use_logger: bool = True):
     if result["asr_default_model"]["loaded"]:
         model_id = result["asr_default_model"]["model_id"]
         loaded_models.append(f"默认ASR模型({model_id})")
-        output(f"   ✅ 默认ASR模型({model_id}): 已加载")
+        output(
+            f"   ✅ 默认ASR模型({model_id}): 已加载{_format_seconds(result['asr_default_model'])}"
+        )
     elif result["asr_default_model"]["error"] is not None:
         failed_models.append("默认ASR模型")
         if use_logger:
@@ -43,7 +57,7 @@ def print_model_statistics(result: dict, use_logger: bool = True):
     for model_id, status in result["asr_custom_models"].items():
         if status["loaded"]:
             loaded_models.append(f"自定义ASR模型({model_id})")
-            output(f"   ✅ 自定义ASR模型({model_id}): 已加载")
+            output(f"   ✅ 自定义ASR模型({model_id}): 已加载{_format_seconds(status)}")
         elif status["error"] is not None:
             failed_models.append(f"自定义ASR模型({model_id})")
             if use_logger:
@@ -61,7 +75,7 @@ def print_model_statistics(result: dict, use_logger: bool = True):
     for key, name in other_models.items():
         if result[key]["loaded"]:
             loaded_models.append(name)
-            output(f"   ✅ {name}: 已加载")
+            output(f"   ✅ {name}: 已加载{_format_seconds(result[key])}")
         elif result[key]["error"] is not None:
             failed_models.append(name)
             if use_logger:
@@ -95,15 +109,64 @@ def print_model_statistics(result: dict, use_logger: bool = True):
         else:
             output("⚠️  没有模型被加载")
 
+    timing = result.get("timing")
+    if timing:
+        output(
+            f"⏱️  加载耗时: {timing['wall_seconds']:.1f}s，各模型累计 {timing['serial_seconds']:.1f}s，"
+            f"并行节省 {timing['saved_seconds']:.1f}s (并发上限: {timing['concurrency']})"
+        )
+
     output("=" * 60)
 
 
+class _PreloadTask:
+    """预加载计划中的一项：加载函数及其依赖的任务"""
+
+    def __init__(self, key: str, func: Callable[[], None], deps: Tuple[str, ...] = ()):
+        self.key = key
+        self.func = func
+        self.deps = deps
+
+
+def _run_preload_plan(tasks: Dict[str, _PreloadTask], concurrency: int) -> Dict[str, float]:
+    """按依赖关系执行预加载任务，依赖完成（无论成败）后才提交任务，返回各任务耗时（秒）
+
+    任务函数自行记录加载结果与错误，这里只负责调度和计时。
+    """
+    pending = dict(tasks)
+    finished: set = set()
+    seconds: Dict[str, float] = {}
+
+    def timed(task: _PreloadTask) -> None:
+        start = time.perf_counter()
+        try:
+            task.func()
+        finally:
+            seconds[task.key] = time.perf_counter() - start
+
+    with ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="preload") as executor:
+        running = {}
+        while pending or running:
+            for key in [k for k, t in pending.items() if all(d in finished for d in t.deps)]:
+                running[executor.submit(timed, pending.pop(key))] = key
+            if not running:
+                # 依赖不存在于计划中，无法满足
+                raise RuntimeError(f"预加载计划存在无法满足的依赖: {', '.join(pending)}")
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                key = running.pop(future)
+                finished.add(key)
+                if future.exception() is not None:
+                    logger.error(f"❌ 预加载任务 {key} 异常: {future.exception()}")
+    return seconds
+
+
 def preload_models() -> dict:
     """
     预加载所有需要的模型
 
     Returns:
-        dict: 包含加载状态的字典
+        dict: 包含加载状态的字典（各模型含加载耗时 seconds，timing 为整体耗时统计）
     """
     result = {
         "asr_default_model": {"loaded": False, "error": None, "model_id": None},
@@ -114,106 +177,102 @@ def preload_models() -> dict:
     }
 
     from ..core.config import settings
+    from ..services.asr.engine import detect_device
+    from ..services.asr.loading import get_load_concurrency, get_load_stats
+    from ..services.asr.manager import get_model_manager
 
-    # 初始化变量，避免未绑定错误
-    asr_engine = None
+    # 默认引擎实例，辅助模型优先使用引擎对应的实现
+    loaded = {"asr_engine": None}
 
     logger.info("=" * 60)
     logger.info("🔄 开始预加载模型...")
     logger.info("=" * 60)
 
-    # 1. 预加载默认ASR模型
-    try:
-        logger.info("📥 正在加载默认ASR模型...")
-        from ..services.asr.manager import get_model_manager
-
-        model_manager = get_model_manager()
-        asr_engine = model_manager.get_asr_engine()  # 加载默认模型
-
-        if asr_engine.is_model_loaded():
-            default_model_id = model_manager._default_model_id
-            result["asr_default_model"]["loaded"] = True
-            result["asr_default_model"]["model_id"] = default_model_id
-            logger.info(f"✅ 默认ASR模型加载成功: {default_model_id}")
-
-            # 根据ASR_MODEL_MODE显示加载的模型类型
-            mode = settings.ASR_MODEL_MODE.lower()
-            if mode == "all":
-                logger.info(
-                    f"   - 离线模型: {'✓' if getattr(asr_engine, 'offline_model', None) else '✗'}"
-                )
-                logger.info(
-                    f"   - 实时模型: {'✓' if getattr(asr_engine, 'realtime_model', None) else '✗'}"
-                )
-            elif mode == "offline":
-                logger.info("   - 离线模型: ✓")
-            elif mode == "realtime":
-                logger.info("   - 实时模型: ✓")
-        else:
-            result["asr_default_model"]["error"] = "ASR模型加载后未正确初始化"
-            logger.warning("⚠️  默认ASR模型加载后未正确初始化")
+    # 检测CPU的bf16支持，precision 为 bf16 的模型据此决定是否启用
+    from ..services.asr.precision import detect_cpu_bf16_support
 
-    except Exception as e:
-        result["asr_default_model"]["error"] = str(e)
-        logger.error(f"❌ 默认ASR模型加载失败: {e}")
+    detect_cpu_bf16_support()
 
-    # 2. 预加载自定义ASR模型（如果配置了AUTO_LOAD_CUSTOM_ASR_MODELS）
-    if settings.AUTO_LOAD_CUSTOM_ASR_MODELS:
-        custom_model_ids = [
-            m.strip()
-            for m in settings.AUTO_LOAD_CUSTOM_ASR_MODELS.split(",")
-            if m.strip()
-        ]
+    aux_device = detect_device(settings.DEVICE)
 
-        logger.info(
-            f"📥 配置了自定义ASR模型加载: {', '.join(custom_model_ids)}"
-        )
+    # 1. 预加载默认ASR模型
+    def load_default_asr() -> None:
+        try:
+            logger.info("📥 正在加载默认ASR模型...")
+            model_manager = get_model_manager()
+            asr_engine = model_manager.get_asr_engine()  # 加载默认模型
+
+            if asr_engine.is_model_loaded():
+                loaded["asr_engine"] = asr_engine
+                default_model_id = model_manager._default_model_id
+                result["asr_default_model"]["loaded"] = True
+                result["asr_default_model"]["model_id"] = default_model_id
+                logger.info(f"✅ 默认ASR模型加载成功: {default_model_id}")
+
+                # 根据ASR_MODEL_MODE显示加载的模型类型
+                mode = settings.ASR_MODEL_MODE.lower()
+                if mode == "all":
+                    logger.info(
+                        f"   - 离线模型: {'✓' if getattr(asr_engine, 'offline_model', None) else '✗'}"
+                    )
+                    logger.info(
+                        f"   - 实时模型: {'✓' if getattr(asr_engine, 'realtime_model', None) else '✗'}"
+                    )
+                elif mode == "offline":
+                    logger.info("   - 离线模型: ✓")
+                elif mode == "realtime":
+                    logger.info("   - 实时模型: ✓")
+            else:
+                result["asr_default_model"]["error"] = "ASR模型加载后未正确初始化"
+                logger.warning("⚠️  默认ASR模型加载后未正确初始化")
 
-        for model_id in custom_model_ids:
-            result["asr_custom_models"][model_id] = {"loaded": False, "error": None}
+        except Exception as e:
+            result["asr_default_model"]["error"] = str(e)
+            logger.error(f"❌ 默认ASR模型加载失败: {e}")
+
+    # 2. 预加载自定义ASR模型（如果配置了AUTO_LOAD_CUSTOM_ASR_MODELS）
+    def load_custom_asr(model_id: str) -> None:
+        try:
+            logger.info(f"📥 正在加载自定义ASR模型: {model_id}...")
+            model_manager = get_model_manager()
 
+            # 检查模型是否在配置中
             try:
-                logger.info(f"📥 正在加载自定义ASR模型: {model_id}...")
-                from ..services.asr.manager import get_model_manager
+                model_config = model_manager.get_model_config(model_id)
+            except Exception as config_error:
+                result["asr_custom_models"][model_id]["error"] = (
+                    f"模型配置不存在: {config_error}"
+                )
+                logger.error(f"❌ 自定义ASR模型 {model_id} 配置不存在: {config_error}")
+                return
 
-                model_manager = get_model_manager()
+            # 加载模型
+            custom_engine = model_manager.get_asr_engine(model_id)
 
-                # 检查模型是否在配置中
-                try:
-                    model_config = model_manager.get_model_config(model_id)
-                except Exception as config_error:
-                    result["asr_custom_models"][model_id]["error"] = (
-                        f"模型配置不存在: {config_error}"
-                    )
-                    logger.error(f"❌ 自定义ASR模型 {model_id} 配置不存在: {config_error}")
-                    continue
-
-                # 加载模型
-                custom_engine = model_manager.get_asr_engine(model_id)
-
-                if custom_engine.is_model_loaded():
-                    result["asr_custom_models"][model_id]["loaded"] = True
-                    logger.info(f"✅ 自定义ASR模型加载成功: {model_id}")
-                    logger.info(f"   - 引擎: {model_config.engine}")
-                    logger.info(f"   - 支持实时: {model_config.supports_realtime}")
-                else:
-                    result["asr_custom_models"][model_id]["error"] = "模型加载后未正确初始化"
-                    logger.warning(f"⚠️  自定义ASR模型 {model_id} 加载后未正确初始化")
-
-            except Exception as e:
-                result["asr_custom_models"][model_id]["error"] = str(e)
-                logger.error(f"❌ 自定义ASR模型 {model_id} 加载失败: {e}")
-    else:
-        logger.info("⏭️  未配置自定义ASR模型加载 (AUTO_LOAD_CUSTOM_ASR_MODELS为空)")
+            if custom_engine.is_model_loaded():
+                result["asr_custom_models"][model_id]["loaded"] = True
+                logger.info(f"✅ 自定义ASR模型加载成功: {model_id}")
+                logger.info(f"   - 引擎: {model_config.engine}")
+                logger.info(f"   - 支持实时: {model_config.supports_realtime}")
+            else:
+                result["asr_custom_models"][model_id]["error"] = "模型加载后未正确初始化"
+                logger.warning(f"⚠️  自定义ASR模型 {model_id} 加载后未正确初始化")
+
+        except Exception as e:
+            result["asr_custom_models"][model_id]["error"] = str(e)
+            logger.error(f"❌ 自定义ASR模型 {model_id} 加载失败: {e}")
 
     # 3. 预加载VAD模型 (如果ASR模式包含离线模型)
-    if settings.ASR_MODEL_MODE.lower() in ["all", "offline"]:
+    def load_vad() -> None:
         try:
             logger.info("📥 正在加载VAD模型...")
             from ..services.asr.engine import get_global_vad_model
 
-            device = asr_engine.device if asr_engine else settings.DEVICE
-            vad_model = get_global_vad_model(device)
+            # 使用引擎对应的模型（如 funasr-onnx 引擎加载ONNX版本）
+            if loaded["asr_engine"]:
+                vad_model = loaded["asr_engine"].get_vad_model()
+            else:
+                vad_model = get_global_vad_model(aux_device)
 
             if vad_model:
                 result["vad_model"]["loaded"] = True
@@ -225,36 +284,39 @@ def preload_models() -> dict:
         except Exception as e:
             result["vad_model"]["error"] = str(e)
             logger.error(f"❌ VAD模型加载失败: {e}")
-    else:
-        logger.info("⏭️  跳过VAD模型加载 (ASR_MODEL_MODE=realtime)")
 
     # 4. 预加载标点符号模型 (离线版)
-    try:
-        logger.info("📥 正在加载标点符号模型(离线)...")
-        from ..services.asr.engine import get_global_punc_model
+    def load_punc() -> None:
+        try:
+            logger.info("📥 正在加载标点符号模型(离线)...")
+            from ..services.asr.engine import get_global_punc_model
 
-        device = asr_engine.device if asr_engine else settings.DEVICE
-        punc_model = get_global_punc_model(device)
+            if loaded["asr_engine"]:
+                punc_model = loaded["asr_engine"].get_punc_model()
+            else:
+                punc_model = get_global_punc_model(aux_device)
 
-        if punc_model:
-            result["punc_model"]["loaded"] = True
-            logger.info("✅ 标点符号模型(离线)加载成功")
-        else:
-            result["punc_model"]["error"] = "标点符号模型加载后返回None"
-            logger.warning("⚠️  标点符号模型(离线)加载后返回None")
+            if punc_model:
+                result["punc_model"]["loaded"] = True
+                logger.info("✅ 标点符号模型(离线)加载成功")
+            else:
+                result["punc_model"]["error"] = "标点符号模型加载后返回None"
+                logger.warning("⚠️  标点符号模型(离线)加载后返回None")
 
-    except Exception as e:
-        result["punc_model"]["error"] = str(e)
-        logger.error(f"❌ 标点符号模型(离线)加载失败: {e}")
+        except Exception as e:
+            result["punc_model"]["error"] = str(e)
+            logger.error(f"❌ 标点符号模型(离线)加载失败: {e}")
 
     # 5. 预加载实时标点符号模型 (如果启用)
-    if settings.ASR_ENABLE_REALTIME_PUNC:
+    def load_punc_realtime() -> None:
         try:
             logger.info("📥 正在加载实时标点符号模型...")
             from ..services.asr.engine import get_global_punc_realtime_model
 
-            device = asr_engine.device if asr_engine else settings.DEVICE
-            punc_realtime_model = get_global_punc_realtime_model(device)
+            if loaded["asr_engine"]:
+                punc_realtime_model = loaded["asr_engine"].get_punc_model(realtime=True)
+            else:
+                punc_realtime_model = get_global_punc_realtime_model(aux_device)
 
             if punc_realtime_model:
                 result["punc_realtime_model"]["loaded"] = True
@@ -266,9 +328,82 @@ def preload_models() -> dict:
         except Exception as e:
             result["punc_realtime_model"]["error"] = str(e)
             logger.error(f"❌ 实时标点符号模型加载失败: {e}")
+
+    # funasr 引擎的辅助模型即全局PyTorch实例，可与默认引擎同时加载；
+    # 其他引擎（如 funasr-onnx）提供自己的实现，需等默认引擎加载完成。
+    # 同时在并发加载前创建模型管理器单例
+    try:
+        default_engine_type = get_model_manager().get_model_config().engine.lower()
+    except Exception:
+        default_engine_type = "funasr"
+    aux_deps = () if default_engine_type == "funasr" else ("asr_default_model",)
+
+    tasks = {"asr_default_model": _PreloadTask("asr_default_model", load_default_asr)}
+
+    if settings.AUTO_LOAD_CUSTOM_ASR_MODELS:
+        custom_model_ids = [
+            m.strip()
+            for m in settings.AUTO_LOAD_CUSTOM_ASR_MODELS.split(",")
+            if m.strip()
+        ]
+
+        logger.info(
+            f"📥 配置了自定义ASR模型加载: {', '.join(custom_model_ids)}"
+        )
+
+        for model_id in custom_model_ids:
+            result["asr_custom_models"][model_id] = {"loaded": False, "error": None}
+            key = f"asr_custom_models/{model_id}"
+            tasks[key] = _PreloadTask(key, lambda m=model_id: load_custom_asr(m))
+    else:
+        logger.info("⏭️  未配置自定义ASR模型加载 (AUTO_LOAD_CUSTOM_ASR_MODELS为空)")
+
+    if settings.ASR_MODEL_MODE.lower() in ["all", "offline"]:
+        tasks["vad_model"] = _PreloadTask("vad_model", load_vad, aux_deps)
+    else:
+        logger.info("⏭️  跳过VAD模型加载 (ASR_MODEL_MODE=realtime)")
+
+    tasks["punc_model"] = _PreloadTask("punc_model", load_punc, aux_deps)
+
+    if settings.ASR_ENABLE_REALTIME_PUNC:
+        tasks["punc_realtime_model"] = _PreloadTask(
+            "punc_realtime_model", load_punc_realtime, aux_deps
+        )
     else:
         logger.info("⏭️  跳过实时标点符号模型加载 (ASR_ENABLE_REALTIME_PUNC=False)")
 
+    concurrency = get_load_concurrency()
+    logger.info(f"📋 预加载计划: {len(tasks)} 项，并发上限 {concurrency}")
+
+    serial_before = get_load_stats()["total_seconds"]
+    start = time.perf_counter()
+    task_seconds = _run_preload_plan(tasks, concurrency)
+    wall_seconds = time.perf_counter() - start
+    # 各模型单独加载耗时之和，即串行加载所需时间
+    serial_seconds = get_load_stats()["total_seconds"] - serial_before
+
+    for key, seconds in task_seconds.items():
+        if key.startswith("asr_custom_models/"):
+            status = result["asr_custom_models"][key.split("/", 1)[1]]
+        else:
+            status = result[key]
+        status["seconds"] = round(seconds, 3)
+
+    result["timing"] = {
+        "concurrency": concurrency,
+        "wall_seconds": round(wall_seconds, 3),
+        "serial_seconds": round(serial_seconds, 3),
+        "saved_seconds": round(max(serial_seconds - wall_seconds, 0.0), 3),
+    }
+
+    # 6. 预热已加载的模型，结束后服务才标记为就绪
+    from ..services.asr.warmup import run_warmup
+
+    try:
+        run_warmup(get_model_manager().get_loaded_engines())
+    except Exception as e:
+        logger.error(f"❌ 模型预热失败: {e}")
+
     # 打印统计结果到日志
     print_model_statistics(result, use_logger=True)
 
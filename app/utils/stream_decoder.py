@@ -0,0 +1,366 @@
+# -*- coding: utf-8 -*-
+"""
+流式音频解码工具 - 用于WebSocket流式ASR的增量解码
+
+WebSocket 的二进制消息只是任意切分的字节流，不能假设每条消息都是完整的音频文件。
+本模块为每个会话提供一个增量解码器，跨消息保留解码状态：
+
+1. pcm: 16位小端PCM，保留跨消息的半个样本
+2. wav: 增量解析RIFF头（支持分片到达的头部、LIST等附加块、8/16/24/32位整型与32位浮点、
+   多声道下混），之后按数据块流式输出
+3. opus/ogg/webm/mp3/aac/amr: 每个会话一个常驻 ffmpeg 进程，压缩数据写入 stdin，
+   后台线程读取 stdout 的 16kHz 单声道PCM
+
+所有解码器输出 float32 单声道数组（范围-1.0到1.0），sample_rate 属性为输出采样率，
+在尚未解析出采样率时（如WAV头未到齐）为 None。resumable 表示解码器状态能否随会话快照
+序列化（用于断线续传），ffmpeg 解码器持有子进程，不可序列化。blocking 表示 decode/flush
+会读写子进程管道、可能阻塞，调用方应在线程池中调用（close 不阻塞，可直接调用）。
+"""
+
+import logging
+import struct
+import subprocess
+import threading
+from abc import ABC, abstractmethod
+from typing import Optional
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# 压缩格式 -> ffmpeg 输入格式（demuxer）
+_FFMPEG_INPUT_FORMATS = {
+    "opus": "ogg",
+    "ogg": "ogg",
+    "webm": "matroska",
+    "mp3": "mp3",
+    "aac": "aac",
+    "amr": "amr",
+}
+
+# WebSocket 流式识别支持的音频格式
+STREAMING_AUDIO_FORMATS = ("pcm", "wav") + tuple(_FFMPEG_INPUT_FORMATS)
+
+_EMPTY = np.zeros(0, dtype=np.float32)
+
+
+def _pcm16_to_float(data: bytes) -> np.ndarray:
+    """16位小端PCM字节转换为float32数组"""
+    return np.frombuffer(data, dtype="<i2").astype(np.float32) / 32768.0
+
+
+class StreamDecoder(ABC):
+    """增量音频解码器基类"""
+
+    sample_rate: Optional[int] = None
+    resumable: bool = True
+    blocking: bool = False
+
+    @abstractmethod
+    def decode(self, data: bytes) -> np.ndarray:
+        """解码一段字节流，返回当前可用的float32音频（可能为空）"""
+        pass
+
+    def flush(self) -> np.ndarray:
+        """输入结束，返回解码器内部剩余的音频"""
+        return _EMPTY
+
+    def close(self) -> None:
+        """释放解码器资源"""
+        pass
+
+
+class PCMStreamDecoder(StreamDecoder):
+    """16位PCM增量解码器"""
+
+    def __init__(self, sample_rate: int):
+        self.sample_rate = sample_rate
+        self._remainder = b""
+
+    def decode(self, data: bytes) -> np.ndarray:
+        if self._remainder:
+            data = self._remainder + data
+        usable = len(data) - (len(data) % 2)
+        self._remainder = data[usable:]
+        if usable == 0:
+            return _EMPTY
+        return _pcm16_to_float(data[:usable])
+
+
+class WAVStreamDecoder(StreamDecoder):
+    """WAV增量解码器
+
+    按顺序解析 RIFF/WAVE 头、fmt 块，跳过 LIST/fact 等附加块，进入 data 块后流式输出样本。
+    流式写入的WAV通常在 data 块长度处填 0 或 0xFFFFFFFF，因此 data 之后的字节全部视为样本。
+    兼容旧客户端每条消息发送一个完整WAV文件的用法：样本对齐时遇到新的 RIFF 头会重新解析。
+    """
+
+    _WAVE_FORMAT_PCM = 0x0001
+    _WAVE_FORMAT_IEEE_FLOAT = 0x0003
+    _WAVE_FORMAT_EXTENSIBLE = 0xFFFE
+
+    def __init__(self):
+        self.sample_rate = None
+        self._buffer = b""
+        self._state = "riff"
+        self._skip_bytes = 0
+        self._channels = 1
+        self._sample_width = 2
+        self._format_tag = self._WAVE_FORMAT_PCM
+
+    def decode(self, data: bytes) -> np.ndarray:
+        if (
+            self._state == "data"
+            and not self._buffer
+            and data[:4] == b"RIFF"
+            and data[8:12] == b"WAVE"
+        ):
+            self._state = "riff"
+
+        self._buffer += data
+        self._parse_header()
+
+        if self._state != "data":
+            return _EMPTY
+
+        frame_bytes = self._channels * self._sample_width
+        usable = len(self._buffer) - (len(self._buffer) % frame_bytes)
+        if usable == 0:
+            return _EMPTY
+
+        payload = self._buffer[:usable]
+        self._buffer = self._buffer[usable:]
+        return self._convert(payload)
+
+    def _parse_header(self) -> None:
+        """尽可能推进头部解析状态机"""
+        while self._state != "data":
+            if self._state == "riff":
+                if len(self._buffer) < 12:
+                    return
+                if self._buffer[:4] != b"RIFF" or self._buffer[8:12] != b"WAVE":
+                    raise ValueError("无效的WAV数据: 缺少RIFF/WAVE头")
+                self._buffer = self._buffer[12:]
+                self._state = "chunk"
+
+            elif self._state == "chunk":
+                if len(self._buffer) < 8:
+                    return
+                chunk_id = self._buffer[:4]
+                (chunk_size,) = struct.unpack("<I", self._buffer[4:8])
+                self._buffer = self._buffer[8:]
+                if chunk_id == b"fmt ":
+                    self._skip_bytes = chunk_size + (chunk_size & 1)
+                    self._state = "fmt"
+                elif chunk_id == b"data":
+                    if self.sample_rate is None:
+                        raise ValueError("无效的WAV数据: data块之前缺少fmt块")
+                    self._state = "data"
+                else:
+                    self._skip_bytes = chunk_size + (chunk_size & 1)
+                    self._state = "skip"
+
+            elif self._state == "fmt":
+                if len(self._buffer) < self._skip_bytes:
+                    return
+                self._parse_fmt(self._buffer[: self._skip_bytes])
+                self._buffer = self._buffer[self._skip_bytes:]
+                self._state = "chunk"
+
+            elif self._state == "skip":
+                skipped = min(self._skip_bytes, len(self._buffer))
+                self._buffer = self._buffer[skipped:]
+                self._skip_bytes -= skipped
+                if self._skip_bytes > 0:
+                    return
+                self._state = "chunk"
+
+    def _parse_fmt(self, fmt: bytes) -> None:
+        """解析fmt块"""
+        if len(fmt) < 16:
+            raise ValueError("无效的WAV数据: fmt块长度不足")
+        format_tag, channels, sample_rate, _, _, bits = struct.unpack("<HHIIHH", fmt[:16])
+        if format_tag == self._WAVE_FORMAT_EXTENSIBLE and len(fmt) >= 26:
+            (format_tag,) = struct.unpack("<H", fmt[24:26])
+
+        if format_tag not in (self._WAVE_FORMAT_PCM, self._WAVE_FORMAT_IEEE_FLOAT):
+            raise ValueError(f"不支持的WAV编码格式: 0x{format_tag:04x}")
+        if format_tag == self._WAVE_FORMAT_IEEE_FLOAT and bits != 32:
+            raise ValueError(f"不支持的WAV浮点位深: {bits}")
+        if format_tag == self._WAVE_FORMAT_PCM and bits not in (8, 16, 24, 32):
+            raise ValueError(f"不支持的WAV采样位深: {bits}")
+        if channels < 1:
+            raise ValueError("无效的WAV声道数")
+
+        self._format_tag = format_tag
+        self._channels = channels
+        self._sample_width = bits // 8
+        self.sample_rate = sample_rate
+
+    def _convert(self, payload: bytes) -> np.ndarray:
+        """样本字节转换为float32单声道"""
+        width = self._sample_width
+        if self._format_tag == self._WAVE_FORMAT_IEEE_FLOAT:
+            audio = np.frombuffer(payload, dtype="<f4").astype(np.float32)
+        elif width == 1:
+            audio = (np.frombuffer(payload, dtype=np.uint8).astype(np.float32) - 128.0) / 128.0
+        elif width == 2:
+            audio = _pcm16_to_float(payload)
+        elif width == 3:
+            raw = np.frombuffer(payload, dtype=np.uint8).reshape(-1, 3).astype(np.int32)
+            values = raw[:, 0] | (raw[:, 1] << 8) | (raw[:, 2] << 16)
+            values = np.where(values >= 1 << 23, values - (1 << 24), values)
+            audio = values.astype(np.float32) / float(1 << 23)
+        else:
+            audio = np.frombuffer(payload, dtype="<i4").astype(np.float32) / float(1 << 31)
+
+        if self._channels > 1:
+            audio = audio.reshape(-1, self._channels).mean(axis=1)
+        return audio
+
+    def flush(self) -> np.ndarray:
+        self._buffer = b""
+        return _EMPTY
+
+
+class FFmpegStreamDecoder(StreamDecoder):
+    """基于常驻 ffmpeg 进程的压缩音频增量解码器
+
+    压缩数据写入 ffmpeg 的 stdin，后台线程持续读取 stdout 的PCM输出。
+    decode() 返回调用时刻已解码完成的全部音频，因此本次写入的数据通常在下一次调用时才可取出；
+    输入结束时调用 flush() 关闭 stdin 并取回全部剩余音频。
+    """
+
+    _READ_SIZE = 16384
+    resumable = False
+    blocking = True
+
+    def __init__(self, input_format: str, output_sample_rate: int = 16000):
+        self.sample_rate = output_sample_rate
+        self.input_format = input_format
+        self._output = bytearray()
+        self._stderr_tail = b""
+        self._lock = threading.Lock()
+
+        command = [
+            "ffmpeg",
+            "-hide_banner",
+            "-loglevel", "error",
+            "-fflags", "nobuffer",
+            "-probesize", "32768",
+            "-analyzeduration", "0",
+            "-f", input_format,
+            "-i", "pipe:0",
+            "-f", "s16le",
+            "-acodec", "pcm_s16le",
+            "-ac", "1",
+            "-ar", str(output_sample_rate),
+            "pipe:1",
+        ]
+        try:
+            self._process = subprocess.Popen(
+                command,
+                stdin=subprocess.PIPE,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.PIPE,
+                bufsize=0,
+            )
+        except FileNotFoundError:
+            raise RuntimeError("未找到ffmpeg，无法解码压缩音频流")
+
+        self._stdout_reader = threading.Thread(
+            target=self._read_stdout, name="ffmpeg_stdout_reader", daemon=True
+        )
+        self._stderr_reader = threading.Thread(
+            target=self._read_stderr, name="ffmpeg_stderr_reader", daemon=True
+        )
+        self._stdout_reader.start()
+        self._stderr_reader.start()
+
+    def _read_stdout(self) -> None:
+        stdout = self._process.stdout
+        while True:
+            chunk = stdout.read(self._READ_SIZE)
+            if not chunk:
+                break
+            with self._lock:
+                self._output.extend(chunk)
+
+    def _read_stderr(self) -> None:
+        stderr = self._process.stderr
+        while True:
+            chunk = stderr.read(4096)
+            if not chunk:
+                break
+            self._stderr_tail = (self._stderr_tail + chunk)[-2048:]
+
+    def _take_output(self) -> np.ndarray:
+        with self._lock:
+            usable = len(self._output) - (len(self._output) % 2)
+            if usable == 0:
+                return _EMPTY
+            payload = bytes(self._output[:usable])
+            del self._output[:usable]
+        return _pcm16_to_float(payload)
+
+    def decode(self, data: bytes) -> np.ndarray:
+        if data:
+            try:
+                self._process.stdin.write(data)
+            except (BrokenPipeError, OSError):
+                error = self._stderr_tail.decode("utf-8", errors="ignore").strip()
+                raise RuntimeError(f"ffmpeg解码进程已退出: {error or '未知错误'}")
+        return self._take_output()
+
+    def flush(self) -> np.ndarray:
+        try:
+            if self._process.stdin and not self._process.stdin.closed:
+                self._process.stdin.close()
+        except OSError:
+            pass
+        self._stdout_reader.join(timeout=5)
+        return self._take_output()
+
+    def close(self) -> None:
+        """结束 ffmpeg 进程，不等待退出（由后台线程回收，避免阻塞调用方）"""
+        try:
+            if self._process.stdin and not self._process.stdin.closed:
+                self._process.stdin.close()
+        except OSError:
+            pass
+        if self._process.poll() is None:
+            self._process.kill()
+            threading.Thread(
+                target=self._reap, name="ffmpeg_reaper", daemon=True
+            ).start()
+
+    def _reap(self) -> None:
+        try:
+            self._process.wait(timeout=5)
+        except subprocess.TimeoutExpired:
+            logger.warning(f"ffmpeg解码进程未能及时退出: pid={self._process.pid}")
+
+
+def create_stream_decoder(
+    audio_format: str, sample_rate: int = 16000, target_sample_rate: int = 16000
+) -> StreamDecoder:
+    """根据音频格式创建增量解码器
+
+    Args:
+        audio_format: 音频格式（见 STREAMING_AUDIO_FORMATS）
+        sample_rate: 客户端声明的采样率（仅 pcm 使用；wav 以文件头为准）
+        target_sample_rate: 压缩格式直接由 ffmpeg 输出的采样率
+
+    Returns:
+        StreamDecoder 实例
+    """
+    audio_format = audio_format.lower()
+    if audio_format == "pcm":
+        return PCMStreamDecoder(sample_rate)
+    if audio_format == "wav":
+        return WAVStreamDecoder()
+    if audio_format in _FFMPEG_INPUT_FORMATS:
+        return FFmpegStreamDecoder(
+            _FFMPEG_INPUT_FORMATS[audio_format], output_sample_rate=target_sample_rate
+        )
+    raise ValueError(f"暂不支持的音频格式: {audio_format}")
@@ -0,0 +1,127 @@
+# -*- coding: utf-8 -*-
+"""
+流式重采样工具 - 用于WebSocket流式ASR的非16kHz输入
+
+实时识别模型只接受16kHz音频，而电话信道（8kHz）或部分客户端（22.05/24/48kHz）
+会以其他采样率推流。逐帧调用 librosa.resample 既慢又会在帧边界产生不连续，
+因此这里实现一个有状态的多相（polyphase）FIR重采样器：
+
+1. 重采样比 L/M 由 gcd 约简，低通滤波器（Kaiser窗sinc）按相位拆分为 L 组子滤波器
+2. 每个会话持有一个实例，跨帧保留滤波器历史样本和输出相位，帧边界无缝衔接
+3. 每次调用只做一次滑动窗口视图 + einsum，全部在NumPy中向量化完成
+"""
+
+import math
+import numpy as np
+from typing import Dict, Tuple
+
+
+# 滤波器设计缓存：(up, down, taps_per_phase) -> 多相滤波器组
+_filter_bank_cache: Dict[Tuple[int, int, int], np.ndarray] = {}
+
+
+def _design_filter_bank(up: int, down: int, taps_per_phase: int) -> np.ndarray:
+    """设计多相低通滤波器组
+
+    Returns:
+        形状为 (up, taps_per_phase) 的float32数组，每行已按时间反序排列，
+        可直接与输入窗口做点积
+    """
+    key = (up, down, taps_per_phase)
+    bank = _filter_bank_cache.get(key)
+    if bank is not None:
+        return bank
+
+    num_taps = up * taps_per_phase
+    # 截止频率取上采样后奈奎斯特频率的 1/max(L, M)，留少量过渡带余量
+    cutoff = 0.95 / max(up, down)
+    n = np.arange(num_taps, dtype=np.float64) - (num_taps - 1) / 2.0
+    h = cutoff * np.sinc(cutoff * n) * np.kaiser(num_taps, 8.0)
+    # 插零上采样后需补偿 L 倍增益
+    h *= up / h.sum() if h.sum() != 0 else up
+
+    # h[p + k*L] 为相位 p 的第 k 个系数，反序后与时间顺序的输入窗口对齐
+    bank = h.reshape(taps_per_phase, up).T[:, ::-1].astype(np.float32).copy()
+    _filter_bank_cache[key] = bank
+    return bank
+
+
+class StreamingResampler:
+    """有状态的流式多相重采样器
+
+    Example:
+        resampler = StreamingResampler(8000, 16000)
+        for frame in frames:
+            audio_16k = resampler.process(frame)
+    """
+
+    def __init__(self, orig_sr: int, target_sr: int, taps_per_phase: int = 32):
+        if orig_sr <= 0 or target_sr <= 0:
+            raise ValueError(f"无效的采样率: {orig_sr} -> {target_sr}")
+
+        g = math.gcd(orig_sr, target_sr)
+        self.orig_sr = orig_sr
+        self.target_sr = target_sr
+        self.up = target_sr // g
+        self.down = orig_sr // g
+        self.taps = taps_per_phase
+        self._bank = _design_filter_bank(self.up, self.down, self.taps)
+
+        # 输入缓冲区：前 taps-1 个样本为历史（初始为零），_buf_start 为缓冲区首样本的全局下标
+        self._buffer = np.zeros(self.taps - 1, dtype=np.float32)
+        self._buf_start = -(self.taps - 1)
+        self._next_output = 0  # 下一个输出样本的全局下标
+
+    @property
+    def passthrough(self) -> bool:
+        """采样率一致时不做处理"""
+        return self.up == self.down
+
+    def process(self, audio: np.ndarray) -> np.ndarray:
+        """处理一帧音频，返回目标采样率的音频
+
+        Args:
+            audio: float32单声道音频
+
+        Returns:
+            float32音频，长度约为 len(audio) * target_sr / orig_sr
+        """
+        audio = np.asarray(audio, dtype=np.float32)
+        if self.passthrough:
+            return audio
+        if len(audio) == 0:
+            return np.zeros(0, dtype=np.float32)
+
+        buffer = np.concatenate([self._buffer, audio])
+        last_input = self._buf_start + len(buffer) - 1
+
+        # 输出样本 t 对应输入下标 floor(t*M/L)，该下标必须已到达
+        last_output = ((last_input + 1) * self.up - 1) // self.down
+        if last_output < self._next_output:
+            self._buffer = buffer
+            return np.zeros(0, dtype=np.float32)
+
+        t = np.arange(self._next_output, last_output + 1, dtype=np.int64)
+        pos = t * self.down
+        phases = pos % self.up
+        # 每个输出对应的输入窗口起点（窗口为 [i-taps+1, i]）
+        starts = pos // self.up - (self.taps - 1) - self._buf_start
+
+        windows = np.lib.stride_tricks.sliding_window_view(buffer, self.taps)
+        output = np.einsum("ij,ij->i", windows[starts], self._bank[phases])
+
+        self._next_output = last_output + 1
+
+        # 仅保留下一个输出所需的历史样本
+        next_start = (self._next_output * self.down) // self.up - (self.taps - 1)
+        keep_from = max(0, next_start - self._buf_start)
+        self._buffer = buffer[keep_from:]
+        self._buf_start += keep_from
+
+        return output.astype(np.float32, copy=False)
+
+    def reset(self) -> None:
+        """清空滤波器状态（新的音频流）"""
+        self._buffer = np.zeros(self.taps - 1, dtype=np.float32)
+        self._buf_start = -(self.taps - 1)
+        self._next_output = 0
@@ -3,96 +3,95 @@
 """
 音频RMS时序分析工具
 
-用于分析音频���件的RMS能量，帮助确定远场过滤的阈值。
+用于分析音频文件的RMS能量，帮助确定远场过滤的阈值。
 支持立体声、左声道、右声道选择。
+
+批量模式（--batch）遍历录音目录，在进程池中计算每个文件、每个声道的分帧RMS与
+噪声/语音统计，按设备（子目录）与声道汇总为远场过滤配置（JSON），
+服务端通过 ASR_NEARFIELD_PROFILES_FILE 加载，按 appkey 选择。
 """
 
 import argparse
+import json
+import os
+import time
 import numpy as np
-import matplotlib.pyplot as plt
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 import sys
 
-# 设置中文显示
-plt.rcParams['font.sans-serif'] = ['Arial Unicode MS', 'SimHei', 'DejaVu Sans']
-plt.rcParams['axes.unicode_minus'] = False
+# 批量模式支持的音频扩展名
+AUDIO_EXTENSIONS = ('.wav', '.flac', '.ogg', '.mp3', '.m4a', '.aac')
 
+# 与服务端自适应过滤器一致的子帧时长（ms）
+SUBFRAME_MS = 10
 
-def load_audio(file_path: str, channel: str = 'stereo') -> tuple:
-    """加载音频文件
+# 配置文件格式版本
+PROFILE_VERSION = 1
 
-    Args:
-        file_path: 音频文件路径
-        channel: 声道选择 ('stereo', 'left', 'right')
+
+def read_audio(file_path: str) -> tuple:
+    """读取音频文件的全部声道
 
     Returns:
-        (audio_data, sample_rate): 音频数据和采样率
+        (audio_data, sample_rate): 形状为 (样本数, 声道数) 的float32数组和采样率
     """
-    file_ext = Path(file_path).suffix.lower()
-
-    if file_ext == '.wav':
+    if Path(file_path).suffix.lower() == '.wav':
         import wave
         with wave.open(file_path, 'rb') as wav_file:
             sample_rate = wav_file.getframerate()
             n_channels = wav_file.getnchannels()
             sample_width = wav_file.getsampwidth()
-            n_frames = wav_file.getnframes()
+            audio_bytes = wav_file.readframes(wav_file.getnframes())
 
-            # 读取音频数据
-            audio_bytes = wav_file.readframes(n_frames)
+        if sample_width == 2:  # 16-bit
+            audio_int = np.frombuffer(audio_bytes, dtype=np.int16)
+        elif sample_width == 4:  # 32-bit
+            audio_int = np.frombuffer(audio_bytes, dtype=np.int32)
+        else:
+            raise ValueError(f"不支持的采样位深: {sample_width}")
 
-            # 转换为numpy数组
-            if sample_width == 2:  # 16-bit
-                audio_int = np.frombuffer(audio_bytes, dtype=np.int16)
-            elif sample_width == 4:  # 32-bit
-                audio_int = np.frombuffer(audio_bytes, dtype=np.int32)
-            else:
-                raise ValueError(f"不支持的采样位深: {sample_width}")
-
-            # 转换为float32 (-1.0 to 1.0)
-            audio_float = audio_int.astype(np.float32) / (2 ** (8 * sample_width - 1))
-
-            # 处理多声道
-            if n_channels > 1:
-                audio_float = audio_float.reshape(-1, n_channels)
-                if channel == 'left':
-                    audio_float = audio_float[:, 0]
-                    print(f"✓ 使用左声道")
-                elif channel == 'right':
-                    audio_float = audio_float[:, 1]
-                    print(f"✓ 使用右声道")
-                else:  # stereo - 平均
-                    audio_float = np.mean(audio_float, axis=1)
-                    print(f"✓ 使用立体声（双声道平均）")
-            else:
-                print(f"✓ 使用单声道")
+        # 转换为float32 (-1.0 to 1.0)
+        audio_float = audio_int.astype(np.float32) / (2 ** (8 * sample_width - 1))
+        return audio_float.reshape(-1, n_channels), sample_rate
 
-            return audio_float, sample_rate
+    import soundfile as sf
+    audio_float, sample_rate = sf.read(file_path, dtype='float32', always_2d=True)
+    return audio_float, sample_rate
 
-    else:
-        # 尝试使用 soundfile 或 librosa
-        try:
-            import soundfile as sf
-            audio_float, sample_rate = sf.read(file_path)
-
-            if len(audio_float.shape) > 1:  # 多声道
-                if channel == 'left':
-                    audio_float = audio_float[:, 0]
-                    print(f"✓ 使用左声道")
-                elif channel == 'right':
-                    audio_float = audio_float[:, 1]
-                    print(f"✓ 使用右声道")
-                else:
-                    audio_float = np.mean(audio_float, axis=1)
-                    print(f"✓ 使用立体声（双声道平均）")
-            else:
-                print(f"✓ 使用单声道")
 
-            return audio_float, sample_rate
+def load_audio(file_path: str, channel: str = 'stereo') -> tuple:
+    """加载音频文件
+
+    Args:
+        file_path: 音频文件路径
+        channel: 声道选择 ('stereo', 'left', 'right')
 
-        except ImportError:
-            print("错误: 请安装 soundfile 库: pip install soundfile")
-            sys.exit(1)
+    Returns:
+        (audio_data, sample_rate): 音频数据和采样率
+    """
+    try:
+        audio_float, sample_rate = read_audio(file_path)
+    except ImportError:
+        print("错误: 请安装 soundfile 库: pip install soundfile")
+        sys.exit(1)
+
+    # 处理多声道
+    if audio_float.shape[1] > 1:
+        if channel == 'left':
+            audio_float = audio_float[:, 0]
+            print(f"✓ 使用左声道")
+        elif channel == 'right':
+            audio_float = audio_float[:, 1]
+            print(f"✓ 使用右声道")
+        else:  # stereo - 平均
+            audio_float = np.mean(audio_float, axis=1)
+            print(f"✓ 使用立体声（双声道平均）")
+    else:
+        audio_float = audio_float[:, 0]
+        print(f"✓ 使用单声道")
+
+    return audio_float, sample_rate
 
 
 def calculate_rms_energy(audio_array: np.ndarray) -> float:
@@ -109,6 +108,24 @@ def calculate_rms_energy(audio_array: np.ndarray) -> float:
     return float(np.sqrt(np.mean(audio_array ** 2)))
 
 
+def framewise_rms(audio_data: np.ndarray, frame_samples: int, hop_samples: int = None) -> np.ndarray:
+    """分帧RMS能量（stride视图，不复制音频数据）
+
+    Args:
+        audio_data: 单声道音频数据
+        frame_samples: 帧长（样本数）
+        hop_samples: 帧移（样本数），默认等于帧长
+
+    Returns:
+        每帧的RMS值
+    """
+    hop_samples = hop_samples or frame_samples
+    if frame_samples <= 0 or len(audio_data) < frame_samples:
+        return np.zeros(0, dtype=np.float32)
+    frames = np.lib.stride_tricks.sliding_window_view(audio_data, frame_samples)[::hop_samples]
+    return np.sqrt(np.einsum('ij,ij->i', frames, frames) / frame_samples)
+
+
 def analyze_rms_timeline(audio_data: np.ndarray, sample_rate: int,
                          chunk_size_ms: int = 240) -> tuple:
     """分析音频的RMS时序
@@ -122,23 +139,9 @@ def analyze_rms_timeline(audio_data: np.ndarray, sample_rate: int,
         (time_points, rms_values): 时间点和对应的RMS值
     """
     chunk_samples = int(sample_rate * chunk_size_ms / 1000)
-    n_chunks = len(audio_data) // chunk_samples
-
-    time_points = []
-    rms_values = []
-
-    for i in range(n_chunks):
-        start_idx = i * chunk_samples
-        end_idx = start_idx + chunk_samples
-        chunk = audio_data[start_idx:end_idx]
-
-        rms = calculate_rms_energy(chunk)
-        time_s = (start_idx + chunk_samples / 2) / sample_rate
-
-        time_points.append(time_s)
-        rms_values.append(rms)
-
-    return np.array(time_points), np.array(rms_values)
+    rms_values = framewise_rms(np.ascontiguousarray(audio_data, dtype=np.float32), chunk_samples)
+    time_points = (np.arange(len(rms_values)) * chunk_samples + chunk_samples / 2) / sample_rate
+    return time_points, rms_values
 
 
 def print_statistics(rms_values: np.ndarray, threshold: float = 0.01):
@@ -197,6 +200,12 @@ def plot_rms_timeline(time_points: np.ndarray, rms_values: np.ndarray,
         threshold: 阈值线
         save_path: 保存路径
     """
+    import matplotlib.pyplot as plt
+
+    # 设置中文显示
+    plt.rcParams['font.sans-serif'] = ['Arial Unicode MS', 'SimHei', 'DejaVu Sans']
+    plt.rcParams['axes.unicode_minus'] = False
+
     fig, (ax1, ax2) = plt.subplots(2, 1, figsize=(14, 10))
 
     # 上图: RMS时序
@@ -242,6 +251,149 @@ def plot_rms_timeline(time_points: np.ndarray, rms_values: np.ndarray,
     plt.show()
 
 
+def analyze_file_stats(task: tuple) -> dict:
+    """批量模式单文件分析（在工作进程中执行）
+
+    Args:
+        task: (文件路径, 设备名, 噪声分位数, 语音分位数)
+
+    Returns:
+        文件分析结果：每个声道及多声道平均（mix）的子帧RMS噪声/语音统计
+    """
+    file_path, device, noise_percentile, speech_percentile = task
+    try:
+        audio_data, sample_rate = read_audio(file_path)
+    except Exception as e:
+        return {'file': file_path, 'device': device, 'error': str(e)}
+
+    frame_samples = max(1, sample_rate * SUBFRAME_MS // 1000)
+    tracks = {f'ch{i}': audio_data[:, i] for i in range(audio_data.shape[1])}
+    tracks['mix'] = audio_data[:, 0] if audio_data.shape[1] == 1 else audio_data.mean(axis=1)
+
+    channels = {}
+    for name, track in tracks.items():
+        rms_values = framewise_rms(np.ascontiguousarray(track, dtype=np.float32), frame_samples)
+        if len(rms_values) == 0:
+            continue
+        noise_floor, speech_level = np.percentile(rms_values, [noise_percentile, speech_percentile])
+        channels[name] = {
+            'noise_floor': float(noise_floor),
+            'speech_level': float(speech_level),
+            'frames': int(len(rms_values)),
+        }
+
+    return {
+        'file': file_path,
+        'device': device,
+        'duration_s': len(audio_data) / sample_rate,
+        'channels': channels,
+    }
+
+
+def collect_audio_files(root: str, group_by_dir: bool = True) -> list:
+    """遍历目录收集音频文件，返回 [(文件路径, 设备名)]
+
+    按一级子目录名作为设备名（即配置名，如 appkey），根目录下的文件归入 default
+    """
+    root_path = Path(root)
+    files = []
+    for path in sorted(root_path.rglob('*')):
+        if path.suffix.lower() not in AUDIO_EXTENSIONS or not path.is_file():
+            continue
+        parts = path.relative_to(root_path).parts
+        device = parts[0] if group_by_dir and len(parts) > 1 else 'default'
+        files.append((str(path), device))
+    return files
+
+
+def build_profiles(results: list, noise_ratio: float = 3.0) -> dict:
+    """汇总文件统计为按设备、声道的远场过滤配置
+
+    每个声道取各文件噪声底与语音电平的中位数：初始阈值取两者的几何中点，
+    阈值下限取噪声底的 noise_ratio 倍与初始阈值中的较小值
+    """
+    grouped = {}
+    for result in results:
+        for channel, stats in result.get('channels', {}).items():
+            entry = grouped.setdefault(result['device'], {}).setdefault(
+                channel, {'noise': [], 'speech': [], 'frames': 0, 'files': 0}
+            )
+            entry['noise'].append(stats['noise_floor'])
+            entry['speech'].append(stats['speech_level'])
+            entry['frames'] += stats['frames']
+            entry['files'] += 1
+
+    profiles = {}
+    for device, channels in grouped.items():
+        profiles[device] = {}
+        for channel, entry in channels.items():
+            noise_floor = float(np.median(entry['noise']))
+            speech_level = float(np.median(entry['speech']))
+            initial_threshold = float(np.sqrt(max(noise_floor, 1e-6) * max(speech_level, 1e-6)))
+            profiles[device][channel] = {
+                'initial_threshold': round(initial_threshold, 6),
+                'min_rms': round(min(noise_floor * noise_ratio, initial_threshold), 6),
+                'noise_floor': round(noise_floor, 6),
+                'speech_level': round(speech_level, 6),
+                'files': entry['files'],
+                'duration_s': round(entry['frames'] * SUBFRAME_MS / 1000, 1),
+            }
+    return profiles
+
+
+def run_batch(args) -> None:
+    """批量模式：并行分析目录下所有录音并输出配置JSON"""
+    files = collect_audio_files(args.audio_file, group_by_dir=not args.no_group)
+    if not files:
+        print(f"错误: 目录中没有音频文件: {args.audio_file}")
+        sys.exit(1)
+
+    workers = args.workers or os.cpu_count() or 1
+    print(f"📁 目录: {args.audio_file}")
+    print(f"🎧 文件数: {len(files)}，设备数: {len({device for _, device in files})}")
+    print(f"⚙️  进程数: {workers}")
+
+    tasks = [
+        (path, device, args.noise_percentile, args.speech_percentile) for path, device in files
+    ]
+    results = []
+    errors = 0
+    start = time.time()
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        for i, result in enumerate(executor.map(analyze_file_stats, tasks, chunksize=8), 1):
+            if 'error' in result:
+                errors += 1
+                print(f"  ⚠️  {result['file']}: {result['error']}")
+            else:
+                results.append(result)
+            if i % 500 == 0 or i == len(tasks):
+                print(f"  - 已分析 {i}/{len(tasks)} ({time.time() - start:.1f}s)")
+
+    total_audio_s = sum(result['duration_s'] for result in results)
+    elapsed = time.time() - start
+    print(f"✓ 分析完成: {len(results)} 个文件，{total_audio_s / 3600:.2f} 小时音频，"
+          f"耗时 {elapsed:.1f}s，失败 {errors} 个")
+
+    profiles = build_profiles(results, args.noise_ratio)
+    document = {
+        'version': PROFILE_VERSION,
+        'subframe_ms': SUBFRAME_MS,
+        'generated_at': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'profiles': profiles,
+    }
+    output = args.profile_output
+    with open(output, 'w', encoding='utf-8') as f:
+        json.dump(document, f, ensure_ascii=False, indent=2)
+
+    print(f"\n💡 远场过滤配置:")
+    for device, channels in profiles.items():
+        mix = channels.get('mix', {})
+        print(f"  - {device}: 初始阈值 {mix.get('initial_threshold', 0):.6f}, "
+              f"噪声底 {mix.get('noise_floor', 0):.6f}, 语音电平 {mix.get('speech_level', 0):.6f} "
+              f"({mix.get('files', 0)} 个文件)")
+    print(f"✓ 配置已保存到: {output}")
+
+
 def main():
     parser = argparse.ArgumentParser(
         description='音频RMS时序分析工具 - 帮助确定远场过滤阈值',
@@ -262,11 +414,14 @@ def main():
 
   # 保存图表
   python analyze_audio_rms.py audio.wav --output rms_analysis.png
+
+  # 批量模式：按子目录（设备/appkey）生成远场过滤配置
+  python analyze_audio_rms.py recordings/ --batch --profile-output nearfield_profiles.json
         """
     )
 
     parser.add_argument('audio_file', type=str,
-                       help='音频文件路径 (支持 WAV, MP3, FLAC 等格式)')
+                       help='音频文件路径 (支持 WAV, MP3, FLAC 等格式)，批量模式下为录音目录')
     parser.add_argument('--channel', type=str, choices=['stereo', 'left', 'right'],
                        default='stereo',
                        help='声道选择: stereo(立体声平均), left(左声道), right(右声道) [默认: stereo]')
@@ -278,9 +433,33 @@ def main():
                        help='保存图表的路径 (例如: output.png)')
     parser.add_argument('--no-plot', action='store_true',
                        help='不显示图表，仅输出统计信息')
+    parser.add_argument('--batch', action='store_true',
+                       help='批量模式: 分析目录下所有录音并生成远场过滤配置JSON')
+    parser.add_argument('--profile-output', type=str, default='nearfield_profiles.json',
+                       help='批量模式配置输出路径 [默认: nearfield_profiles.json]')
+    parser.add_argument('--workers', type=int, default=0,
+                       help='批量模式进程数 [默认: CPU核数]')
+    parser.add_argument('--no-group', action='store_true',
+                       help='批量模式不按子目录区分设备，全部归入 default')
+    parser.add_argument('--noise-percentile', type=float, default=10,
+                       help='批量模式噪声底分位数 [默认: 10]')
+    parser.add_argument('--speech-percentile', type=float, default=90,
+                       help='批量模式语音电平分位数 [默认: 90]')
+    parser.add_argument('--noise-ratio', type=float, default=3.0,
+                       help='批量模式阈值下限相对噪声底的倍数 [默认: 3.0]')
 
     args = parser.parse_args()
 
+    if args.batch:
+        if not Path(args.audio_file).is_dir():
+            print(f"错误: 目录不存在: {args.audio_file}")
+            sys.exit(1)
+        print("="*60)
+        print("音频 RMS 批量分析")
+        print("="*60)
+        run_batch(args)
+        return
+
     # 检查文件是否存在
     if not Path(args.audio_file).exists():
         print(f"错误: 文件不存在: {args.audio_file}")
@@ -320,6 +499,7 @@ def main():
         print("正在保存图表...")
         plot_rms_timeline(time_points, rms_values, args.threshold, args.output)
         # 关闭显示窗口
+        import matplotlib.pyplot as plt
         plt.close()
 
 
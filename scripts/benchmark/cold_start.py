@@ -0,0 +1,182 @@
+# -*- coding: utf-8 -*-
+"""
+模型冷启动耗时对比（AutoModel vs 模型快照）
+
+对默认ASR模型的离线/实时模型、VAD、离线标点、实时标点五个模型，每次在新的子进程中分别测量：
+
+- AutoModel(model=..., device=...) 的加载耗时与常驻内存增量
+- 从模型快照（skeleton.pkl + mmap 读取的 weights.safetensors）加载的耗时与常驻内存增量
+
+首次运行时先在子进程中按 AutoModel 加载并写出快照。各模型的加载参数与服务一致
+（不含离线模型的 LM 语言模型）。模型文件通常已在页缓存中，测得的是重启场景下的耗时。
+
+需在项目根目录以模块方式运行:
+    python -m scripts.benchmark.cold_start
+    python -m scripts.benchmark.cold_start --repeat 5 --output cold_start.json
+    python -m scripts.benchmark.cold_start --models vad punc --snapshot-dir /tmp/snapshots
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+from typing import Dict, List
+
+SOURCES = ("automodel", "snapshot")
+
+
+def rss_mb() -> float:
+    """当前进程常驻内存（MB）"""
+    with open("/proc/self/statm") as f:
+        return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 1024**2
+
+
+def model_paths() -> Dict[str, str]:
+    """五个需要预加载的模型: {名称: 模型ID/路径}"""
+    from app.core.config import settings
+    from app.services.asr.manager import get_model_manager
+
+    config = get_model_manager().get_model_config()
+    paths = {
+        "offline": config.offline_model_path,
+        "realtime": config.realtime_model_path,
+        "vad": settings.VAD_MODEL,
+        "punc": settings.PUNC_MODEL,
+        "punc_realtime": settings.PUNC_REALTIME_MODEL,
+    }
+    return {name: path for name, path in paths.items() if path}
+
+
+def run_child(model: str, source: str) -> None:
+    """子进程：加载一个模型，输出耗时与内存增量（JSON，最后一行）"""
+    from app.core.config import settings
+
+    settings.MODEL_SNAPSHOT_ENABLED = source == "snapshot"
+
+    from app.services.asr.engine import detect_device, resolve_model_path
+    from app.services.asr.snapshot import get_snapshot_stats, load_auto_model
+
+    path = model_paths()[model]
+    model_kwargs = {
+        "model": resolve_model_path(path),
+        "device": detect_device(settings.DEVICE),
+        **settings.FUNASR_AUTOMODEL_KWARGS,
+    }
+
+    rss_before = rss_mb()
+    start = time.perf_counter()
+    load_auto_model(model_kwargs, path)
+    seconds = time.perf_counter() - start
+    report = get_snapshot_stats()["models"][path]
+    print(
+        json.dumps(
+            {
+                "model": model,
+                "source": report["source"],
+                "seconds": seconds,
+                "rss_delta_mb": rss_mb() - rss_before,
+                "snapshot_mb": report.get("snapshot_mb"),
+                "error": report.get("error"),
+            }
+        )
+    )
+
+
+def spawn(model: str, source: str, env: dict) -> dict:
+    output = subprocess.run(
+        [sys.executable, "-m", "scripts.benchmark.cold_start", "--child", model, source],
+        env=env,
+        capture_output=True,
+        text=True,
+        check=True,
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def benchmark(models: List[str], repeat: int, env: dict) -> List[dict]:
+    reports = []
+    for model in models:
+        # 确保快照存在（首次加载会按 AutoModel 加载并写出快照）
+        prime = spawn(model, "snapshot", env)
+        if prime["error"]:
+            print(f"⚠️  {model}: {prime['error']}")
+
+        runs: Dict[str, List[dict]] = {source: [] for source in SOURCES}
+        for _ in range(repeat):
+            for source in SOURCES:
+                result = spawn(model, source, env)
+                if result["source"] == source:
+                    runs[source].append(result)
+
+        report = {"model": model, "snapshot_mb": prime["snapshot_mb"]}
+        for source in SOURCES:
+            if runs[source]:
+                report[source] = {
+                    "seconds": statistics.median(r["seconds"] for r in runs[source]),
+                    "rss_delta_mb": statistics.median(r["rss_delta_mb"] for r in runs[source]),
+                    "runs": len(runs[source]),
+                }
+        reports.append(report)
+        print(f"✅ {model} 测试完成")
+    return reports
+
+
+def print_summary(reports: List[dict]) -> None:
+    print()
+    print(f"{'模型':<16}{'AutoModel(s)':>14}{'快照(s)':>10}{'加速':>8}{'内存增量(MB)':>22}")
+    print("-" * 70)
+    total = {source: 0.0 for source in SOURCES}
+    for report in reports:
+        automodel, snapshot = report.get("automodel"), report.get("snapshot")
+        if not automodel or not snapshot:
+            print(f"{report['model']:<16}{'快照不可用':>14}")
+            continue
+        for source in SOURCES:
+            total[source] += report[source]["seconds"]
+        speedup = automodel["seconds"] / max(snapshot["seconds"], 1e-6)
+        print(
+            f"{report['model']:<16}{automodel['seconds']:>14.2f}{snapshot['seconds']:>10.2f}"
+            f"{speedup:>7.1f}x{automodel['rss_delta_mb']:>12.0f} -> {snapshot['rss_delta_mb']:<8.0f}"
+        )
+    print("-" * 70)
+    print(f"{'合计':<16}{total['automodel']:>14.2f}{total['snapshot']:>10.2f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="模型冷启动耗时对比（AutoModel vs 模型快照）")
+    parser.add_argument(
+        "--models",
+        nargs="+",
+        default=["offline", "realtime", "vad", "punc", "punc_realtime"],
+        help="测试的模型（offline realtime vad punc punc_realtime）",
+    )
+    parser.add_argument("--repeat", type=int, default=3, help="每种方式的测试次数（取中位数）")
+    parser.add_argument("--snapshot-dir", help="快照目录，默认使用 MODEL_SNAPSHOT_DIR")
+    parser.add_argument("--output", help="保存结果的JSON路径")
+    parser.add_argument("--child", nargs=2, metavar=("MODEL", "SOURCE"), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        run_child(*args.child)
+        return
+
+    env = dict(os.environ)
+    if args.snapshot_dir:
+        env["MODEL_SNAPSHOT_DIR"] = args.snapshot_dir
+
+    available = model_paths()
+    models = [model for model in args.models if model in available]
+    reports = benchmark(models, args.repeat, env)
+    print_summary(reports)
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(reports, f, ensure_ascii=False, indent=2)
+        print(f"\n结果已保存: {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,352 @@
+# -*- coding: utf-8 -*-
+"""
+ASR 引擎一致性与速度对比
+
+在同一进程内依次加载 models.json 中的多个模型（如 PyTorch 的 paraformer-large 与
+ONNX Runtime 的 paraformer-large-onnx），对同一批音频分别测量：
+
+- 离线识别（transcribe_file_with_vad）：单文件耗时、RTF
+- 流式识别（引擎层 StreamingSession）：每个chunk推理耗时、RTF
+- 准确率：提供参考文本时计算 CER；未提供时以第一个模型的结果为基准计算一致性（parity CER）
+- 加载耗时、常驻内存增量与首个请求的耗时（含编译/懒加载，不经预热）
+- 变体对比：--quantize / --compile 指定多个模式时，每个模型按各模式组合分别加载测试（结果标记为
+  "模型ID@模式"），全局 VAD/标点模型同步切换，用于按模型决定是否启用 int8 量化或编译执行
+
+不经过网络，直接调用引擎。需在项目根目录以模块方式运行:
+    python -m scripts.benchmark.engine_compare --audio-dir ./testsets/zh \\
+        --models paraformer-large paraformer-large-onnx
+
+    # 参考文本文件: 每行 "文件名<TAB>文本"（文件名可不带扩展名）
+    python -m scripts.benchmark.engine_compare --audio-dir ./testsets/zh \\
+        --reference ./testsets/zh/text.tsv --output engine_compare.json
+
+    # int8 动态量化的 CER/延迟对比（以 fp32 结果为基准）
+    python -m scripts.benchmark.engine_compare --audio-dir ./testsets/zh \
+        --models paraformer-large --quantize none int8-dynamic
+
+    # 编译执行与 eager 的首请求/稳态延迟对比
+    python -m scripts.benchmark.engine_compare --audio-dir ./testsets/zh \
+        --models paraformer-large --compile none torch-compile torchscript
+"""
+
+import argparse
+import copy
+import itertools
+import json
+import logging
+import os
+import tempfile
+import time
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import soundfile as sf
+
+from .metrics.accuracy import character_errors
+from .metrics.statistics import calculate_percentile
+from .utils.audio_utils import resample_audio
+
+SAMPLE_RATE = 16000
+AUDIO_EXTENSIONS = (".wav", ".flac", ".ogg", ".mp3")
+
+logger = logging.getLogger(__name__)
+
+
+def rss_mb() -> float:
+    """当前进程常驻内存（MB）"""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 1024**2
+    except (OSError, ValueError):
+        import resource
+
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def load_references(path: Optional[str]) -> Dict[str, str]:
+    """读取参考文本: 每行 "文件名<TAB或空格>文本" """
+    references = {}
+    if not path:
+        return references
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            parts = line.strip().split(maxsplit=1)
+            if len(parts) == 2:
+                references[Path(parts[0]).stem] = parts[1]
+    return references
+
+
+def prepare_audio(audio_dir: str, limit: int, temp_dir: str) -> List[dict]:
+    """加载音频为16kHz单声道，同时写出标准化WAV供离线识别使用"""
+    files = sorted(
+        p for p in Path(audio_dir).rglob("*") if p.suffix.lower() in AUDIO_EXTENSIONS
+    )
+    if limit:
+        files = files[:limit]
+
+    items = []
+    for path in files:
+        audio, sample_rate = sf.read(path, dtype="float32", always_2d=True)
+        audio = resample_audio(audio.mean(axis=1), sample_rate, SAMPLE_RATE)
+        wav_path = os.path.join(temp_dir, f"{len(items):05d}.wav")
+        sf.write(wav_path, audio, SAMPLE_RATE, subtype="PCM_16")
+        items.append(
+            {"name": path.stem, "audio": audio, "wav": wav_path, "duration": len(audio) / SAMPLE_RATE}
+        )
+    return items
+
+
+def run_offline(engine, item: dict) -> tuple:
+    start = time.perf_counter()
+    result = engine.transcribe_file_with_vad(
+        audio_path=item["wav"], enable_punctuation=True, enable_itn=False
+    )
+    return result.text, time.perf_counter() - start
+
+
+def run_streaming(engine, item: dict, chunk_stride_ms: int) -> tuple:
+    """按chunk送入整段音频，返回 (原始文本, 总耗时, 每chunk耗时列表)"""
+    session = engine.create_streaming_session(chunk_stride_ms=chunk_stride_ms)
+    session.push(item["audio"])
+    texts, chunk_times = [], []
+    start = time.perf_counter()
+    while True:
+        chunk = session.pop_chunk()
+        if chunk is None:
+            break
+        chunk_start = time.perf_counter()
+        texts.append(session.decode(chunk).text_raw)
+        chunk_times.append(time.perf_counter() - chunk_start)
+    texts.append(session.flush(drain=True).text_raw)
+    return "".join(texts), time.perf_counter() - start, chunk_times
+
+
+def use_aux_variant(variant: Dict[str, str]) -> None:
+    """全局 VAD/标点模型切换到变体的量化/编译模式（清除已加载的实例，下次使用时按新模式重新加载）"""
+    from app.core.config import settings
+    from app.services.asr.engine import (
+        clear_global_punc_model,
+        clear_global_punc_realtime_model,
+        clear_global_vad_model,
+    )
+
+    aux_settings = {}
+    if "quantize" in variant:
+        aux_settings["VAD_MODEL_QUANTIZE"] = variant["quantize"]
+        aux_settings["PUNC_MODEL_QUANTIZE"] = variant["quantize"]
+    if "compile" in variant:
+        aux_settings["PUNC_MODEL_COMPILE"] = variant["compile"]
+    if all(getattr(settings, key) == value for key, value in aux_settings.items()):
+        return
+    for key, value in aux_settings.items():
+        setattr(settings, key, value)
+    clear_global_vad_model()
+    clear_global_punc_model()
+    clear_global_punc_realtime_model()
+
+
+def variant_label(model_id: str, variant: Dict[str, str]) -> str:
+    return "@".join([model_id, "+".join(variant.values())]) if variant else model_id
+
+
+def benchmark_model(
+    model_id: str, items: List[dict], args, variant: Optional[Dict[str, str]] = None
+) -> dict:
+    """加载一个模型并在所有音频上测试，variant 覆盖模型配置的量化（quantize）/编译（compile）模式"""
+    from app.services.asr.compilation import forget_compile, get_compile_stats
+    from app.services.asr.manager import get_model_manager
+    from app.services.asr.quantization import forget_quantization, get_quantization_stats
+
+    variant = variant or {}
+    manager = get_model_manager()
+    config = manager.get_model_config(model_id)
+    if variant:
+        config = copy.copy(config)
+        for key, value in variant.items():
+            setattr(config, key, value)
+        use_aux_variant(variant)
+    # 清除同一模型上一个变体的统计
+    for path in (config.offline_model_path, config.realtime_model_path):
+        if path:
+            forget_quantization(path)
+            forget_compile(path)
+
+    rss_before = rss_mb()
+    start = time.perf_counter()
+    engine = manager._create_engine(config)
+    load_s = time.perf_counter() - start
+
+    # 首个请求（含编译、VAD/标点模型懒加载），不计入稳态耗时
+    first_request_ms = {}
+    if "offline" in args.modes:
+        start = time.perf_counter()
+        run_offline(engine, items[0])
+        first_request_ms["offline"] = round((time.perf_counter() - start) * 1000, 1)
+    if "streaming" in args.modes and engine.supports_realtime:
+        start = time.perf_counter()
+        run_streaming(engine, items[0], args.chunk_ms)
+        first_request_ms["streaming"] = round((time.perf_counter() - start) * 1000, 1)
+
+    # 预热，不计入耗时
+    for item in items[: args.warmup]:
+        if "offline" in args.modes:
+            run_offline(engine, item)
+        if "streaming" in args.modes and engine.supports_realtime:
+            run_streaming(engine, item, args.chunk_ms)
+
+    report = {
+        "model_id": variant_label(model_id, variant),
+        "engine": config.engine,
+        "quantize": config.quantize,
+        "compile": config.compile,
+        "load_s": round(load_s, 2),
+        "rss_delta_mb": round(rss_mb() - rss_before, 1),
+        "first_request_ms": first_request_ms,
+        "quantization": get_quantization_stats()["models"],
+        "compilation": get_compile_stats()["models"],
+        "results": {},
+    }
+    total_audio = sum(item["duration"] for item in items)
+
+    if "offline" in args.modes:
+        texts, latencies = {}, []
+        for item in items:
+            texts[item["name"]], elapsed = run_offline(engine, item)
+            latencies.append(elapsed)
+        report["results"]["offline"] = {
+            "texts": texts,
+            "latency_p50_ms": round(calculate_percentile(latencies, 50) * 1000, 1),
+            "latency_p95_ms": round(calculate_percentile(latencies, 95) * 1000, 1),
+            "rtf": round(sum(latencies) / total_audio, 4) if total_audio else None,
+        }
+
+    if "streaming" in args.modes and engine.supports_realtime:
+        texts, totals, chunk_times = {}, [], []
+        for item in items:
+            texts[item["name"]], elapsed, times = run_streaming(engine, item, args.chunk_ms)
+            totals.append(elapsed)
+            chunk_times.extend(times)
+        report["results"]["streaming"] = {
+            "texts": texts,
+            "chunk_ms": args.chunk_ms,
+            "chunk_p50_ms": round(calculate_percentile(chunk_times, 50) * 1000, 2),
+            "chunk_p95_ms": round(calculate_percentile(chunk_times, 95) * 1000, 2),
+            "rtf": round(sum(totals) / total_audio, 4) if total_audio else None,
+        }
+
+    del engine
+    return report
+
+
+def score(reports: List[dict], references: Dict[str, str]) -> None:
+    """计算CER：有参考文本时对比参考文本，否则以第一个模型的结果为基准"""
+    baseline = reports[0]
+    for report in reports:
+        for mode, result in report["results"].items():
+            if references:
+                refs = references
+                key = "cer"
+            else:
+                if report is baseline:
+                    continue
+                refs = baseline["results"].get(mode, {}).get("texts", {})
+                key = "parity_cer"
+            errors = length = 0
+            for name, text in result["texts"].items():
+                if name in refs:
+                    e, n = character_errors(refs[name], text)
+                    errors += e
+                    length += n
+            result[key] = round(errors / length, 4) if length else None
+
+
+def print_summary(reports: List[dict]) -> None:
+    print("\n" + "=" * 116)
+    print(
+        f"{'模型':<30}{'引擎':<12}{'加载(s)':>8}{'内存(MB)':>10}{'量化节省(MB)':>14}"
+        f"{'首请求离线(ms)':>16}{'首请求流式(ms)':>16}"
+    )
+    for report in reports:
+        saved = sum(r.get("saved_mb", 0.0) for r in report["quantization"].values())
+        first = report["first_request_ms"]
+        print(
+            f"{report['model_id']:<30}{report['engine']:<12}"
+            f"{report['load_s']:>8}{report['rss_delta_mb']:>10}{round(saved, 1):>14}"
+            f"{str(first.get('offline', '-')):>16}{str(first.get('streaming', '-')):>16}"
+        )
+    for mode, latency_keys in (
+        ("offline", ("latency_p50_ms", "latency_p95_ms")),
+        ("streaming", ("chunk_p50_ms", "chunk_p95_ms")),
+    ):
+        rows = [r for r in reports if mode in r["results"]]
+        if not rows:
+            continue
+        print("-" * 116)
+        print(f"[{mode}] {'模型':<28}{'p50(ms)':>10}{'p95(ms)':>10}{'RTF':>10}{'CER':>10}{'一致性CER':>12}")
+        for report in rows:
+            result = report["results"][mode]
+            print(
+                f"        {report['model_id']:<28}"
+                f"{result[latency_keys[0]]:>10}{result[latency_keys[1]]:>10}"
+                f"{str(result['rtf']):>10}{str(result.get('cer', '-')):>10}"
+                f"{str(result.get('parity_cer', '-')):>12}"
+            )
+    print("=" * 116)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="ASR 引擎一致性与速度对比")
+    parser.add_argument("--audio-dir", required=True, help="测试音频目录（递归查找）")
+    parser.add_argument(
+        "--models", nargs="+", default=["paraformer-large", "paraformer-large-onnx"],
+        help="models.json 中的模型ID，第一个作为一致性基准",
+    )
+    parser.add_argument("--reference", help="参考文本文件，每行 \"文件名<TAB>文本\"")
+    parser.add_argument(
+        "--modes", nargs="+", default=["offline", "streaming"], choices=["offline", "streaming"]
+    )
+    parser.add_argument("--chunk-ms", type=int, default=600, choices=[240, 480, 600], help="流式chunk步长")
+    parser.add_argument("--limit", type=int, default=0, help="最多测试的文件数（0为全部）")
+    parser.add_argument("--warmup", type=int, default=1, help="预热使用的文件数")
+    parser.add_argument(
+        "--quantize", nargs="+", choices=["none", "int8-dynamic"],
+        help="按各量化模式分别测试每个模型（默认使用 models.json 中的配置），第一个模式作为基准",
+    )
+    parser.add_argument(
+        "--compile", nargs="+", choices=["none", "torch-compile", "torchscript"],
+        help="按各编译模式分别测试每个模型（默认使用 models.json 中的配置），第一个模式作为基准",
+    )
+    parser.add_argument("--output", help="保存完整结果（含每条识别文本）的JSON路径")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.WARNING, format="%(asctime)s - %(levelname)s - %(message)s")
+
+    with tempfile.TemporaryDirectory(prefix="engine_compare_") as temp_dir:
+        items = prepare_audio(args.audio_dir, args.limit, temp_dir)
+        if not items:
+            parser.error(f"目录中没有音频文件: {args.audio_dir}")
+        print(f"测试音频: {len(items)} 个, 共 {sum(i['duration'] for i in items):.1f}s")
+
+        reports = []
+        dimensions = [
+            [(key, mode) for mode in modes]
+            for key, modes in (("quantize", args.quantize), ("compile", args.compile))
+            if modes
+        ]
+        variants = [dict(combo) for combo in itertools.product(*dimensions)]
+        for model_id in args.models:
+            for variant in variants:
+                print(f"\n▶ 测试模型: {variant_label(model_id, variant)}")
+                reports.append(benchmark_model(model_id, items, args, variant))
+
+    score(reports, load_references(args.reference))
+    print_summary(reports)
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump({"models": reports}, f, ensure_ascii=False, indent=2)
+        print(f"结果已保存: {args.output}")
+
+
+if __name__ == "__main__":
+    main()
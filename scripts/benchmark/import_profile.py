@@ -0,0 +1,133 @@
+# -*- coding: utf-8 -*-
+"""
+导入耗时与基线内存分析
+
+在新的子进程中用 `python -X importtime` 导入指定模块（默认 app.main，即 Worker 启动时的导入），
+多次测量取中位数，输出：
+
+- 导入总耗时（墙钟时间）与导入后的常驻内存
+- 耗时最多的包（按 importtime 中包首次导入时的累计耗时，含其依赖）
+- 重量级依赖（torch、funasr、librosa、numba 等）是否在导入阶段被加载
+
+需在项目根目录以模块方式运行:
+    python -m scripts.benchmark.import_profile
+    python -m scripts.benchmark.import_profile --module app.services.asr.engine --top 15
+    python -m scripts.benchmark.import_profile --repeat 5 --output import_profile.json
+"""
+
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+from typing import Dict, List
+
+# 关注的重量级依赖
+HEAVY_PACKAGES = (
+    "torch",
+    "torchaudio",
+    "funasr",
+    "modelscope",
+    "librosa",
+    "numba",
+    "scipy",
+    "transformers",
+    "requests",
+    "soundfile",
+)
+
+_CHILD_CODE = """
+import json, os, sys, time
+start = time.perf_counter()
+import {module}
+seconds = time.perf_counter() - start
+with open("/proc/self/statm") as f:
+    rss_mb = int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 1024**2
+print(json.dumps({{
+    "seconds": seconds,
+    "rss_mb": rss_mb,
+    "loaded": [name for name in {heavy!r} if name in sys.modules],
+}}))
+"""
+
+
+def parse_importtime(stderr: str) -> Dict[str, int]:
+    """解析 -X importtime 输出，返回各包（不含子模块）首次导入的累计耗时（微秒）"""
+    packages: Dict[str, int] = {}
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or line.count("|") != 2:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        name = name.strip()
+        if cumulative.strip().isdigit() and "." not in name:
+            packages[name] = max(packages.get(name, 0), int(cumulative))
+    return packages
+
+
+def profile_once(module: str) -> dict:
+    result = subprocess.run(
+        [
+            sys.executable,
+            "-X",
+            "importtime",
+            "-c",
+            _CHILD_CODE.format(module=module, heavy=HEAVY_PACKAGES),
+        ],
+        capture_output=True,
+        text=True,
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"导入 {module} 失败:\n{result.stderr[-2000:]}")
+    report = json.loads(result.stdout.strip().splitlines()[-1])
+    report["packages"] = parse_importtime(result.stderr)
+    return report
+
+
+def profile(module: str, repeat: int) -> dict:
+    runs: List[dict] = [profile_once(module) for _ in range(repeat)]
+    packages: Dict[str, float] = {}
+    for name in runs[0]["packages"]:
+        packages[name] = statistics.median(r["packages"].get(name, 0) for r in runs) / 1000
+    return {
+        "module": module,
+        "seconds": statistics.median(r["seconds"] for r in runs),
+        "rss_mb": statistics.median(r["rss_mb"] for r in runs),
+        "loaded": runs[0]["loaded"],
+        "packages_ms": dict(sorted(packages.items(), key=lambda item: -item[1])),
+    }
+
+
+def print_report(report: dict, top: int) -> None:
+    print("=" * 60)
+    print(f"模块: {report['module']}")
+    print(f"导入耗时: {report['seconds'] * 1000:.0f}ms    常驻内存: {report['rss_mb']:.0f}MB")
+    print("-" * 60)
+    print(f"{'包':<30}{'累计耗时(ms)':>16}")
+    for name, ms in list(report["packages_ms"].items())[:top]:
+        print(f"{name:<30}{ms:>16.1f}")
+    print("-" * 60)
+    for name in HEAVY_PACKAGES:
+        print(f"   {'✓' if name in report['loaded'] else '✗'} {name}")
+    print("=" * 60)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="导入耗时与基线内存分析")
+    parser.add_argument("--module", nargs="+", default=["app.main"], help="导入的模块")
+    parser.add_argument("--repeat", type=int, default=3, help="测量次数（取中位数）")
+    parser.add_argument("--top", type=int, default=20, help="显示耗时最多的包数")
+    parser.add_argument("--output", help="保存结果的JSON路径")
+    args = parser.parse_args()
+
+    reports = [profile(module, args.repeat) for module in args.module]
+    for report in reports:
+        print_report(report, args.top)
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(reports, f, ensure_ascii=False, indent=2)
+        print(f"\n结果已保存: {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,6 +1,7 @@
 # -*- coding: utf-8 -*-
 from .models import ASRMetrics, TTSMetrics, AggregatedMetrics
 from .statistics import calculate_statistics, calculate_percentile
+from .accuracy import character_errors, character_error_rate
 
 __all__ = [
     "ASRMetrics",
@@ -8,4 +9,6 @@ __all__ = [
     "AggregatedMetrics",
     "calculate_statistics",
     "calculate_percentile",
+    "character_errors",
+    "character_error_rate",
 ]
@@ -0,0 +1,56 @@
+# -*- coding: utf-8 -*-
+"""
+识别准确率计算模块
+"""
+
+import re
+import unicodedata
+from typing import Tuple
+
+# 计算字错误率前去除的字符：标点、符号和空白
+_IGNORED_CATEGORIES = ("P", "S", "Z")
+
+
+def normalize_text(text: str) -> str:
+    """去除标点、空白并统一大小写，只比较文字内容"""
+    text = unicodedata.normalize("NFKC", text or "").lower()
+    return "".join(
+        ch for ch in text if unicodedata.category(ch)[0] not in _IGNORED_CATEGORIES
+    )
+
+
+def _tokenize(text: str) -> list:
+    """中文按字、英文和数字按词切分"""
+    return re.findall(r"[a-z0-9']+|\S", text)
+
+
+def edit_distance(reference: list, hypothesis: list) -> int:
+    """编辑距离（替换、插入、删除代价均为1）"""
+    if not reference:
+        return len(hypothesis)
+    previous = list(range(len(hypothesis) + 1))
+    for i, ref_token in enumerate(reference, 1):
+        current = [i] + [0] * len(hypothesis)
+        for j, hyp_token in enumerate(hypothesis, 1):
+            current[j] = min(
+                previous[j] + 1,
+                current[j - 1] + 1,
+                previous[j - 1] + (ref_token != hyp_token),
+            )
+        previous = current
+    return previous[-1]
+
+
+def character_errors(reference: str, hypothesis: str) -> Tuple[int, int]:
+    """返回 (错误数, 参考文本长度)，多条语句汇总时分别累加后再相除"""
+    ref_tokens = _tokenize(normalize_text(reference))
+    hyp_tokens = _tokenize(normalize_text(hypothesis))
+    return edit_distance(ref_tokens, hyp_tokens), len(ref_tokens)
+
+
+def character_error_rate(reference: str, hypothesis: str) -> float:
+    """字错误率 CER（参考文本为空时，假设文本也为空则为0，否则为1）"""
+    errors, length = character_errors(reference, hypothesis)
+    if length == 0:
+        return 0.0 if errors == 0 else 1.0
+    return errors / length
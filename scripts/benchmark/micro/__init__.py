@@ -0,0 +1,8 @@
+# -*- coding: utf-8 -*-
+"""
+服务端组件微基准测试
+
+不经过网络和模型，直接测量流式链路中单个组件的 CPU 开销。
+需在项目根目录以模块方式运行，例如:
+    python -m scripts.benchmark.micro.resampler
+"""
@@ -0,0 +1,163 @@
+# -*- coding: utf-8 -*-
+"""
+中间结果投递微基准
+
+模拟一个会话每分钟的 TranscriptionResultChanged 消息流，对比以下方式发送的
+字节数和 CPU 耗时（编码部分，不含网络）：
+
+- legacy: 每次构建完整dict + uuid4 message_id + json.dumps 累计全文（改造前）
+- full:   预生成头部模板编码累计全文
+- delta:  预生成头部模板，仅发送新增文本和offset
+- delta+throttle: delta 基础上按最小间隔/最小字数节流
+
+使用方法:
+    python -m scripts.benchmark.micro.partial_results
+    python -m scripts.benchmark.micro.partial_results --sentence-seconds 30 --interval-ms 300
+"""
+
+import argparse
+import json
+import random
+import time
+
+from app.models.websocket_asr import (
+    AliyunASRWSHeader,
+    AliyunASRNamespace,
+    AliyunASRMessageName,
+    AliyunASRStatus,
+)
+from app.services.websocket_messages import (
+    IntermediateResultEmitter,
+    encode_success_message,
+)
+
+TASK_ID = "a" * 32
+SAMPLE_CHARS = "今天天气很好我们一起去公园散步然后在湖边吃午饭下午回家继续工作"
+
+
+def _make_session(minutes: float, stride_ms: int, sentence_seconds: float, chars_per_second: float):
+    """生成每个chunk的 (句子编号, 音频时间ms, 本chunk新增文本) 序列"""
+    rng = random.Random(0)
+    chunks_per_sentence = max(1, int(sentence_seconds * 1000 // stride_ms))
+    total_chunks = int(minutes * 60 * 1000 // stride_ms)
+    chars_per_chunk = chars_per_second * stride_ms / 1000
+
+    events = []
+    carry = 0.0
+    for i in range(total_chunks):
+        carry += chars_per_chunk
+        count = int(carry)
+        carry -= count
+        text = "".join(rng.choice(SAMPLE_CHARS) for _ in range(count))
+        events.append((i // chunks_per_sentence + 1, (i + 1) * stride_ms, text))
+    return events
+
+
+def _legacy_encode(index: int, time_ms: int, result: str) -> str:
+    response = {
+        "header": {
+            "message_id": AliyunASRWSHeader.generate_message_id(),
+            "task_id": TASK_ID,
+            "namespace": AliyunASRNamespace.SPEECH_TRANSCRIBER,
+            "name": AliyunASRMessageName.TRANSCRIPTION_RESULT_CHANGED,
+            "status": AliyunASRStatus.SUCCESS,
+            "status_message": "GATEWAY|SUCCESS|Success.",
+        },
+        "payload": {"index": index, "time": time_ms, "result": result},
+    }
+    return json.dumps(response, ensure_ascii=False)
+
+
+def run_legacy(events):
+    sent_bytes = messages = 0
+    current_index, parts = 0, []
+    for index, time_ms, text in events:
+        if index != current_index:
+            current_index, parts = index, []
+        if not text:
+            continue
+        parts.append(text)
+        message = _legacy_encode(index, time_ms, "".join(parts))
+        sent_bytes += len(message.encode("utf-8"))
+        messages += 1
+    return sent_bytes, messages
+
+
+def run_emitter(events, mode: str, min_interval_ms: int = 0, min_chars: int = 1):
+    # 使用音频时间作为时钟，使节流结果可复现
+    clock_ms = [0]
+    emitter = IntermediateResultEmitter(
+        mode, min_interval_ms, min_chars, clock=lambda: clock_ms[0] / 1000.0
+    )
+    sent_bytes = messages = 0
+    current_index, parts = 0, []
+    for index, time_ms, text in events:
+        clock_ms[0] = time_ms
+        if index != current_index:
+            current_index, parts = index, []
+            emitter.reset()
+        if not text:
+            continue
+        parts.append(text)
+        payload = emitter.next_payload(index, time_ms, "".join(parts))
+        if payload is None:
+            continue
+        message = encode_success_message(
+            AliyunASRMessageName.TRANSCRIPTION_RESULT_CHANGED, TASK_ID, payload
+        )
+        sent_bytes += len(message.encode("utf-8"))
+        messages += 1
+    return sent_bytes, messages
+
+
+def _measure(func, repeat: int):
+    start = time.process_time()
+    for _ in range(repeat):
+        result = func()
+    elapsed = (time.process_time() - start) / repeat
+    return result, elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="中间结果投递微基准")
+    parser.add_argument("--minutes", type=float, default=1.0, help="模拟会话时长(分钟)")
+    parser.add_argument("--stride-ms", type=int, default=240, help="chunk步长(ms)")
+    parser.add_argument("--sentence-seconds", type=float, default=15.0, help="平均句长(秒)")
+    parser.add_argument("--chars-per-second", type=float, default=4.0, help="语速(字/秒)")
+    parser.add_argument("--interval-ms", type=int, default=200, help="节流模式最小发送间隔(ms)")
+    parser.add_argument("--min-chars", type=int, default=2, help="节流模式最小新增字数")
+    parser.add_argument("--repeat", type=int, default=50, help="重复次数（取平均CPU耗时）")
+    args = parser.parse_args()
+
+    events = _make_session(
+        args.minutes, args.stride_ms, args.sentence_seconds, args.chars_per_second
+    )
+    scale = 1.0 / args.minutes
+
+    cases = [
+        ("legacy", lambda: run_legacy(events)),
+        ("full", lambda: run_emitter(events, "full")),
+        ("delta", lambda: run_emitter(events, "delta")),
+        (
+            "delta+throttle",
+            lambda: run_emitter(events, "delta", args.interval_ms, args.min_chars),
+        ),
+    ]
+
+    print(
+        f"步长: {args.stride_ms}ms, 句长: {args.sentence_seconds:.0f}s, "
+        f"语速: {args.chars_per_second}字/s, 节流: {args.interval_ms}ms/{args.min_chars}字"
+    )
+    print("-" * 64)
+    print(f"{'模式':<16} | {'消息数/分钟':>10} | {'KB/分钟':>10} | {'CPU ms/分钟':>12}")
+
+    for name, func in cases:
+        (sent_bytes, messages), elapsed = _measure(func, args.repeat)
+        print(
+            f"{name:<16} | {messages * scale:>10.0f} | "
+            f"{sent_bytes * scale / 1024:>10.1f} | {elapsed * 1000 * scale:>12.3f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+# -*- coding: utf-8 -*-
+"""
+流式重采样微基准
+
+测量 StreamingResampler 处理每秒输入音频所需的 CPU 时间，
+并与逐帧调用 librosa.resample（若已安装）进行对比。
+
+使用方法:
+    python -m scripts.benchmark.micro.resampler
+    python -m scripts.benchmark.micro.resampler --rates 8000 48000 --frame-ms 20 --seconds 120
+"""
+
+import argparse
+import importlib.util
+import time
+
+import numpy as np
+
+from app.utils.stream_resampler import StreamingResampler
+
+TARGET_SR = 16000
+
+
+def _make_stream(sample_rate: int, seconds: float) -> np.ndarray:
+    """生成带噪声的多频合成语音信号"""
+    rng = np.random.default_rng(0)
+    t = np.arange(int(sample_rate * seconds)) / sample_rate
+    signal = (
+        0.3 * np.sin(2 * np.pi * 220 * t)
+        + 0.2 * np.sin(2 * np.pi * 1800 * t)
+        + 0.05 * rng.standard_normal(len(t))
+    )
+    return signal.astype(np.float32)
+
+
+def _iter_frames(audio: np.ndarray, frame_samples: int):
+    for start in range(0, len(audio), frame_samples):
+        yield audio[start:start + frame_samples]
+
+
+def bench_streaming(audio: np.ndarray, sample_rate: int, frame_samples: int) -> float:
+    """返回每秒音频的CPU耗时（毫秒）"""
+    resampler = StreamingResampler(sample_rate, TARGET_SR)
+    start = time.process_time()
+    for frame in _iter_frames(audio, frame_samples):
+        resampler.process(frame)
+    elapsed = time.process_time() - start
+    return elapsed * 1000 / (len(audio) / sample_rate)
+
+
+def bench_librosa(audio: np.ndarray, sample_rate: int, frame_samples: int) -> float:
+    """逐帧 librosa.resample 的每秒音频CPU耗时（毫秒）"""
+    import librosa
+
+    start = time.process_time()
+    for frame in _iter_frames(audio, frame_samples):
+        librosa.resample(frame, orig_sr=sample_rate, target_sr=TARGET_SR)
+    elapsed = time.process_time() - start
+    return elapsed * 1000 / (len(audio) / sample_rate)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="流式重采样微基准")
+    parser.add_argument(
+        "--rates", type=int, nargs="+", default=[8000, 22050, 24000, 48000],
+        help="输入采样率列表",
+    )
+    parser.add_argument("--frame-ms", type=int, default=100, help="每帧时长(毫秒)")
+    parser.add_argument("--seconds", type=float, default=60.0, help="每个采样率的流时长(秒)")
+    args = parser.parse_args()
+
+    has_librosa = importlib.util.find_spec("librosa") is not None
+
+    print(f"帧长: {args.frame_ms}ms, 流时长: {args.seconds:.0f}s, 目标采样率: {TARGET_SR}Hz")
+    print("-" * 64)
+    header = f"{'输入采样率':>10} | {'StreamingResampler':>20}"
+    if has_librosa:
+        header += f" | {'librosa逐帧':>14}"
+    print(header + "   (CPU ms / 流秒)")
+
+    for sample_rate in args.rates:
+        audio = _make_stream(sample_rate, args.seconds)
+        frame_samples = max(1, sample_rate * args.frame_ms // 1000)
+
+        row = f"{sample_rate:>10} | {bench_streaming(audio, sample_rate, frame_samples):>20.3f}"
+        if has_librosa:
+            row += f" | {bench_librosa(audio, sample_rate, frame_samples):>14.3f}"
+        print(row)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+ONNX 模型导出脚本
+
+将 ModelScope 缓存中的离线/在线 Paraformer、VAD、标点模型导出为 ONNX，
+供 funasr-onnx 引擎使用。导出文件（model.onnx、在线模型另有 decoder.onnx）
+写入各模型自身的缓存目录，引擎按相同的模型ID加载。
+
+使用方法（在项目根目录）:
+    # 导出 models.json 中所有 funasr-onnx 模型及 VAD/标点模型
+    python -m scripts.export_onnx
+
+    # 只导出指定模型，同时导出int8量化版本（model_quant.onnx，配合 ONNX_QUANTIZE=true）
+    python -m scripts.export_onnx --models paraformer-large-onnx --quantize
+
+    # 已存在的导出文件默认跳过，--force 重新导出
+    python -m scripts.export_onnx --force
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+
+from app.core.config import settings
+
+
+def collect_models(model_ids=None, include_aux: bool = True):
+    """收集需要导出的模型，返回 [(模型ID, 说明)]"""
+    with open(settings.models_config_path, "r", encoding="utf-8") as f:
+        config = json.load(f)
+
+    models = []
+    for model_id, model_config in config["models"].items():
+        if model_ids and model_id not in model_ids:
+            continue
+        if model_config.get("engine", "").lower() != "funasr-onnx":
+            if model_ids:
+                print(f"⚠️  {model_id} 的引擎不是 funasr-onnx，仍按请求导出")
+            else:
+                continue
+        paths = model_config.get("models", {})
+        if paths.get("offline"):
+            models.append((paths["offline"], f"{model_id} 离线模型"))
+        if paths.get("realtime"):
+            models.append((paths["realtime"], f"{model_id} 实时模型"))
+
+    if include_aux:
+        models.append((settings.VAD_MODEL, "VAD 模型"))
+        models.append((settings.PUNC_MODEL, "标点模型(离线)"))
+        models.append((settings.PUNC_REALTIME_MODEL, "标点模型(实时)"))
+
+    # 去重并保持顺序
+    unique = {}
+    for model_id, desc in models:
+        unique.setdefault(model_id, desc)
+    return list(unique.items())
+
+
+def export_model(model_id: str, quantize: bool, force: bool) -> str:
+    """导出单个模型，返回导出目录"""
+    from funasr import AutoModel
+
+    from app.services.asr.engine import resolve_model_path
+
+    model_dir = resolve_model_path(model_id)
+    if not os.path.isdir(model_dir):
+        raise FileNotFoundError(f"本地缓存不存在，请先运行 scripts/download_models.py: {model_id}")
+
+    target = os.path.join(model_dir, "model_quant.onnx" if quantize else "model.onnx")
+    if os.path.exists(target) and not force:
+        print(f"    ℹ️  已存在，跳过: {target}")
+        return model_dir
+
+    model = AutoModel(model=model_dir, device="cpu", **settings.FUNASR_AUTOMODEL_KWARGS)
+    return model.export(type="onnx", quantize=quantize)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="导出 funasr-onnx 引擎使用的 ONNX 模型")
+    parser.add_argument("--models", nargs="+", help="models.json 中的模型ID（默认所有 funasr-onnx 模型）")
+    parser.add_argument("--quantize", action="store_true", help="导出int8动态量化模型 model_quant.onnx")
+    parser.add_argument("--no-aux", action="store_true", help="不导出 VAD/标点模型")
+    parser.add_argument("--force", action="store_true", help="导出文件已存在时重新导出")
+    args = parser.parse_args()
+
+    models = collect_models(args.models, include_aux=not args.no_aux)
+
+    print("=" * 60)
+    print("FunASR ONNX 模型导出")
+    print("=" * 60)
+    print(f"待导出模型数: {len(models)}，量化: {'是' if args.quantize else '否'}")
+
+    failed = []
+    for i, (model_id, desc) in enumerate(models, 1):
+        print(f"\n[{i}/{len(models)}] 导出: {desc}")
+        print(f"    模型ID: {model_id}")
+        start = time.time()
+        try:
+            export_dir = export_model(model_id, args.quantize, args.force)
+            print(f"    ✅ 完成 ({time.time() - start:.1f}s): {export_dir}")
+        except Exception as e:
+            print(f"    ❌ 失败: {e}")
+            failed.append((model_id, str(e)))
+
+    print("\n" + "=" * 60)
+    if failed:
+        print(f"导出完成，{len(failed)} 个模型失败:")
+        for model_id, err in failed:
+            print(f"  - {model_id}: {err}")
+        sys.exit(1)
+    print("✅ 所有模型导出完成!")
+    print("=" * 60)
+
+
+if __name__ == "__main__":
+    main()
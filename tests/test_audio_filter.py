@@ -0,0 +1,59 @@
+# -*- coding: utf-8 -*-
+"""自适应近场过滤器测试"""
+
+import numpy as np
+
+from app.utils.audio_filter import AdaptiveNearfieldFilter, is_nearfield_voice
+
+SAMPLE_RATE = 16000
+CHUNK_SAMPLES = 9600  # 600ms
+
+
+def _tone(rms: float, seed: int) -> np.ndarray:
+    """指定RMS的类语音信号：语音频段正弦，约三成10ms子帧为音节间的静音间隙"""
+    rng = np.random.default_rng(seed)
+    t = np.arange(CHUNK_SAMPLES) / SAMPLE_RATE
+    audio = np.sin(2 * np.pi * 220 * t) + 0.1 * rng.standard_normal(CHUNK_SAMPLES)
+    subframes = audio.reshape(-1, SAMPLE_RATE // 100)
+    subframes[rng.random(len(subframes)) < 0.3] *= 0.01
+    audio = audio / np.sqrt(np.mean(audio ** 2)) * rms
+    return audio.astype(np.float32)
+
+
+def test_transient_does_not_reject_normal_speech():
+    """单次大音量瞬态之后，正常音量的语音仍判定为近场"""
+    nearfield_filter = AdaptiveNearfieldFilter(initial_threshold=0.01)
+    nearfield_filter.process(_tone(0.6, 0), SAMPLE_RATE)
+
+    accepted = 0
+    for i in range(200):
+        is_nearfield, _ = nearfield_filter.process(_tone(0.05, i + 1), SAMPLE_RATE)
+        accepted += is_nearfield
+
+    assert accepted == 200
+    # 与固定阈值的判定一致
+    assert is_nearfield_voice(_tone(0.05, 999), SAMPLE_RATE, rms_threshold=0.01)[0]
+
+
+def test_speech_threshold_is_capped():
+    """语音电平项不超过初始阈值的 SPEECH_THRESHOLD_CAP 倍"""
+    nearfield_filter = AdaptiveNearfieldFilter(initial_threshold=0.01)
+    for i in range(20):
+        nearfield_filter.process(_tone(0.6, i), SAMPLE_RATE)
+
+    cap = 0.01 * AdaptiveNearfieldFilter.SPEECH_THRESHOLD_CAP
+    assert nearfield_filter.speech_level * nearfield_filter.speech_ratio > cap
+    assert nearfield_filter.threshold() <= max(cap, nearfield_filter.noise_floor * nearfield_filter.noise_ratio)
+
+
+def test_speech_level_decays_on_filtered_chunks():
+    """远场chunk中语音电平向噪声底衰减"""
+    nearfield_filter = AdaptiveNearfieldFilter(initial_threshold=0.01)
+    nearfield_filter.process(_tone(0.6, 0), SAMPLE_RATE)
+    peak = nearfield_filter.speech_level
+
+    for i in range(50):
+        is_nearfield, _ = nearfield_filter.process(_tone(0.001, i + 1), SAMPLE_RATE)
+        assert not is_nearfield
+
+    assert nearfield_filter.speech_level < peak * 0.2
@@ -0,0 +1,147 @@
+# -*- coding: utf-8 -*-
+"""断线续传测试：chunk推理进行中断开连接后续传"""
+
+import asyncio
+import json
+import struct
+import threading
+import time
+
+import numpy as np
+from fastapi import WebSocketDisconnect
+
+from app.core.config import settings
+from app.services.asr.streaming import StreamingSession
+from app.services.websocket_asr import AliyunWebSocketASRService
+
+CHUNK_BYTES = 3840 * 2  # 240ms 16kHz PCM
+
+
+class _SlowRealtimeModel:
+    """每次推理耗时固定，记录同时进行的推理数"""
+
+    def __init__(self, delay: float = 0.3):
+        self.delay = delay
+        self.lock = threading.Lock()
+        self.active = 0
+        self.max_active = 0
+        self.calls = 0
+
+    def generate(self, input, cache, is_final, **kwargs):
+        with self.lock:
+            self.active += 1
+            self.max_active = max(self.max_active, self.active)
+        time.sleep(self.delay)
+        cache["chunks"] = cache.get("chunks", 0) + 1
+        with self.lock:
+            self.active -= 1
+            self.calls += 1
+        return [{"text": "" if is_final else "字"}]
+
+
+class _FakeEngine:
+    device = "cpu"
+    supports_realtime = True
+
+    def __init__(self, model):
+        self.realtime_model = model
+
+    def create_streaming_session(self, **kwargs):
+        return StreamingSession(self.realtime_model, **kwargs)
+
+
+class _FakeWebSocket:
+    """按顺序返回消息；数字表示等待该秒数后断开"""
+
+    headers = {}
+
+    def __init__(self, messages):
+        self.messages = list(messages)
+        self.sent = []
+
+    async def receive(self):
+        message = self.messages.pop(0)
+        if isinstance(message, float):
+            await asyncio.sleep(message)
+            raise WebSocketDisconnect()
+        await asyncio.sleep(0.01)
+        return message
+
+    async def receive_text(self):
+        return (await self.receive())["text"]
+
+    async def send_text(self, text):
+        self.sent.append(json.loads(text))
+
+    def names(self):
+        return [message["header"]["name"] for message in self.sent]
+
+
+def _text(name, task_id, payload=None):
+    return {
+        "text": json.dumps(
+            {
+                "header": {"namespace": "SpeechTranscriber", "name": name, "task_id": task_id},
+                "payload": payload or {},
+            }
+        )
+    }
+
+
+def _audio(seed):
+    rng = np.random.default_rng(seed)
+    return (rng.standard_normal(CHUNK_BYTES // 2) * 3000).astype(np.int16).tobytes()
+
+
+def test_disconnect_mid_chunk_then_resume(monkeypatch):
+    monkeypatch.setattr(settings, "ASR_STREAM_RESUME_GRACE_S", 30.0)
+    monkeypatch.setattr(settings, "ASR_ENABLE_NEARFIELD_FILTER", False)
+    monkeypatch.setattr(settings, "ASR_ENABLE_REALTIME_PUNC", False)
+
+    model = _SlowRealtimeModel()
+    service = AliyunWebSocketASRService()
+    engine = _FakeEngine(model)
+    service._ensure_asr_engine = lambda: engine
+
+    async def finalize(text, params, task_id):
+        return text
+
+    service._finalize_sentence_text = finalize
+
+    async def scenario():
+        # 多路复用连接：推理进行中（0.1s）断开
+        first = _FakeWebSocket(
+            [
+                _text("StartTranscription", "t1", {"format": "pcm"}),
+                {"bytes": struct.pack(">H", 0) + _audio(1)},
+                0.1,
+            ]
+        )
+        await service._process_multiplexed_connection(first, "mux")
+        resume_token = first.sent[0]["payload"]["resume_token"]
+        assert model.calls == 1
+
+        # 续传连接：继续发送音频并结束
+        second = _FakeWebSocket(
+            [
+                _text("StartTranscription", "t1", {"resume_token": resume_token}),
+                {"bytes": _audio(2)},
+                _text("StopTranscription", "t1"),
+            ]
+        )
+        await service._process_websocket_connection(second, "t1")
+        return second
+
+    second = asyncio.run(scenario())
+
+    started = second.sent[0]
+    assert started["header"]["name"] == "TranscriptionStarted"
+    assert started["payload"]["resumed"] is True
+    # 断开时在途的chunk已计入
+    assert started["payload"]["time"] == 240
+    assert "TaskFailed" not in second.names()
+    assert second.names()[-1] == "TranscriptionCompleted"
+    sentence_end = [m for m in second.sent if m["header"]["name"] == "SentenceEnd"][0]
+    assert sentence_end["payload"]["time"] == 480
+    # 续传的推理不会与断开前的推理线程并发
+    assert model.max_active == 1